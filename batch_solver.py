@@ -0,0 +1,250 @@
+"""Arayüz olmadan toplu labirent çözücü.
+
+Bir klasördeki tüm labirent görüntülerini (videolar için ilk kare) süreç havuzu
+(process pool) ile paralel işler: segmentasyon -> iskelet -> BFS -> sadeleştirme -> komut üretimi.
+
+Başlangıç/bitiş çiftleri JSON dosyasından okunur; koordinatlar arayüzdeki gibi [y, x]:
+
+    {
+        "*":          [{"start": [120, 40], "end": [610, 900]}],
+        "maze_07.jpg": [{"start": [35, 60], "end": [400, 410]}]
+    }
+
+"*" anahtarı, kendine özel çifti olmayan tüm görüntülere uygulanır.
+
+--fleet verilirse bir görüntünün tüm çiftleri aynı anda süren araçlar olarak da planlanır
+(fleet_planner.py) ve result.json'a 'fleet' bölümü eklenir.
+
+Kullanım:
+    python batch_solver.py --images kayitlar/ --pairs pairs.json --output sonuclar/ --workers 8
+"""
+import argparse
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+
+import drive_time
+import fleet_planner
+import image_sources
+import maze_core
+import segmentation_cache
+import skeletonization
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp') + image_sources.VIDEO_EXTENSIONS
+
+_worker_model = None
+_worker_cache = None
+
+
+def _init_worker(model_path, cache_dir=None):
+    global _worker_model, _worker_cache
+    _worker_model = maze_core.load_segmentation_model(model_path)
+    _worker_model.warm_up()
+    # Süreçler bellek LRU'sunu paylaşmaz ama aynı disk klasörünü paylaşır.
+    if cache_dir:
+        _worker_cache = segmentation_cache.SegmentationCache(cache_dir)
+
+
+def _write_mask(path, mask_01):
+    cv2.imwrite(path, (mask_01 * 255).astype('uint8'))
+
+
+def solve_image(image_path, pairs, output_dir, snap_radius=0, tiling=None, skeleton_engine=None, planner=None,
+                image_source=None, simplify_mode=None, simplify_tolerance=maze_core.AXIS_RDP_TOLERANCE_PX,
+                fleet=False):
+    """Tek bir görüntüyü çözer, maskeleri ve result.json dosyasını output_dir altına yazar."""
+    image_name = os.path.basename(image_path)
+    image_output_dir = os.path.join(output_dir, os.path.splitext(image_name)[0])
+    os.makedirs(image_output_dir, exist_ok=True)
+    result = {'image': image_name, 'pairs': [], 'error': None}
+    started = time.perf_counter()
+    time_model = drive_time.time_model_for_source(image_source)
+
+    try:
+        image_bgr = image_sources.source_for_path(image_path).read()
+        if image_bgr is None:
+            raise ValueError(f"Görüntü yüklenemedi: {image_name}")
+
+        segmentation = segmentation_cache.segment_with_cache(_worker_cache, _worker_model, image_bgr, tiling=tiling,
+                                                             skeleton_engine=skeleton_engine)
+        result['cache_hit'] = bool(segmentation.get('cache_hit'))
+        bfs_mask = segmentation['bfs_mask']
+        _write_mask(os.path.join(image_output_dir, 'raw_mask.png'), segmentation['raw_mask'])
+        _write_mask(os.path.join(image_output_dir, 'bfs_mask.png'), bfs_mask)
+        if segmentation['skeleton'] is not None:
+            _write_mask(os.path.join(image_output_dir, 'skeleton.png'), segmentation['skeleton'])
+        result['mask_type'] = segmentation['mask_type']
+        result['image_shape'] = list(image_bgr.shape[:2])
+        if 'tiling' in segmentation:
+            result['tiling'] = dict(segmentation['tiling'], tile_size=list(segmentation['tiling']['tile_size']))
+
+        for pair in pairs:
+            start = maze_core.snap_to_mask(bfs_mask, tuple(pair['start']), snap_radius)
+            end = maze_core.snap_to_mask(bfs_mask, tuple(pair['end']), snap_radius)
+            pair_result = {'start': pair['start'], 'end': pair['end'],
+                           'snapped_start': start, 'snapped_end': end, 'found': False}
+            if start is None or end is None:
+                pair_result['error'] = "Başlangıç/bitiş noktası yol maskesi üzerinde değil."
+            else:
+                solution = maze_core.solve_path(bfs_mask, start, end, verbose=False, planner=planner,
+                                                time_model=time_model, simplify_mode=simplify_mode,
+                                                simplify_tolerance=simplify_tolerance)
+                if solution is None:
+                    pair_result['error'] = "Yol bulunamadı."
+                else:
+                    pair_result['found'] = True
+                    pair_result['path_length_pixels'] = solution['path_length_pixels']
+                    pair_result['simplified_path'] = [list(map(int, node)) for node in solution['simplified_path']]
+                    pair_result['commands_for_pi'] = [[action, int(value)] for action, value in solution['commands_for_pi']]
+                    pair_result['commands_for_display'] = solution['commands_for_display']
+                    pair_result['planner_report'] = [dict(level, shape=list(level['shape']))
+                                                     for level in solution['planner_report']]
+                    pair_result['estimated_mission_s'] = solution['estimated_mission_s']
+            result['pairs'].append(pair_result)
+
+        if fleet and len(result['pairs']) >= 2:
+            result['fleet'] = _solve_fleet(bfs_mask, result['pairs'], time_model)
+    except Exception as e:
+        result['error'] = f"{e}\n{traceback.format_exc()}"
+
+    result['elapsed_s'] = time.perf_counter() - started
+    with open(os.path.join(image_output_dir, 'result.json'), 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    return result
+
+
+def _solve_fleet(bfs_mask, pair_results, time_model):
+    """Yakalanmış çiftleri tek filo olarak planlar; result.json'a yazılacak sözlüğü döndürür."""
+    if any(p['snapped_start'] is None or p['snapped_end'] is None for p in pair_results):
+        return {'solved': False, 'error': "Başlangıç/bitiş noktası yol maskesi üzerinde değil."}
+    try:
+        plan = fleet_planner.plan_fleet(bfs_mask, [(p['snapped_start'], p['snapped_end']) for p in pair_results],
+                                        time_model)
+    except ValueError as e:
+        return {'solved': False, 'error': str(e)}
+    vehicles = []
+    for vehicle in plan['vehicles']:
+        vehicle_result = {'found': vehicle['found'], 'priority': vehicle['priority']}
+        if vehicle['found']:
+            vehicle_result['simplified_path'] = [list(map(int, node)) for node in vehicle['simplified_path']]
+            vehicle_result['commands_for_pi'] = [[action, int(value)] for action, value in vehicle['commands_for_pi']]
+            vehicle_result['arrival_s'] = vehicle['arrival_s']
+            vehicle_result['wait_s'] = vehicle['wait_s']
+        else:
+            vehicle_result['error'] = vehicle['error']
+        vehicles.append(vehicle_result)
+    return {'solved': plan['solved'], 'vehicles': vehicles, 'makespan_s': plan['makespan_s'],
+            'independent_makespan_s': plan['independent_makespan_s'], 'tick_s': plan['tick_s'],
+            'cell_px': plan['cell_px'], 'replans': plan['replans'], 'ms': plan['ms']}
+
+
+def _pairs_for_image(all_pairs, image_name):
+    return all_pairs.get(image_name, all_pairs.get('*', []))
+
+
+def run_batch(images_dir, pairs_path, output_dir, workers=None, model_path=maze_core.MODEL_PATH, snap_radius=0,
+              tiling=None, cache_dir=None, skeleton_engine=None, planner=None, image_source=None, simplify_mode=None,
+              simplify_tolerance=maze_core.AXIS_RDP_TOLERANCE_PX, fleet=False):
+    image_paths = sorted(os.path.join(images_dir, f) for f in os.listdir(images_dir)
+                         if f.lower().endswith(IMAGE_EXTENSIONS))
+    if not image_paths:
+        raise FileNotFoundError(f"'{images_dir}' klasöründe uygun resim dosyası bulunamadı.")
+
+    all_pairs = {}
+    if pairs_path:
+        with open(pairs_path, 'r', encoding='utf-8') as f:
+            all_pairs = json.load(f)
+
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    print(f"{len(image_paths)} görüntü {workers} süreçte işlenecek...")
+
+    started = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(model_path, cache_dir)) as executor:
+        futures = {executor.submit(solve_image, path, _pairs_for_image(all_pairs, os.path.basename(path)),
+                                   output_dir, snap_radius, tiling, skeleton_engine, planner, image_source,
+                                   simplify_mode, simplify_tolerance, fleet): path
+                   for path in image_paths}
+        for done_count, future in enumerate(as_completed(futures), start=1):
+            result = future.result()
+            results.append(result)
+            found = sum(1 for p in result['pairs'] if p['found'])
+            status = "HATA" if result['error'] else f"{found}/{len(result['pairs'])} yol"
+            if 'fleet' in result:
+                status += ", filo " + ("çözüldü" if result['fleet']['solved'] else "çözülemedi")
+            print(f"[{done_count}/{len(image_paths)}] {result['image']}: {status} ({result['elapsed_s']:.2f}s)")
+
+    elapsed = time.perf_counter() - started
+    results.sort(key=lambda r: r['image'])
+    summary = {
+        'image_count': len(results),
+        'failed_images': [r['image'] for r in results if r['error']],
+        'pairs_total': sum(len(r['pairs']) for r in results),
+        'pairs_solved': sum(1 for r in results for p in r['pairs'] if p['found']),
+        'workers': workers,
+        'cache_hits': sum(1 for r in results if r.get('cache_hit')),
+        'elapsed_s': elapsed,
+        'images_per_second': len(results) / elapsed if elapsed > 0 else None,
+    }
+    if fleet:
+        summary['fleets_solved'] = sum(1 for r in results if r.get('fleet', {}).get('solved'))
+    tiled_results = [r['tiling'] for r in results if 'tiling' in r]
+    if tiled_results:
+        predict_s = sum(t['predict_ms'] for t in tiled_results) / 1000.0
+        summary['tiles_total'] = sum(t['tile_count'] for t in tiled_results)
+        summary['tiles_per_second'] = summary['tiles_total'] / predict_s if predict_s > 0 else None
+    with open(os.path.join(output_dir, 'summary.json'), 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    print(f"Tamamlandı: {summary['pairs_solved']}/{summary['pairs_total']} yol, {elapsed:.1f}s.")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Arayüzsüz toplu labirent çözücü")
+    parser.add_argument('--images', required=True, help="Labirent görüntülerinin bulunduğu klasör")
+    parser.add_argument('--pairs', help="Başlangıç/bitiş çiftlerini içeren JSON dosyası ([y, x])")
+    parser.add_argument('--output', required=True, help="Maskelerin, yolların ve komutların yazılacağı klasör")
+    parser.add_argument('--workers', type=int, default=None, help="Süreç sayısı (varsayılan: CPU çekirdek sayısı)")
+    parser.add_argument('--model', default=maze_core.MODEL_PATH, help="Segmentasyon modeli (.h5, .tflite veya .onnx)")
+    parser.add_argument('--snap-radius', type=int, default=0,
+                        help="Maske dışındaki noktaları bu yarıçap içindeki en yakın yol pikseline taşı")
+    parser.add_argument('--tiled', action='store_true',
+                        help="Görüntüyü küçültmek yerine örtüşen döşemelerle orijinal çözünürlükte segmentle")
+    parser.add_argument('--tile-size', type=int, default=None, help="Döşeme kenarı (px, varsayılan: model girdi boyutu)")
+    parser.add_argument('--tile-overlap', type=int, default=maze_core.DEFAULT_TILE_OVERLAP, help="Döşeme örtüşmesi (px)")
+    parser.add_argument('--tile-batch', type=int, default=None,
+                        help="Tek predict çağrısındaki en fazla döşeme (varsayılan: hepsi)")
+    parser.add_argument('--cache-dir', default=None,
+                        help="Segmentasyon önbelleği klasörü (tekrar çalıştırmalarda model atlanır)")
+    parser.add_argument('--skeleton-engine', choices=skeletonization.SKELETON_ENGINES,
+                        default=skeletonization.DEFAULT_SKELETON_ENGINE, help="İskelet çıkarma motoru")
+    parser.add_argument('--planner', choices=maze_core.PATH_PLANNERS, default=maze_core.DEFAULT_PATH_PLANNER,
+                        help="Yol arama: bfs, bfs-bidir (çift yönlü), astar, astar-manhattan, jps, "
+                             "multires (kabadan inceye), graph (iskelet grafı), drive-time (en kısa görev süresi), "
+                             "goal-field (hedefe köklü mesafe alanı)")
+    parser.add_argument('--image-source', choices=tuple(drive_time.ADIM_KAZANCI), default='camera',
+                        help="Görev süresi tahmininde kullanılacak Pi adım kazançları")
+    parser.add_argument('--simplify', choices=maze_core.SIMPLIFY_MODES, default=maze_core.DEFAULT_SIMPLIFY_MODE,
+                        help="Yol sadeleştirme: exact (her yön değişimi) veya axis-rdp (eksen hizalı Douglas-Peucker)")
+    parser.add_argument('--simplify-tolerance', type=float, default=maze_core.AXIS_RDP_TOLERANCE_PX,
+                        help="axis-rdp için en büyük sapma (px)")
+    parser.add_argument('--fleet', action='store_true',
+                        help="Görüntünün tüm çiftlerini aynı anda süren araçlar olarak çakışmasız planla")
+    args = parser.parse_args()
+    tiling = None
+    if args.tiled:
+        tiling = {'tile_size': args.tile_size, 'overlap': args.tile_overlap, 'batch_size': args.tile_batch}
+    run_batch(args.images, args.pairs, args.output, workers=args.workers,
+              model_path=args.model, snap_radius=args.snap_radius, tiling=tiling, cache_dir=args.cache_dir,
+              skeleton_engine=args.skeleton_engine, planner=args.planner, image_source=args.image_source,
+              simplify_mode=args.simplify, simplify_tolerance=args.simplify_tolerance, fleet=args.fleet)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+"""Klasik (OpenCV) labirent segmentasyonu ve U-Net'e otomatik geri dönüş.
+
+İyi aydınlatılmış tahtalarda uyarlamalı eşikleme + morfoloji koridor maskesini
+birkaç milisaniyede üretir. Her sonuç için bir kalite puanı hesaplanır:
+  * bağlantılılık: koridor alanının en büyük bileşende toplanan oranı (başlangıç/bitiş
+    verilmişse ikisinin aynı bileşende olması),
+  * koridor genişliği dağılımı: iskelet üzerindeki genişliklerin medyana yakın olan oranı,
+  * iskelet düzgünlüğü: iskelet uzunluğuna göre uç nokta (kısa dal) sayısı,
+  * koridor oranı: görüntünün makul bir kısmının koridor olması.
+Puan MIN_QUALITY_SCORE altındaysa U-Net kullanılır.
+
+Karşılaştırma:
+    python classical_segmentation.py --images kayitlar/ --model final_maze_segmentation_unet_model.h5
+"""
+import argparse
+import os
+import statistics
+import time
+
+import cv2
+import numpy as np
+
+import maze_core
+
+ADAPTIVE_BLOCK_SIZE = 51
+ADAPTIVE_C = 10
+MORPH_KERNEL_SIZE = 5
+WORK_MAX_SIDE = 640
+MIN_COMPONENT_AREA_RATIO = 0.001
+MIN_QUALITY_SCORE = 0.8
+CORRIDOR_RATIO_RANGE = (0.15, 0.9)
+MAX_ENDPOINT_RATIO = 0.02  # iskelet pikseli başına uç nokta; gürültülü maskelerde iskelet çok dallanır
+WIDTH_TOLERANCE = 0.5  # medyanın ±%50'si "tutarlı genişlik" sayılır
+SEGMENTATION_ENGINES = ('unet', 'opencv', 'auto')
+
+
+def corridor_mask_opencv(image_bgr, walls_dark=True, block_size=ADAPTIVE_BLOCK_SIZE, c=ADAPTIVE_C,
+                         kernel_size=MORPH_KERNEL_SIZE):
+    """Orijinal çözünürlükte 0/1 koridor maskesi döndürür (1 = yol)."""
+    gray = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2GRAY) if image_bgr.ndim == 3 else image_bgr
+    gray = cv2.GaussianBlur(gray, (5, 5), 0)
+    threshold_type = cv2.THRESH_BINARY_INV if walls_dark else cv2.THRESH_BINARY
+    walls = cv2.adaptiveThreshold(gray, 1, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, threshold_type, block_size, c)
+
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (kernel_size, kernel_size))
+    # Duvarlardaki küçük boşluklar kapatılır, koridordaki gürültü lekeleri silinir.
+    walls = cv2.morphologyEx(walls, cv2.MORPH_CLOSE, kernel)
+    walls = cv2.morphologyEx(walls, cv2.MORPH_OPEN, kernel)
+    corridors = (1 - walls).astype(np.uint8)
+
+    component_count, labels, component_stats, _ = cv2.connectedComponentsWithStats(corridors, connectivity=8)
+    min_area = MIN_COMPONENT_AREA_RATIO * corridors.size
+    keep = np.zeros(component_count, dtype=bool)
+    keep[1:] = component_stats[1:, cv2.CC_STAT_AREA] >= min_area
+    return keep[labels].astype(np.uint8)
+
+
+def endpoints_connected_in(mask, start_node, end_node, snap_radius=15, labels=None):
+    """Başlangıç ve bitiş (en yakın yol pikseline taşınmış haliyle) aynı bağlı bileşende mi?"""
+    start = maze_core.snap_to_mask(mask, start_node, snap_radius)
+    end = maze_core.snap_to_mask(mask, end_node, snap_radius)
+    if start is None or end is None:
+        return False
+    if labels is None:
+        _, labels = cv2.connectedComponents(mask, connectivity=8)
+    return bool(labels[start] == labels[end])
+
+
+def _skeleton_endpoint_ratio(skeleton):
+    neighbour_count = cv2.filter2D(skeleton, cv2.CV_16S, np.ones((3, 3), np.int16), borderType=cv2.BORDER_CONSTANT) - 1
+    endpoints = np.count_nonzero((skeleton == 1) & (neighbour_count == 1))
+    return endpoints / max(1, int(skeleton.sum()))
+
+
+def quality_score(corridor_mask, skeleton=None, start_node=None, end_node=None, snap_radius=15, skeleton_engine=None):
+    """Maskenin BFS için güvenilirliğini 0..1 arasında puanlar; ayrıntıları sözlük olarak döndürür."""
+    corridor_area = int(corridor_mask.sum())
+    if corridor_area == 0:
+        return {'score': 0.0, 'corridor_ratio': 0.0, 'largest_component_ratio': 0.0,
+                'width_consistency': 0.0, 'median_width_px': None, 'skeleton_smoothness': 0.0,
+                'endpoints_connected': None}
+
+    corridor_ratio = corridor_area / corridor_mask.size
+    _, labels, component_stats, _ = cv2.connectedComponentsWithStats(corridor_mask, connectivity=8)
+    largest_component_ratio = component_stats[1:, cv2.CC_STAT_AREA].max() / corridor_area
+
+    if skeleton is None:
+        skeleton = maze_core.skeletonize_mask(corridor_mask, skeleton_engine)
+    width_consistency, median_width, skeleton_smoothness = 0.0, None, 0.0
+    if skeleton is not None:
+        skeleton_smoothness = float(max(0.0, 1.0 - _skeleton_endpoint_ratio(skeleton) / MAX_ENDPOINT_RATIO))
+        distance = cv2.distanceTransform(corridor_mask, cv2.DIST_L2, 3)
+        widths = 2.0 * distance[skeleton == 1]
+        median_width = float(np.median(widths))
+        if median_width > 0:
+            width_consistency = float(np.mean(np.abs(widths - median_width) <= WIDTH_TOLERANCE * median_width))
+
+    low, high = CORRIDOR_RATIO_RANGE
+    ratio_ok = 1.0 if low <= corridor_ratio <= high else 0.0
+    if start_node is not None and end_node is not None:
+        endpoints_connected = endpoints_connected_in(corridor_mask, start_node, end_node, snap_radius, labels)
+        connectivity = 1.0 if endpoints_connected else 0.0
+    else:
+        endpoints_connected = None
+        connectivity = float(largest_component_ratio)
+
+    score = 0.35 * connectivity + 0.25 * width_consistency + 0.25 * skeleton_smoothness + 0.15 * ratio_ok
+    return {'score': float(score), 'corridor_ratio': float(corridor_ratio),
+            'largest_component_ratio': float(largest_component_ratio),
+            'width_consistency': width_consistency, 'median_width_px': median_width,
+            'skeleton_smoothness': skeleton_smoothness, 'endpoints_connected': endpoints_connected}
+
+
+def segment_maze_opencv(image_bgr, start_node=None, end_node=None, walls_dark=True, work_max_side=WORK_MAX_SIDE,
+                        skeleton_engine=None):
+    """segment_maze_image ile aynı sözlüğü üretir ve 'quality' puanı ekler.
+
+    U-Net akışındaki gibi 'raw_mask' ve 'skeleton' çalışma ölçeğinde (uzun kenar en fazla
+    work_max_side), 'bfs_mask' orijinal ölçektedir. Noktalar orijinal koordinatlardadır.
+    """
+    started = time.perf_counter()
+    orig_h, orig_w = image_bgr.shape[:2]
+    scale = min(1.0, work_max_side / max(orig_h, orig_w)) if work_max_side else 1.0
+    work_image = image_bgr
+    if scale < 1.0:
+        work_image = cv2.resize(image_bgr, (max(1, int(orig_w * scale)), max(1, int(orig_h * scale))),
+                                interpolation=cv2.INTER_AREA)
+    work_h, work_w = work_image.shape[:2]
+
+    def to_work(node):
+        if node is None:
+            return None
+        return (min(work_h - 1, int(node[0] * work_h / orig_h)), min(work_w - 1, int(node[1] * work_w / orig_w)))
+
+    corridors = corridor_mask_opencv(work_image, walls_dark=walls_dark)
+    skeleton, chosen_mask, mask_type = maze_core.select_bfs_mask(corridors, skeleton_engine)
+    quality = quality_score(corridors, skeleton, to_work(start_node), to_work(end_node))
+    bfs_mask = chosen_mask
+    if (work_h, work_w) != (orig_h, orig_w):
+        bfs_mask = cv2.resize(chosen_mask, (orig_w, orig_h), interpolation=cv2.INTER_NEAREST)
+    return {
+        'raw_mask': corridors,
+        'skeleton': skeleton,
+        'bfs_mask': bfs_mask,
+        'padding_info': {},
+        'mask_type': mask_type + " [OpenCV]",
+        'engine': 'opencv',
+        'quality': quality,
+        'elapsed_ms': (time.perf_counter() - started) * 1000.0,
+    }
+
+
+def segment_maze_auto(image_bgr, neural_segment, start_node=None, end_node=None, min_quality=MIN_QUALITY_SCORE,
+                      skeleton_engine=None):
+    """Önce OpenCV'yi dener; kalite puanı düşükse neural_segment() (U-Net) sonucunu döndürür."""
+    segmentation = segment_maze_opencv(image_bgr, start_node, end_node, skeleton_engine=skeleton_engine)
+    if segmentation['quality']['score'] >= min_quality:
+        return segmentation
+    print(f"OpenCV segmentasyon kalitesi düşük ({segmentation['quality']['score']:.2f} < {min_quality}); U-Net kullanılıyor.")
+    fallback = neural_segment()
+    fallback['engine'] = 'unet'
+    fallback['opencv_quality'] = segmentation['quality']
+    return fallback
+
+
+def _mask_iou(a, b):
+    union = np.logical_or(a, b).sum()
+    return float(np.logical_and(a, b).sum() / union) if union else 1.0
+
+
+def benchmark(images_dir, model_path=maze_core.MODEL_PATH, min_quality=MIN_QUALITY_SCORE, repeats=3):
+    """Kayıtlı görüntülerde iki motoru süre, U-Net'e göre IoU ve geri dönüş oranıyla karşılaştırır."""
+    image_paths = sorted(os.path.join(images_dir, f) for f in os.listdir(images_dir)
+                         if f.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp')))
+    if not image_paths:
+        raise FileNotFoundError(f"'{images_dir}' klasöründe görüntü bulunamadı.")
+    model = maze_core.load_segmentation_model(model_path)
+    model.warm_up()
+
+    rows = []
+    for path in image_paths:
+        image_bgr = cv2.imread(path, cv2.IMREAD_COLOR)
+        if image_bgr is None:
+            continue
+        orig_h, orig_w = image_bgr.shape[:2]
+        unet_ms, opencv_ms = [], []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            unet = maze_core.segment_maze_image(model, image_bgr)
+            unet_ms.append((time.perf_counter() - started) * 1000.0)
+            started = time.perf_counter()
+            opencv = segment_maze_opencv(image_bgr)
+            opencv_ms.append((time.perf_counter() - started) * 1000.0)
+        unet_corridors = maze_core.mask_to_original_scale(unet['raw_mask'], unet['padding_info'], orig_w, orig_h)
+        opencv_corridors = cv2.resize(opencv['raw_mask'], (orig_w, orig_h), interpolation=cv2.INTER_NEAREST)
+        rows.append({
+            'image': os.path.basename(path),
+            'unet_ms': statistics.median(unet_ms),
+            'opencv_ms': statistics.median(opencv_ms),
+            'score': opencv['quality']['score'],
+            'iou': _mask_iou(unet_corridors == 1, opencv_corridors == 1),
+        })
+
+    print(f"{'Görüntü':<28} {'U-Net ms':>9} {'OpenCV ms':>10} {'Puan':>6} {'IoU':>6}")
+    for row in rows:
+        print(f"{row['image'][:28]:<28} {row['unet_ms']:>9.1f} {row['opencv_ms']:>10.1f} {row['score']:>6.2f} {row['iou']:>6.3f}")
+    fallbacks = sum(1 for row in rows if row['score'] < min_quality)
+    print(f"Medyan: U-Net {statistics.median(r['unet_ms'] for r in rows):.1f} ms, "
+          f"OpenCV {statistics.median(r['opencv_ms'] for r in rows):.1f} ms, "
+          f"IoU {statistics.median(r['iou'] for r in rows):.3f}; "
+          f"otomatik modda U-Net'e dönüş: {fallbacks}/{len(rows)}")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenCV ve U-Net segmentasyon karşılaştırması")
+    parser.add_argument('--images', required=True, help="Kayıtlı labirent görüntülerinin klasörü")
+    parser.add_argument('--model', default=maze_core.MODEL_PATH)
+    parser.add_argument('--min-quality', type=float, default=MIN_QUALITY_SCORE)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+    benchmark(args.images, args.model, args.min_quality, args.repeats)
+
+
+if __name__ == '__main__':
+    main()
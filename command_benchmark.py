@@ -0,0 +1,122 @@
+"""Tek geçişli komut optimizasyonunun eski çok aşamalı hatla eşdeğerlik kontrolü ve ölçümü.
+
+Rastgele üretilen girdilerde maze_core.generate_and_process_commands çıktısı (Pi demetleri ve
+arayüz metinleri) eski hattın çıktısıyla birebir karşılaştırılır:
+  * rastgele ham komut dizileri (ileri değerleri eşik çevresinde, ardışık/zıt dönüşler),
+  * rastgele 8-komşulu yürüyüşlerden sadeleştirilmiş yollar.
+Herhangi bir fark varsa ilk örnek yazdırılır ve çıkış kodu 1'dir. Ardından uzun yollarda
+iki hattın süresi karşılaştırılır.
+
+Kullanım:
+    python command_benchmark.py --cases 20000 --lengths 1000 10000 100000
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+
+import maze_core
+
+ACTIONS = ("ileri_a", "ileri_b", "saga_don", "sola_don")
+
+
+def legacy_generate_and_process_commands(simplified_path_nodes,
+                                         min_acceptable_forward_step=maze_core.MIN_ACCEPTABLE_FORWARD_STEP):
+    """Eski hat (birleştir, filtrele, birleştir, zıt dönüş iptali, birleştir, son dönüşü at); karşılaştırma için."""
+    return legacy_process_commands(maze_core.generate_vehicle_perspective_commands(simplified_path_nodes),
+                                   min_acceptable_forward_step)
+
+
+def legacy_process_commands(raw_vehicle_commands_tuples, min_acceptable_forward_step):
+    processed_commands_tuples = maze_core.consolidate_vehicle_commands(raw_vehicle_commands_tuples)
+    processed_commands_tuples = maze_core.filter_short_forwards(processed_commands_tuples, min_acceptable_forward_step)
+    processed_commands_tuples = maze_core.consolidate_vehicle_commands(processed_commands_tuples)
+    processed_commands_tuples = maze_core.nullify_opposing_turns(processed_commands_tuples)
+    final_commands_tuples = maze_core.consolidate_vehicle_commands(processed_commands_tuples)
+    if final_commands_tuples and final_commands_tuples[-1][0] in maze_core.TURN_ACTIONS:
+        final_commands_tuples.pop()
+    return final_commands_tuples, maze_core.commands_to_display(final_commands_tuples)
+
+
+def new_process_commands(raw_vehicle_commands_tuples, min_acceptable_forward_step):
+    commands, texts = [], []
+    for command, text in maze_core.optimize_commands(raw_vehicle_commands_tuples, min_acceptable_forward_step):
+        commands.append(command)
+        if text is not None:
+            texts.append(text)
+    return commands, texts
+
+
+def random_raw_commands(rng, length):
+    commands = []
+    for _ in range(length):
+        action = rng.choice(ACTIONS)
+        commands.append((action, rng.randint(0, 25) if action.startswith("ileri") else 0))
+    return commands
+
+
+def random_walk_path(rng, length, step_bias=0.7):
+    """Yön değiştirme olasılığı 1 - step_bias olan 8-komşulu yürüyüş (tekrarlanan pikseller dahil)."""
+    moves = [(dy, dx) for dy in (-1, 0, 1) for dx in (-1, 0, 1)]
+    y, x = 0, 0
+    move = rng.choice(moves)
+    path = [(y, x)]
+    for _ in range(length):
+        if rng.random() > step_bias:
+            move = rng.choice(moves)
+        y, x = y + move[0], x + move[1]
+        path.append((y, x))
+    return path
+
+
+def check_equivalence(cases, seed=0):
+    rng = random.Random(seed)
+    for case in range(cases):
+        minimum = rng.choice((0, 5, maze_core.MIN_ACCEPTABLE_FORWARD_STEP, 20))
+        if case % 2:
+            raw = random_raw_commands(rng, rng.randint(0, 40))
+        else:
+            nodes = maze_core.simplify_path(random_walk_path(rng, rng.randint(1, 400)))
+            raw = maze_core.generate_vehicle_perspective_commands(nodes)
+        expected = legacy_process_commands(list(raw), minimum)
+        actual = new_process_commands(raw, minimum)
+        if actual != expected:
+            print(f"FARK (durum {case}, eşik {minimum}):\n  girdi: {raw}\n  eski:  {expected[0]}\n  yeni:  {actual[0]}")
+            return False
+    print(f"{cases} rastgele durumda çıktı aynı.")
+    return True
+
+
+def benchmark(lengths, repeats=5, seed=1):
+    rng = random.Random(seed)
+    print(f"{'Ham komut':>10} {'Eski ms (medyan)':>17} {'Yeni ms (medyan)':>17} {'Hızlanma':>9}")
+    for length in lengths:
+        raw = random_raw_commands(rng, length)
+        timings = {}
+        for name, process in (('eski', legacy_process_commands), ('yeni', new_process_commands)):
+            samples = []
+            for _ in range(repeats):
+                started = time.perf_counter()
+                process(raw, maze_core.MIN_ACCEPTABLE_FORWARD_STEP)
+                samples.append((time.perf_counter() - started) * 1000.0)
+            timings[name] = statistics.median(samples)
+        print(f"{length:>10} {timings['eski']:>17.2f} {timings['yeni']:>17.2f} "
+              f"{timings['eski'] / timings['yeni']:>8.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Komut optimizasyonu eşdeğerlik kontrolü ve ölçümü")
+    parser.add_argument('--cases', type=int, default=20000, help="Rastgele eşdeğerlik durumu sayısı")
+    parser.add_argument('--lengths', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help="Ölçülecek ham komut dizisi uzunlukları")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    if not check_equivalence(args.cases, args.seed):
+        return 1
+    benchmark(args.lengths)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""COMMANDS mesajı için sürümlü, sıkıştırılmış ikili kodlama (PC ve Pi ortak modülü).
+
+Yalnızca standart kütüphane kullanır; Raspberry Pi'de raspberrypiside.py ile aynı klasöre
+kopyalanması yeterlidir.
+
+Sürüm 1/2 çerçevesi:
+    [sürüm: 1 bayt][komut sayısı: varint]
+    her komut için [işlem kodu: 1 bayt][değer: varint]
+    [CRC32: 4 bayt, big-endian; önceki tüm baytlar üzerinden]
+
+Sürüm 2, sürüm 1'e 'bekle' (değer: milisaniye) işlem kodunu ekler; filo çizelgeleri
+(fleet_planner.py) bunu kullanır.
+
+Varint, LEB128 (7 bit/bayt, düşük bitler önce) biçimindedir; 127'ye kadar değerler tek
+bayttır. Satır sonlu metin protokolüne uymak için çerçeve base64 ile COMMANDS_BIN:
+önekiyle gönderilir. Pi bağlanınca CAPS:COMMANDS_BIN=1,2 ile desteklediği sürümleri bildirir;
+bildirmeyen (eski) Pi'ye JSON COMMANDS: gönderilmeye devam edilir.
+"""
+import base64
+import binascii
+import json
+import numbers
+import struct
+import zlib
+
+CODEC_VERSION = 2
+SUPPORTED_VERSIONS = (1, 2)
+
+JSON_PREFIX = "COMMANDS:"
+BINARY_PREFIX = "COMMANDS_BIN:"
+CAPS_PREFIX = "CAPS:"
+CAPS_BINARY_KEY = "COMMANDS_BIN"
+
+# İlk dört işlem kodu jit_kernels.COMMAND_CODES ile aynı sıradadır.
+OPCODES = ("ileri_a", "ileri_b", "saga_don", "sola_don", "bekle")
+_OPCODE_FOR_ACTION = {action: code for code, action in enumerate(OPCODES)}
+# Sürüm başına geçerli işlem kodu sayısı.
+_OPCODE_COUNT = {1: 4, 2: 5}
+
+_CRC = struct.Struct('>I')
+
+
+def _write_varint(out, value):
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, pos, end):
+    value, shift = 0, 0
+    while True:
+        if pos >= end:
+            raise ValueError("İkili komut çerçevesi eksik (varint yarıda kaldı).")
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+        if shift > 63:
+            raise ValueError("İkili komut çerçevesinde geçersiz varint.")
+
+
+def encode_commands(commands, version=CODEC_VERSION):
+    """[(eylem, değer), ...] -> bayt çerçevesi."""
+    if version not in SUPPORTED_VERSIONS:
+        raise ValueError(f"Desteklenmeyen kodlama sürümü: {version}")
+    out = bytearray((version,))
+    _write_varint(out, len(commands))
+    for action, value in commands:
+        opcode = _OPCODE_FOR_ACTION.get(action)
+        if opcode is None or opcode >= _OPCODE_COUNT[version]:
+            raise ValueError(f"Kodlanamayan komut: {action} (sürüm {version})")
+        if not isinstance(value, numbers.Integral) or value < 0:
+            raise ValueError(f"Komut değeri negatif olmayan tam sayı olmalı: {action}, {value}")
+        out.append(opcode)
+        _write_varint(out, int(value))
+    out += _CRC.pack(zlib.crc32(out) & 0xFFFFFFFF)
+    return bytes(out)
+
+
+def decode_commands(data):
+    """Bayt çerçevesi -> [(eylem, değer), ...]; bozuk çerçevede ValueError."""
+    if len(data) < 1 + 1 + _CRC.size:
+        raise ValueError("İkili komut çerçevesi çok kısa.")
+    end = len(data) - _CRC.size
+    if (zlib.crc32(data[:end]) & 0xFFFFFFFF) != _CRC.unpack_from(data, end)[0]:
+        raise ValueError("İkili komut çerçevesinde CRC uyuşmazlığı.")
+    if data[0] not in SUPPORTED_VERSIONS:
+        raise ValueError(f"Desteklenmeyen kodlama sürümü: {data[0]}")
+    count, pos = _read_varint(data, 1, end)
+    opcode_count = _OPCODE_COUNT[data[0]]
+    commands = []
+    for _ in range(count):
+        if pos >= end:
+            raise ValueError("İkili komut çerçevesi eksik (komut sayısı tutmuyor).")
+        opcode = data[pos]
+        if opcode >= opcode_count:
+            raise ValueError(f"Bilinmeyen işlem kodu: {opcode}")
+        value, pos = _read_varint(data, pos + 1, end)
+        commands.append((OPCODES[opcode], value))
+    if pos != end:
+        raise ValueError("İkili komut çerçevesinde fazladan bayt var.")
+    return commands
+
+
+def caps_message(extra_fields=None):
+    """Pi'nin bağlanınca gönderdiği yetenek mesajı; extra_fields: {anahtar: sürümler} (ör. görev akışı)."""
+    fields = {CAPS_BINARY_KEY: SUPPORTED_VERSIONS}
+    fields.update(extra_fields or {})
+    return CAPS_PREFIX + ';'.join(f"{key}={','.join(str(v) for v in versions)}" for key, versions in fields.items())
+
+
+def parse_caps_fields(message):
+    """CAPS: mesajı -> {anahtar: {sürüm, ...}}; sayı olmayan değerler yok sayılır."""
+    fields = {}
+    for field in message[len(CAPS_PREFIX):].split(';'):
+        key, _, values = field.partition('=')
+        versions = fields.setdefault(key.strip(), set())
+        for value in values.split(','):
+            if value.strip().isdigit():
+                versions.add(int(value))
+    return fields
+
+
+def parse_caps(message):
+    """CAPS: mesajından karşı tarafın desteklediği ikili sürümleri döndürür (bilinmeyen alanlar yok sayılır)."""
+    return parse_caps_fields(message).get(CAPS_BINARY_KEY, set())
+
+
+def required_version(commands):
+    """Komutları taşıyabilen en düşük sürüm (JSON alıcısının da bu sürümü anlaması gerekir)."""
+    highest = max((_OPCODE_FOR_ACTION.get(action, 0) for action, _ in commands), default=0)
+    return min(version for version, count in _OPCODE_COUNT.items() if highest < count)
+
+
+def negotiated_version(peer_versions):
+    """İki tarafın da desteklediği en yüksek sürüm; ortak sürüm yoksa None (JSON kullanılır)."""
+    common = set(peer_versions) & set(SUPPORTED_VERSIONS)
+    return max(common) if common else None
+
+
+def encode_message(commands, version=None):
+    """Gönderilecek satır: sürüm verilirse COMMANDS_BIN:<base64>, yoksa JSON COMMANDS:."""
+    if version is None:
+        return JSON_PREFIX + json.dumps([list(command) for command in commands])
+    return BINARY_PREFIX + base64.b64encode(encode_commands(commands, version)).decode('ascii')
+
+
+def decode_binary_payload(payload):
+    """COMMANDS_BIN: önekinden sonraki base64 metni çözer."""
+    try:
+        data = base64.b64decode(payload.strip(), validate=True)
+    except binascii.Error:
+        raise ValueError("İkili komut çerçevesi geçerli base64 değil.")
+    return decode_commands(data)
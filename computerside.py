@@ -1,29 +1,32 @@
-import tensorflow as tf
 import cv2
 import numpy as np
 import os
-from collections import deque
 import traceback
 import threading
 import math
-import socket 
-import json  
 import time  
 
-try:
-    from skimage.morphology import skeletonize
-    SKIMAGE_AVAILABLE = True
-except ImportError:
-    print("UYARI: 'scikit-image' kütüphanesi bulunamadı. İskelet çıkarma bazı durumlarda çalışmayabilir.")
-    SKIMAGE_AVAILABLE = False
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 from PIL import Image, ImageTk
 
-MODEL_PATH = 'final_maze_segmentation_unet_model.h5'  
-THRESHOLD = 0.5
-SMALL_STEP_THRESHOLD = 6 
-MIN_ACCEPTABLE_FORWARD_STEP = 10 
+import image_sources
+import classical_segmentation
+import command_codec
+import drive_time
+import fleet_planner
+import goal_field
+import jit_kernels
+import link_health
+import live_replanner
+import segmentation_cache
+import skeleton_graph
+import skeletonization
+import vehicle_server
+import maze_core
+import mission_stream
+from maze_core import MODEL_PATH
+
 LIVE_PATH_LINE_COLOR = (0, 0, 255)  
 LIVE_PATH_LINE_THICKNESS = 3
 LIVE_START_POINT_COLOR = (0, 255, 0) 
@@ -39,10 +42,36 @@ VEHICLE_IMAGE_FILENAME = "arac.png"
 ANIMATION_DELAY_MS = 100
 STEPS_PER_SEGMENT = 20 
 PIXEL_MOVE_PER_COMMAND_ANIM_STEP = 10  
-
+HOVER_PREVIEW_INTERVAL_MS = 30
+HOVER_PREVIEW_COLOR = "orange"
+FLEET_PATH_COLORS = [(0, 0, 255), (255, 0, 255), (0, 165, 255), (255, 255, 0), (0, 128, 0), (128, 0, 128)]
+
+
+SEGMENTATION_ENGINE_LABELS = {
+    "U-Net": 'unet',
+    "OpenCV (hızlı)": 'opencv',
+    "Otomatik (OpenCV, gerekirse U-Net)": 'auto',
+}
+FALLBACK_SNAP_RADIUS = 15
+PATH_PLANNER_LABELS = {
+    "BFS": 'bfs',
+    "BFS (çift yönlü)": 'bfs-bidir',
+    "A* (oktil)": 'astar',
+    "A* (Manhattan)": 'astar-manhattan',
+    "Jump Point Search": 'jps',
+    "Kabadan inceye": 'multires',
+    "İskelet grafı": 'graph',
+    "Sürüş süresi (en hızlı görev)": 'drive-time',
+    "Hedef alanı (önbellekli)": 'goal-field',
+}
+SIMPLIFY_MODE_LABELS = {
+    "Tam (her yön değişimi)": 'exact',
+    "Eksen hizalı RDP": 'axis-rdp',
+}
 
 SERVER_HOST = '0.0.0.0' 
-SERVER_PORT = 65432  
+SERVER_PORT = 65432
+LINK_STATUS_INTERVAL_MS = 1000  
 
 
 class MazeSolverApp:
@@ -56,7 +85,7 @@ class MazeSolverApp:
         self.IMG_HEIGHT, self.IMG_WIDTH, self.IMG_CHANNELS = None, None, None
         self.is_grayscale_model = False
 
-        self.image_path = None
+        self.image_source = None
         self.original_cv_image = None
         self.h_orig_for_path, self.w_orig_for_path = 0, 0
         self.image_with_skeleton_overlay_for_selection = None
@@ -69,8 +98,16 @@ class MazeSolverApp:
         self.start_point_original_coords = None
         self.end_point_original_coords = None
         self.selected_points_on_canvas = []
+        # Hedefe köklü mesafe alanı; maske nesnesi veya hedef değişince geçersiz sayılır.
+        self.goal_field = None
+        self.goal_field_mask = None
+        self.goal_field_building_key = None
+        self.hover_preview_line_id = None
+        self.pending_hover_xy = None
+        self.hover_after_id = None
 
         self.current_mask_type_str = "Bilinmeyen"
+        self.current_segmentation_engine = None
         self.raw_model_mask_pil = None
         self.skeleton_model_scale_pil = None
         self.bfs_mask_pil = None
@@ -81,12 +118,16 @@ class MazeSolverApp:
         self.last_simplified_path_for_overlay = None
         self.last_generated_commands_for_pi_json = []
         self.last_generated_commands_for_display = []
+        # Filo planlama: aynı maske üzerinde birden çok (başlangıç, bitiş) çifti ve son çakışmasız çizelge.
+        self.fleet_pairs = []
+        self.last_fleet_plan = None
 
 
         self.camera_thread = None
         self.stop_camera_event = threading.Event()
         self.is_live_camera_active = False
         self.video_capture_device = None
+        self.live_replanner = None
 
         self.is_camera_streaming_on_main_canvas = False
         self.camera_preview_thread = None
@@ -117,20 +158,26 @@ class MazeSolverApp:
         self.lbl_skeleton_mask_canvas = None
         self.lbl_raw_model_mask_canvas = None
 
-        self.socket_server_thread = None
-        self.stop_socket_server_event = threading.Event()
-        self.server_socket = None
-        self.client_socket = None
-        self.client_address = None
+        # Her bağlı araç için bağımsız oturum (plan, kalibrasyon, görev durumu); yalnızca arayüz thread'inde değişir.
+        self.vehicle_server = None
+        self.vehicle_sessions = {}
+        self.vehicle_choice_ids = []
+        self.selected_vehicle_id = None
         self.is_server_running = False
         self.server_status_message = "Sunucu: Başlatılmadı"
         self.pi_status_message = "Raspberry Pi: Bağlı Değil"
-        self.is_pi_calibrating = False
-        self.is_pi_driving = False
-        self.pi_calibration_offset = None
+
+        self.segmentation_cache = segmentation_cache.SegmentationCache()
+
+        self.model_ready_event = threading.Event()
+        self.pending_model_actions = []
+        self.model_status_message = "Model: Yükleniyor..."
 
         self.setup_ui()
+        self.link_status_after_id = self.root.after(LINK_STATUS_INTERVAL_MS, self._poll_link_health)
         self.load_model_on_startup()
+        # Numba varsa çekirdekler ilk yol aramasından önce derlenir (veya disk önbelleğinden yüklenir).
+        threading.Thread(target=jit_kernels.warm_up, daemon=True).start()
         self.load_vehicle_image()
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
 
@@ -149,6 +196,39 @@ class MazeSolverApp:
         self.lbl_image_status = ttk.Label(self.control_frame, text="Görüntü seçilmedi.")
         self.lbl_image_status.pack(pady=5, fill=tk.X)
 
+        self.lbl_model_status = ttk.Label(self.control_frame, text=self.model_status_message)
+        self.lbl_model_status.pack(pady=5, fill=tk.X)
+
+        self.segmentation_frame = ttk.LabelFrame(self.control_frame, text="Segmentasyon", padding=5)
+        self.segmentation_frame.pack(pady=5, fill=tk.X)
+        self.tiled_segmentation_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(self.segmentation_frame, text="Döşemeli (yüksek çözünürlük)",
+                        variable=self.tiled_segmentation_var).grid(row=0, column=0, columnspan=2, sticky=tk.W)
+        ttk.Label(self.segmentation_frame, text="Döşeme (px):").grid(row=1, column=0, sticky=tk.W)
+        self.tile_size_var = tk.IntVar(value=128)
+        ttk.Spinbox(self.segmentation_frame, from_=64, to=1024, increment=32, width=6,
+                    textvariable=self.tile_size_var).grid(row=1, column=1, sticky=tk.W)
+        ttk.Label(self.segmentation_frame, text="Örtüşme (px):").grid(row=2, column=0, sticky=tk.W)
+        self.tile_overlap_var = tk.IntVar(value=maze_core.DEFAULT_TILE_OVERLAP)
+        ttk.Spinbox(self.segmentation_frame, from_=0, to=512, increment=8, width=6,
+                    textvariable=self.tile_overlap_var).grid(row=2, column=1, sticky=tk.W)
+        ttk.Label(self.segmentation_frame, text="Motor:").grid(row=3, column=0, sticky=tk.W)
+        self.segmentation_engine_var = tk.StringVar(value="U-Net")
+        ttk.Combobox(self.segmentation_frame, textvariable=self.segmentation_engine_var, state='readonly', width=18,
+                     values=list(SEGMENTATION_ENGINE_LABELS)).grid(row=3, column=1, sticky=tk.W)
+        ttk.Label(self.segmentation_frame, text="İskelet:").grid(row=4, column=0, sticky=tk.W)
+        self.skeleton_engine_var = tk.StringVar(value=skeletonization.DEFAULT_SKELETON_ENGINE)
+        ttk.Combobox(self.segmentation_frame, textvariable=self.skeleton_engine_var, state='readonly', width=18,
+                     values=list(skeletonization.SKELETON_ENGINES)).grid(row=4, column=1, sticky=tk.W)
+        ttk.Label(self.segmentation_frame, text="Yol arama:").grid(row=5, column=0, sticky=tk.W)
+        self.path_planner_var = tk.StringVar(value="BFS")
+        ttk.Combobox(self.segmentation_frame, textvariable=self.path_planner_var, state='readonly', width=18,
+                     values=list(PATH_PLANNER_LABELS)).grid(row=5, column=1, sticky=tk.W)
+        ttk.Label(self.segmentation_frame, text="Sadeleştirme:").grid(row=6, column=0, sticky=tk.W)
+        self.simplify_mode_var = tk.StringVar(value="Tam (her yön değişimi)")
+        ttk.Combobox(self.segmentation_frame, textvariable=self.simplify_mode_var, state='readonly', width=18,
+                     values=list(SIMPLIFY_MODE_LABELS)).grid(row=6, column=1, sticky=tk.W)
+
         self.lbl_point_instruction = ttk.Label(self.control_frame, text="1. Başlangıç noktasını seçin.")
         self.lbl_point_instruction.pack(pady=10, fill=tk.X)
 
@@ -156,6 +236,22 @@ class MazeSolverApp:
                                       state=tk.DISABLED)
         self.btn_process.pack(pady=10, fill=tk.X)
 
+        self.fleet_frame = ttk.LabelFrame(self.control_frame, text="Filo Planlama", padding=5)
+        self.fleet_frame.pack(pady=5, fill=tk.X)
+        self.fleet_frame.columnconfigure((0, 1), weight=1)
+        self.btn_fleet_add = ttk.Button(self.fleet_frame, text="Çifti Filoya Ekle", command=self.add_pair_to_fleet)
+        self.btn_fleet_add.grid(row=0, column=0, sticky=tk.EW)
+        self.btn_fleet_clear = ttk.Button(self.fleet_frame, text="Filoyu Temizle", command=self.clear_fleet)
+        self.btn_fleet_clear.grid(row=0, column=1, sticky=tk.EW)
+        self.btn_fleet_plan = ttk.Button(self.fleet_frame, text="Filoyu Planla", command=self.plan_fleet_routes,
+                                         state=tk.DISABLED)
+        self.btn_fleet_plan.grid(row=1, column=0, sticky=tk.EW)
+        self.btn_fleet_drive = ttk.Button(self.fleet_frame, text="Filoyu Sür (Pi)", command=self.drive_fleet_on_pi,
+                                          state=tk.DISABLED)
+        self.btn_fleet_drive.grid(row=1, column=1, sticky=tk.EW)
+        self.lbl_fleet_status = ttk.Label(self.fleet_frame, text="Filo: 0 çift")
+        self.lbl_fleet_status.grid(row=2, column=0, columnspan=2, sticky=tk.W)
+
         self.animation_control_frame = ttk.LabelFrame(self.control_frame, text="Animasyon (PC)", padding=5)
         self.animation_control_frame.pack(pady=10, fill=tk.X)
 
@@ -170,6 +266,11 @@ class MazeSolverApp:
         self.rpi_control_frame = ttk.LabelFrame(self.control_frame, text="Raspberry Pi Kontrolü", padding=5)
         self.rpi_control_frame.pack(pady=10, fill=tk.X)
 
+        ttk.Label(self.rpi_control_frame, text="Araç:").pack(anchor=tk.W)
+        self.cmb_vehicle = ttk.Combobox(self.rpi_control_frame, state="readonly", width=28)
+        self.cmb_vehicle.pack(pady=(0, 5), fill=tk.X)
+        self.cmb_vehicle.bind("<<ComboboxSelected>>", self.on_vehicle_selected)
+
         self.btn_drive_vehicle = ttk.Button(self.rpi_control_frame, text="Aracı Sür (Pi)",
                                             command=self.drive_vehicle_on_pi, state=tk.DISABLED)
         self.btn_drive_vehicle.pack(pady=5, fill=tk.X)
@@ -178,8 +279,14 @@ class MazeSolverApp:
                                                  command=self.stop_vehicle_on_pi, state=tk.DISABLED)
         self.btn_stop_vehicle_on_pi.pack(pady=5, fill=tk.X)
 
+        self.btn_stop_all_vehicles = ttk.Button(self.rpi_control_frame, text="Tüm Araçları Durdur",
+                                                command=self.stop_all_vehicles, state=tk.DISABLED)
+        self.btn_stop_all_vehicles.pack(pady=5, fill=tk.X)
+
         self.lbl_pi_status = ttk.Label(self.rpi_control_frame, text=self.pi_status_message)
         self.lbl_pi_status.pack(pady=5, fill=tk.X)
+        self.lbl_link_status = ttk.Label(self.rpi_control_frame, text="Bağlantı: ölçüm yok", wraplength=260)
+        self.lbl_link_status.pack(pady=(0, 5), fill=tk.X)
 
         self.server_control_frame = ttk.LabelFrame(self.control_frame, text="Ağ Sunucusu (PC)", padding=5)
         self.server_control_frame.pack(pady=10, fill=tk.X, side=tk.BOTTOM)
@@ -202,6 +309,9 @@ class MazeSolverApp:
         self.canvas_image = tk.Canvas(self.image_interaction_frame, bg="gray")
         self.canvas_image.pack(fill=tk.BOTH, expand=True)
         self.canvas_image.bind("<Button-1>", self.on_image_click)
+        self.canvas_image.bind("<Button-3>", self.on_image_right_click)
+        self.canvas_image.bind("<Motion>", self.on_image_hover)
+        self.canvas_image.bind("<Leave>", lambda e: self._clear_hover_preview())
         self.canvas_image.bind("<Configure>", self.on_main_canvas_resize)
 
         self.results_frame = ttk.LabelFrame(self.root, text="Sonuçlar", padding=10)
@@ -259,6 +369,20 @@ class MazeSolverApp:
         self.live_camera_status_label = ttk.Label(self.tab_live_camera, text="Yol bulunursa kamera burada aktifleşir.")
         self.live_camera_status_label.pack(pady=5)
 
+        self.live_replan_frame = ttk.Frame(self.tab_live_camera)
+        self.live_replan_frame.pack(pady=(0, 5), fill=tk.X, padx=5)
+        self.live_replan_var = tk.BooleanVar(value=False)
+        self.chk_live_replan = ttk.Checkbutton(self.live_replan_frame, text="Canlı Yeniden Planlama",
+                                               variable=self.live_replan_var, command=self.toggle_live_replanning)
+        self.chk_live_replan.pack(side=tk.LEFT)
+        ttk.Label(self.live_replan_frame, text="Hedef Hz:").pack(side=tk.LEFT, padx=(10, 2))
+        self.live_replan_hz_var = tk.DoubleVar(value=live_replanner.DEFAULT_TARGET_HZ)
+        self.spn_live_replan_hz = ttk.Spinbox(self.live_replan_frame, from_=0.5, to=15.0, increment=0.5, width=5,
+                                              textvariable=self.live_replan_hz_var)
+        self.spn_live_replan_hz.pack(side=tk.LEFT)
+        self.lbl_live_replan_status = ttk.Label(self.tab_live_camera, text="Canlı planlama kapalı.")
+        self.lbl_live_replan_status.pack(pady=(0, 5))
+
     def _update_server_status_ui(self, message):
         self.server_status_message = message
         if hasattr(self, 'lbl_server_status') and self.lbl_server_status.winfo_exists():
@@ -271,263 +395,320 @@ class MazeSolverApp:
             self.root.after(0, lambda: self.lbl_pi_status.config(text=self.pi_status_message))
         print(f"PI_STATUS: {message}")
 
+    def _set_vehicle_status(self, session, message):
+        """Oturumun durum metnini günceller; seçili araçsa Pi durum etiketine de yazar."""
+        session.status = message
+        print(f"PI_STATUS [{session.label}]: {message}")
+        if session.session_id == self.selected_vehicle_id:
+            self.pi_status_message = message
+            if hasattr(self, 'lbl_pi_status') and self.lbl_pi_status.winfo_exists():
+                self.lbl_pi_status.config(text=message)
+
+    def _selected_session(self):
+        return self.vehicle_sessions.get(self.selected_vehicle_id)
+
+    def _refresh_vehicle_controls(self):
+        """Araç listesini ve seçili araca göre Sür/Durdur düğmelerini yeniler (arayüz thread'inde)."""
+        if not (hasattr(self, 'cmb_vehicle') and self.cmb_vehicle.winfo_exists()):
+            return
+        self.vehicle_choice_ids = list(self.vehicle_sessions)
+        labels = []
+        for session_id in self.vehicle_choice_ids:
+            session = self.vehicle_sessions[session_id]
+            state = "sürüyor" if session.is_driving else ("kalibrasyon" if session.is_calibrating else "hazır")
+            labels.append(f"{session.label} - {state}")
+        self.cmb_vehicle['values'] = labels
+        if self.selected_vehicle_id not in self.vehicle_sessions:
+            self.selected_vehicle_id = self.vehicle_choice_ids[0] if self.vehicle_choice_ids else None
+        if self.selected_vehicle_id is None:
+            self.cmb_vehicle.set("")
+        else:
+            self.cmb_vehicle.current(self.vehicle_choice_ids.index(self.selected_vehicle_id))
+
+        session = self._selected_session()
+        if hasattr(self, 'lbl_pi_status') and self.lbl_pi_status.winfo_exists():
+            self.lbl_pi_status.config(text=session.status if session else "Raspberry Pi: Bağlı Değil")
+        can_drive = session is not None and bool(self.last_generated_commands_for_pi_json) and \
+            not (session.is_driving or session.is_calibrating)
+        self.btn_drive_vehicle.config(state=tk.NORMAL if can_drive else tk.DISABLED)
+        self.btn_stop_vehicle_on_pi.config(state=tk.NORMAL if session is not None else tk.DISABLED)
+        self.btn_stop_all_vehicles.config(state=tk.NORMAL if self.vehicle_sessions else tk.DISABLED)
+        self._update_fleet_controls()
+
+    def on_vehicle_selected(self, event=None):
+        index = self.cmb_vehicle.current()
+        if 0 <= index < len(self.vehicle_choice_ids):
+            self.selected_vehicle_id = self.vehicle_choice_ids[index]
+        self._refresh_vehicle_controls()
+
     def toggle_socket_server(self):
         if self.is_server_running:
             self._update_server_status_ui("Sunucu: Durduruluyor...")
-            self.stop_socket_server_event.set()
-            if self.client_socket:
-                try:
-                    self.client_socket.shutdown(socket.SHUT_RDWR)
-                    self.client_socket.close()
-                except:
-                    pass
-                self.client_socket = None
-                self._update_pi_status_ui("Raspberry Pi: Bağlantı Kesildi (Sunucu Durdu)")
-                self.btn_drive_vehicle.config(state=tk.DISABLED)
-                self.btn_stop_vehicle_on_pi.config(state=tk.DISABLED)
-
-            if self.socket_server_thread and self.socket_server_thread.is_alive():
-                try:
-                    if self.server_socket:
-                        self.server_socket.close() 
-                    self.socket_server_thread.join(timeout=2.0)
-                except Exception as e:
-                    print(f"Sunucu thread'i join hatası: {e}")
-
+            if self.vehicle_server:
+                self.vehicle_server.stop()
+            self.vehicle_server = None
             self.is_server_running = False
             self.btn_toggle_server.config(text="Sunucuyu Başlat")
             self._update_server_status_ui("Sunucu: Durduruldu")
-            self.server_socket = None 
         else:
             self.is_server_running = True
-            self.stop_socket_server_event.clear()
             self.btn_toggle_server.config(text="Sunucuyu Durdur")
             self._update_server_status_ui(f"Sunucu: {SERVER_HOST}:{SERVER_PORT} üzerinde başlatılıyor...")
+            # Geri çağrılar sunucu thread'inden gelir; oturum durumu yalnızca arayüz thread'inde değişir.
+            self.vehicle_server = vehicle_server.VehicleServer(
+                SERVER_HOST, SERVER_PORT,
+                on_connect=lambda session: self.root.after(0, lambda: self._on_vehicle_connected(session)),
+                on_message=lambda session, msg: self.root.after(0, lambda: self.process_message_from_pi(session, msg)),
+                on_disconnect=lambda session: self.root.after(0, lambda: self._on_vehicle_disconnected(session)),
+                on_status=lambda msg, running: self.root.after(0, lambda: self._on_server_status(msg, running)))
+            self.vehicle_server.start()
+
+    def _on_server_status(self, message, running):
+        self._update_server_status_ui(message)
+        if not running and self.is_server_running and self.vehicle_server and self.vehicle_server.start_failed:
+            # Başlatma hatası: düğme eski haline döner.
+            self.is_server_running = False
+            self.vehicle_server = None
+            self.btn_toggle_server.config(text="Sunucuyu Başlat")
 
-            self.socket_server_thread = threading.Thread(target=self._socket_server_loop, daemon=True)
-            self.socket_server_thread.start()
-
-    def _socket_server_loop(self):
-        if self.server_socket is None: 
-            self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            try:
-                self.server_socket.bind((SERVER_HOST, SERVER_PORT))
-                self.server_socket.listen(1)
-                self.root.after(0, lambda: self._update_server_status_ui(
-                    f"Sunucu: {SERVER_HOST}:{SERVER_PORT} dinleniyor..."))
-            except socket.error as e:
-                self.root.after(0, lambda msg=f"Sunucu başlatma hatası: {e}": self._update_server_status_ui(msg))
-                self.root.after(0, self.toggle_socket_server) 
-                self.is_server_running = False 
-                if self.server_socket: self.server_socket.close() 
-                self.server_socket = None 
-                return 
-
-        while self.is_server_running and not self.stop_socket_server_event.is_set():
-            try:
-                if not self.server_socket: 
-                    print("Sunucu soketi None, döngüden çıkılıyor.")
-                    break
-
-                self.server_socket.settimeout(1.0) 
-                conn, addr = self.server_socket.accept()
-
-                if self.client_socket is not None:
-                    print(f"Zaten bir istemci ({self.client_address}) bağlı. Yeni bağlantı ({addr}) reddedildi.")
-                    conn.sendall(b"BUSY\n")
-                    conn.close()
-                    continue
-
-                self.client_socket = conn
-                self.client_address = addr
-                self.root.after(0, lambda a=addr: self._update_pi_status_ui(f"Raspberry Pi: {a[0]}:{a[1]} bağlandı."))
-                self.root.after(0, lambda: self.btn_drive_vehicle.config(
-                    state=tk.NORMAL if self.last_generated_commands_for_pi_json else tk.DISABLED))
-                self.root.after(0, lambda: self.btn_stop_vehicle_on_pi.config(state=tk.NORMAL))
-
-                self._handle_client_connection(conn, addr)
-
-                if self.client_socket == conn:
-                    self.client_socket = None
-                    self.client_address = None
-                    self.root.after(0, lambda: self._update_pi_status_ui("Raspberry Pi: Bağlantı Kesildi."))
-                    self.root.after(0, lambda: self.btn_drive_vehicle.config(state=tk.DISABLED))
-                    self.root.after(0, lambda: self.btn_stop_vehicle_on_pi.config(state=tk.DISABLED))
-                    self.is_pi_calibrating = False
-                    self.is_pi_driving = False
-
-            except socket.timeout:
-                continue
-            except socket.error as e:
-                if self.stop_socket_server_event.is_set():
-                    print(f"Sunucu soketi kapatıldı (beklenen): {e}")
+    def _on_vehicle_connected(self, session):
+        self.vehicle_sessions[session.session_id] = session
+        if self.selected_vehicle_id is None:
+            self.selected_vehicle_id = session.session_id
+        self._set_vehicle_status(session, f"Raspberry Pi: {session.label} bağlandı.")
+        self._update_server_status_ui(f"Sunucu: {len(self.vehicle_sessions)} araç bağlı.")
+        self._refresh_vehicle_controls()
+
+    def _on_vehicle_disconnected(self, session):
+        self.vehicle_sessions.pop(session.session_id, None)
+        if session.link.sent:
+            print(f"{session.label} bağlantı özeti: {link_health.format_summary(session.link.snapshot())}")
+        session.is_calibrating = False
+        session.is_driving = False
+        self._set_vehicle_status(session, "Raspberry Pi: Bağlantı Kesildi.")
+        if self.is_server_running:
+            self._update_server_status_ui(f"Sunucu: {len(self.vehicle_sessions)} araç bağlı.")
+        self._refresh_vehicle_controls()
+
+    def _poll_link_health(self):
+        """Seçili aracın kalp atışı özetini yeniler; yanıtsız kalan veya geri gelen aracı bildirir."""
+        for session in list(self.vehicle_sessions.values()):
+            snapshot = session.link.snapshot()
+            if snapshot['stalled'] != session.link_stalled:
+                session.link_stalled = snapshot['stalled']
+                if snapshot['stalled']:
+                    print(f"UYARI: {session.label} {snapshot['silence_s']:.0f} s'dir kalp atışına yanıt vermiyor.")
+                    self._set_vehicle_status(session, f"Bağlantı yanıtsız ({snapshot['silence_s']:.0f} s).")
                 else:
-                    print(f"Sunucu accept/socket hatası: {e}")
-                break 
-            except Exception as e:
-                if not self.stop_socket_server_event.is_set():
-                     self.root.after(0, lambda msg=f"Sunucu döngü hatası: {e}": self._update_server_status_ui(msg))
-                break
-
-        if self.server_socket: 
-            try:
-                self.server_socket.close()
-            except: pass
-        self.server_socket = None 
-        self.is_server_running = False 
-        self.root.after(0, lambda: self.btn_toggle_server.config(text="Sunucuyu Başlat"))
-        if not self.stop_socket_server_event.is_set(): 
-            self.root.after(0, lambda: self._update_server_status_ui("Sunucu: Hata ile durdu"))
-        else: 
-             self.root.after(0, lambda: self._update_server_status_ui("Sunucu: Durduruldu"))
-        print("Soket sunucu döngüsü sonlandı.")
-
-
-    def _handle_client_connection(self, client_sock, client_addr):
-        client_sock.settimeout(1.0)
-        self.is_pi_calibrating = False
-        self.is_pi_driving = False
-
-        try:
-            while self.is_server_running and not self.stop_socket_server_event.is_set():
-                try:
-                    data = client_sock.recv(1024)
-                    if not data:
-                        self.root.after(0,
-                                        lambda: self._update_pi_status_ui(f"Pi ({client_addr[0]}) bağlantıyı kapattı."))
-                        break
-
-                    message_from_pi = data.decode('utf-8').strip()
-                    for single_msg in message_from_pi.split('\n'):
-                        if single_msg:
-                            self.root.after(0, lambda msg=single_msg.strip(): self.process_message_from_pi(msg))
-
-                except socket.timeout:
-                    continue
-                except socket.error as e:
-                    self.root.after(0, lambda err=str(e): self._update_pi_status_ui(
-                        f"Pi ({client_addr[0]}) ile soket hatası: {err}"))
-                    break
-        finally:
-            print(f"İstemci {client_addr} ile bağlantı sonlandırılıyor (_handle_client_connection).")
+                    self._set_vehicle_status(session, "Bağlantı yeniden yanıt veriyor.")
+        session = self._selected_session()
+        if hasattr(self, 'lbl_link_status') and self.lbl_link_status.winfo_exists():
+            self.lbl_link_status.config(text=link_health.format_summary(session.link.snapshot()) if session
+                                        else "Bağlantı: ölçüm yok")
+        self.link_status_after_id = self.root.after(LINK_STATUS_INTERVAL_MS, self._poll_link_health)
+
+    def send_to_pi(self, session, message):
+        if session is not None and self.vehicle_server and self.vehicle_server.send(session, message):
+            print(f"Pi'ye gönderildi [{session.label}]: {message}")
+            return True
+        self._update_pi_status_ui("Pi'ye gönderilemedi: Bağlantı yok veya sunucu çalışmıyor.")
+        return False
 
-    def send_to_pi(self, message):
-        if self.client_socket and self.is_server_running:
-            try:
-                self.client_socket.sendall((message + "\n").encode('utf-8'))
-                print(f"Pi'ye gönderildi: {message}")
-                return True
-            except socket.error as e:
-                self._update_pi_status_ui(f"Pi'ye gönderme hatası: {e}")
-                if self.client_socket:
-                    try: self.client_socket.close()
-                    except: pass
-                self.client_socket = None
-                self.client_address = None
-                self._update_pi_status_ui("Raspberry Pi: Bağlantı Kesildi.")
-                self.btn_drive_vehicle.config(state=tk.DISABLED)
-                self.btn_stop_vehicle_on_pi.config(state=tk.DISABLED)
-                self.is_pi_calibrating = False
-                self.is_pi_driving = False
-                return False
-        else:
-            self._update_pi_status_ui("Pi'ye gönderilemedi: Bağlantı yok veya sunucu çalışmıyor.")
-            return False
+    def process_message_from_pi(self, session, message):
+        self._set_vehicle_status(session, f"Pi'den alındı: {message}")
 
-    def process_message_from_pi(self, message):
-        self._update_pi_status_ui(f"Pi'den alındı: {message}")
+        if message.startswith("VEHICLE:"):
+            session.name = message[len("VEHICLE:"):].strip() or None
+            self._set_vehicle_status(session, f"Araç adı: {session.label}")
 
-        if message.startswith("CALIBRATION_DONE:"):
-            self.is_pi_calibrating = False
+        elif message.startswith("CALIBRATION_DONE:"):
+            session.is_calibrating = False
             try:
                 offset_str = message.split(":")[1]
-                self.pi_calibration_offset = float(offset_str)
-                self._update_pi_status_ui(
-                    f"Pi kalibrasyonu tamamlandı (Ofset: {self.pi_calibration_offset:.2f}). Komutlar gönderiliyor...")
+                session.calibration_offset = float(offset_str)
+                self._set_vehicle_status(
+                    session, f"Pi kalibrasyonu tamamlandı (Ofset: {session.calibration_offset:.2f}). Komutlar gönderiliyor...")
 
-                if not self.last_generated_commands_for_pi_json:
-                    self._update_pi_status_ui("Hata: Pi için gönderilecek komut bulunamadı.")
-                    self.send_to_pi("ERROR:NO_COMMANDS_AVAILABLE")
+                if not session.plan:
+                    self._set_vehicle_status(session, "Hata: Pi için gönderilecek komut bulunamadı.")
+                    self.send_to_pi(session, "ERROR:NO_COMMANDS_AVAILABLE")
                     return
 
-                if self.last_generated_commands_for_pi_json:
-                    json_commands = json.dumps(self.last_generated_commands_for_pi_json)
-                    self.send_to_pi(f"COMMANDS:{json_commands}")
-                    self.is_pi_driving = True
-                    self.btn_drive_vehicle.config(state=tk.DISABLED)
-                    self.btn_stop_vehicle_on_pi.config(state=tk.NORMAL)
-                else: 
-                    self._update_pi_status_ui("Pi için geçerli komut oluşturulamadı (iç boş).")
-                    self.send_to_pi("ERROR:NO_VALID_COMMANDS_FORMED_EMPTY")
+                self._send_commands_to_pi(session, session.codec_version)
+                session.is_driving = True
 
             except Exception as e:
-                self._update_pi_status_ui(f"Kalibrasyon ofset ayrıştırma veya komut gönderme hatası: {e}")
-                self.send_to_pi("ERROR:CALIBRATION_OR_COMMAND_SEND_ERROR")
-
+                self._set_vehicle_status(session, f"Kalibrasyon ofset ayrıştırma veya komut gönderme hatası: {e}")
+                self.send_to_pi(session, "ERROR:CALIBRATION_OR_COMMAND_SEND_ERROR")
 
         elif message == "CALIBRATION_FAIL:MPU_INIT_ERROR":
-            self.is_pi_calibrating = False
-            self._update_pi_status_ui("Pi kalibrasyonu başarısız: MPU başlatılamadı.")
-            self.btn_drive_vehicle.config(
-                state=tk.NORMAL if self.client_socket and self.last_generated_commands_for_pi_json else tk.DISABLED)
+            session.is_calibrating = False
+            self._set_vehicle_status(session, "Pi kalibrasyonu başarısız: MPU başlatılamadı.")
 
         elif message == "COMMANDS_RECEIVED_VALID":
-            self._update_pi_status_ui("Pi komutları aldı, araç hareket ediyor...")
-            self.btn_stop_vehicle_on_pi.config(state=tk.NORMAL)
+            self._set_vehicle_status(session, "Pi komutları aldı, araç hareket ediyor...")
+
+        elif message.startswith(command_codec.CAPS_PREFIX):
+            session.codec_version = command_codec.negotiated_version(command_codec.parse_caps(message))
+            if session.codec_version is None:
+                self._set_vehicle_status(session, "Pi ortak ikili kodlama sürümü bildirmedi; komutlar JSON ile gönderilecek.")
+            else:
+                self._set_vehicle_status(session, f"Pi ikili komut kodlamasını destekliyor (sürüm {session.codec_version}).")
+            mission_versions = command_codec.parse_caps_fields(message).get(mission_stream.CAPS_MISSION_KEY, set())
+            session.supports_mission = mission_stream.MISSION_VERSION in mission_versions
+            if session.supports_mission:
+                self._set_vehicle_status(session, "Pi akışlı görevi destekliyor (kalibrasyonu Pi kendisi yapar).")
+
+        elif message.startswith(mission_stream.ACK_PREFIX):
+            try:
+                mission_id, seq, queue_length = mission_stream.parse_int_fields(message, mission_stream.ACK_PREFIX, 3)
+            except ValueError:
+                return
+            if mission_id == session.mission_id and seq == 0 and session.mission_started_at is not None:
+                elapsed_ms = (time.perf_counter() - session.mission_started_at) * 1000.0
+                self._set_vehicle_status(session, f"Pi ilk parçayı aldı ve sürmeye başladı ({elapsed_ms:.0f} ms).")
+
+        elif message.startswith(mission_stream.PROGRESS_PREFIX):
+            try:
+                mission_id, index = mission_stream.parse_int_fields(message, mission_stream.PROGRESS_PREFIX, 2)
+            except ValueError:
+                return
+            if mission_id == session.mission_id:
+                session.mission_progress_index = max(session.mission_progress_index, index)
+                self._set_vehicle_status(session, f"Pi komut {index + 1}/{len(session.mission_sent_commands)} yürütüyor.")
+
+        elif message.startswith(mission_stream.END_NAK_PREFIX):
+            self._set_vehicle_status(session, f"Pi görev sonunu reddetti: {message[len(mission_stream.END_NAK_PREFIX):]}")
+
+        elif message.startswith(mission_stream.NAK_PREFIX):
+            self._set_vehicle_status(session, f"Pi görev parçasını reddetti: {message[len(mission_stream.NAK_PREFIX):]}")
+            fields = mission_stream.split_fields(message, mission_stream.NAK_PREFIX, 3) if message.count(':') >= 3 else []
+            if session.mission_pending_amend and fields and fields[0] == str(session.mission_id) and \
+               fields[1] == str(session.mission_pending_amend[0]):
+                session.mission_sent_commands = session.mission_pending_amend[1]
+                session.mission_pending_amend = None
+
+        elif message == "COMMANDS_INVALID_FORMAT" and session.last_commands_sent_binary and session.is_driving:
+            # İkili çerçeve reddedildiyse bu bağlantı için JSON'a dönülür ve plan bir kez daha gönderilir.
+            session.codec_version = None
+            self._set_vehicle_status(session, "Pi ikili komut çerçevesini reddetti; JSON ile yeniden gönderiliyor...")
+            self._send_commands_to_pi(session, None)
 
         elif message == "COMMANDS_INVALID_FORMAT":
-            self.is_pi_driving = False
-            self._update_pi_status_ui("Pi komut formatını geçersiz buldu.")
-            self.btn_drive_vehicle.config(
-                state=tk.NORMAL if self.client_socket and self.last_generated_commands_for_pi_json else tk.DISABLED)
-            self.btn_stop_vehicle_on_pi.config(state=tk.DISABLED)
+            session.is_driving = False
+            self._set_vehicle_status(session, "Pi komut formatını geçersiz buldu.")
 
         elif message == "SEQUENCE_DONE":
-            self.is_pi_driving = False
-            self._update_pi_status_ui("Pi komut dizisini tamamladı.")
-            self.btn_drive_vehicle.config(
-                state=tk.NORMAL if self.client_socket and self.last_generated_commands_for_pi_json else tk.DISABLED)
-            self.btn_stop_vehicle_on_pi.config(state=tk.DISABLED)
+            session.is_driving = False
+            self._set_vehicle_status(session, "Pi komut dizisini tamamladı.")
 
         elif message == "STOP_ACK":
-            self.is_pi_driving = False
-            self.is_pi_calibrating = False
-            self._update_pi_status_ui("Pi aracı durdurdu (STOP_ACK).")
-            self.btn_drive_vehicle.config(
-                state=tk.NORMAL if self.client_socket and self.last_generated_commands_for_pi_json else tk.DISABLED)
-            self.btn_stop_vehicle_on_pi.config(state=tk.DISABLED)
+            session.is_driving = False
+            session.is_calibrating = False
+            self._set_vehicle_status(session, "Pi aracı durdurdu (STOP_ACK).")
+
+        self._refresh_vehicle_controls()
+
+    def _send_commands_to_pi(self, session, codec_version):
+        """Oturumun planını seçilen kodlamayla (None: JSON) gönderir."""
+        message = command_codec.encode_message(session.plan, codec_version)
+        session.last_commands_sent_binary = codec_version is not None
+        print(f"Komut mesajı [{session.label}]: {len(session.plan)} komut, {len(message)} bayt "
+              f"({'ikili v' + str(codec_version) if codec_version is not None else 'JSON'}).")
+        return self.send_to_pi(session, message)
+
+    def _send_mission_commands(self, session, start, commands, chunked=True):
+        """commands'ı start indeksinden itibaren (chunked ise parçalar halinde) gönderir, ardından yeni toplamı bildirir."""
+        chunks = mission_stream.chunk_commands(commands, start) if chunked else [(start, commands)]
+        for chunk_start, chunk in chunks:
+            message = mission_stream.commands_message(session.mission_id, session.mission_seq, chunk_start, chunk,
+                                                      session.codec_version)
+            session.mission_seq += 1
+            if not self.send_to_pi(session, message):
+                return False
+        session.mission_sent_commands = session.mission_sent_commands[:start] + list(commands)
+        return self.send_to_pi(session, mission_stream.end_message(session.mission_id, len(session.mission_sent_commands)))
+
+    def _start_mission_stream(self, session):
+        session.mission_id += 1
+        session.mission_seq = 0
+        session.mission_sent_commands = []
+        session.mission_progress_index = -1
+        session.mission_pending_amend = None
+        session.mission_started_at = time.perf_counter()
+        if not self.send_to_pi(session, mission_stream.start_message(session.mission_id, session.image_source)):
+            return
+        session.is_driving = True
+        self._send_mission_commands(session, 0, session.plan)
+        self._set_vehicle_status(session, f"Görev {session.mission_id} akışla gönderildi ({len(session.plan)} komut).")
 
+    def amend_mission_tail(self, session, new_commands):
+        """Sürüş sürerken yeni planın henüz başlamamış kısmını Pi kuyruğunda değiştirir."""
+        if not (session.supports_mission and session.is_driving):
+            return False
+        sent = session.mission_sent_commands
+        common = 0
+        while common < min(len(sent), len(new_commands)) and sent[common] == new_commands[common]:
+            common += 1
+        if common == len(sent) == len(new_commands):
+            return False
+        if common <= session.mission_progress_index:
+            print(f"Görev kuyruğu değiştirilemedi [{session.label}]: fark komut {common + 1}'de, "
+                  f"Pi {session.mission_progress_index + 1}. komuta başladı.")
+            return False
+        print(f"Görev kuyruğu [{session.label}] {common + 1}. komuttan itibaren güncelleniyor "
+              f"({len(new_commands) - common} komut).")
+        # Pi bu arada o komuta başlarsa değişiklik reddedilir; NAK gelince eski liste geri yüklenir.
+        session.mission_pending_amend = (session.mission_seq, list(sent))
+        session.plan = list(new_commands)
+        return self._send_mission_commands(session, common, list(new_commands[common:]), chunked=False)
 
     def drive_vehicle_on_pi(self):
-        if not self.client_socket:
-            messagebox.showerror("Bağlantı Hatası", "Raspberry Pi bağlı değil.")
+        session = self._selected_session()
+        if session is None:
+            messagebox.showerror("Bağlantı Hatası", "Raspberry Pi bağlı değil veya araç seçilmedi.")
             return
         if not self.last_generated_commands_for_pi_json: # Pi için JSON formatındaki komutları kontrol et
             messagebox.showerror("Komut Hatası", "Önce 'Yolu Bul ve İşle' ile komutları oluşturun.")
             return
-        if self.is_pi_calibrating or self.is_pi_driving:
-            messagebox.showwarning("İşlem Sürüyor", "Pi zaten kalibrasyon yapıyor veya aracı sürüyor.")
+        if session.is_calibrating or session.is_driving:
+            messagebox.showwarning("İşlem Sürüyor", f"{session.label} zaten kalibrasyon yapıyor veya sürüyor.")
             return
         if not self.current_image_source:
             messagebox.showerror("Hata", "Görüntü kaynağı belirlenemedi (galeri/kamera). Lütfen bir görüntü yükleyin.")
             return
 
-        self.is_pi_calibrating = True
-        calibrate_command = f"CALIBRATE:{self.current_image_source.upper()}"
-        self.send_to_pi(calibrate_command)
-        self._update_pi_status_ui(f"Pi'ye kalibrasyon komutu gönderildi ({self.current_image_source}). Bekleniyor...")
-        self.btn_drive_vehicle.config(state=tk.DISABLED)
-        self.btn_stop_vehicle_on_pi.config(state=tk.NORMAL)
+        self._dispatch_plan(session, self.last_generated_commands_for_pi_json, self.live_replanner is not None)
+        self._refresh_vehicle_controls()
+
+    def _dispatch_plan(self, session, commands, follows_live_plan):
+        """Planı oturuma sabitler ve sürüşü başlatır (akışlı görev ya da CALIBRATE + COMMANDS)."""
+        # Plan araca gönderildiği anda sabitlenir; sonraki çözümler diğer araçlar için kullanılabilir.
+        session.plan = list(commands)
+        session.image_source = self.current_image_source
+        session.follows_live_plan = follows_live_plan
+        if session.supports_mission:
+            # Pi kalibrasyonu kendisi yaptığı (bağlanınca, ofset eskiyse MISSION_START'ta) için CALIBRATE turu atlanır.
+            self._start_mission_stream(session)
+        else:
+            session.is_calibrating = True
+            self.send_to_pi(session, f"CALIBRATE:{session.image_source.upper()}")
+            self._set_vehicle_status(session, f"Pi'ye kalibrasyon komutu gönderildi ({session.image_source}). Bekleniyor...")
 
     def stop_vehicle_on_pi(self):
-        if not self.client_socket:
-            messagebox.showerror("Bağlantı Hatası", "Raspberry Pi bağlı değil.")
+        session = self._selected_session()
+        if session is None:
+            messagebox.showerror("Bağlantı Hatası", "Raspberry Pi bağlı değil veya araç seçilmedi.")
             return
-        self.send_to_pi("STOP")
-        self._update_pi_status_ui("Pi'ye DUR komutu gönderildi.")
+        self.send_to_pi(session, "STOP")
+        self._set_vehicle_status(session, "Pi'ye DUR komutu gönderildi.")
+        self.btn_drive_vehicle.config(state=tk.DISABLED)
+
+    def stop_all_vehicles(self):
+        for session in list(self.vehicle_sessions.values()):
+            self.send_to_pi(session, "STOP")
+            self._set_vehicle_status(session, "Pi'ye DUR komutu gönderildi.")
         self.btn_drive_vehicle.config(state=tk.DISABLED)
-        self.btn_stop_vehicle_on_pi.config(state=tk.DISABLED)
 
     def start_progress(self):
         if hasattr(self, 'progress_bar') and self.progress_bar:
@@ -580,6 +761,9 @@ class MazeSolverApp:
 
     def on_closing(self):
         print("Uygulama kapatılıyor...")
+        if self.link_status_after_id:
+            self.root.after_cancel(self.link_status_after_id)
+            self.link_status_after_id = None
         self.stop_path_animation()
         self.stop_command_animation()
         self.stop_live_camera_feed()
@@ -596,21 +780,10 @@ class MazeSolverApp:
             self.video_capture_device.release()
         self.video_capture_device = None
 
-        if self.is_server_running:
-            self.stop_socket_server_event.set()
-            if self.client_socket:
-                try: self.client_socket.sendall(b"SERVER_SHUTDOWN\n")
-                except: pass
-                try: self.client_socket.close()
-                except: pass
-            if self.server_socket:
-                try: self.server_socket.close()
-                except: pass
-            if self.socket_server_thread and self.socket_server_thread.is_alive():
-                self.socket_server_thread.join(timeout=1.0)
-
-        self.client_socket = None
-        self.server_socket = None
+        if self.is_server_running and self.vehicle_server:
+            self.vehicle_server.stop(farewell="SERVER_SHUTDOWN", timeout=1.0)
+        self.vehicle_server = None
+        self.vehicle_sessions.clear()
 
         if self.root.winfo_exists():
             self.root.destroy()
@@ -633,15 +806,15 @@ class MazeSolverApp:
         self.video_capture_device_main_canvas = None
 
         if self.is_server_running:
-            if self.client_socket:
-                self.stop_vehicle_on_pi()
+            if self.vehicle_sessions:
+                self.stop_all_vehicles()
                 time.sleep(0.5)
             self.toggle_socket_server()
 
+        self.vehicle_sessions.clear(); self.selected_vehicle_id = None
         self._update_pi_status_ui("Raspberry Pi: Bağlı Değil")
-        self.is_pi_calibrating = False; self.is_pi_driving = False; self.pi_calibration_offset = None
 
-        self.image_path = None; self.original_cv_image = None; self.h_orig_for_path, self.w_orig_for_path = 0, 0
+        self.image_source = None; self.original_cv_image = None; self.h_orig_for_path, self.w_orig_for_path = 0, 0
         self.image_with_skeleton_overlay_for_selection = None; self.display_image_tk = None; self.displayed_image_pil = None
         self.current_image_source = None
         self.mask_for_bfs_and_clicking_ORIG_SCALE = None; self.padding_info = {}
@@ -652,6 +825,8 @@ class MazeSolverApp:
         self.last_simplified_path_for_overlay = None
         self.last_generated_commands_for_pi_json = []
         self.last_generated_commands_for_display = []
+        self.fleet_pairs = []
+        self.last_fleet_plan = None
 
 
         self.result_image_display_tk_pil = None; self.bfs_mask_pil = None
@@ -682,6 +857,7 @@ class MazeSolverApp:
         if hasattr(self, 'btn_animate_commands') and self.btn_animate_commands.winfo_exists(): self.btn_animate_commands.config(state=tk.DISABLED)
         if hasattr(self, 'btn_drive_vehicle') and self.btn_drive_vehicle.winfo_exists(): self.btn_drive_vehicle.config(state=tk.DISABLED)
         if hasattr(self, 'btn_stop_vehicle_on_pi') and self.btn_stop_vehicle_on_pi.winfo_exists(): self.btn_stop_vehicle_on_pi.config(state=tk.DISABLED)
+        self._update_fleet_controls()
         if hasattr(self, 'live_camera_status_label') and self.live_camera_status_label.winfo_exists(): self.live_camera_status_label.config(text="Yol bulunursa kamera burada aktifleşir.")
         print("Sistem sıfırlandı.")
 
@@ -691,21 +867,66 @@ class MazeSolverApp:
             messagebox.showerror("Model Hatası", f"Model dosyası bulunamadı: {MODEL_PATH}")
             self.root.quit()
             return
+        # TensorFlow içe aktarımı ve model yüklemesi saniyeler sürer; pencere beklemeden açılsın
+        # diye arka planda yapılır. Modele ihtiyaç duyan işlemler run_when_model_ready ile sıraya girer.
+        self._update_model_status_ui("Model: Yükleniyor...")
+        self.start_progress()
+        threading.Thread(target=self._model_loader_loop, daemon=True).start()
+
+    def _model_loader_loop(self):
         try:
             print("Model yükleniyor...")
-            self.start_progress()
-            self.model = tf.keras.models.load_model(MODEL_PATH)
-            self.input_shape_tuple = self.model.input_shape[1:]
-            self.IMG_HEIGHT, self.IMG_WIDTH, self.IMG_CHANNELS = self.input_shape_tuple
-            self.is_grayscale_model = (self.IMG_CHANNELS == 1)
-            print(
-                f"'{MODEL_PATH}' modeli yüklendi. Girdi: {self.IMG_HEIGHT}x{self.IMG_WIDTH}x{self.IMG_CHANNELS} (Gri: {self.is_grayscale_model})")
+            model = maze_core.load_segmentation_model(MODEL_PATH)
         except Exception as e:
-            messagebox.showerror("Model Yükleme Hatası",
-                                 f"Model yüklenirken bir hata oluştu:\n{e}\n{traceback.format_exc()}")
-            self.root.quit()
-        finally:
-            self.stop_progress()
+            error_text = f"Model yüklenirken bir hata oluştu:\n{e}\n{traceback.format_exc()}"
+            self.root.after(0, lambda: self._on_model_load_failed(error_text))
+            return
+        self.root.after(0, lambda: self._on_model_loaded(model))
+        self._warm_up_model(model)
+
+    def _on_model_loaded(self, model):
+        self.model = model
+        self.input_shape_tuple = maze_core.model_input_spec(self.model)
+        self.IMG_HEIGHT, self.IMG_WIDTH, self.IMG_CHANNELS = self.input_shape_tuple
+        self.is_grayscale_model = (self.IMG_CHANNELS == 1)
+        print(
+            f"'{MODEL_PATH}' modeli yüklendi. Girdi: {self.IMG_HEIGHT}x{self.IMG_WIDTH}x{self.IMG_CHANNELS} (Gri: {self.is_grayscale_model})")
+        self.stop_progress()
+        self._update_model_status_ui(f"Model: Hazır ({self.model.name})")
+        self.model_ready_event.set()
+
+        pending_actions, self.pending_model_actions = self.pending_model_actions, []
+        for action in pending_actions:
+            action()
+
+    def _on_model_load_failed(self, error_text):
+        self.stop_progress()
+        self._update_model_status_ui("Model: Yükleme Hatası")
+        messagebox.showerror("Model Yükleme Hatası", error_text)
+        self.root.quit()
+
+    def _update_model_status_ui(self, message):
+        self.model_status_message = message
+        if hasattr(self, 'lbl_model_status') and self.lbl_model_status.winfo_exists():
+            self.lbl_model_status.config(text=self.model_status_message)
+
+    def run_when_model_ready(self, action):
+        """Model hazırsa işlemi hemen çalıştırır, değilse model yüklenince çalıştırılmak üzere sıraya alır."""
+        if self.model_ready_event.is_set():
+            action()
+            return
+        if action not in self.pending_model_actions:
+            self.pending_model_actions.append(action)
+        self._update_model_status_ui("Model: Yükleniyor... (işlem sırada)")
+
+    def _warm_up_model(self, model):
+        # İlk yakalamada grafik izleme/bellek ayırma gecikmesi yaşanmasın diye arka planda çalışır.
+        try:
+            report = model.warm_up()
+            print(f"Model ısındı ({report['backend']}): ilk çağrı {report['first_call_ms']:.0f} ms, "
+                  f"kararlı durum {report['steady_state_ms']:.1f} ms")
+        except Exception as e:
+            print(f"Model ısındırma hatası: {e}")
 
     def load_vehicle_image(self):
         try:
@@ -828,6 +1049,15 @@ class MazeSolverApp:
         offset_y = (canvas_height - self.displayed_image_pil.height) / 2
 
 
+        for number, pair in enumerate(self.fleet_pairs, start=1):
+            for (orig_y, orig_x), color in zip(pair, ("green", "red")):
+                canvas_x = int(orig_x * scale_x + offset_x)
+                canvas_y = int(orig_y * scale_y + offset_y)
+                self.selected_points_on_canvas.append(self.canvas_image.create_oval(
+                    canvas_x - 4, canvas_y - 4, canvas_x + 4, canvas_y + 4, outline=color, width=2))
+                self.selected_points_on_canvas.append(self.canvas_image.create_text(
+                    canvas_x + 9, canvas_y - 9, text=str(number), fill=color))
+
         points_to_draw = []
         if self.start_point_original_coords:
             points_to_draw.append((self.start_point_original_coords, "green"))
@@ -843,15 +1073,130 @@ class MazeSolverApp:
             self.selected_points_on_canvas.append(p_id)
 
 
+    def current_tiling_config(self):
+        """Döşemeli mod kapalıysa None, açıksa maze_core.segment_maze için döşeme ayarlarını döndürür."""
+        if not (hasattr(self, 'tiled_segmentation_var') and self.tiled_segmentation_var.get()):
+            return None
+        try:
+            return {'tile_size': int(self.tile_size_var.get()), 'overlap': int(self.tile_overlap_var.get())}
+        except (tk.TclError, ValueError):
+            return {'overlap': maze_core.DEFAULT_TILE_OVERLAP}
+
+    def selected_segmentation_engine(self):
+        if not hasattr(self, 'segmentation_engine_var'):
+            return 'unet'
+        return SEGMENTATION_ENGINE_LABELS.get(self.segmentation_engine_var.get(), 'unet')
+
+    def selected_simplify_mode(self):
+        if not hasattr(self, 'simplify_mode_var'):
+            return maze_core.DEFAULT_SIMPLIFY_MODE
+        return SIMPLIFY_MODE_LABELS.get(self.simplify_mode_var.get(), maze_core.DEFAULT_SIMPLIFY_MODE)
+
+    def selected_path_planner(self):
+        if not hasattr(self, 'path_planner_var'):
+            return maze_core.DEFAULT_PATH_PLANNER
+        return PATH_PLANNER_LABELS.get(self.path_planner_var.get(), maze_core.DEFAULT_PATH_PLANNER)
+
+    def selected_skeleton_engine(self):
+        if not hasattr(self, 'skeleton_engine_var'):
+            return skeletonization.DEFAULT_SKELETON_ENGINE
+        return self.skeleton_engine_var.get()
+
+    def _segment_with_unet(self):
+        segmentation = segmentation_cache.segment_with_cache(self.segmentation_cache, self.model,
+                                                             self.original_cv_image,
+                                                             tiling=self.current_tiling_config(),
+                                                             skeleton_engine=self.selected_skeleton_engine())
+        if segmentation.get('cache_hit'):
+            print(f"Segmentasyon önbellekten alındı: {self.segmentation_cache.stats()}")
+        elif 'tiling' in segmentation:
+            report = segmentation['tiling']
+            print(f"Döşemeli segmentasyon: {report['tile_count']} döşeme, predict {report['predict_ms']:.0f} ms, "
+                  f"toplam {report['total_ms']:.0f} ms ({report['tiles_per_second']:.1f} döşeme/s, "
+                  f"{report['megapixels_per_second']:.2f} MP/s)")
+        segmentation['engine'] = 'unet'
+        return segmentation
+
+    def _segment_current_image(self, engine):
+        if engine == 'opencv':
+            segmentation = classical_segmentation.segment_maze_opencv(self.original_cv_image,
+                                                                      skeleton_engine=self.selected_skeleton_engine())
+        elif engine == 'auto':
+            segmentation = classical_segmentation.segment_maze_auto(self.original_cv_image, self._segment_with_unet,
+                                                                    skeleton_engine=self.selected_skeleton_engine())
+        else:
+            return self._segment_with_unet()
+        if segmentation['engine'] == 'opencv':
+            print(f"OpenCV segmentasyon: {segmentation['elapsed_ms']:.1f} ms, kalite {segmentation['quality']['score']:.2f}")
+        return segmentation
+
+    def _apply_segmentation(self, segmentation):
+        self.current_segmentation_engine = segmentation.get('engine', 'unet')
+        self.padding_info = segmentation['padding_info']
+        self.current_mask_type_str = segmentation['mask_type']
+        self.raw_model_mask_pil = Image.fromarray((segmentation['raw_mask'] * 255).astype(np.uint8))
+        self.skeleton_model_scale_pil = None
+        if segmentation['skeleton'] is not None:
+            self.skeleton_model_scale_pil = Image.fromarray((segmentation['skeleton'] * 255).astype(np.uint8))
+
+        self.mask_for_bfs_and_clicking_ORIG_SCALE = segmentation['bfs_mask']
+        if self.mask_for_bfs_and_clicking_ORIG_SCALE is None:
+            messagebox.showerror("Hata", "BFS için maske oluşturulamadı (son aşama).")
+            return False
+
+        self.bfs_mask_pil = Image.fromarray((self.mask_for_bfs_and_clicking_ORIG_SCALE * 255).astype(np.uint8))
+        if self.selected_path_planner() == 'graph':
+            # Kullanıcı noktaları seçerken graf arka planda kurulur; sorgular önbellekten yanıtlanır.
+            threading.Thread(target=skeleton_graph.graph_for_mask, args=(self.mask_for_bfs_and_clicking_ORIG_SCALE,),
+                             daemon=True).start()
+
+        self.image_with_skeleton_overlay_for_selection = self.original_cv_image.copy()
+        overlay_color = [0, 255, 255]  
+        path_pixels = self.mask_for_bfs_and_clicking_ORIG_SCALE == 1 
+
+        highlight_overlay_temp = np.zeros_like(self.image_with_skeleton_overlay_for_selection)
+        highlight_overlay_temp[path_pixels] = overlay_color
+        self.image_with_skeleton_overlay_for_selection = cv2.addWeighted(self.image_with_skeleton_overlay_for_selection, 0.7, highlight_overlay_temp, 0.3, 0)
+        return True
+
+    def _fallback_to_unet_if_points_disconnected(self):
+        """Otomatik modda OpenCV maskesinde başlangıç/bitiş bağlı değilse U-Net ile yeniden segmentler."""
+        if self.selected_segmentation_engine() != 'auto' or self.current_segmentation_engine != 'opencv':
+            return True
+        if classical_segmentation.endpoints_connected_in(self.mask_for_bfs_and_clicking_ORIG_SCALE,
+                                                         self.start_point_original_coords,
+                                                         self.end_point_original_coords):
+            return True
+        print("OpenCV maskesinde başlangıç ve bitiş bağlı değil; U-Net ile yeniden segmentleniyor.")
+        if not self._apply_segmentation(self._segment_with_unet()):
+            return False
+        start = maze_core.snap_to_mask(self.mask_for_bfs_and_clicking_ORIG_SCALE, self.start_point_original_coords, FALLBACK_SNAP_RADIUS)
+        end = maze_core.snap_to_mask(self.mask_for_bfs_and_clicking_ORIG_SCALE, self.end_point_original_coords, FALLBACK_SNAP_RADIUS)
+        self._update_main_canvas_display(self.image_with_skeleton_overlay_for_selection)
+        if hasattr(self, 'raw_model_mask_pil') and self.raw_model_mask_pil and \
+           hasattr(self, 'lbl_raw_model_mask_canvas') and self.lbl_raw_model_mask_canvas.winfo_exists():
+            self.on_generic_canvas_resize(None, self.lbl_raw_model_mask_canvas, 'raw_model_mask_pil')
+        if start is None or end is None:
+            messagebox.showwarning("Segmentasyon Değişti", "U-Net maskesine geçildi; seçilen noktalar yol üzerinde değil. Lütfen noktaları yeniden seçin.")
+            self.start_point_original_coords = self.end_point_original_coords = None
+            self.redraw_selected_points()
+            if hasattr(self, 'btn_process') and self.btn_process.winfo_exists():
+                self.btn_process.config(state=tk.DISABLED)
+            return False
+        self.start_point_original_coords, self.end_point_original_coords = start, end
+        self.redraw_selected_points()
+        self._prepare_goal_field()
+        return True
+
     def _load_and_preprocess_image_for_model_and_mask(self):
-        if not self.image_path or not os.path.exists(self.image_path):
-            messagebox.showerror("Hata", "Geçerli bir görüntü yolu belirtilmemiş.")
+        if self.image_source is None:
+            messagebox.showerror("Hata", "Geçerli bir görüntü kaynağı belirtilmemiş.")
             return False
         try:
             self.start_progress()
-            self.original_cv_image = cv2.imread(self.image_path, cv2.IMREAD_COLOR)
+            self.original_cv_image = self.image_source.read()
             if self.original_cv_image is None:
-                messagebox.showerror("Hata", f"Görüntü yüklenemedi: {os.path.basename(self.image_path)}")
+                messagebox.showerror("Hata", f"Görüntü yüklenemedi: {self.image_source.label}")
                 return False
             self.h_orig_for_path, self.w_orig_for_path = self.original_cv_image.shape[:2]
 
@@ -859,123 +1204,8 @@ class MazeSolverApp:
                 messagebox.showerror("Hata", "Model yüklenmemiş.")
                 return False
 
-            read_mode = cv2.IMREAD_GRAYSCALE if self.is_grayscale_model else cv2.IMREAD_COLOR
-            img_to_process_for_model = cv2.imread(self.image_path, read_mode)
-            if img_to_process_for_model is None:
-                messagebox.showerror("Hata", f"Girdi görüntüsü okunamadı: {os.path.basename(self.image_path)}")
-                return False
-
-            target_h, target_w = self.IMG_HEIGHT, self.IMG_WIDTH
-            current_h_m, current_w_m = img_to_process_for_model.shape[:2]
-
-            scale = 1.0
-            if current_w_m > 0 and current_h_m > 0: 
-                scale = min(target_w / current_w_m, target_h / current_h_m)
-
-            new_w, new_h = int(current_w_m * scale), int(current_h_m * scale)
-            if new_w == 0 or new_h == 0: 
-                 messagebox.showerror("Hata", "Görüntü ölçekleme hatası (boyut sıfır).")
-                 return False
-
-
-            resized_img = cv2.resize(img_to_process_for_model, (new_w, new_h), interpolation=cv2.INTER_AREA)
-
-            top_pad = (target_h - new_h) // 2
-            bottom_pad = target_h - new_h - top_pad
-            left_pad = (target_w - new_w) // 2
-            right_pad = target_w - new_w - left_pad
-            self.padding_info = {
-                'top_pad': top_pad, 'left_pad': left_pad,
-                'new_w': new_w, 'new_h': new_h, 
-                'bottom_pad': bottom_pad, 'right_pad': right_pad,
-                'original_model_input_shape': (target_h, target_w) 
-            }
-            border_val = 0 if self.is_grayscale_model else [0,0,0]
-            padded_img = cv2.copyMakeBorder(resized_img, top_pad, bottom_pad, left_pad, right_pad, cv2.BORDER_CONSTANT, value=border_val)
-
-            img_processed_for_model = np.expand_dims(padded_img, axis=-1) if self.is_grayscale_model and padded_img.ndim == 2 else padded_img
-
-            if img_processed_for_model.shape[0] != target_h or img_processed_for_model.shape[1] != target_w:
-                print(f"UYARI: Dolgulu görüntü boyutu ({img_processed_for_model.shape}) model girdisiyle ({target_h},{target_w}) eşleşmiyor. Yeniden boyutlandırılıyor.")
-                img_processed_for_model = cv2.resize(img_processed_for_model, (target_w, target_h), interpolation=cv2.INTER_NEAREST)
-                if self.is_grayscale_model and img_processed_for_model.ndim == 2:
-                    img_processed_for_model = np.expand_dims(img_processed_for_model, axis=-1)
-
-
-            prediction = self.model.predict(np.expand_dims(img_processed_for_model / 255.0, axis=0))
-            predicted_mask_prob = prediction[0] 
-            if predicted_mask_prob.shape[-1] > 1: 
-                predicted_mask_prob = predicted_mask_prob[:,:,0:1]
-
-
-            mask_3d_model_scale = (predicted_mask_prob < THRESHOLD).astype(np.uint8) 
-            mask_from_model_prediction_MODEL_SCALE = np.squeeze(mask_3d_model_scale).astype(np.uint8) 
-            self.raw_model_mask_pil = Image.fromarray((mask_from_model_prediction_MODEL_SCALE * 255).astype(np.uint8))
-
-
-            self.skeleton_model_scale_pil = None
-            chosen_mask_for_processing_MODEL_SCALE = mask_from_model_prediction_MODEL_SCALE.copy()
-            self.current_mask_type_str = "Orijinal Model Maskesi (BFS için)"
-
-            if SKIMAGE_AVAILABLE:
-                try:
-                    skeleton_model_scale_01 = skeletonize(chosen_mask_for_processing_MODEL_SCALE == 1).astype(np.uint8) 
-                    if np.any(skeleton_model_scale_01): 
-                        self.skeleton_model_scale_pil = Image.fromarray((skeleton_model_scale_01 * 255).astype(np.uint8))
-                        chosen_mask_for_processing_MODEL_SCALE = skeleton_model_scale_01
-                        self.current_mask_type_str = "İskelet Maskesi (BFS için)"
-                    else:
-                        self.current_mask_type_str += " (İskelet Boş, BFS orijinali kullanıyor)"
-                except Exception as e_skele:
-                    print(f"İskelet çıkarma hatası: {e_skele}")
-                    self.current_mask_type_str += f" (İskelet Hatası, BFS orijinali kullanıyor)"
-
-
-            pi = self.padding_info
-            cropped_mask = chosen_mask_for_processing_MODEL_SCALE[
-                           pi['top_pad']:pi['original_model_input_shape'][0] - pi['bottom_pad'],
-                           pi['left_pad']:pi['original_model_input_shape'][1] - pi['right_pad']]
-
-            if cropped_mask.shape[0] != pi['new_h'] or cropped_mask.shape[1] != pi['new_w']:
-                if pi['new_h'] > 0 and pi['new_w'] > 0:
-                     cropped_mask = cv2.resize(cropped_mask, (pi['new_w'], pi['new_h']), interpolation=cv2.INTER_NEAREST)
-                else: 
-                    print(f"UYARI: Cropped_mask için geçersiz new_h/new_w: {pi['new_h']}x{pi['new_w']}. Tam maske yeniden boyutlandırılıyor.")
-                    if self.w_orig_for_path > 0 and self.h_orig_for_path > 0:
-                        self.mask_for_bfs_and_clicking_ORIG_SCALE = cv2.resize(chosen_mask_for_processing_MODEL_SCALE, (self.w_orig_for_path, self.h_orig_for_path), interpolation=cv2.INTER_NEAREST)
-                    else:
-                        messagebox.showerror("Hata", "Maske boyutlandırmada kritik hata: Orijinal veya yeni boyutlar sıfır.")
-                        return False
-
-
-            if pi['new_h'] > 0 and pi['new_w'] > 0: 
-                if cropped_mask.size > 0: 
-                    self.mask_for_bfs_and_clicking_ORIG_SCALE = cv2.resize(cropped_mask,
-                                                                       (self.w_orig_for_path, self.h_orig_for_path),
-                                                                       interpolation=cv2.INTER_NEAREST)
-                else:
-                     self.mask_for_bfs_and_clicking_ORIG_SCALE = cv2.resize(chosen_mask_for_processing_MODEL_SCALE,
-                                                                       (self.w_orig_for_path, self.h_orig_for_path),
-                                                                       interpolation=cv2.INTER_NEAREST)
-
-
-            if self.mask_for_bfs_and_clicking_ORIG_SCALE is None:
-                messagebox.showerror("Hata", "BFS için maske oluşturulamadı (son aşama).")
-                return False
-
-            self.bfs_mask_pil = Image.fromarray((self.mask_for_bfs_and_clicking_ORIG_SCALE * 255).astype(np.uint8))
-
-
-            self.image_with_skeleton_overlay_for_selection = self.original_cv_image.copy()
-            overlay_color = [0, 255, 255]  
-            path_pixels = self.mask_for_bfs_and_clicking_ORIG_SCALE == 1 
-
-            highlight_overlay_temp = np.zeros_like(self.image_with_skeleton_overlay_for_selection)
-            highlight_overlay_temp[path_pixels] = overlay_color
-            self.image_with_skeleton_overlay_for_selection = cv2.addWeighted(self.image_with_skeleton_overlay_for_selection, 0.7, highlight_overlay_temp, 0.3, 0)
-
-
-            return True
+            segmentation = self._segment_current_image(self.selected_segmentation_engine())
+            return self._apply_segmentation(segmentation)
         except Exception as e:
             messagebox.showerror("Görüntü Ön İşleme Hatası",
                                  f"Görüntü işlenirken bir hata oluştu:\n{e}\n{traceback.format_exc()}")
@@ -990,11 +1220,13 @@ class MazeSolverApp:
 
         new_path = filedialog.askopenfilename(
             title="Labirent Görüntüsü Seçin",
-            filetypes=(("Resim Dosyaları", "*.jpg *.jpeg *.png"), ("Tüm Dosyalar", "*.*"))
+            filetypes=(("Resim Dosyaları", "*.jpg *.jpeg *.png"), ("Video Dosyaları", "*.mp4 *.avi *.mov *.mkv"),
+                       ("Tüm Dosyalar", "*.*"))
         )
         if new_path:
-            self.image_path = new_path
-            self.current_image_source = "gallery" 
+            self.image_source = image_sources.source_for_path(new_path)
+            # Video kayıtları arena kamerasından geldiği için kamera kazançlarıyla sürülür.
+            self.current_image_source = "camera" if isinstance(self.image_source, image_sources.VideoFileSource) else "gallery"
             self._reset_image_specific_state() 
             self._proceed_with_image_loading()
 
@@ -1010,7 +1242,7 @@ class MazeSolverApp:
         self.display_image_tk = None
         self.displayed_image_pil = None
 
-      self.mask_for_bfs_and_clicking_ORIG_SCALE = None
+        self.mask_for_bfs_and_clicking_ORIG_SCALE = None
         self.padding_info = {}
         self.start_point_original_coords = None
         self.end_point_original_coords = None
@@ -1020,6 +1252,9 @@ class MazeSolverApp:
         self.last_simplified_path_for_overlay = None
         self.last_generated_commands_for_pi_json = [] 
         self.last_generated_commands_for_display = [] 
+        self.fleet_pairs = []
+        self.last_fleet_plan = None
+        self._update_fleet_controls()
 
 
         self.result_image_display_tk_pil = None
@@ -1107,20 +1342,11 @@ class MazeSolverApp:
 
 
         if captured_frame_to_process is not None:
-            temp_image_filename = "temp_camera_capture.jpg"
-            save_success = cv2.imwrite(temp_image_filename, captured_frame_to_process)
-            if save_success:
-                self.image_path = temp_image_filename
-                self.current_image_source = "camera" 
-                self.current_preview_frame_cv2 = None 
-                self._reset_image_specific_state() 
-                self._proceed_with_image_loading()
-            else:
-                messagebox.showerror("Kamera Hatası", "Yakalanan görüntü diske yazılamadı.")
-                if hasattr(self, 'lbl_image_status') and self.lbl_image_status.winfo_exists(): self.lbl_image_status.config(text="Görüntü seçilmedi.")
-                if hasattr(self, 'lbl_point_instruction') and self.lbl_point_instruction.winfo_exists(): self.lbl_point_instruction.config(text="1. Başlangıç noktasını seçin.")
-                self.current_preview_frame_cv2 = None
-                self.current_image_source = None
+            self.image_source = image_sources.FrameImageSource(captured_frame_to_process, "Kamera karesi")
+            self.current_image_source = "camera" 
+            self.current_preview_frame_cv2 = None 
+            self._reset_image_specific_state() 
+            self._proceed_with_image_loading()
         else:
             messagebox.showerror("Kamera Hatası", "Kameradan görüntü yakalanamadı (kare boş).")
             if hasattr(self, 'lbl_image_status') and self.lbl_image_status.winfo_exists(): self.lbl_image_status.config(text="Görüntü seçilmedi.")
@@ -1231,17 +1457,22 @@ class MazeSolverApp:
 
 
     def _proceed_with_image_loading(self):
-        if not self.image_path: return
+        if not self.image_source: return
+        if not self.model_ready_event.is_set():
+            if hasattr(self, 'lbl_image_status') and self.lbl_image_status.winfo_exists():
+                self.lbl_image_status.config(text=f"Model bekleniyor: {self.image_source.label} (Kaynak: {self.current_image_source})")
+            self.run_when_model_ready(self._proceed_with_image_loading)
+            return
 
         if hasattr(self, 'lbl_image_status') and self.lbl_image_status.winfo_exists():
-            self.lbl_image_status.config(text=f"Yükleniyor: {os.path.basename(self.image_path)} (Kaynak: {self.current_image_source})")
+            self.lbl_image_status.config(text=f"Yükleniyor: {self.image_source.label} (Kaynak: {self.current_image_source})")
         self.root.update_idletasks() 
 
         load_success = self._load_and_preprocess_image_for_model_and_mask()
 
         if load_success:
             if hasattr(self, 'lbl_image_status') and self.lbl_image_status.winfo_exists():
-                self.lbl_image_status.config(text=f"Hazır: {os.path.basename(self.image_path)} (Kaynak: {self.current_image_source})")
+                self.lbl_image_status.config(text=f"Hazır: {self.image_source.label} (Kaynak: {self.current_image_source})")
             self._update_main_canvas_display(self.image_with_skeleton_overlay_for_selection)
             if hasattr(self, 'lbl_point_instruction') and self.lbl_point_instruction.winfo_exists():
                 self.lbl_point_instruction.config(text="1. Başlangıç noktasını seçin.")
@@ -1278,22 +1509,13 @@ class MazeSolverApp:
             if hasattr(self, 'lbl_skeleton_mask_canvas') and self.lbl_skeleton_mask_canvas.winfo_exists(): self.lbl_skeleton_mask_canvas.delete("all")
 
 
-    def on_image_click(self, event):
-        if self.is_camera_streaming_on_main_canvas:
-            print("Kamera önizleme alanına tıklandı, görüntü yakalanıyor...")
-            self.capture_frame_from_preview_and_process()
-            return
-
-        if self.image_with_skeleton_overlay_for_selection is None or \
-           self.mask_for_bfs_and_clicking_ORIG_SCALE is None or \
-           self.displayed_image_pil is None: 
-            return 
-
-        if not self.canvas_image.winfo_exists(): return
-
+    def _canvas_to_original_coords(self, canvas_x, canvas_y):
+        """Kanvas koordinatını orijinal görüntü koordinatına (y, x) çevirir; görüntü dışındaysa None."""
+        if self.displayed_image_pil is None or not self.canvas_image.winfo_exists():
+            return None
         canvas_w = self.canvas_image.winfo_width()
         canvas_h = self.canvas_image.winfo_height()
-        if canvas_w <=1 or canvas_h <=1 or self.displayed_image_pil.width == 0 or self.displayed_image_pil.height == 0 : return
+        if canvas_w <=1 or canvas_h <=1 or self.displayed_image_pil.width == 0 or self.displayed_image_pil.height == 0 : return None
 
 
         img_disp_w = self.displayed_image_pil.width
@@ -1302,25 +1524,44 @@ class MazeSolverApp:
         offset_x = (canvas_w - img_disp_w) / 2
         offset_y = (canvas_h - img_disp_h) / 2
 
-        if not (offset_x <= event.x < offset_x + img_disp_w and \
-                offset_y <= event.y < offset_y + img_disp_h):
-            return 
+        if not (offset_x <= canvas_x < offset_x + img_disp_w and \
+                offset_y <= canvas_y < offset_y + img_disp_h):
+            return None
 
-        click_x_on_displayed_img = event.x - offset_x
-        click_y_on_displayed_img = event.y - offset_y
+        click_x_on_displayed_img = canvas_x - offset_x
+        click_y_on_displayed_img = canvas_y - offset_y
 
         orig_x = int((click_x_on_displayed_img / img_disp_w) * self.w_orig_for_path)
         orig_y = int((click_y_on_displayed_img / img_disp_h) * self.h_orig_for_path)
 
         orig_x = max(0, min(orig_x, self.w_orig_for_path - 1))
         orig_y = max(0, min(orig_y, self.h_orig_for_path - 1))
+        return orig_y, orig_x
 
+    def _clicked_path_point(self, event):
+        """Tıklanan nokta yol maskesi üzerindeyse orijinal koordinatları, değilse None."""
+        if self.image_with_skeleton_overlay_for_selection is None or \
+           self.mask_for_bfs_and_clicking_ORIG_SCALE is None or \
+           self.displayed_image_pil is None: 
+            return None
 
-        if self.mask_for_bfs_and_clicking_ORIG_SCALE[orig_y, orig_x] != 1: 
+        current_point_orig_coords = self._canvas_to_original_coords(event.x, event.y)
+        if current_point_orig_coords is None:
+            return None
+        if self.mask_for_bfs_and_clicking_ORIG_SCALE[current_point_orig_coords] != 1: 
             messagebox.showwarning("Geçersiz Nokta", "Lütfen labirentin vurgulanmış (muhtemel yol) çizgileri üzerine tıklayın.")
+            return None
+        return current_point_orig_coords
+
+    def on_image_click(self, event):
+        if self.is_camera_streaming_on_main_canvas:
+            print("Kamera önizleme alanına tıklandı, görüntü yakalanıyor...")
+            self.capture_frame_from_preview_and_process()
             return
 
-        current_point_orig_coords = (orig_y, orig_x) 
+        current_point_orig_coords = self._clicked_path_point(event)
+        if current_point_orig_coords is None:
+            return
 
         if self.start_point_original_coords is None:
             self.start_point_original_coords = current_point_orig_coords
@@ -1330,24 +1571,109 @@ class MazeSolverApp:
             if current_point_orig_coords == self.start_point_original_coords:
                 messagebox.showinfo("Aynı Nokta", "Başlangıç ve bitiş noktaları aynı olamaz.")
                 return
-            self.end_point_original_coords = current_point_orig_coords
-            if hasattr(self, 'lbl_point_instruction') and self.lbl_point_instruction.winfo_exists():
-                self.lbl_point_instruction.config(text="Noktalar seçildi. 'Yolu Bul ve İşle' butonuna basabilirsiniz.")
-            if hasattr(self, 'btn_process') and self.btn_process.winfo_exists():
-                self.btn_process.config(state=tk.NORMAL) 
+            self._set_end_point(current_point_orig_coords)
         else: 
+            # Bitiş korunur: hedef alanı önbellekte olduğundan yeni başlangıçtan yol anında bulunur.
+            if current_point_orig_coords == self.end_point_original_coords:
+                messagebox.showinfo("Aynı Nokta", "Başlangıç ve bitiş noktaları aynı olamaz.")
+                return
             self.start_point_original_coords = current_point_orig_coords
-            self.end_point_original_coords = None
             if hasattr(self, 'lbl_point_instruction') and self.lbl_point_instruction.winfo_exists():
-                self.lbl_point_instruction.config(text="Başlangıç sıfırlandı. 2. Bitiş noktasını seçin.")
-            if hasattr(self, 'btn_process') and self.btn_process.winfo_exists():
-                self.btn_process.config(state=tk.DISABLED) 
+                self.lbl_point_instruction.config(text="Başlangıç güncellendi. Bitişi değiştirmek için sağ tıklayın.")
 
         self.redraw_selected_points() 
 
+    def on_image_right_click(self, event):
+        """Başlangıç seçiliyse bitiş noktasını (yeniden) belirler."""
+        if self.is_camera_streaming_on_main_canvas or self.start_point_original_coords is None:
+            return
+        current_point_orig_coords = self._clicked_path_point(event)
+        if current_point_orig_coords is None:
+            return
+        if current_point_orig_coords == self.start_point_original_coords:
+            messagebox.showinfo("Aynı Nokta", "Başlangıç ve bitiş noktaları aynı olamaz.")
+            return
+        self._set_end_point(current_point_orig_coords)
+        self.redraw_selected_points()
+
+    def _set_end_point(self, point_orig_coords):
+        self.end_point_original_coords = point_orig_coords
+        if hasattr(self, 'lbl_point_instruction') and self.lbl_point_instruction.winfo_exists():
+            self.lbl_point_instruction.config(text="Noktalar seçildi. 'Yolu Bul ve İşle' butonuna basabilirsiniz. "
+                                                   "(Sol tık: başlangıç, sağ tık: bitiş)")
+        if hasattr(self, 'btn_process') and self.btn_process.winfo_exists():
+            self.btn_process.config(state=tk.NORMAL) 
+        self._clear_hover_preview()
+        self._prepare_goal_field()
+
+    def _goal_field_is_current(self):
+        return self.goal_field is not None and \
+               self.goal_field_mask is self.mask_for_bfs_and_clicking_ORIG_SCALE and \
+               self.goal_field.goal == self.end_point_original_coords
+
+    def _prepare_goal_field(self):
+        """Seçili hedef için mesafe alanını arka planda kurar (hover önizleme ve 'goal-field' planlayıcısı)."""
+        mask, goal = self.mask_for_bfs_and_clicking_ORIG_SCALE, self.end_point_original_coords
+        if mask is None or goal is None or self._goal_field_is_current():
+            return
+        key = (id(mask), goal)
+        if self.goal_field_building_key == key:
+            return
+        self.goal_field_building_key = key
+
+        def build():
+            try:
+                field, cached = goal_field.field_for(mask, goal)
+            except ValueError as e:
+                print(f"Hedef alanı kurulamadı: {e}")
+                return
+            if not cached:
+                print(f"Hedef alanı kuruldu: {field.reachable_count} piksel, {field.build_ms:.0f} ms.")
+            self.root.after(0, lambda: self._on_goal_field_ready(mask, field, key))
+
+        threading.Thread(target=build, daemon=True).start()
+
+    def _on_goal_field_ready(self, mask, field, key):
+        if self.goal_field_building_key == key:
+            self.goal_field_building_key = None
+        if mask is self.mask_for_bfs_and_clicking_ORIG_SCALE and field.goal == self.end_point_original_coords:
+            self.goal_field, self.goal_field_mask = field, mask
+
+    def on_image_hover(self, event):
+        self.pending_hover_xy = (event.x, event.y)
+        if self.hover_after_id is None:
+            self.hover_after_id = self.root.after(HOVER_PREVIEW_INTERVAL_MS, self._update_hover_preview)
+
+    def _clear_hover_preview(self):
+        if self.hover_preview_line_id is not None and self.canvas_image.winfo_exists():
+            self.canvas_image.delete(self.hover_preview_line_id)
+        self.hover_preview_line_id = None
+
+    def _update_hover_preview(self):
+        """İmleçten hedefe yolu, önbellekteki alandan gradyan inişiyle çizer (arama yapılmaz)."""
+        self.hover_after_id = None
+        self._clear_hover_preview()
+        if self.is_camera_streaming_on_main_canvas or self.pending_hover_xy is None or not self._goal_field_is_current():
+            return
+        point = self._canvas_to_original_coords(*self.pending_hover_xy)
+        if point is None or self.mask_for_bfs_and_clicking_ORIG_SCALE[point] != 1:
+            return
+        path = self.goal_field.path_from(point)
+        if not path or len(path) < 2:
+            return
+        scale_x = self.displayed_image_pil.width / self.w_orig_for_path
+        scale_y = self.displayed_image_pil.height / self.h_orig_for_path
+        offset_x = (self.canvas_image.winfo_width() - self.displayed_image_pil.width) / 2
+        offset_y = (self.canvas_image.winfo_height() - self.displayed_image_pil.height) / 2
+        canvas_points = []
+        for y, x in maze_core.simplify_path(path):
+            canvas_points.extend((x * scale_x + offset_x, y * scale_y + offset_y))
+        self.hover_preview_line_id = self.canvas_image.create_line(*canvas_points, fill=HOVER_PREVIEW_COLOR,
+                                                                   width=2, dash=(4, 2))
+
 
     def process_maze(self):
-        if not self.image_path or self.original_cv_image is None:
+        if not self.image_source or self.original_cv_image is None:
             messagebox.showerror("Eksik Bilgi", "Lütfen önce bir labirent görüntüsü yükleyin.")
             return
         if self.start_point_original_coords is None or self.end_point_original_coords is None:
@@ -1359,6 +1685,8 @@ class MazeSolverApp:
         if not self.current_image_source: 
             messagebox.showerror("Hata", "Görüntü kaynağı (galeri/kamera) belirlenmemiş. Lütfen tekrar görüntü yükleyin.")
             return
+        if not self._fallback_to_unet_if_points_disconnected():
+            return
 
 
         self.start_progress()
@@ -1380,11 +1708,25 @@ class MazeSolverApp:
 
         output_image_final_display_cv = self.original_cv_image.copy() 
 
-        path_found_pixels = self.find_path_bfs(
-            self.mask_for_bfs_and_clicking_ORIG_SCALE, 
-            self.start_point_original_coords,
-            self.end_point_original_coords    
-        )
+        planner = self.selected_path_planner()
+        if planner != 'bfs':
+            planner_report = []
+            path_found_pixels = maze_core.find_path(
+                self.mask_for_bfs_and_clicking_ORIG_SCALE,
+                self.start_point_original_coords,
+                self.end_point_original_coords,
+                planner, planner_report,
+                time_model=drive_time.time_model_for_source(self.current_image_source)
+            )
+            print(f"Yol arama ({self.path_planner_var.get()}):")
+            for line in maze_core.format_planner_report(planner_report):
+                print(f"  {line}")
+        else:
+            path_found_pixels = self.find_path_bfs(
+                self.mask_for_bfs_and_clicking_ORIG_SCALE, 
+                self.start_point_original_coords,
+                self.end_point_original_coords    
+            )
 
         if path_found_pixels:
             simplified_path_nodes = self.simplify_path(path_found_pixels) 
@@ -1395,13 +1737,16 @@ class MazeSolverApp:
 
 
                 if self.last_generated_commands_for_display:
+                    estimated_s = drive_time.estimate_mission_time(
+                        self.last_generated_commands_for_pi_json,
+                        drive_time.time_model_for_source(self.current_image_source))
+                    print(f"Tahmini görev süresi ({self.current_image_source}): {estimated_s:.1f} s")
                     for cmd_text in self.last_generated_commands_for_display:
                         if hasattr(self, 'txt_commands') and self.txt_commands.winfo_exists():
                             self.txt_commands.insert(tk.END, cmd_text + "\n")
                     self.save_commands_to_file(self.last_generated_commands_for_display, "ui_directions.txt") 
 
-                    if self.client_socket and hasattr(self, 'btn_drive_vehicle') and self.btn_drive_vehicle.winfo_exists():
-                        self.btn_drive_vehicle.config(state=tk.NORMAL)
+                    self._refresh_vehicle_controls()
                 else:
                     if hasattr(self, 'txt_commands') and self.txt_commands.winfo_exists():
                         self.txt_commands.insert(tk.END, "(Sonuçta komut listesi boş)\n")
@@ -1445,141 +1790,125 @@ class MazeSolverApp:
             self.live_camera_status_label.config(text="Yol bulundu. Canlı kamera sekmesine geçilebilir." if (self.last_simplified_path_for_overlay or self.last_generated_commands_for_display) else "Canlı yol için önce bir yol bulunmalı.")
         self.stop_progress()
 
-    def nullify_opposing_turns(self, commands_input):
-        if not commands_input or len(commands_input) < 2:
-            return commands_input
-
-        standardized_commands = []
-        for cmd in commands_input:
-            if isinstance(cmd, str):
-                parts = cmd.split()
-                action = parts[0]
-                value = int(parts[1]) if len(parts) > 1 and parts[0].startswith("ileri") else 0
-                if parts[0] == "Sağ" and len(parts) > 1 and parts[1] == "Dön": action = "saga_don"
-                elif parts[0] == "Sol" and len(parts) > 1 and parts[1] == "Dön": action = "sola_don"
-                standardized_commands.append((action, value))
-            elif isinstance(cmd, tuple) and len(cmd) == 2:
-                standardized_commands.append(cmd)
-            else: 
-                standardized_commands.append(cmd)
-
-
-        processed_commands_tuples = []
-        i = 0
-        n = len(standardized_commands)
-        while i < n:
-            if i + 1 < n:
-                cmd1_action, cmd1_val = standardized_commands[i]
-                cmd2_action, cmd2_val = standardized_commands[i+1]
+    def _update_fleet_controls(self):
+        if not (hasattr(self, 'lbl_fleet_status') and self.lbl_fleet_status.winfo_exists()):
+            return
+        status = f"Filo: {len(self.fleet_pairs)} çift"
+        plan = self.last_fleet_plan
+        if plan is not None:
+            status += f", toplam {plan['makespan_s']:.0f} s" if plan['solved'] else ", plan bulunamadı"
+        self.lbl_fleet_status.config(text=status)
+        self.btn_fleet_plan.config(state=tk.NORMAL if len(self.fleet_pairs) >= 2 else tk.DISABLED)
+        can_drive = plan is not None and plan['solved'] and len(self.vehicle_sessions) >= len(plan['vehicles'])
+        self.btn_fleet_drive.config(state=tk.NORMAL if can_drive else tk.DISABLED)
+
+    def add_pair_to_fleet(self):
+        if self.mask_for_bfs_and_clicking_ORIG_SCALE is None or \
+                self.start_point_original_coords is None or self.end_point_original_coords is None:
+            messagebox.showerror("Eksik Bilgi", "Filoya eklemek için başlangıç ve bitiş noktalarını seçin.")
+            return
+        self.fleet_pairs.append((self.start_point_original_coords, self.end_point_original_coords))
+        self.last_fleet_plan = None
+        self.redraw_selected_points()
+        self._update_fleet_controls()
+
+    def clear_fleet(self):
+        self.fleet_pairs = []
+        self.last_fleet_plan = None
+        self.redraw_selected_points()
+        self._update_fleet_controls()
+
+    def plan_fleet_routes(self):
+        """Filo çiftlerini aynı maskede çakışmasız planlar; yolları araç başına renkle çizer."""
+        if len(self.fleet_pairs) < 2:
+            messagebox.showerror("Eksik Bilgi", "Filo planlaması için en az iki çift ekleyin.")
+            return
+        if self.mask_for_bfs_and_clicking_ORIG_SCALE is None or self.original_cv_image is None:
+            messagebox.showerror("Hata", "Yol bulma için gerekli maske oluşturulamamış.")
+            return
+        self.stop_path_animation()
+        self.stop_command_animation()
+        try:
+            plan = fleet_planner.plan_fleet(self.mask_for_bfs_and_clicking_ORIG_SCALE, self.fleet_pairs,
+                                            drive_time.time_model_for_source(self.current_image_source))
+        except ValueError as e:
+            messagebox.showerror("Filo Planlama Hatası", str(e))
+            return
+        self.last_fleet_plan = plan
+        report = fleet_planner.format_fleet_report(plan)
+        for line in report:
+            print(line)
 
-                if (cmd1_action == "saga_don" and cmd2_action == "sola_don") or \
-                   (cmd1_action == "sola_don" and cmd2_action == "saga_don"):
-                    i += 2 
-                else:
-                    processed_commands_tuples.append(standardized_commands[i])
-                    i += 1
-            else:
-                processed_commands_tuples.append(standardized_commands[i])
-                i += 1
-        return processed_commands_tuples 
-
-    def _merge_short_forwards_across_turns(self, commands_input_tuples, min_acceptable_steps_for_merge_trigger):
-        if not commands_input_tuples: return []
-        processed_commands = []
-        i = 0
-        n = len(commands_input_tuples)
-        while i < n:
-            action, steps = commands_input_tuples[i]
-            if action.startswith("ileri") and steps < min_acceptable_steps_for_merge_trigger:
-                if i + 2 < n:
-                    turn_action, _ = commands_input_tuples[i+1]
-                    next_fwd_action, next_fwd_steps = commands_input_tuples[i+2]
-
-                    is_turn_next = (turn_action == "saga_don" or turn_action == "sola_don")
-                    is_forward_after_turn = next_fwd_action.startswith("ileri")
-
-                    if is_turn_next and is_forward_after_turn:
-                        
-                        processed_commands.append(commands_input_tuples[i]) 
-                        processed_commands.append(commands_input_tuples[i+1]) 
-                        processed_commands.append(commands_input_tuples[i+2]) 
-                        i += 3
-                        continue
-                    else:
-                        processed_commands.append(commands_input_tuples[i])
-                        i += 1
-                else:
-                    processed_commands.append(commands_input_tuples[i])
-                    i += 1
-            else:
-                processed_commands.append(commands_input_tuples[i])
-                i += 1
-        return processed_commands
+        output_image = self.original_cv_image.copy()
+        if hasattr(self, 'txt_commands') and self.txt_commands.winfo_exists():
+            self.txt_commands.delete(1.0, tk.END)
+            self.txt_commands.insert(tk.END, "\n".join(report) + "\n")
+        for number, vehicle in enumerate(plan['vehicles'], start=1):
+            if not vehicle['found']:
+                continue
+            color = FLEET_PATH_COLORS[(number - 1) % len(FLEET_PATH_COLORS)]
+            nodes = vehicle['simplified_path']
+            for a, b in zip(nodes, nodes[1:]):
+                cv2.line(output_image, (a[1], a[0]), (b[1], b[0]), color, LIVE_PATH_LINE_THICKNESS)
+            cv2.circle(output_image, (nodes[0][1], nodes[0][0]), LIVE_POINT_RADIUS, LIVE_START_POINT_COLOR, LIVE_POINT_THICKNESS)
+            cv2.circle(output_image, (nodes[-1][1], nodes[-1][0]), LIVE_POINT_RADIUS, LIVE_END_POINT_COLOR, LIVE_POINT_THICKNESS)
+            cv2.putText(output_image, str(number), (nodes[0][1] + 10, nodes[0][0] - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.8,
+                        color, 2)
+            if hasattr(self, 'txt_commands') and self.txt_commands.winfo_exists():
+                self.txt_commands.insert(tk.END, f"\nAraç {number}:\n")
+                for cmd_text in maze_core.commands_to_display(vehicle['commands_for_pi']):
+                    self.txt_commands.insert(tk.END, cmd_text + "\n")
+
+        self.result_image_display_tk_pil = Image.fromarray(cv2.cvtColor(output_image, cv2.COLOR_BGR2RGB))
+        if hasattr(self, 'lbl_result_image_canvas') and self.lbl_result_image_canvas.winfo_exists():
+            self.on_generic_canvas_resize_wrapper(None, self.lbl_result_image_canvas, 'result_image_display_tk_pil', 'current_animation_frame_pil')
+        if hasattr(self, 'notebook_results') and self.notebook_results.winfo_exists():
+            self.notebook_results.select(self.tab_result_image)
+        if not plan['solved']:
+            messagebox.showwarning("Filo Planlama", "\n".join(report))
+        self._update_fleet_controls()
+
+    def drive_fleet_on_pi(self):
+        """Filo çizelgesini bağlı araçlara (listedeki sırayla) aynı anda gönderir."""
+        plan = self.last_fleet_plan
+        if plan is None or not plan['solved']:
+            messagebox.showerror("Komut Hatası", "Önce 'Filoyu Planla' ile çakışmasız bir plan oluşturun.")
+            return
+        if not self.current_image_source:
+            messagebox.showerror("Hata", "Görüntü kaynağı belirlenemedi (galeri/kamera). Lütfen bir görüntü yükleyin.")
+            return
+        sessions = [self.vehicle_sessions[session_id] for session_id in self.vehicle_choice_ids][:len(plan['vehicles'])]
+        if len(sessions) < len(plan['vehicles']):
+            messagebox.showerror("Bağlantı Hatası", f"Filo için {len(plan['vehicles'])} araç bağlı olmalı "
+                                                     f"({len(self.vehicle_sessions)} bağlı).")
+            return
+        problems = []
+        for number, (session, vehicle) in enumerate(zip(sessions, plan['vehicles']), start=1):
+            if session.is_driving or session.is_calibrating:
+                problems.append(f"Araç {number} ({session.label}) zaten kalibrasyon yapıyor veya sürüyor.")
+            elif not session.supports_mission:
+                # Eski akışta 4 s kalibrasyon araçlar arasında farklı sürer; çizelge eşzamanlı kalkış varsayar.
+                problems.append(f"Araç {number} ({session.label}) akışlı görevi desteklemiyor.")
+            elif command_codec.required_version(vehicle['commands_for_pi']) > (session.codec_version or 1):
+                problems.append(f"Araç {number} ({session.label}) bekleme komutunu desteklemiyor "
+                                f"(kodlama sürümü {command_codec.required_version(vehicle['commands_for_pi'])} gerekir).")
+        if problems:
+            messagebox.showerror("Filo Sürüşü", "\n".join(problems))
+            return
+        for number, (session, vehicle) in enumerate(zip(sessions, plan['vehicles']), start=1):
+            print(f"Filo aracı {number} -> {session.label}")
+            self._dispatch_plan(session, vehicle['commands_for_pi'], follows_live_plan=False)
+        self._refresh_vehicle_controls()
 
+    def nullify_opposing_turns(self, commands_input):
+        return maze_core.nullify_opposing_turns(commands_input)
 
     def _simple_filter_short_forwards(self, commands_input_tuples, min_acceptable_steps):
-
-        if not commands_input_tuples: return []
-        filtered_command_list = []
-        for action, value in commands_input_tuples:
-            if action.startswith("ileri"):
-                if value >= min_acceptable_steps:
-                    filtered_command_list.append((action, value))
-            else: 
-                filtered_command_list.append((action, value))
-        return filtered_command_list
+        return maze_core.filter_short_forwards(commands_input_tuples, min_acceptable_steps)
 
 
     def generate_and_process_commands(self, simplified_path_nodes):
-       
-
-        raw_vehicle_commands_tuples = self.generate_vehicle_perspective_commands(simplified_path_nodes) 
-        print(f"Ham komut (tuple) sayısı: {len(raw_vehicle_commands_tuples)}")
-
-        processed_commands_tuples = list(raw_vehicle_commands_tuples)
-
-        processed_commands_tuples = self.consolidate_vehicle_commands(processed_commands_tuples)
-        print(f"Birleştirme 1 sonrası: {len(processed_commands_tuples)}")
-
-        
-        processed_commands_tuples = self._simple_filter_short_forwards(processed_commands_tuples, min_acceptable_steps=MIN_ACCEPTABLE_FORWARD_STEP)
-        print(f"Kısa ileri filtreleme sonrası: {len(processed_commands_tuples)}")
-
-        # Adım 6: Filtrelemeden sonra oluşabilecek ardışık aynı komutları tekrar birleştir
-        processed_commands_tuples = self.consolidate_vehicle_commands(processed_commands_tuples)
-        print(f"Birleştirme 3 (filtre sonrası) sonrası: {len(processed_commands_tuples)}")
-
-
-        if processed_commands_tuples and (processed_commands_tuples[0][0] == "saga_don" or processed_commands_tuples[0][0] == "sola_don"):
-           
-            pass
-
-
-       
-        processed_commands_tuples = self.nullify_opposing_turns(processed_commands_tuples)
-        print(f"Zıt dönüş iptali sonrası: {len(processed_commands_tuples)}")
-
-        final_commands_tuples = self.consolidate_vehicle_commands(processed_commands_tuples)
-        print(f"Birleştirme 4 (iptal sonrası) sonrası: {len(final_commands_tuples)}")
-
-
-        if final_commands_tuples and (final_commands_tuples[-1][0] == "saga_don" or final_commands_tuples[-1][0] == "sola_don"):
-            final_commands_tuples.pop()
-            print(f"Son dönüş iptali sonrası: {len(final_commands_tuples)}")
-
-
-        final_commands_for_display = []
-        for action, value in final_commands_tuples:
-            if action.startswith("ileri"): 
-                direction_label = "Yatay" if action == "ileri_a" else "Dikey"
-                final_commands_for_display.append(f"İleri ({direction_label}) {value}")
-            elif action == "saga_don":
-                final_commands_for_display.append("Sağ Dön")
-            elif action == "sola_don":
-                final_commands_for_display.append("Sol Dön")
-
-        print(f"Nihai işlenmiş komut (tuple) sayısı: {len(final_commands_tuples)}.")
-        return final_commands_tuples, final_commands_for_display
+        return maze_core.generate_and_process_commands(simplified_path_nodes)
 
 
     def start_path_animation(self):
@@ -1626,8 +1955,7 @@ class MazeSolverApp:
                      self.btn_animate_commands.config(state=tk.NORMAL)
             if hasattr(self, 'btn_process') and self.btn_process.winfo_exists():
                 self.btn_process.config(state=tk.NORMAL if self.start_point_original_coords and self.end_point_original_coords else tk.DISABLED)
-            if hasattr(self, 'btn_drive_vehicle') and self.btn_drive_vehicle.winfo_exists() and self.client_socket and self.last_generated_commands_for_pi_json:
-                self.btn_drive_vehicle.config(state=tk.NORMAL)
+            self._refresh_vehicle_controls()
 
 
         if hasattr(self, 'result_image_display_tk_pil') and self.result_image_display_tk_pil and not (self.is_path_animating or self.is_command_animating):
@@ -1759,8 +2087,7 @@ class MazeSolverApp:
                      self.btn_animate_commands.config(state=tk.NORMAL)
             if hasattr(self, 'btn_process') and self.btn_process.winfo_exists():
                 self.btn_process.config(state=tk.NORMAL if self.start_point_original_coords and self.end_point_original_coords else tk.DISABLED)
-            if hasattr(self, 'btn_drive_vehicle') and self.btn_drive_vehicle.winfo_exists() and self.client_socket and self.last_generated_commands_for_pi_json:
-                self.btn_drive_vehicle.config(state=tk.NORMAL)
+            self._refresh_vehicle_controls()
 
         if hasattr(self, 'result_image_display_tk_pil') and self.result_image_display_tk_pil and not (self.is_path_animating or self.is_command_animating):
             if hasattr(self, 'lbl_result_image_canvas') and self.lbl_result_image_canvas.winfo_exists():
@@ -1844,186 +2171,23 @@ class MazeSolverApp:
 
 
     def find_path_bfs(self, grid, start_node, end_node):
-        if grid.ndim != 2: return None
-        rows, cols = grid.shape
-
-        if not (0 <= start_node[0] < rows and 0 <= start_node[1] < cols and grid[start_node[0], start_node[1]] == 1):
-            print(f"BFS: Başlangıç noktası geçersiz: {start_node}, grid değeri: {grid[start_node[0], start_node[1]] if (0 <= start_node[0] < rows and 0 <= start_node[1] < cols) else 'sınır dışı'}")
-            return None
-        if not (0 <= end_node[0] < rows and 0 <= end_node[1] < cols and grid[end_node[0], end_node[1]] == 1):
-            print(f"BFS: Bitiş noktası geçersiz: {end_node}, grid değeri: {grid[end_node[0], end_node[1]] if (0 <= end_node[0] < rows and 0 <= end_node[1] < cols) else 'sınır dışı'}")
-            return None
-
-        queue = deque([(start_node, [start_node])]) 
-        visited_nodes = {start_node}
-
-        possible_moves = [(0, 1), (0, -1), (1, 0), (-1, 0), (1,1), (1,-1), (-1,1), (-1,-1)] 
-
-        while queue:
-            (current_node, current_path) = queue.popleft()
-            if current_node == end_node:
-                return current_path 
-
-            for dr, dc in possible_moves:
-                next_r, next_c = current_node[0] + dr, current_node[1] + dc
-                neighbor_node = (next_r, next_c)
-
-                if 0 <= next_r < rows and 0 <= next_c < cols and \
-                   grid[next_r, next_c] == 1 and neighbor_node not in visited_nodes: 
-                    visited_nodes.add(neighbor_node)
-                    new_path = list(current_path)
-                    new_path.append(neighbor_node)
-                    queue.append((neighbor_node, new_path))
-        return None 
-
+        return maze_core.find_path_bfs(grid, start_node, end_node)
 
-    def simplify_path(self, path_input_pixels): 
-        if not path_input_pixels or len(path_input_pixels) < 2:
-            return path_input_pixels
 
-        simplified_nodes = [path_input_pixels[0]] 
-        for i in range(1, len(path_input_pixels) - 1):
-            dy1 = path_input_pixels[i][0] - path_input_pixels[i-1][0]
-            dx1 = path_input_pixels[i][1] - path_input_pixels[i-1][1]
-            dy2 = path_input_pixels[i+1][0] - path_input_pixels[i][0]
-            dx2 = path_input_pixels[i+1][1] - path_input_pixels[i][1]
-
-            dir1 = (np.sign(dy1), np.sign(dx1))
-            dir2 = (np.sign(dy2), np.sign(dx2))
-
-            if dir1 != dir2:
-                if simplified_nodes[-1] != path_input_pixels[i]: 
-                     simplified_nodes.append(path_input_pixels[i])
-
-        if simplified_nodes[-1] != path_input_pixels[-1]:
-            simplified_nodes.append(path_input_pixels[-1])
-
-
-        return simplified_nodes
+    def simplify_path(self, path_input_pixels):
+        return maze_core.simplify_path(path_input_pixels, self.selected_simplify_mode())
 
 
     def _calculate_turns(self, current_dy, current_dx, target_dy, target_dx):
-        
-        turn_sequence = []
-        if (current_dy, current_dx) == (target_dy, target_dx):
-            return turn_sequence 
-
-      
-        temp_dy_right, temp_dx_right = current_dx, -current_dy
-        if (temp_dy_right, temp_dx_right) == (target_dy, target_dx):
-            turn_sequence.append("saga_don")
-            return turn_sequence
-
-        temp_dy_left, temp_dx_left = -current_dx, current_dy
-        if (temp_dy_left, temp_dx_left) == (target_dy, target_dx):
-            turn_sequence.append("sola_don")
-            return turn_sequence
-
-       
-        if (-current_dy, -current_dx) == (target_dy, target_dx):
-            turn_sequence.extend(["saga_don", "saga_don"]) 
-            return turn_sequence
-
-       
-        print(f"UYARI: Dönüş hesaplanamadı! Mevcut: ({current_dy},{current_dx}), Hedef: ({target_dy},{target_dx})")
-        return []
+        return maze_core.calculate_turns(current_dy, current_dx, target_dy, target_dx)
 
 
     def generate_vehicle_perspective_commands(self, simplified_path_nodes):
-        if not simplified_path_nodes or len(simplified_path_nodes) < 2:
-            return []
-
-        vehicle_commands_tuples = []
-        current_orientation_dy, current_orientation_dx = (0, 0)
-
-        p0_y, p0_x = simplified_path_nodes[0]
-        p1_y, p1_x = simplified_path_nodes[1]
-
-        initial_delta_y = p1_y - p0_y
-        initial_delta_x = p1_x - p0_x
-        initial_forward_steps = 0
-        initial_forward_command_type = "" 
-
-        if initial_delta_y != 0: 
-            initial_forward_steps = abs(initial_delta_y)
-            current_orientation_dy = np.sign(initial_delta_y)
-            current_orientation_dx = 0
-            initial_forward_command_type = "ileri_b"
-        elif initial_delta_x != 0: 
-            initial_forward_steps = abs(initial_delta_x)
-            current_orientation_dx = np.sign(initial_delta_x)
-            current_orientation_dy = 0
-            initial_forward_command_type = "ileri_a"
-        else: 
-            return []
-
-        if initial_forward_steps > 0:
-            vehicle_commands_tuples.append((initial_forward_command_type, initial_forward_steps))
-
-        for i in range(1, len(simplified_path_nodes) - 1):
-            seg_start_y, seg_start_x = simplified_path_nodes[i]
-            seg_end_y, seg_end_x = simplified_path_nodes[i+1]
-
-            target_seg_delta_y = seg_end_y - seg_start_y
-            target_seg_delta_x = seg_end_x - seg_start_x
-
-            if target_seg_delta_y == 0 and target_seg_delta_x == 0: continue 
-            next_segment_intended_orientation_dy, next_segment_intended_orientation_dx = (0,0)
-            current_segment_interpreted_forward_steps = 0
-            current_segment_forward_command_type = ""
-
-            if target_seg_delta_y != 0:
-                current_segment_interpreted_forward_steps = abs(target_seg_delta_y)
-                next_segment_intended_orientation_dy = np.sign(target_seg_delta_y)
-                next_segment_intended_orientation_dx = 0
-                current_segment_forward_command_type = "ileri_b"
-            elif target_seg_delta_x != 0:
-                current_segment_interpreted_forward_steps = abs(target_seg_delta_x)
-                next_segment_intended_orientation_dx = np.sign(target_seg_delta_x)
-                next_segment_intended_orientation_dy = 0
-                current_segment_forward_command_type = "ileri_a"
-
-            if current_segment_interpreted_forward_steps == 0: continue 
-
-            turns = self._calculate_turns(current_orientation_dy, current_orientation_dx,
-                                          next_segment_intended_orientation_dy, next_segment_intended_orientation_dx)
-            if turns:
-                for turn_action_str in turns: 
-                    vehicle_commands_tuples.append((turn_action_str, 0)) 
-                current_orientation_dy = next_segment_intended_orientation_dy
-                current_orientation_dx = next_segment_intended_orientation_dx
-
-            if current_segment_interpreted_forward_steps > 0:
-                vehicle_commands_tuples.append((current_segment_forward_command_type, current_segment_interpreted_forward_steps))
-
-        return vehicle_commands_tuples
+        return maze_core.generate_vehicle_perspective_commands(simplified_path_nodes)
 
 
     def consolidate_vehicle_commands(self, commands_input_tuples):
-       
-        if not commands_input_tuples:
-            return []
-        consolidated_list = []
-        i = 0
-        while i < len(commands_input_tuples):
-            current_action, current_value = commands_input_tuples[i]
-            if current_action.startswith("ileri"): 
-                total_steps = current_value
-                j = i + 1
-                while j < len(commands_input_tuples) and commands_input_tuples[j][0] == current_action:
-                    total_steps += commands_input_tuples[j][1]
-                    j += 1
-                consolidated_list.append((current_action, total_steps))
-                i = j 
-            else:
-                consolidated_list.append((current_action, current_value))
-                i += 1
-        return consolidated_list
-
-    def merge_small_vehicle_steps(self, commands_input_tuples, threshold=SMALL_STEP_THRESHOLD):
-      
-        return commands_input_tuples 
-
+        return maze_core.consolidate_vehicle_commands(commands_input_tuples)
 
     def save_commands_to_file(self, commands_list_to_save, filename="direction.txt"):
         try:
@@ -2069,9 +2233,12 @@ class MazeSolverApp:
         self.camera_thread.start()
         if hasattr(self, 'live_camera_status_label') and self.live_camera_status_label.winfo_exists():
             self.live_camera_status_label.config(text="Canlı kamera aktif.")
+        if self.live_replan_var.get():
+            self._start_live_replanner()
 
 
     def stop_live_camera_feed(self):
+        self._stop_live_replanner()
         if self.is_live_camera_active:
             print("Canlı kamera yayını durduruluyor (sonuçlar sekmesi)...")
             self.stop_camera_event.set() 
@@ -2117,6 +2284,9 @@ class MazeSolverApp:
                 if not ret:
                     cv2.waitKey(100) 
                     continue
+                live_replanner_instance = self.live_replanner
+                if live_replanner_instance is not None:
+                    live_replanner_instance.submit_frame(frame)
 
                 frame_with_path_overlay = frame.copy()
                 current_frame_h, current_frame_w = frame_with_path_overlay.shape[:2]
@@ -2220,12 +2390,98 @@ class MazeSolverApp:
             if self.root.winfo_exists() and hasattr(self, 'live_camera_status_label') and self.live_camera_status_label.winfo_exists():
                 self.root.after(0, lambda: self.live_camera_status_label.config(text="Canlı kamera durdu."))
 
+    def toggle_live_replanning(self):
+        if not self.live_replan_var.get():
+            self._stop_live_replanner()
+            return
+        if self.is_live_camera_active:
+            self._start_live_replanner()
+        elif hasattr(self, 'lbl_live_replan_status') and self.lbl_live_replan_status.winfo_exists():
+            self.lbl_live_replan_status.config(text="Canlı planlama kamera açılınca başlayacak.")
+
+    def _start_live_replanner(self):
+        if self.live_replanner is not None:
+            return True
+        if not self.model_ready_event.is_set():
+            self._update_live_replan_status_ui("Canlı planlama için model bekleniyor.")
+            self.run_when_model_ready(self._start_live_replanner_if_enabled)
+            return False
+        if self.start_point_original_coords is None or self.end_point_original_coords is None or \
+           self.h_orig_for_path == 0 or self.w_orig_for_path == 0:
+            messagebox.showwarning("Eksik Bilgi", "Canlı planlama için önce görüntü yükleyip başlangıç ve bitiş noktalarını seçin.")
+            self.live_replan_var.set(False)
+            return False
+        try:
+            target_hz = float(self.live_replan_hz_var.get())
+        except (tk.TclError, ValueError):
+            target_hz = live_replanner.DEFAULT_TARGET_HZ
+        if target_hz <= 0:
+            target_hz = live_replanner.DEFAULT_TARGET_HZ
+
+        # Geri çağrılar kaynak planlayıcıyı taşır; durdurulmuş bir planlayıcının root.after ile kuyruğa
+        # girmiş sonucu yeniden başlatmadan sonra gelirse yok sayılır.
+        replanner = live_replanner.LiveReplanner(
+            self.model, (self.h_orig_for_path, self.w_orig_for_path),
+            self.start_point_original_coords, self.end_point_original_coords,
+            on_update=lambda result: self.root.after(0, lambda: self._on_live_replan_update(replanner, result)),
+            on_status=lambda text: self.root.after(0, lambda: self._on_live_replan_status(replanner, text)),
+            target_hz=target_hz, tiling=self.current_tiling_config(),
+            skeleton_engine=self.selected_skeleton_engine(), planner=self.selected_path_planner(),
+            time_model=drive_time.time_model_for_source(self.current_image_source),
+            simplify_mode=self.selected_simplify_mode())
+        self.live_replanner = replanner
+        replanner.start()
+        self._update_live_replan_status_ui(f"Canlı planlama başladı ({target_hz:g} Hz).")
+        print(f"Canlı yeniden planlama başlatıldı ({target_hz:g} Hz).")
+        return True
+
+    def _start_live_replanner_if_enabled(self):
+        if self.live_replan_var.get() and self.is_live_camera_active:
+            self._start_live_replanner()
+
+    def _stop_live_replanner(self):
+        if self.live_replanner is None:
+            return
+        replanner, self.live_replanner = self.live_replanner, None
+        replanner.stop()
+        print(f"Canlı yeniden planlama durduruldu: {replanner.frames_processed} kare işlendi, "
+              f"{replanner.frames_dropped} kare düşürüldü, {replanner.updates_published} güncelleme.")
+        self._update_live_replan_status_ui("Canlı planlama kapalı.")
+
+    def _on_live_replan_status(self, source, message):
+        if source is self.live_replanner:
+            self._update_live_replan_status_ui(message)
+
+    def _update_live_replan_status_ui(self, message):
+        if hasattr(self, 'lbl_live_replan_status') and self.lbl_live_replan_status.winfo_exists():
+            self.lbl_live_replan_status.config(text=message)
+
+    def _on_live_replan_update(self, source, result):
+        if source is not self.live_replanner:
+            return
+        # Kamera döngüsü kaplamayı bu alanlardan çizdiği için yeni yol bir sonraki karede görünür.
+        self.mask_for_bfs_and_clicking_ORIG_SCALE = result['bfs_mask']
+        self.last_simplified_path_for_overlay = result['simplified_path']
+        self.last_generated_commands_for_pi_json = result['commands_for_pi']
+        self.last_generated_commands_for_display = result['commands_for_display']
+        for session in self.vehicle_sessions.values():
+            if session.follows_live_plan and session.is_driving:
+                self.amend_mission_tail(session, result['commands_for_pi'])
+
+        if hasattr(self, 'txt_commands') and self.txt_commands.winfo_exists():
+            self.txt_commands.delete(1.0, tk.END)
+            for cmd_text in self.last_generated_commands_for_display:
+                self.txt_commands.insert(tk.END, cmd_text + "\n")
+        self._refresh_vehicle_controls()
+        print(f"Canlı planlama: yeni yol yayınlandı ({len(self.last_generated_commands_for_display)} komut).")
+
 
 if __name__ == "__main__":
     if not os.path.exists(MODEL_PATH):
         print(f"HATA: Model dosyası '{MODEL_PATH}' bulunamadı. Lütfen MODEL_PATH değişkenini güncelleyin.")
         try:
             print("UYARI: Gerçek model bulunamadı. Test için dummy model oluşturuluyor (TensorFlow gerektirir).")
+            import tensorflow as tf
             dummy_model = tf.keras.Sequential([
                 tf.keras.layers.InputLayer(input_shape=(128, 128, 1)),
                 tf.keras.layers.Conv2D(1, (3,3), padding='same', activation='sigmoid')
@@ -0,0 +1,397 @@
+"""Sürüş süresine göre en iyi yol planlayıcı.
+
+Araç yalnızca dört eksen yönünde ilerler ve yerinde 90° döner (bkz. raspberrypiside.py):
+
+  * ileri:  FORWARD_DURATION_PER_STEP x ADIM_KAZANCI saniye/piksel (yatay 'a', dikey 'b' kazancı)
+  * dönüş:  turn_pid döngüsü + sabit 1.5 s bekleme + DELAY_BETWEEN_COMMANDS
+  * her yeni komut arasında DELAY_BETWEEN_COMMANDS
+
+BFS piksel sayısını en aza indirir ve dönüşleri yok sayar; oysa tek bir dönüş yüzlerce
+piksellik ileri hareket kadar sürer. Bu planlayıcı (hücre, yön) durumları üzerinde A*
+çalıştırır; kenar maliyetleri DriveTimeModel'den gelir ve beklenen görev süresi en az
+olan yol döndürülür. Durum sayısını sınırlamak için arama, uzun kenarı en fazla
+MAX_SEARCH_SIDE olan kaba hücre ızgarasında yapılır; iki komşu hücre yalnızca ortak
+sınırlarını bir yol pikseli geçiyorsa bağlıdır (coarse_moves). Tam çözünürlükteki yol,
+aramanın her düz koşusu hücrelerinin içinde maskede kalan bir piksel satırına/sütununa
+oturtularak kurulur; şerit yoksa seçilen hücrelerle sınırlı BFS kullanılır. Düz BFS yolu
+da planlanır: komut hattındaki süresi aramanın üst sınırıdır ve kurulan yol daha uzun
+sürecekse BFS yolu döndürülür.
+"""
+import heapq
+import math
+from array import array
+from dataclasses import dataclass
+
+import numpy as np
+
+# raspberrypiside.py ile aynı değerler (Pi modülü GPIO gerektirdiği için PC'de içe aktarılamaz).
+FORWARD_DURATION_PER_STEP = 0.1
+DELAY_BETWEEN_COMMANDS = 0.2
+TURN_SETTLE_S = 1.5
+ADIM_KAZANCI = {
+    'camera': (0.068, 0.08),
+    'gallery': (0.2, 0.25),
+}
+# turn_pid'in 90° için tipik süresi (TURN_TIMEOUT = 7 s üst sınırdır); sahada ölçülüp güncellenmeli.
+TURN_PID_ESTIMATE_S = 2.0
+
+MAX_SEARCH_SIDE = 240
+# Yönler: 0 yukarı, 1 sağ, 2 aşağı, 3 sol; sağa dönüş +1, sola dönüş -1.
+HEADINGS = ((-1, 0), (0, 1), (1, 0), (0, -1))
+
+
+@dataclass
+class DriveTimeModel:
+    forward_s_per_px_a: float
+    forward_s_per_px_b: float
+    turn_s: float = TURN_PID_ESTIMATE_S + TURN_SETTLE_S
+    command_delay_s: float = DELAY_BETWEEN_COMMANDS
+
+    @property
+    def turn_cost_s(self):
+        """Bir dönüşün yola etkisi: dönüşün kendisi, dönüş komutu ve ardından gelen yeni ileri komutu için iki bekleme."""
+        return self.turn_s + 2 * self.command_delay_s
+
+
+def time_model_for_source(image_source=None):
+    """'camera' / 'gallery' için Pi'deki kazançlarla model; bilinmiyorsa kamera (Pi'deki varsayılan)."""
+    gain_a, gain_b = ADIM_KAZANCI.get((image_source or 'camera').lower(), ADIM_KAZANCI['camera'])
+    return DriveTimeModel(FORWARD_DURATION_PER_STEP * gain_a, FORWARD_DURATION_PER_STEP * gain_b)
+
+
+def estimate_mission_time(commands_for_pi, model=None):
+    """Pi komut listesinin beklenen süresi (saniye)."""
+    model = model or time_model_for_source()
+    total = 0.0
+    for action, value in commands_for_pi:
+        if action == "ileri_a":
+            total += value * model.forward_s_per_px_a
+        elif action == "ileri_b":
+            total += value * model.forward_s_per_px_b
+        elif action in ("saga_don", "sola_don"):
+            total += model.turn_s
+        elif action == "bekle":
+            total += value / 1000.0
+    return total + max(0, len(commands_for_pi) - 1) * model.command_delay_s
+
+
+def dead_reckon(commands_for_pi, start_node, initial_heading):
+    """Komutlar birebir uygulanırsa aracın varacağı piksel (initial_heading: HEADINGS indisi)."""
+    y, x = start_node
+    heading = initial_heading
+    for action, value in commands_for_pi:
+        if action in ("ileri_a", "ileri_b"):
+            y += HEADINGS[heading][0] * value
+            x += HEADINGS[heading][1] * value
+        elif action == "saga_don":
+            heading = (heading + 1) % 4
+        elif action == "sola_don":
+            heading = (heading - 1) % 4
+    return y, x
+
+
+def coarse_moves(mask, cell_px, through_centres=False):
+    """Kenarı cell_px olan kaba hücreler arasında yön başına geçiş düzlemleri.
+
+    (moves, genişlik) döndürür; moves[yön] (HEADINGS sırasıyla) bir hücre dolgulu düz
+    indeksli bayt dizisidir ve hücreden o yöne ileri gidilebiliyorsa 1'dir. İki komşu hücre
+    yalnızca ortak sınırlarını geçen bir yol pikseli çifti (aynı hücre içinde dik eksende ±1
+    piksel dahil) varsa bağlıdır. Bir köşeyi çapraz geçen piksel çifti (8-komşulu iskelet)
+    dört hücreyi de birbirine bağlar. En büyük değerle küçültmek bir duvarın iki yanındaki
+    paralel koridorları komşu hücrelerde birleştirirdi; sınır kontrolü bunu önler.
+    through_centres=True ise ayrıca iki hücre merkezini birleştiren doğru parçasının tüm
+    pikselleri maskede olmalıdır (merkezden merkeze sürülen yol maskeden çıkmaz).
+    """
+    rows, cols = mask.shape
+    mask = np.pad(mask, ((0, -rows % cell_px), (0, -cols % cell_px)))
+    height, width = mask.shape[0] // cell_px, mask.shape[1] // cell_px
+
+    def crossings(before, after):
+        # Son eksen sınır boyunca bir hücrenin pikselleridir; ±1 kaydırma hücre dışına taşmaz.
+        near = after.copy()
+        near[..., 1:] |= after[..., :-1]
+        near[..., :-1] |= after[..., 1:]
+        return (before & near).any(axis=-1)
+
+    # Sağa geçiş: her hücre sütununun son piksel sütunu ile sağdaki hücrenin ilk sütunu.
+    right = crossings(mask[:, cell_px - 1::cell_px][:, :-1].reshape(height, cell_px, width - 1).transpose(0, 2, 1),
+                      mask[:, cell_px::cell_px].reshape(height, cell_px, width - 1).transpose(0, 2, 1))
+    down = crossings(mask[cell_px - 1::cell_px][:-1].reshape(height - 1, width, cell_px),
+                     mask[cell_px::cell_px].reshape(height - 1, width, cell_px))
+    # Köşe çaprazları: sol üst-sağ alt veya sağ üst-sol alt pikseller; köşedeki dört hücre birbirine bağlanır.
+    above, below = mask[cell_px - 1::cell_px][:-1], mask[cell_px::cell_px]
+    corner = ((above[:, cell_px - 1::cell_px][:, :-1] & below[:, cell_px::cell_px]) |
+              (above[:, cell_px::cell_px] & below[:, cell_px - 1::cell_px][:, :-1]))
+    right[:-1] |= corner
+    right[1:] |= corner
+    down[:, :-1] |= corner
+    down[:, 1:] |= corner
+    if through_centres:
+        # Merkez satır/sütunlarında birikimli toplam: parça cell_px + 1 pikselin tamamı maskede mi?
+        center = cell_px // 2
+        starts = np.arange(max(width, height)) * cell_px + center
+        rows_sum = np.pad(np.cumsum(mask[center::cell_px], axis=1, dtype=np.int32), ((0, 0), (1, 0)))
+        cols_sum = np.pad(np.cumsum(mask[:, center::cell_px].T, axis=1, dtype=np.int32), ((0, 0), (1, 0)))
+        right &= (rows_sum[:, starts[:width - 1] + cell_px + 1] - rows_sum[:, starts[:width - 1]]) == cell_px + 1
+        down &= ((cols_sum[:, starts[:height - 1] + cell_px + 1] - cols_sum[:, starts[:height - 1]])
+                 == cell_px + 1).T
+
+    moves = np.zeros((4, height + 2, width + 2), dtype=np.uint8)
+    moves[1, 1:-1, 1:-2] = right
+    moves[3, 1:-1, 2:-1] = right
+    moves[2, 1:-2, 1:-1] = down
+    moves[0, 2:-1, 1:-1] = down
+    return tuple(plane.tobytes() for plane in moves), width + 2
+
+
+def _cells_to_mask(cells, padded_width, factor, shape):
+    """Dolgulu hücre indekslerini tam çözünürlükte bir koridor maskesine çevirir."""
+    corridor = np.zeros(shape, dtype=np.uint8)
+    for cell in cells:
+        y, x = divmod(cell, padded_width)
+        corridor[(y - 1) * factor:y * factor, (x - 1) * factor:x * factor] = 1
+    return corridor
+
+
+def _axis_run(a, b):
+    """a'dan b'ye önce dikey sonra yatay eksen hizalı pikseller (a hariç)."""
+    pixels = []
+    y, x = a
+    step = 1 if b[0] > y else -1
+    while y != b[0]:
+        y += step
+        pixels.append((y, x))
+    step = 1 if b[1] > x else -1
+    while x != b[1]:
+        x += step
+        pixels.append((y, x))
+    return pixels
+
+
+def _line_sums(grid, axis, lane, cache):
+    """Bir satırın (axis=1) veya sütunun (axis=0) maske piksellerinin birikimli toplamı (başta 0)."""
+    key = (axis, lane)
+    if key not in cache:
+        line = grid[lane, :] if axis == 1 else grid[:, lane]
+        cache[key] = np.concatenate(([0], np.cumsum(line == 1, dtype=np.int32)))
+    return cache[key]
+
+
+def _line_on_mask(grid, axis, lane, a, b, cache):
+    """lane satırı/sütunu boyunca a..b (ikisi dahil) piksellerinin hepsi maskede mi?"""
+    a, b = min(a, b), max(a, b)
+    sums = _line_sums(grid, axis, lane, cache)
+    return sums[b + 1] - sums[a] == b - a + 1
+
+
+def _lane_path(grid, states, padded_width, factor, start_node, end_node, model):
+    """(hücre, yön) dizisindeki her düz koşuyu hücrelerinin içindeki tek bir piksel satırına/sütununa oturtur.
+
+    Yatay koşunun şeridi hücre bandındaki bir satır, dikeyinki bir sütundur; iki ardışık
+    şeridin kesişimi dönüş hücresindeki köşe pikselidir. Koşunun iki köşe (ilk/son koşuda
+    başlangıç/bitiş) arasındaki tüm pikselleri maskede olmalıdır. Başlangıç/bitiş kendi
+    koşusunun şeridinde değilse dik kısa bir bacak (ve bir dönüş) eklenir; şeritler bu
+    bacakların süresini en aza indirecek şekilde dinamik programlamayla seçilir. Uygun şerit
+    yoksa (ör. çapraz iskelet geçişi) None.
+    """
+    rows, cols = grid.shape
+    runs = []  # [yön, ilk hücre, son hücre]
+    for (cell, heading), (next_cell, next_heading) in zip(states, states[1:]):
+        if next_cell == cell:
+            continue
+        if runs and runs[-1][0] == heading and runs[-1][2] == cell:
+            runs[-1][2] = next_cell
+        else:
+            runs.append([heading, cell, next_cell])
+    if not runs or any(runs[k][0] % 2 == runs[k + 1][0] % 2 for k in range(len(runs) - 1)):
+        return None
+
+    # Yatay koşu (yön 1/3) satır şeridi, dikey koşu (0/2) sütun şeridi kullanır.
+    # axis: şerit boyunca ilerlenen eksen (1: x, 0: y); lane_axis şeridin koordinatı (0: y, 1: x).
+    def lanes(run):
+        heading, cell, _ = run
+        y, x = divmod(cell, padded_width)
+        if heading % 2:
+            return range((y - 1) * factor, min(y * factor, rows))
+        return range((x - 1) * factor, min(x * factor, cols))
+
+    per_px = (model.forward_s_per_px_b, model.forward_s_per_px_a)  # dikey, yatay
+    cache = {}
+    count = len(runs)
+    start_along = start_node[1] if runs[0][0] % 2 else start_node[0]
+    end_along = end_node[1] if runs[-1][0] % 2 else end_node[0]
+
+    def run_ok(k, lane, a, b):
+        return _line_on_mask(grid, 1 if runs[k][0] % 2 else 0, lane, a, b, cache)
+
+    def jog_cost(k, lane, point):
+        # Nokta k. koşunun şeridinde değilse, noktanın koşu boyu koordinatında şeride dik bacak.
+        horizontal = runs[k][0] % 2
+        perpendicular, along = (point[0], point[1]) if horizontal else (point[1], point[0])
+        if perpendicular == lane:
+            return 0.0
+        if not _line_on_mask(grid, 0 if horizontal else 1, along, perpendicular, lane, cache):
+            return None
+        return model.turn_cost_s + abs(perpendicular - lane) * per_px[0 if horizontal else 1]
+
+    # best[(l_k, l_k+1)] = (maliyet, önceki şerit); son koşuda ikinci öğe None.
+    best = {}
+    for lane in lanes(runs[0]):
+        start_cost = jog_cost(0, lane, start_node)
+        if start_cost is None:
+            continue
+        for next_lane in (lanes(runs[1]) if count > 1 else (None,)):
+            stop = end_along if next_lane is None else next_lane
+            if run_ok(0, lane, start_along, stop):
+                best[(lane, next_lane)] = (start_cost, None)
+    history = [best]
+    for k in range(1, count):
+        current = {}
+        for (previous, lane), (cost, _) in history[-1].items():
+            for next_lane in (lanes(runs[k + 1]) if k + 1 < count else (None,)):
+                stop = end_along if next_lane is None else next_lane
+                if (lane, next_lane) in current and current[(lane, next_lane)][0] <= cost:
+                    continue
+                if run_ok(k, lane, previous, stop):
+                    current[(lane, next_lane)] = (cost, previous)
+        history.append(current)
+    finals = []
+    for (lane, _), (cost, _) in history[-1].items():
+        end_cost = jog_cost(count - 1, lane, end_node)
+        if end_cost is not None:
+            finals.append((cost + end_cost, lane))
+    if not finals:
+        return None
+
+    chosen = [min(finals)[1]]
+    for k in range(count - 1, 0, -1):
+        chosen.append(history[k][(chosen[-1], None if k == count - 1 else chosen[-2])][1])
+    chosen.reverse()
+
+    def point_on(k, lane_value, along):
+        return (lane_value, along) if runs[k][0] % 2 else (along, lane_value)
+
+    waypoints = [tuple(map(int, start_node)), point_on(0, chosen[0], start_along)]
+    for k in range(count - 1):
+        waypoints.append(point_on(k, chosen[k], chosen[k + 1]))
+    waypoints += [point_on(count - 1, chosen[-1], end_along), tuple(map(int, end_node))]
+    path = [waypoints[0]]
+    for point in waypoints[1:]:
+        path.extend(_axis_run(path[-1], point))
+    return path
+
+
+def path_mission_s(path, model=None):
+    """Pikselli yolun maze_core komut hattından geçtikten sonraki beklenen görev süresi (saniye)."""
+    import maze_core  # maze_core bu modülü içe aktarır; döngüyü önlemek için burada
+    nodes = maze_core.simplify_path(path)
+    if not nodes or len(nodes) < 2:
+        return 0.0
+    commands, _ = maze_core.generate_and_process_commands(nodes, verbose=False)
+    return estimate_mission_time(commands, model)
+
+
+def find_path_drive_time(grid, start_node, end_node, model=None, stats=None, max_search_side=MAX_SEARCH_SIDE):
+    """Beklenen sürüş süresi en az olan yol [(y, x), ...]; yoksa None. Yolun tüm pikselleri maske üzerindedir.
+
+    stats verilirse 'expanded' (durum genişletme), 'factor' (küçültme oranı),
+    'search_estimated_s' (aramanın maliyeti; BFS'yi geçemeyince inf), 'estimated_s' ve
+    'bfs_estimated_s' (döndürülen ve BFS yolunun komut hattındaki süresi) ile 'rebuild'
+    (döndürülen yol: 'lanes', 'corridor' veya 'bfs') yazılır.
+    """
+    model = model or time_model_for_source()
+    if stats is not None:
+        stats['expanded'] = 0
+    rows, cols = grid.shape
+    for name, (y, x) in (("Başlangıç", start_node), ("Bitiş", end_node)):
+        if not (0 <= y < rows and 0 <= x < cols and grid[y, x] == 1):
+            print(f"Sürüş süresi planlayıcı: {name} noktası geçersiz: {(y, x)}")
+            return None
+
+    # Düz BFS yolunun komut hattındaki süresi üst sınırdır: arama bunu geçemeyecekse erken biter.
+    import maze_core  # maze_core bu modülü içe aktarır; döngüyü önlemek için burada
+    bfs_path = maze_core.find_path_bfs(grid, start_node, end_node)
+    if bfs_path is None:
+        return None
+    bfs_s = path_mission_s(bfs_path, model)
+
+    factor = 1
+    while max(rows, cols) / factor > max_search_side:
+        factor *= 2
+    moves, padded_width = coarse_moves(grid == 1, factor)
+    source_cell = (start_node[0] // factor + 1) * padded_width + start_node[1] // factor + 1
+    target_cell = (end_node[0] // factor + 1) * padded_width + end_node[1] // factor + 1
+    target_y, target_x = divmod(target_cell, padded_width)
+
+    forward_cost = (model.forward_s_per_px_b * factor, model.forward_s_per_px_a * factor,
+                    model.forward_s_per_px_b * factor, model.forward_s_per_px_a * factor)
+    offsets = (-padded_width, 1, padded_width, -1)
+    turn_cost = model.turn_cost_s
+
+    def heuristic(cell):
+        y, x = divmod(cell, padded_width)
+        dy, dx = abs(y - target_y), abs(x - target_x)
+        estimate = dy * forward_cost[0] + dx * forward_cost[1]
+        return estimate + turn_cost if dy and dx else estimate
+
+    # Durum = hücre * 4 + yön. Araç ilk segmentin yönüne bakacak şekilde yerleştirilir, bu yüzden başlangıç yönü serbest.
+    state_count = len(moves[0]) * 4
+    g_score = array('d', [math.inf]) * state_count
+    parents = array('i', [-1]) * state_count
+    closed = bytearray(state_count)
+    heap = []
+    for heading in range(4):
+        state = source_cell * 4 + heading
+        g_score[state] = 0.0
+        heapq.heappush(heap, (heuristic(source_cell), state))
+
+    expanded, reached = 0, -1
+    while heap:
+        estimate, state = heapq.heappop(heap)
+        if estimate > bfs_s:
+            break
+        if closed[state]:
+            continue
+        closed[state] = 1
+        expanded += 1
+        cell, heading = divmod(state, 4)
+        if cell == target_cell:
+            reached = state
+            break
+        cost = g_score[state]
+        next_cell = cell + offsets[heading]
+        candidates = [(next_cell * 4 + heading, cost + forward_cost[heading])] if moves[heading][cell] else []
+        candidates.append((cell * 4 + (heading + 1) % 4, cost + turn_cost))
+        candidates.append((cell * 4 + (heading - 1) % 4, cost + turn_cost))
+        for neighbour, new_cost in candidates:
+            if not closed[neighbour] and new_cost < g_score[neighbour]:
+                g_score[neighbour] = new_cost
+                parents[neighbour] = state
+                heapq.heappush(heap, (new_cost + heuristic(neighbour // 4), neighbour))
+    if stats is not None:
+        stats['expanded'] = expanded
+        stats['factor'] = factor
+        stats['search_estimated_s'] = g_score[reached] if reached >= 0 else math.inf
+    path, estimated_s, rebuild = bfs_path, bfs_s, 'bfs'
+    if reached >= 0:
+        states = []
+        state = reached
+        while state >= 0:
+            states.append(divmod(state, 4))
+            state = parents[state]
+        states.reverse()
+        # Her düz koşu hücrelerinin içinde maskede kalan bir şeride oturtulur; dönüşler aramadakiyle aynıdır.
+        candidate, mode = _lane_path(grid, states, padded_width, factor, start_node, end_node, model), 'lanes'
+        if candidate is None:
+            # Şerit yok (ör. iskeletin çapraz geçişleri): seçilen hücrelerle sınırlı BFS.
+            cells = list(dict.fromkeys(cell for cell, _ in states))
+            candidate, mode = maze_core._find_path_in_corridor(
+                grid, _cells_to_mask(cells, padded_width, factor, grid.shape), start_node, end_node, {}), 'corridor'
+        candidate_s = path_mission_s(candidate, model) if candidate is not None else math.inf
+        if candidate_s <= bfs_s:
+            path, estimated_s, rebuild = candidate, candidate_s, mode
+    if stats is not None:
+        stats['estimated_s'] = estimated_s
+        stats['bfs_estimated_s'] = bfs_s
+        stats['rebuild'] = rebuild
+    return path
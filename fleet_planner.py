@@ -0,0 +1,628 @@
+"""Aynı labirentte birden fazla araç için çakışmasız, zaman senkronlu planlama.
+
+Her araç (başlangıç, bitiş) çifti için aynı maske üzerinde öncelikli planlama yapılır:
+araçlar sırayla, güvenli aralıklı zaman-uzay A* (SIPP) ile planlanır ve her planın kapladığı
+(hücre, tık aralığı) çiftleri bir ayırma tablosuna yazılır; sonraki araçlar bu ayırmalara
+girmeyen yollar arar ve gerekirse bekler. Bir araç planlanamazsa en öne alınıp tüm filo yeniden planlanır.
+
+Arama, kenarı cell_px (yaklaşık araç boyu) olan kaba hücrelerde yapılır. Araç modeli
+drive_time ile aynıdır (eksen yönlerinde ileri, yerinde 90° dönüş); süreler
+DriveTimeModel'den tık sayısına çevrilir. Tık, iki eksendeki hücre süresinin de tam sayı
+katı olacak şekilde seçilir ve tüm süreler yukarı yuvarlanır; çizelge hiçbir hareketi
+gerçekte sürdüğünden kısa saymaz. İleri hareket boyunca hem çıkılan hem girilen hücre
+ayrılır (karşılıklı geçiş ve aynı hücreye giriş böylece engellenir); çıkılan hücre ayrıca
+clearance_s saniye daha tutulur. Hedefine varan araç hücresini kalıcı olarak tutar.
+
+Araç hücre merkezlerine zorlanmaz: başlangıç pikselinden herhangi bir yöne kalkabilir, ileri
+hareket dik eksendeki koordinatını korur ve hareket ekseninde sonraki hücrenin merkezinde ya da
+bitiş pikselinin koordinatında durur (_PixelRoute). Merkez dışındaki parçalar maskede kalmalıdır
+ve aracın taştığı komşu hücreler de ayrılır. Başlangıç koridoru orada maskeden çıkıyorsa araç
+önce hücre merkezine bir giriş bacağıyla gider; bacağın iki sırası, son yönleri ve süreleriyle
+ayrı başlangıç durumlarıdır. Hedef hücreden tam bitiş pikseline kalan çıkış bacağının süresi
+aramada hesaba katılır. Komutlar ve çizilen yol aynı rotadan üretilir.
+
+Çıktı araç başına Pi komut listesidir; bekleme noktaları ('bekle', milisaniye) komutudur
+(Pi'de command_codec sürüm 2 gerekir). Beklemeler, Pi'nin komut arası gecikmesi de
+hesaba katılarak her hareketin çizelgedeki başlangıç anından yeniden hesaplanır; böylece
+yuvarlama payı birikmez. Araçlar aynı anda başlatılır; zamanlama açık döngüdür,
+ölçülmemiş dönüş süresi sapmaları clearance_s payıyla karşılanır.
+"""
+import heapq
+import math
+import time
+
+import numpy as np
+
+import drive_time
+
+FLEET_CELL_PX = 24
+FLEET_CLEARANCE_S = 0.5
+# Araç çizelgenin en fazla (komut arası gecikme + bu süre) önüne geçebilir; daha kısa bekleme komutu eklenmez.
+FLEET_MIN_WAIT_S = 0.1
+# Araç başına arama ufku: bağımsız en iyi varış süresinin bu katı (+ FLEET_HORIZON_SLACK_S).
+FLEET_HORIZON_FACTOR = 3
+FLEET_HORIZON_SLACK_S = 15.0
+# Tık seçimi: hızlı eksendeki hücre en fazla bu kadar tığa bölünür; yavaş eksenin tık sayısı
+# tam sayıya bu göreli payla yaklaşmalıdır (kalan fark yukarı yuvarlanır).
+FLEET_MAX_TICKS_PER_CELL = 32
+FLEET_TICK_TOLERANCE = 0.005
+FLEET_MAX_EXPANSIONS = 300000
+WAIT_ACTION = "bekle"
+
+# SIPP sırasında çıkış bacağı da eklenmiş hedef durumunun hücre alanı (gerçek hücreler >= 0).
+_FINISHED = -1
+# Yönler drive_time.HEADINGS ile aynı: 0 yukarı, 1 sağ, 2 aşağı, 3 sol; sağa dönüş +1.
+_FORWARD_ACTION_FOR_HEADING = ("ileri_b", "ileri_a", "ileri_b", "ileri_a")
+
+
+class ReservationTable:
+    """Planlanmış araçların hücre başına dolu tık aralıkları; hedefe varan araç hücresini o tıktan sonra kalıcı tutar."""
+
+    def __init__(self):
+        self._busy = {}
+        self._parked = {}
+
+    def reserve(self, cell, first, last):
+        self._busy.setdefault(cell, []).append((first, last))
+
+    def park(self, cell, tick):
+        self._parked[cell] = tick
+
+    def release(self, cell, first, last):
+        if cell in self._busy:
+            self._busy[cell] = [span for span in self._busy[cell] if span != (first, last)]
+
+    def safe_intervals(self, cell):
+        """Hücrenin boş olduğu [ilk, son] tık aralıkları; sonuncusunun sonu math.inf olabilir."""
+        limit = self._parked[cell] - 1 if cell in self._parked else math.inf
+        intervals, start = [], 0
+        for first, last in sorted(self._busy.get(cell, ())):
+            if first > start:
+                intervals.append((start, min(first - 1, limit)))
+            start = max(start, last + 1)
+        intervals.append((start, limit))
+        return [(first, last) for first, last in intervals if first <= last]
+
+
+class _CoarseGrid:
+    """Maskeden kaba hücre ızgarası; geçişler drive_time.coarse_moves ile yalnızca sınırı geçen yol piksellerinden kurulur.
+
+    through_centres=True ise yalnızca merkezden merkeze doğru parçası maskede kalan komşular bağlıdır.
+    """
+
+    def __init__(self, grid, cell_px, through_centres=False):
+        self.cell_px = cell_px
+        # moves[yön][hücre]: hücreden o yöne ileri gidilebilir mi.
+        self.moves, self.width = drive_time.coarse_moves(grid == 1, cell_px, through_centres)
+        self.cell_count = len(self.moves[0])
+        self.offsets = (-self.width, 1, self.width, -1)
+
+    def cell_of(self, point):
+        return (point[0] // self.cell_px + 1) * self.width + point[1] // self.cell_px + 1
+
+    def center(self, cell, shape):
+        """Hücrenin merkez pikseli; görüntü kenarındaki yarım hücrelerde görüntü içine kırpılır."""
+        y, x = divmod(cell, self.width)
+        return (min((y - 1) * self.cell_px + self.cell_px // 2, shape[0] - 1),
+                min((x - 1) * self.cell_px + self.cell_px // 2, shape[1] - 1))
+
+
+class _PixelRoute:
+    """Bir aracın hücre içindeki gerçek piksel konumuyla ileri hareketleri.
+
+    Araç hücre merkezine zorlanmaz: ileri hareket dik eksendeki koordinatı korur ve hareket
+    ekseninde sonraki hücrenin merkezinde ya da, bitiş pikseli o hücrenin aralığındaysa, bitişin
+    koordinatında durur. Merkezden merkeze olmayan her parçanın pikselleri maskede olmalıdır;
+    süre gerçek piksel sayısından yukarı yuvarlanır. Merkez dışındaki araç (kenarı cell_px kare)
+    komşu hücrelere taşar; bu hücreler extra_cells ile ayrıca ayrılır.
+    """
+
+    def __init__(self, grid, coarse, end, per_px, tick_s):
+        self.grid = grid
+        self.coarse = coarse
+        self.end = end
+        self.per_px = per_px
+        self.tick_s = tick_s
+        self.sums = {}
+
+    def extra_cells(self, a, b, cells):
+        """a'dan b'ye giden aracın taradığı karenin değdiği, cells dışındaki hücreler."""
+        coarse, half = self.coarse, self.coarse.cell_px // 2
+        first_y, last_y = (min(a[0], b[0]) - half) // coarse.cell_px, (max(a[0], b[0]) + half - 1) // coarse.cell_px
+        first_x, last_x = (min(a[1], b[1]) - half) // coarse.cell_px, (max(a[1], b[1]) + half - 1) // coarse.cell_px
+        return [(y + 1) * coarse.width + x + 1 for y in range(first_y, last_y + 1) for x in range(first_x, last_x + 1)
+                if (y + 1) * coarse.width + x + 1 not in cells]
+
+    def forward(self, cell, heading, position):
+        """[(sonraki hücre, yeni konum, tık sayısı), ...]; yön ekseni 0 (dikey) veya 1 (yatay)."""
+        coarse, shape = self.coarse, self.grid.shape
+        next_cell = cell + coarse.offsets[heading]
+        axis = heading % 2
+        here, there = coarse.center(cell, shape), coarse.center(next_cell, shape)
+        first = (divmod(next_cell, coarse.width)[axis] - 1) * coarse.cell_px
+        stops = [there[axis]]
+        if first <= self.end[axis] < first + coarse.cell_px and self.end[axis] != there[axis]:
+            stops.append(self.end[axis])
+        results = []
+        for stop in stops:
+            new_position = (stop, position[1]) if axis == 0 else (position[0], stop)
+            pixels = abs(stop - position[axis])
+            if pixels == 0:
+                continue
+            if (position != here or new_position != there) and not drive_time._line_on_mask(
+                    self.grid, axis, position[1 - axis], position[axis], stop, self.sums):
+                continue
+            results.append((next_cell, new_position, _ceil_ticks(pixels * self.per_px[heading], self.tick_s)))
+        return results
+
+
+def _ceil_ticks(duration_s, tick_s):
+    # Kayan nokta artığı (ör. 20.000000001) fazladan bir tık saydırmasın.
+    return max(1, math.ceil(duration_s / tick_s - 1e-9))
+
+
+def _tick_model(model, cell_px, tick_s=None):
+    """(tık süresi, yön başına ileri tık sayısı, dönüş tık sayısı).
+
+    tick_s verilmezse hızlı eksendeki hücre süresi n tığa bölünür; n, yavaş eksendeki hücre
+    de (FLEET_TICK_TOLERANCE payıyla) tam sayıda tık sürecek en küçük değerdir. Kamera
+    kazançlarında (yatay 0.1632 s, dikey 0.192 s) bu 11 ve 13 tıktır. Süreler yukarı yuvarlanır.
+    """
+    per_px = (model.forward_s_per_px_b, model.forward_s_per_px_a, model.forward_s_per_px_b, model.forward_s_per_px_a)
+    fast_s, slow_s = cell_px * min(per_px), cell_px * max(per_px)
+    if not tick_s:
+        for divisions in range(1, FLEET_MAX_TICKS_PER_CELL + 1):
+            tick_s = fast_s / divisions
+            slow_ticks = slow_s / tick_s
+            if _ceil_ticks(slow_s, tick_s) - slow_ticks <= FLEET_TICK_TOLERANCE * slow_ticks:
+                break
+    forward_ticks = tuple(_ceil_ticks(cell_px * s, tick_s) for s in per_px)
+    return tick_s, forward_ticks, _ceil_ticks(model.turn_cost_s, tick_s)
+
+
+def _distance_to_goal(coarse, target, forward_ticks, turn_ticks):
+    """Ters Dijkstra: her (hücre, yön) durumundan hedefe çakışmasız en kısa tık sayısı (A* sezgiseli)."""
+    distance = np.full(coarse.cell_count * 4, np.iinfo(np.int32).max, dtype=np.int64)
+    heap = []
+    for heading in range(4):
+        distance[target * 4 + heading] = 0
+        heap.append((0, target * 4 + heading))
+    while heap:
+        cost, state = heapq.heappop(heap)
+        if cost > distance[state]:
+            continue
+        cell, heading = divmod(state, 4)
+        # state'e ileri hareketle gelen önceki hücre ve dönüşle gelen komşu yönler.
+        previous_cell = cell - coarse.offsets[heading]
+        candidates = [((heading + 1) % 4, cell, turn_ticks), ((heading - 1) % 4, cell, turn_ticks)]
+        if coarse.moves[heading][previous_cell]:
+            candidates.append((heading, previous_cell, forward_ticks[heading]))
+        for previous_heading, previous, step in candidates:
+            previous_state = previous * 4 + previous_heading
+            if cost + step < distance[previous_state]:
+                distance[previous_state] = cost + step
+                heapq.heappush(heap, (cost + step, previous_state))
+    return distance
+
+
+def _plan_vehicle(coarse, source, target, heuristic, reservations, route, turn_ticks, clearance_ticks, horizon, stats,
+                  starts, lead_out_ticks):
+    """Güvenli aralıklarla (SIPP) zaman-uzay A*; ([(eylem, yön, başlangıç tığı, süre, konum), ...], varış tığı,
+    başlangıç seçeneği) ya da (None, None, None).
+
+    Durum (hücre, yön, hücrenin boş aralığı, piksel konumu) ve değeri en erken varış tığıdır;
+    eylemdeki konum aracın eylem sonundaki pikselidir. Bekleme ayrı bir durum değildir: ileri
+    hareket, kalkış hücresinin aralığı izin verdiği sürece hedef hücrenin ilk uygun aralığına
+    kadar ertelenir. starts [(tık, yön, konum), ...] başlangıç seçenekleridir. Hedef hücredeki
+    durum, lead_out_ticks(konum, yön) kadar sonra bitmiş sayılır; çıkış bacağı böylece
+    seçime katılır.
+    """
+    intervals = {}
+
+    def safe_intervals(cell):
+        if cell not in intervals:
+            intervals[cell] = reservations.safe_intervals(cell)
+        return intervals[cell]
+
+    def free(cells, first, last):
+        return all(any(a <= first and last <= b for a, b in safe_intervals(cell)) for cell in cells)
+
+    start_intervals = safe_intervals(source)
+    if not start_intervals or start_intervals[0][0] != 0:
+        return None, None, None
+    parents, best, roots = {}, {}, {}
+    heap = []
+    for option, (start_tick, heading, position) in enumerate(starts):
+        key = (source, heading, 0, position)
+        estimate = start_tick + int(heuristic[source * 4 + heading])
+        if start_intervals[0][1] < start_tick or estimate > horizon or start_tick >= best.get(key, math.inf):
+            continue
+        parents[key], best[key], roots[key] = None, start_tick, option
+        heapq.heappush(heap, (estimate, start_tick, key))
+    closed = set()
+    expanded = 0
+    while heap and expanded < FLEET_MAX_EXPANSIONS:
+        _, tick, key = heapq.heappop(heap)
+        if key in closed:
+            continue
+        closed.add(key)
+        if key[0] == _FINISHED:
+            key = key[1]
+            arrival = best[key]
+            actions = []
+            while parents[key] is not None:
+                key, steps = parents[key]
+                actions.extend(reversed(steps))
+            return actions[::-1], arrival, roots[key]
+        expanded += 1
+        stats['expanded'] += 1
+        cell, heading, interval, position = key
+        interval_end = safe_intervals(cell)[interval][1]
+        if cell == target and interval_end == math.inf:
+            # Çıkış bacağı hedef hücrede sürülür; süresi eklenmiş sahte durum sıraya girer.
+            finished = tick + lead_out_ticks(position, heading)
+            heapq.heappush(heap, (finished, finished, (_FINISHED, key)))
+            continue
+
+        successors = []
+        for action, new_heading in (('saga_don', (heading + 1) % 4), ('sola_don', (heading - 1) % 4)):
+            if tick + turn_ticks <= interval_end and free(route.extra_cells(position, position, (cell,)),
+                                                          tick, tick + turn_ticks):
+                successors.append(((cell, new_heading, interval, position), tick + turn_ticks,
+                                   [(action, heading, tick, turn_ticks, position)]))
+        if coarse.moves[heading][cell]:
+            for next_cell, new_position, duration in route.forward(cell, heading, position):
+                for next_interval, (first, last) in enumerate(safe_intervals(next_cell)):
+                    # Kalkış en erken hedef aralığın başında; kalkılan hücre varıştan sonra clearance_ticks daha dolu.
+                    departure = max(tick, first)
+                    if departure + duration + clearance_ticks > interval_end:
+                        break
+                    if departure + duration > last or not free(
+                            route.extra_cells(position, new_position, (cell, next_cell)),
+                            tick, departure + duration + clearance_ticks):
+                        continue
+                    steps = [('bekle', heading, tick, departure - tick, position)] if departure > tick else []
+                    steps.append(('ileri', heading, departure, duration, new_position))
+                    successors.append(((next_cell, heading, next_interval, new_position), departure + duration, steps))
+        for new_key, new_tick, steps in successors:
+            estimate = new_tick + int(heuristic[new_key[0] * 4 + new_key[1]])
+            if new_key in closed or estimate > horizon or new_tick >= best.get(new_key, math.inf):
+                continue
+            best[new_key] = new_tick
+            parents[new_key] = (key, steps)
+            heapq.heappush(heap, (estimate, new_tick, new_key))
+    return None, None, None
+
+
+def _reserve_actions(reservations, coarse, route, source, position, actions, arrival_tick, clearance_ticks):
+    # Araç ilk hareketine (giriş bacağı varsa onun sonuna) kadar başlangıç hücresindedir.
+    reservations.reserve(source, 0, actions[0][2] if actions else arrival_tick)
+    cell = source
+    for action, heading, tick, duration, new_position in actions:
+        if action == 'ileri':
+            next_cell = cell + coarse.offsets[heading]
+            reservations.reserve(cell, tick, tick + duration + clearance_ticks)
+            reservations.reserve(next_cell, tick, tick + duration)
+            for extra in route.extra_cells(position, new_position, (cell, next_cell)):
+                reservations.reserve(extra, tick, tick + duration + clearance_ticks)
+            cell = next_cell
+        else:
+            reservations.reserve(cell, tick, tick + duration)
+            for extra in route.extra_cells(position, position, (cell,)):
+                reservations.reserve(extra, tick, tick + duration)
+        position = new_position
+    reservations.reserve(cell, arrival_tick, arrival_tick)
+    reservations.park(cell, arrival_tick)
+
+
+def _command_duration_s(action, value, model):
+    if action == "ileri_a":
+        return value * model.forward_s_per_px_a
+    if action == "ileri_b":
+        return value * model.forward_s_per_px_b
+    return model.turn_s
+
+
+def _leg_options(grid, a, b):
+    """a'dan b'ye hücre içi eksen hizalı bacaklar: önce dikey ve önce yatay sıra için
+    [(maskede kalan piksel sayısı, [(yön, piksel), ...]), ...]; a ile b bir eksende aynıysa tek seçenek."""
+    options = []
+    for axes in ((0, 1), (1, 0)):
+        segments, on_mask, point = [], 0, list(a)
+        for axis in axes:
+            delta = b[axis] - point[axis]
+            if delta == 0:
+                continue
+            heading = (2 if delta > 0 else 0) if axis == 0 else (1 if delta > 0 else 3)
+            for _ in range(abs(delta)):
+                point[axis] += 1 if delta > 0 else -1
+                on_mask += int(grid[point[0], point[1]] == 1)
+            segments.append((heading, abs(delta)))
+        if not options or segments != options[0][1]:
+            options.append((on_mask, segments))
+    return options
+
+
+def _leg_segments(grid, a, b):
+    """a'dan b'ye bacak [(yön, piksel), ...]; iki sıradan pikselleri maskede kalanı, ikisi de
+    taşıyorsa daha çok piksel kalanı seçilir."""
+    return max(_leg_options(grid, a, b), key=lambda option: option[0])[1]
+
+
+def _turn_moves(heading, new_heading):
+    turns = {1: ['saga_don'], 2: ['saga_don', 'saga_don'], 3: ['sola_don']}.get((new_heading - heading) % 4, [])
+    return [[turn, 0, None, None, None] for turn in turns]
+
+
+def _leg_moves(segments, heading):
+    """Bacak parçaları -> ([eylem, piksel, None, None, yön], ...), son yön); zamanlaması serbesttir."""
+    moves = []
+    for new_heading, pixels in segments:
+        if heading is not None:
+            moves.extend(_turn_moves(heading, new_heading))
+        moves.append([_FORWARD_ACTION_FOR_HEADING[new_heading], pixels, None, None, new_heading])
+        heading = new_heading
+    return moves, heading
+
+
+def _schedule_moves(actions, position):
+    """Zaman çizelgesi -> [eylem, piksel, başlangıç tığı, bitiş tığı, yön] hareketleri; position çizelge başındaki piksel."""
+    moves = []
+    for action, heading, tick, duration, new_position in actions:
+        if action == 'ileri':
+            moves.append([_FORWARD_ACTION_FOR_HEADING[heading],
+                          abs(new_position[0] - position[0]) + abs(new_position[1] - position[1]),
+                          tick, tick + duration, heading])
+            position = new_position
+        elif action != 'bekle':
+            moves.append([action, 0, tick, tick + duration, heading])
+    return moves
+
+
+def _final_heading(actions, heading):
+    """Çizelge sonunda aracın yönü; çizelgede hareket yoksa heading."""
+    for action, action_heading, _, _, _ in actions:
+        if action == 'ileri':
+            heading = action_heading
+        elif action == 'saga_don':
+            heading = (action_heading + 1) % 4
+        elif action == 'sola_don':
+            heading = (action_heading - 1) % 4
+    return heading
+
+
+def _moves_duration_s(moves, model):
+    """Zamanlaması serbest hareketlerin Pi'de süresi (aradaki komut gecikmeleri dahil)."""
+    if not moves:
+        return 0.0
+    return sum(_command_duration_s(action, value, model) for action, value, *_ in moves) + \
+        model.command_delay_s * (len(moves) - 1)
+
+
+def moves_to_commands(moves, tick_s, model):
+    """Hareketler -> Pi komutları; aynı yöndeki ardışık ileri hareketler tek komut olur.
+
+    Bekleme komutları çizelgedeki beklemelerden değil, her hareketin çizelgedeki başlangıç
+    anından hesaplanır: Pi'de her komuttan önce model.command_delay_s beklenir, hareketler
+    modeldeki gerçek sürelerinde biter. Tıklar yukarı yuvarlandığı için araç çizelgenin hep
+    önünde ya da tam zamanındadır; aradaki fark bekleme komutuyla kapatılır. Bekleme komutunun
+    kendisi de bir gecikme getirdiğinden fark command_delay_s + FLEET_MIN_WAIT_S'den kısaysa
+    eklenmez; araç en fazla bu kadar erken kalkar (clearance_s bunu karşılar). Başlangıç tığı
+    None olan hareketler (giriş/çıkış bacakları) öncekinin hemen ardından yürütülür.
+    """
+    merged = []
+    for move in moves:
+        action, pixels, tick, end_tick, heading = move
+        # Arada çizelge beklemesi yoksa aynı yöndeki ileri hareket öncekine eklenir.
+        if merged and action in ("ileri_a", "ileri_b") and merged[-1][0] == action and merged[-1][4] == heading \
+                and (tick is None or merged[-1][3] == tick):
+            merged[-1][1] += pixels
+            if end_tick is not None:
+                merged[-1][3] = end_tick
+            continue
+        merged.append(list(move))
+
+    commands = []
+    elapsed_s = 0.0  # Son eklenen komutun bittiği an
+    for action, value, tick, _, _ in merged:
+        delay_s = model.command_delay_s if commands else 0.0
+        if tick is not None:
+            slack_s = tick * tick_s - (elapsed_s + delay_s)
+            if slack_s >= model.command_delay_s + FLEET_MIN_WAIT_S:
+                # Bekleme, hareketten önce bir komut arası gecikmesi daha getirir.
+                commands.append((WAIT_ACTION, int(round((slack_s - model.command_delay_s) * 1000))))
+                elapsed_s = tick * tick_s - model.command_delay_s
+                delay_s = model.command_delay_s
+        commands.append((action, value))
+        elapsed_s += delay_s + _command_duration_s(action, value, model)
+    return commands
+
+
+def _moves_to_path(start, moves):
+    """Başlangıç pikselinden hareketlerle izlenen rotanın köşe noktaları (arayüz çizimi için)."""
+    y, x = start
+    nodes = [(y, x)]
+    last_heading = None
+    for action, pixels, _, _, heading in moves:
+        if action not in ("ileri_a", "ileri_b"):
+            continue
+        dy, dx = drive_time.HEADINGS[heading]
+        y, x = y + dy * pixels, x + dx * pixels
+        if heading == last_heading:
+            nodes[-1] = (y, x)
+        else:
+            nodes.append((y, x))
+        last_heading = heading
+    return nodes
+
+
+def _lead_out_moves(grid, actions, position, heading, end):
+    """Çizelgenin bittiği pikselden tam bitiş pikseline çıkış bacağı (hareketler)."""
+    for action in actions:
+        if action[0] == 'ileri':
+            position = action[4]
+    moves, _ = _leg_moves(_leg_segments(grid, position, end), _final_heading(actions, heading))
+    return moves
+
+
+def plan_fleet(grid, pairs, time_model=None, cell_px=FLEET_CELL_PX, clearance_s=FLEET_CLEARANCE_S, tick_s=None):
+    """pairs: [(başlangıç, bitiş), ...] ([y, x]); araç başına çakışmasız, senkron komut çizelgesi.
+
+    Döndürülen sözlükte 'solved' tüm araçların planlanıp planlanmadığını, 'vehicles' pairs
+    sırasıyla araç sonuçlarını ('commands_for_pi', 'simplified_path', 'arrival_s', 'wait_s',
+    'priority'), 'makespan_s' ve 'independent_makespan_s' (çakışmalar yok sayılınca) süreleri verir.
+    Noktalar maskede değilse veya iki aracın başlangıç/bitiş noktaları cell_px'ten yakınsa ValueError.
+    """
+    started = time.perf_counter()
+    model = time_model or drive_time.time_model_for_source()
+    coarse = _CoarseGrid(grid, cell_px)
+    tick_s, forward_ticks, turn_ticks = _tick_model(model, cell_px, tick_s)
+    clearance_ticks = math.ceil(clearance_s / tick_s - 1e-9)
+    rows, cols = grid.shape
+
+    per_px = (model.forward_s_per_px_b, model.forward_s_per_px_a, model.forward_s_per_px_b, model.forward_s_per_px_a)
+    sources, targets, starts, routes, start_ticks = [], [], [], [], []
+    for index, (start, end) in enumerate(pairs):
+        for name, (y, x) in (("Başlangıç", start), ("Bitiş", end)):
+            if not (0 <= y < rows and 0 <= x < cols and grid[y, x] == 1):
+                raise ValueError(f"Araç {index + 1}: {name} noktası yol maskesi üzerinde değil: {(y, x)}")
+        sources.append(coarse.cell_of(start))
+        targets.append(coarse.cell_of(end))
+        routes.append(_PixelRoute(grid, coarse, tuple(end), per_px, tick_s))
+        # Başlangıç seçenekleri [(tık, yön, konum, giriş bacağı), ...]: araç başlangıç pikselinden her yöne
+        # kalkabilir (ilk ileri komut yönü belirler); koridoru orada maskeden çıkıyorsa hücre merkezine giriş
+        # bacağıyla gider. Bacağın iki sırası ayrı seçenektir; çizelge bacağın son yönüyle, bacak ve bir komut
+        # gecikmesi sonra başlar.
+        center = coarse.center(sources[-1], grid.shape)
+        options = [(0, heading, tuple(start), []) for heading in range(4)]
+        if tuple(start) != center:
+            legs = _leg_options(grid, tuple(start), center)
+            for on_mask, segments in legs:
+                if on_mask == max(leg[0] for leg in legs):
+                    lead_in, heading = _leg_moves(segments, None)
+                    options.append((_ceil_ticks(_moves_duration_s(lead_in, model) + model.command_delay_s, tick_s),
+                                    heading, center, lead_in))
+        starts.append(options)
+        start_ticks.append(max(option[0] for option in options))
+    # Bir araç boyundan (cell_px) yakın iki nokta araçları üst üste koyar; aynı hücredeki noktalar da bu kapsamdadır.
+    for name, points in (("başlangıç", [start for start, _ in pairs]), ("bitiş", [end for _, end in pairs])):
+        for i, (y, x) in enumerate(points):
+            if any(max(abs(y - other_y), abs(x - other_x)) < cell_px for other_y, other_x in points[:i]):
+                raise ValueError(f"İki aracın {name} noktası birbirine {cell_px} px'ten yakın; "
+                                 "noktaları birbirinden uzaklaştırın.")
+
+    # Araç, rotası maskeden çıkmayan merkez bağlarıyla hedefe varabiliyorsa onlarla planlanır (geniş koridorlar);
+    # varamıyorsa (ör. tek piksellik iskelet) yalnızca sınır bağlarıyla. İki ızgaranın hücreleri aynıdır.
+    lanes = _CoarseGrid(grid, cell_px, through_centres=True)
+    grids, heuristics = [], []
+    for source, target in zip(sources, targets):
+        for candidate in (lanes, coarse):
+            heuristic = _distance_to_goal(candidate, target, forward_ticks, turn_ticks)
+            if heuristic[source * 4:source * 4 + 4].min() < np.iinfo(np.int32).max:
+                break
+        grids.append(candidate)
+        heuristics.append(heuristic)
+
+    def lead_out_ticks_to(end):
+        def lead_out_ticks(position, heading):
+            lead_out, _ = _leg_moves(_leg_segments(grid, position, end), heading)
+            return _ceil_ticks(_moves_duration_s(lead_out, model) + model.command_delay_s, tick_s) if lead_out else 0
+        return lead_out_ticks
+    lead_out_ticks = [lead_out_ticks_to(tuple(end)) for _, end in pairs]
+
+    def plan_moves(index, plan):
+        """Plan -> (giriş bacağı + çizelge + çıkış bacağı hareketleri, çıkış bacağı dahil varış saniyesi)."""
+        actions, arrival, option = plan
+        start_tick, heading, position, lead_in = starts[index][option]
+        lead_in = [list(move) for move in lead_in]
+        if lead_in:
+            # Giriş bacağı çizelgenin ilk tığında biter; ilk ileri hareket aynı yöndeyse onunla birleşir.
+            lead_in[-1][3] = start_tick
+        lead_out = _lead_out_moves(grid, actions, position, heading, tuple(pairs[index][1]))
+        # Çıkış bacağı hedef hücrede, çizelgeden sonra bir komut gecikmesiyle sürülür.
+        arrival_s = arrival * tick_s + (_moves_duration_s(lead_out, model) + model.command_delay_s if lead_out else 0.0)
+        return lead_in + _schedule_moves(actions, position) + lead_out, arrival_s
+
+    stats = {'expanded': 0}
+    # Çakışmalar yok sayılınca varış: araç boş ayırma tablosuyla, aynı başlangıç seçenekleri ve çıkış bacağıyla planlanır.
+    independent_s = []
+    for index, (source, target) in enumerate(zip(sources, targets)):
+        plan = (None, None, None)
+        if heuristics[index][source * 4:source * 4 + 4].min() < np.iinfo(np.int32).max:
+            plan = _plan_vehicle(grids[index], source, target, heuristics[index], ReservationTable(), routes[index],
+                                 turn_ticks, clearance_ticks, math.inf, stats,
+                                 [option[:3] for option in starts[index]], lead_out_ticks[index])
+        independent_s.append(None if plan[0] is None else plan_moves(index, plan)[1])
+    unreachable = [i for i, seconds in enumerate(independent_s) if seconds is None]
+
+    # Uzun yolu olan araç önce planlanır; planlanamayan araç en öne alınıp yeniden denenir.
+    order = sorted(range(len(pairs)), key=lambda i: -(independent_s[i] or 0.0))
+    plans, replans = {}, 0
+    while not unreachable:
+        reservations = ReservationTable()
+        for source, start_tick in zip(sources, start_ticks):
+            reservations.reserve(source, 0, start_tick)
+        plans, failed = {}, None
+        for index in order:
+            # Diğer araçların başlangıçları giriş bacakları bitene dek doludur; aracın kendi başlangıcı serbest bırakılır.
+            reservations.release(sources[index], 0, start_ticks[index])
+            horizon = _ceil_ticks(independent_s[index], tick_s) * FLEET_HORIZON_FACTOR + \
+                math.ceil(FLEET_HORIZON_SLACK_S / tick_s)
+            plan = _plan_vehicle(grids[index], sources[index], targets[index], heuristics[index], reservations,
+                                 routes[index], turn_ticks, clearance_ticks, horizon, stats,
+                                 [option[:3] for option in starts[index]], lead_out_ticks[index])
+            if plan[0] is None:
+                failed = index
+                break
+            _reserve_actions(reservations, grids[index], routes[index], sources[index],
+                             starts[index][plan[2]][2], plan[0], plan[1], clearance_ticks)
+            plans[index] = plan
+        if failed is None or order[0] == failed or replans >= len(pairs):
+            break
+        order.remove(failed)
+        order.insert(0, failed)
+        replans += 1
+
+    vehicles = []
+    for index, (start, end) in enumerate(pairs):
+        vehicle = {'start': tuple(start), 'end': tuple(end), 'found': index in plans,
+                   'priority': order.index(index), 'independent_s': independent_s[index]}
+        if index in plans:
+            moves, arrival_s = plan_moves(index, plans[index])
+            commands = moves_to_commands(moves, tick_s, model)
+            vehicle.update({
+                'commands_for_pi': commands,
+                'simplified_path': _moves_to_path(tuple(start), moves),
+                'arrival_s': arrival_s,
+                'wait_s': sum(value for action, value in commands if action == WAIT_ACTION) / 1000.0,
+            })
+        else:
+            vehicle['error'] = "Hedefe yol yok." if index in unreachable else "Çakışmasız plan bulunamadı."
+        vehicles.append(vehicle)
+    solved = not unreachable and len(plans) == len(pairs)
+    return {
+        'solved': solved,
+        'vehicles': vehicles,
+        'makespan_s': max(v['arrival_s'] for v in vehicles) if solved and vehicles else None,
+        'independent_makespan_s': max(independent_s) if not unreachable and independent_s else None,
+        'tick_s': tick_s,
+        'cell_px': cell_px,
+        'replans': replans,
+        'expanded': stats['expanded'],
+        'ms': (time.perf_counter() - started) * 1000.0,
+    }
+
+
+def format_fleet_report(result):
+    lines = [f"Filo: {sum(v['found'] for v in result['vehicles'])}/{len(result['vehicles'])} araç planlandı, "
+             f"{result['expanded']} durum, {result['ms']:.0f} ms, {result['replans']} yeniden sıralama"]
+    for number, vehicle in enumerate(result['vehicles'], start=1):
+        if vehicle['found']:
+            lines.append(f"  Araç {number} (öncelik {vehicle['priority'] + 1}): varış {vehicle['arrival_s']:.1f} s, "
+                         f"bekleme {vehicle['wait_s']:.1f} s, {len(vehicle['commands_for_pi'])} komut")
+        else:
+            lines.append(f"  Araç {number}: {vehicle['error']}")
+    if result['solved']:
+        lines.append(f"Toplam süre {result['makespan_s']:.1f} s "
+                     f"(çakışmalar yok sayılınca {result['independent_makespan_s']:.1f} s)")
+    return lines
@@ -0,0 +1,127 @@
+"""Hedefe köklü mesafe / sonraki adım alanı.
+
+Bitiş noktası ve maske değişmediği sürece her başlangıç noktası için BFS'yi baştan
+çalıştırmak gereksizdir. GoalField, hedeften başlayan vektörel bir dalga cephesiyle
+(8-komşulu, BFS ile aynı adım sayısı) her yol pikseli için hedefe uzaklığı ve bir sonraki
+adımı hesaplar. Herhangi bir başlangıçtan yol, mesafenin her adımda bir azaldığı komşuları
+izleyen bir gradyan inişidir; ek arama yapılmaz.
+
+Alanlar (maske özeti, hedef) anahtarıyla küçük bir LRU'da tutulur; maske veya hedef
+değişince anahtar da değiştiği için eski alan kullanılmaz.
+"""
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+import numpy as np
+
+import skeleton_graph
+
+FIELD_CACHE_SIZE = 2
+
+_field_cache = OrderedDict()
+_field_cache_lock = threading.Lock()
+
+
+class GoalField:
+    def __init__(self, mask_01, goal):
+        started = time.perf_counter()
+        rows, cols = mask_01.shape
+        goal_y, goal_x = int(goal[0]), int(goal[1])
+        if not (0 <= goal_y < rows and 0 <= goal_x < cols and mask_01[goal_y, goal_x] == 1):
+            raise ValueError(f"Hedef noktası yol maskesi üzerinde değil: {(goal_y, goal_x)}")
+        self.shape = (rows, cols)
+        self.goal = (goal_y, goal_x)
+        self._width = cols + 2
+        unvisited = np.pad(mask_01 == 1, 1).ravel()
+        goal_index = (goal_y + 1) * self._width + goal_x + 1
+        # Komşu sırası maze_core._bfs_arrays ile aynı: eşitlikte düz adımlar önce gelir.
+        offsets = np.array((1, -1, self._width, -self._width,
+                            self._width + 1, self._width - 1, -self._width + 1, -self._width - 1), dtype=np.int64)
+
+        distance = np.full(unvisited.size, -1, dtype=np.int32)
+        next_hop = np.full(unvisited.size, -1, dtype=np.int32)
+        distance[goal_index] = 0
+        next_hop[goal_index] = goal_index
+        unvisited[goal_index] = False
+        frontier = np.array([goal_index], dtype=np.int64)
+        level = 0
+        while frontier.size:
+            level += 1
+            neighbours = (offsets[:, None] + frontier[None, :]).ravel()
+            sources = np.broadcast_to(frontier, (offsets.size, frontier.size)).ravel()
+            keep = unvisited[neighbours]
+            neighbours, first = np.unique(neighbours[keep], return_index=True)
+            unvisited[neighbours] = False
+            distance[neighbours] = level
+            next_hop[neighbours] = sources[keep][first]
+            frontier = neighbours
+
+        self.distance = distance.reshape(rows + 2, cols + 2)[1:-1, 1:-1]
+        self.reachable_count = int(np.count_nonzero(self.distance >= 0))
+        self._next_hop = array('i', next_hop.tobytes())
+        self.build_ms = (time.perf_counter() - started) * 1000.0
+
+    def distance_to_goal(self, node):
+        """Hedefe adım sayısı; ulaşılamıyorsa None."""
+        value = int(self.distance[node[0], node[1]])
+        return value if value >= 0 else None
+
+    def path_from(self, start_node, stats=None):
+        """start_node'dan hedefe [(y, x), ...]; ulaşılamıyorsa None. stats'a 'expanded' (izlenen adım) yazılır."""
+        y, x = int(start_node[0]), int(start_node[1])
+        if stats is not None:
+            stats['expanded'] = 0
+        if not (0 <= y < self.shape[0] and 0 <= x < self.shape[1]) or self.distance[y, x] < 0:
+            return None
+        next_hop = self._next_hop
+        index = (y + 1) * self._width + x + 1
+        indices = [index]
+        while next_hop[index] != index:
+            index = next_hop[index]
+            indices.append(index)
+        if stats is not None:
+            stats['expanded'] = len(indices)
+        rows, cols = np.divmod(np.asarray(indices, dtype=np.int64), self._width)
+        return list(zip((rows - 1).tolist(), (cols - 1).tolist()))
+
+
+def field_for(mask_01, goal):
+    """(maske, hedef) için alanı önbellekten döndürür, yoksa kurar: (alan, önbellekten_mi)."""
+    key = (skeleton_graph.mask_digest(mask_01), (int(goal[0]), int(goal[1])))
+    with _field_cache_lock:
+        field = _field_cache.get(key)
+        if field is not None:
+            _field_cache.move_to_end(key)
+            return field, True
+    field = GoalField(mask_01, goal)
+    with _field_cache_lock:
+        _field_cache[key] = field
+        while len(_field_cache) > FIELD_CACHE_SIZE:
+            _field_cache.popitem(last=False)
+    return field, False
+
+
+def clear_cache():
+    with _field_cache_lock:
+        _field_cache.clear()
+
+
+def find_path_field(grid, start_node, end_node, report=None):
+    """maze_core.find_path_bfs ile aynı arayüz; hedefin alanı önbellekte yoksa önce kurulur."""
+    if report is None:
+        report = []
+    rows, cols = grid.shape
+    for name, (y, x) in (("Başlangıç", start_node), ("Bitiş", end_node)):
+        if not (0 <= y < rows and 0 <= x < cols and grid[y, x] == 1):
+            print(f"Hedef alanı: {name} noktası geçersiz: {(y, x)}")
+            return None
+    field, cached = field_for(grid, end_node)
+    stats = {}
+    started = time.perf_counter()
+    path = field.path_from(start_node, stats)
+    report.append({'level': 0, 'shape': grid.shape, 'ms': (time.perf_counter() - started) * 1000.0,
+                   'expanded': stats.get('expanded', 0), 'mode': 'hedef alanı',
+                   'field_cached': cached, 'field_build_ms': field.build_ms})
+    return path
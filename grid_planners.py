@@ -0,0 +1,252 @@
+"""Sezgisel ızgara planlayıcıları: A* ve Jump Point Search (JPS).
+
+BFS ile aynı 8-komşulu hareket modeli kullanılır (çapraz geçişte köşe kesmeye izin
+verilir; tek piksel kalınlığındaki çapraz iskelet çizgileri de böyle geçilir). Maliyetler
+tam sayıdır: düz adım 10, çapraz adım 14 (oktil mesafe).
+
+  * A* (octile):   oktil sezgisel; kabul edilebilir, en kısa (oktil) yolu bulur.
+  * A* (manhattan): Manhattan sezgisel; çaprazlarda fazla tahmin eder, daha az düğüm
+                    genişletir ama en kısa yol garanti değildir.
+  * JPS:           düzgün maliyetli ızgarada simetrik yolları budar; yalnızca "sıçrama
+                   noktaları" kuyruğa girer. Açık alanlarda ve uzun düz koridorlarda
+                   genişletilen düğüm sayısı birkaç büyüklük mertebesi düşer.
+
+Tüm fonksiyonlar maze_core.find_path_bfs ile aynı biçimde [(y, x), ...] döndürür; stats
+sözlüğü verilirse 'expanded' (kuyruktan çıkan düğüm) yazılır.
+"""
+import heapq
+
+import numpy as np
+
+STRAIGHT_COST = 10
+DIAGONAL_COST = 14
+HEURISTICS = ('octile', 'manhattan')
+
+
+def _prepare(grid, start_node, end_node, label):
+    """1 piksel dolgulu geçilebilirlik dizisi ve düz indeksler; nokta geçersizse None."""
+    rows, cols = grid.shape
+    for name, (y, x) in (("Başlangıç", start_node), ("Bitiş", end_node)):
+        if not (0 <= y < rows and 0 <= x < cols and grid[y, x] == 1):
+            print(f"{label}: {name} noktası geçersiz: {(y, x)}")
+            return None
+    width = cols + 2
+    passable = bytearray(np.pad(grid == 1, 1).astype(np.uint8).tobytes())
+    source = (int(start_node[0]) + 1) * width + int(start_node[1]) + 1
+    target = (int(end_node[0]) + 1) * width + int(end_node[1]) + 1
+    return passable, width, source, target
+
+
+def _heuristic_function(heuristic, width, target):
+    target_y, target_x = divmod(target, width)
+    if heuristic == 'octile':
+        def h(index):
+            dy, dx = abs(index // width - target_y), abs(index % width - target_x)
+            return STRAIGHT_COST * (dx + dy) + (DIAGONAL_COST - 2 * STRAIGHT_COST) * min(dx, dy)
+    elif heuristic == 'manhattan':
+        def h(index):
+            return STRAIGHT_COST * (abs(index // width - target_y) + abs(index % width - target_x))
+    else:
+        raise ValueError(f"Bilinmeyen sezgisel: {heuristic} (seçenekler: {', '.join(HEURISTICS)})")
+    return h
+
+
+def _to_points(indices, width):
+    rows, cols = np.divmod(np.asarray(indices, dtype=np.int64), width)
+    return list(zip((rows - 1).tolist(), (cols - 1).tolist()))
+
+
+def find_path_astar(grid, start_node, end_node, heuristic='octile', stats=None):
+    if stats is not None:
+        stats['expanded'] = 0
+    prepared = _prepare(grid, start_node, end_node, "A*")
+    if prepared is None:
+        return None
+    passable, width, source, target = prepared
+    h = _heuristic_function(heuristic, width, target)
+    moves = ((1, STRAIGHT_COST), (-1, STRAIGHT_COST), (width, STRAIGHT_COST), (-width, STRAIGHT_COST),
+             (width + 1, DIAGONAL_COST), (width - 1, DIAGONAL_COST),
+             (-width + 1, DIAGONAL_COST), (-width - 1, DIAGONAL_COST))
+
+    closed = bytearray(len(passable))
+    g_score = {source: 0}
+    parents = {source: source}
+    # Eşit f değerlerinde hedefe yakın (küçük h) düğüm önce: açık alanda gereksiz genişlemeyi azaltır.
+    heap = [(h(source), h(source), source)]
+    expanded = 0
+    while heap:
+        _, _, current = heapq.heappop(heap)
+        if closed[current]:
+            continue
+        closed[current] = 1
+        expanded += 1
+        if current == target:
+            break
+        current_g = g_score[current]
+        for offset, cost in moves:
+            neighbour = current + offset
+            if not passable[neighbour] or closed[neighbour]:
+                continue
+            new_g = current_g + cost
+            if new_g < g_score.get(neighbour, new_g + 1):
+                g_score[neighbour] = new_g
+                parents[neighbour] = current
+                neighbour_h = h(neighbour)
+                heapq.heappush(heap, (new_g + neighbour_h, neighbour_h, neighbour))
+    if stats is not None:
+        stats['expanded'] = expanded
+    if target not in parents:
+        return None
+    chain = [target]
+    while chain[-1] != source:
+        chain.append(parents[chain[-1]])
+    return _to_points(chain[::-1], width)
+
+
+def _shifted(array_2d, dy, dx):
+    """out[y, x] = array_2d[y + dy, x + dx] (dışarısı 0)."""
+    out = np.zeros_like(array_2d)
+    h, w = array_2d.shape
+    out[max(0, -dy):h - max(0, dy), max(0, -dx):w - max(0, dx)] = \
+        array_2d[max(0, dy):h - max(0, -dy), max(0, dx):w - max(0, -dx)]
+    return out
+
+
+class _JumpTables:
+    """Düz sıçramalar için 'durma' tabloları: duvar, zorunlu komşulu piksel veya hedef.
+
+    Her düz yön için bir bayt dizisi tutulur; sıçrama, C'de çalışan bytes.find/rfind ile
+    bir sonraki durma pikselini bulmaktır (dikey yönler sütun öncelikli sıradadır).
+    """
+
+    def __init__(self, passable, shape, target):
+        self.height, self.width = shape
+        open_ = np.frombuffer(bytes(passable), dtype=np.uint8).reshape(shape).astype(bool)
+        blocked = ~open_
+
+        def stop_table(forced, transpose):
+            stop = blocked | (open_ & forced)
+            stop.flat[target] = True
+            return (stop.T if transpose else stop).astype(np.uint8).tobytes()
+
+        down, up = _shifted(blocked, 1, 0), _shifted(blocked, -1, 0)
+        right, left = _shifted(blocked, 0, 1), _shifted(blocked, 0, -1)
+        self.right = stop_table((down & _shifted(open_, 1, 1)) | (up & _shifted(open_, -1, 1)), False)
+        self.left = stop_table((down & _shifted(open_, 1, -1)) | (up & _shifted(open_, -1, -1)), False)
+        self.down = stop_table((right & _shifted(open_, 1, 1)) | (left & _shifted(open_, 1, -1)), True)
+        self.up = stop_table((right & _shifted(open_, -1, 1)) | (left & _shifted(open_, -1, -1)), True)
+
+    def straight(self, passable, node, dy, dx):
+        if dy == 0:
+            stop = self.right.find(1, node + 1) if dx > 0 else self.left.rfind(1, 0, node)
+        else:
+            y, x = divmod(node, self.width)
+            column_index = x * self.height + y
+            column_stop = self.down.find(1, column_index + 1) if dy > 0 else self.up.rfind(1, 0, column_index)
+            stop = (column_stop % self.height) * self.width + x
+        return stop if passable[stop] else -1
+
+
+def _jump(passable, width, tables, node, dy, dx, target):
+    """node'dan (dy, dx) yönünde ilk sıçrama noktası; yoksa -1."""
+    if dy == 0 or dx == 0:
+        return tables.straight(passable, node, dy, dx)
+    step = dy * width + dx
+    while True:
+        node += step
+        if not passable[node]:
+            return -1
+        if node == target:
+            return node
+        if (not passable[node - dx] and passable[node - dx + dy * width]) or \
+                (not passable[node - dy * width] and passable[node - dy * width + dx]):
+            return node
+        if tables.straight(passable, node, 0, dx) != -1 or tables.straight(passable, node, dy, 0) != -1:
+            return node
+
+
+def _pruned_directions(passable, width, node, dy, dx):
+    """Geliş yönüne göre doğal ve zorunlu (forced) komşu yönleri."""
+    if dy == 0 and dx == 0:
+        return ((0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1))
+    if dy == 0:
+        directions = [(0, dx)]
+        if not passable[node + width]:
+            directions.append((1, dx))
+        if not passable[node - width]:
+            directions.append((-1, dx))
+        return directions
+    if dx == 0:
+        directions = [(dy, 0)]
+        if not passable[node + 1]:
+            directions.append((dy, 1))
+        if not passable[node - 1]:
+            directions.append((dy, -1))
+        return directions
+    directions = [(dy, 0), (0, dx), (dy, dx)]
+    if not passable[node - dx]:
+        directions.append((dy, -dx))
+    if not passable[node - dy * width]:
+        directions.append((-dy, dx))
+    return directions
+
+
+def _sign(value):
+    return (value > 0) - (value < 0)
+
+
+def find_path_jps(grid, start_node, end_node, stats=None):
+    """Jump Point Search (oktil maliyet, oktil sezgisel); sıçrama noktaları arası düz/çapraz doldurulur."""
+    if stats is not None:
+        stats['expanded'] = 0
+    prepared = _prepare(grid, start_node, end_node, "JPS")
+    if prepared is None:
+        return None
+    passable, width, source, target = prepared
+    h = _heuristic_function('octile', width, target)
+    tables = _JumpTables(passable, (len(passable) // width, width), target)
+
+    g_score = {source: 0}
+    parents = {source: source}
+    closed = set()
+    heap = [(h(source), h(source), source)]
+    expanded = 0
+    while heap:
+        _, _, current = heapq.heappop(heap)
+        if current in closed:
+            continue
+        closed.add(current)
+        expanded += 1
+        if current == target:
+            break
+        parent = parents[current]
+        current_y, current_x = divmod(current, width)
+        parent_y, parent_x = divmod(parent, width)
+        dy, dx = _sign(current_y - parent_y), _sign(current_x - parent_x)
+        for ny, nx in _pruned_directions(passable, width, current, dy, dx):
+            jump_point = _jump(passable, width, tables, current, ny, nx, target)
+            if jump_point == -1 or jump_point in closed:
+                continue
+            jump_y, jump_x = divmod(jump_point, width)
+            distance = max(abs(jump_y - current_y), abs(jump_x - current_x))
+            new_g = g_score[current] + distance * (DIAGONAL_COST if ny and nx else STRAIGHT_COST)
+            if new_g < g_score.get(jump_point, new_g + 1):
+                g_score[jump_point] = new_g
+                parents[jump_point] = current
+                jump_h = h(jump_point)
+                heapq.heappush(heap, (new_g + jump_h, jump_h, jump_point))
+    if stats is not None:
+        stats['expanded'] = expanded
+    if target not in parents:
+        return None
+
+    jump_points = [target]
+    while jump_points[-1] != source:
+        jump_points.append(parents[jump_points[-1]])
+    jump_points.reverse()
+    indices = [source]
+    for a, b in zip(jump_points, jump_points[1:]):
+        (ay, ax), (by, bx) = divmod(a, width), divmod(b, width)
+        step = _sign(by - ay) * width + _sign(bx - ax)
+        indices.extend(range(a + step, b + step, step))
+    return _to_points(indices, width)
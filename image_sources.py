@@ -0,0 +1,58 @@
+"""Labirent görüntüsü kaynakları.
+
+Her kaynak `read()` ile tek bir BGR ndarray döndürür (okunamazsa None) ve arayüzde
+gösterilecek bir `label` taşır. Kameradan yakalanan kare bellekte kalır; diske
+yazılıp tekrar okunmaz.
+"""
+import os
+
+import cv2
+
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv')
+
+
+class FileImageSource:
+    def __init__(self, path):
+        self.path = path
+        self.label = os.path.basename(path)
+
+    def read(self):
+        if not os.path.exists(self.path):
+            return None
+        return cv2.imread(self.path, cv2.IMREAD_COLOR)
+
+
+class FrameImageSource:
+    """Bellekteki bir kare (kamera yakalaması veya canlı akış)."""
+
+    def __init__(self, frame_bgr, label="Kamera karesi"):
+        self.frame = frame_bgr
+        self.label = label
+
+    def read(self):
+        return self.frame
+
+
+class VideoFileSource:
+    def __init__(self, path, frame_index=0):
+        self.path = path
+        self.frame_index = frame_index
+        self.label = f"{os.path.basename(path)} [kare {frame_index}]"
+
+    def read(self):
+        capture = cv2.VideoCapture(self.path)
+        try:
+            if not capture.isOpened():
+                return None
+            if self.frame_index > 0:
+                capture.set(cv2.CAP_PROP_POS_FRAMES, self.frame_index)
+            ret, frame = capture.read()
+            return frame if ret else None
+        finally:
+            capture.release()
+
+
+def source_for_path(path):
+    if path.lower().endswith(VIDEO_EXTENSIONS):
+        return VideoFileSource(path)
+    return FileImageSource(path)
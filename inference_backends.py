@@ -0,0 +1,328 @@
+"""U-Net için değiştirilebilir çıkarım (inference) arka uçları.
+
+Tüm arka uçlar Keras modeliyle aynı küçük arayüzü sunar: `input_shape`
+((None, H, W, C)) ve `predict(batch)`; bu sayede maze_core.segment_maze_image
+hangi çalışma zamanının kullanıldığını bilmez. Arka uç dosya uzantısından seçilir:
+.h5/.keras -> Keras, .tflite -> TFLite, .onnx -> ONNX Runtime.
+
+Dışa aktarma ve karşılaştırma:
+    python inference_backends.py export --model final_maze_segmentation_unet_model.h5 \
+        --format tflite-int8 --calib-dir kayitlar/ --output unet_int8.tflite
+    python inference_backends.py compare --reference final_maze_segmentation_unet_model.h5 \
+        --candidates unet_int8.tflite unet.onnx --images kayitlar/
+"""
+import argparse
+import os
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+EXPORT_FORMATS = ('tflite', 'tflite-float16', 'tflite-int8', 'onnx')
+DEFAULT_CALIBRATION_SAMPLES = 100
+DEFAULT_TFLITE_THREADS = os.cpu_count() or 1
+WARMUP_PASSES = 3
+LATENCY_WINDOW = 50
+
+
+class _InferenceBackend:
+    """Ortak gecikme ölçümü, ısınma ve kilit. Alt sınıflar `_run(batch)` uygular."""
+    name = "base"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._first_call_ms = None
+        self._recent_ms = deque(maxlen=LATENCY_WINDOW)
+        self.is_warmed_up = False
+
+    def _run(self, batch):
+        raise NotImplementedError
+
+    def predict(self, batch):
+        # TFLite yorumlayıcısı gibi çalışma zamanları aynı anda iki çağrıyı kaldıramaz.
+        with self._lock:
+            started = time.perf_counter()
+            output = self._run(batch)
+            elapsed_ms = (time.perf_counter() - started) * 1000.0
+        if self._first_call_ms is None:
+            self._first_call_ms = elapsed_ms
+        else:
+            self._recent_ms.append(elapsed_ms)
+        return output
+
+    def warm_up(self, passes=WARMUP_PASSES):
+        """Sabit girdi boyutuyla boş kareler çalıştırarak izleme/bellek ayırma maliyetini öne çeker."""
+        dummy = np.zeros((1,) + tuple(self.input_shape[1:]), dtype=np.float32)
+        for _ in range(passes):
+            self.predict(dummy)
+        self.is_warmed_up = True
+        return self.latency_report()
+
+    def latency_report(self):
+        return {
+            'backend': self.name,
+            'first_call_ms': self._first_call_ms,
+            'steady_state_ms': float(np.median(self._recent_ms)) if self._recent_ms else None,
+            'calls': (1 if self._first_call_ms is not None else 0) + len(self._recent_ms),
+        }
+
+
+class KerasBackend(_InferenceBackend):
+    name = "keras"
+
+    def __init__(self, model_path):
+        super().__init__()
+        import tensorflow as tf
+        self.model = tf.keras.models.load_model(model_path)
+        self.input_shape = tuple(self.model.input_shape)
+        # Tek görüntü için sabit (1, H, W, C) imzalı derlenmiş çağrı: Keras'ın predict
+        # toplu işleme katmanı atlanır ve grafik yalnızca bir kez izlenir.
+        self._single_input = np.zeros((1,) + tuple(self.input_shape[1:]), dtype=np.float32)
+        self._compiled_forward = tf.function(
+            lambda x: self.model(x, training=False),
+            input_signature=[tf.TensorSpec(self._single_input.shape, tf.float32)])
+        # Döşemeli segmentasyon gibi toplu girdiler için değişken yığın boyutlu ikinci imza.
+        self._compiled_batch_forward = tf.function(
+            lambda x: self.model(x, training=False),
+            input_signature=[tf.TensorSpec((None,) + self._single_input.shape[1:], tf.float32)])
+
+    def _run(self, batch):
+        if batch.shape == self._single_input.shape:
+            np.copyto(self._single_input, batch, casting='unsafe')
+            return self._compiled_forward(self._single_input).numpy()
+        return self._compiled_batch_forward(batch.astype(np.float32)).numpy()
+
+
+class TFLiteBackend(_InferenceBackend):
+    name = "tflite"
+
+    def __init__(self, model_path, num_threads=DEFAULT_TFLITE_THREADS):
+        super().__init__()
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+        self.interpreter = Interpreter(model_path=model_path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self.input_detail = self.interpreter.get_input_details()[0]
+        self.output_detail = self.interpreter.get_output_details()[0]
+        self.input_shape = (None,) + tuple(int(d) for d in self.input_detail['shape'][1:])
+        self._single_input = np.zeros(self.input_detail['shape'], dtype=self.input_detail['dtype'])
+
+    def _run(self, batch):
+        input_dtype = self.input_detail['dtype']
+        in_scale, in_zero_point = self.input_detail['quantization']
+        out_scale, out_zero_point = self.output_detail['quantization']
+        outputs = []
+        # TFLite yorumlayıcısı sabit (1, H, W, C) girdiyle derlenir; toplu girdi tek tek çalıştırılır.
+        for sample in batch:
+            if np.issubdtype(input_dtype, np.integer) and in_scale:
+                sample = np.round(sample / in_scale + in_zero_point)
+                info = np.iinfo(input_dtype)
+                sample = np.clip(sample, info.min, info.max)
+            np.copyto(self._single_input[0], sample, casting='unsafe')
+            self.interpreter.set_tensor(self.input_detail['index'], self._single_input)
+            self.interpreter.invoke()
+            output = self.interpreter.get_tensor(self.output_detail['index'])
+            if np.issubdtype(output.dtype, np.integer) and out_scale:
+                output = (output.astype(np.float32) - out_zero_point) * out_scale
+            outputs.append(output[0])
+        return np.stack(outputs, axis=0)
+
+
+class OnnxBackend(_InferenceBackend):
+    name = "onnx"
+
+    def __init__(self, model_path):
+        super().__init__()
+        import onnxruntime as ort
+        self.session = ort.InferenceSession(model_path, providers=['CPUExecutionProvider'])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.input_shape = (None,) + tuple(int(d) for d in model_input.shape[1:])
+        self._single_input = np.zeros((1,) + self.input_shape[1:], dtype=np.float32)
+        # Eski dışa aktarımlar yığın boyutunu 1'e sabitler; bunlarda toplu girdi tek tek çalıştırılır.
+        self._fixed_single_batch = (model_input.shape[0] == 1)
+
+    def _run(self, batch):
+        if batch.shape == self._single_input.shape:
+            np.copyto(self._single_input, batch, casting='unsafe')
+            return self.session.run(None, {self.input_name: self._single_input})[0]
+        if self._fixed_single_batch:
+            return np.concatenate([self._run(batch[i:i + 1]) for i in range(len(batch))], axis=0)
+        return self.session.run(None, {self.input_name: batch.astype(np.float32)})[0]
+
+
+BACKENDS_BY_EXTENSION = {
+    '.h5': KerasBackend,
+    '.keras': KerasBackend,
+    '.tflite': TFLiteBackend,
+    '.onnx': OnnxBackend,
+}
+
+
+def load_backend(model_path):
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(f"Model dosyası bulunamadı: {model_path}")
+    extension = os.path.splitext(model_path)[1].lower()
+    backend_cls = BACKENDS_BY_EXTENSION.get(extension)
+    if backend_cls is None:
+        raise ValueError(f"Desteklenmeyen model uzantısı: {extension} (desteklenenler: {', '.join(BACKENDS_BY_EXTENSION)})")
+    backend = backend_cls(model_path)
+    backend.model_path = model_path
+    return backend
+
+
+def _list_images(images_dir):
+    return sorted(os.path.join(images_dir, f) for f in os.listdir(images_dir)
+                  if f.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp')))
+
+
+def _model_ready_input(image_bgr, input_shape):
+    """Görüntüyü segment_maze_image ile aynı şekilde (1, H, W, C) float32 girdiye çevirir."""
+    import maze_core
+    img_h, img_w, img_c = input_shape[1:]
+    is_grayscale_model = (img_c == 1)
+    model_input = maze_core.to_model_color_space(image_bgr, is_grayscale_model)
+    padded_img, _ = maze_core.letterbox_for_model(model_input, img_h, img_w, is_grayscale_model)
+    return np.expand_dims(padded_img / 255.0, axis=0).astype(np.float32)
+
+
+def export_tflite(keras_model_path, output_path, quantization=None, calibration_dir=None,
+                  calibration_samples=DEFAULT_CALIBRATION_SAMPLES):
+    """Keras modelini TFLite'a çevirir. quantization: None, 'float16' veya 'int8'."""
+    import tensorflow as tf
+    keras_model = tf.keras.models.load_model(keras_model_path)
+    converter = tf.lite.TFLiteConverter.from_keras_model(keras_model)
+
+    if quantization == 'float16':
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantization == 'int8':
+        if not calibration_dir:
+            raise ValueError("int8 nicemleme için kalibrasyon görüntü klasörü (--calib-dir) gerekli.")
+        calibration_paths = _list_images(calibration_dir)[:calibration_samples]
+        if not calibration_paths:
+            raise FileNotFoundError(f"'{calibration_dir}' klasöründe kalibrasyon görüntüsü bulunamadı.")
+        input_shape = tuple(keras_model.input_shape)
+
+        def representative_dataset():
+            for path in calibration_paths:
+                image_bgr = cv2.imread(path, cv2.IMREAD_COLOR)
+                if image_bgr is not None:
+                    yield [_model_ready_input(image_bgr, input_shape)]
+
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    elif quantization is not None:
+        raise ValueError(f"Bilinmeyen nicemleme türü: {quantization}")
+
+    with open(output_path, 'wb') as f:
+        f.write(converter.convert())
+    print(f"TFLite modeli kaydedildi: {output_path} ({os.path.getsize(output_path) / 1024:.0f} KB)")
+    return output_path
+
+
+def export_onnx(keras_model_path, output_path, opset=13):
+    import tensorflow as tf
+    import tf2onnx
+    keras_model = tf.keras.models.load_model(keras_model_path)
+    img_h, img_w, img_c = keras_model.input_shape[1:]
+    # Yığın boyutu serbest bırakılır; döşemeli segmentasyon tüm döşemeleri tek çağrıda çalıştırabilsin.
+    input_signature = [tf.TensorSpec((None, img_h, img_w, img_c), tf.float32, name='input')]
+    # from_keras Keras 3 ile uyumsuz; tf.function üzerinden çevirmek iki sürümde de çalışır.
+    forward = tf.function(lambda x: keras_model(x, training=False))
+    tf2onnx.convert.from_function(forward, input_signature=input_signature, opset=opset, output_path=output_path)
+    print(f"ONNX modeli kaydedildi: {output_path} ({os.path.getsize(output_path) / 1024:.0f} KB)")
+    return output_path
+
+
+def _time_predict(backend, model_input, repeats):
+    backend.predict(model_input)  # ısınma çağrısı
+    timings_ms = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        backend.predict(model_input)
+        timings_ms.append((time.perf_counter() - started) * 1000.0)
+    return timings_ms
+
+
+def compare_backends(reference_path, candidate_paths, images_dir, repeats=20, max_images=20):
+    """Aday arka uçları referans (genellikle Keras) ile doğruluk ve gecikme açısından karşılaştırır."""
+    import maze_core
+    image_paths = _list_images(images_dir)[:max_images]
+    if not image_paths:
+        raise FileNotFoundError(f"'{images_dir}' klasöründe karşılaştırma görüntüsü bulunamadı.")
+    images = [img for img in (cv2.imread(p, cv2.IMREAD_COLOR) for p in image_paths) if img is not None]
+
+    reference = load_backend(reference_path)
+    candidates = [load_backend(path) for path in candidate_paths]
+    inputs = [_model_ready_input(img, reference.input_shape) for img in images]
+    reference_outputs = [reference.predict(x) for x in inputs]
+
+    report = []
+    for path, backend in [(reference_path, reference)] + list(zip(candidate_paths, candidates)):
+        timings_ms = _time_predict(backend, inputs[0], repeats)
+        ious, max_abs_errors = [], []
+        for x, reference_output in zip(inputs, reference_outputs):
+            output = backend.predict(x)
+            reference_mask = maze_core.prediction_to_mask(reference_output)
+            mask = maze_core.prediction_to_mask(output)
+            union = np.logical_or(reference_mask, mask).sum()
+            ious.append(np.logical_and(reference_mask, mask).sum() / union if union else 1.0)
+            max_abs_errors.append(float(np.max(np.abs(output.astype(np.float32) - reference_output.astype(np.float32)))))
+        report.append({
+            'model': path,
+            'backend': backend.name,
+            'first_call_ms': backend.latency_report()['first_call_ms'],
+            'median_ms': float(np.median(timings_ms)),
+            'p90_ms': float(np.percentile(timings_ms, 90)),
+            'mask_iou_min': float(np.min(ious)),
+            'mask_iou_mean': float(np.mean(ious)),
+            'prob_max_abs_error': float(np.max(max_abs_errors)),
+        })
+
+    print(f"{'Model':<45} {'Arka uç':<8} {'İlk ms':>8} {'Medyan ms':>10} {'p90 ms':>8} {'IoU ort.':>9} {'IoU min':>8} {'Maks hata':>10}")
+    for row in report:
+        print(f"{os.path.basename(row['model']):<45} {row['backend']:<8} {row['first_call_ms']:>8.1f} {row['median_ms']:>10.2f} {row['p90_ms']:>8.2f} "
+              f"{row['mask_iou_mean']:>9.4f} {row['mask_iou_min']:>8.4f} {row['prob_max_abs_error']:>10.4f}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="U-Net çıkarım arka uçları: dışa aktarma ve karşılaştırma")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = subparsers.add_parser('export', help="Keras modelini TFLite/ONNX'e çevir")
+    export_parser.add_argument('--model', required=True, help="Kaynak Keras modeli (.h5)")
+    export_parser.add_argument('--format', required=True, choices=EXPORT_FORMATS)
+    export_parser.add_argument('--output', required=True)
+    export_parser.add_argument('--calib-dir', help="int8 kalibrasyonu için görüntü klasörü")
+    export_parser.add_argument('--calib-samples', type=int, default=DEFAULT_CALIBRATION_SAMPLES)
+
+    compare_parser = subparsers.add_parser('compare', help="Arka uçları doğruluk/gecikme açısından karşılaştır")
+    compare_parser.add_argument('--reference', required=True, help="Referans model (genellikle .h5)")
+    compare_parser.add_argument('--candidates', nargs='+', required=True)
+    compare_parser.add_argument('--images', required=True, help="Karşılaştırma görüntü klasörü")
+    compare_parser.add_argument('--repeats', type=int, default=20)
+    compare_parser.add_argument('--max-images', type=int, default=20)
+
+    args = parser.parse_args()
+    if args.command == 'export':
+        if args.format == 'onnx':
+            export_onnx(args.model, args.output)
+        else:
+            quantization = args.format.split('-', 1)[1] if '-' in args.format else None
+            export_tflite(args.model, args.output, quantization=quantization,
+                          calibration_dir=args.calib_dir, calibration_samples=args.calib_samples)
+    else:
+        compare_backends(args.reference, args.candidates, args.images,
+                         repeats=args.repeats, max_images=args.max_images)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""Numba çekirdekleri ile saf Python sürümlerinin eşdeğerlik kontrolü ve süre karşılaştırması.
+
+Her çift için BFS yolu ve genişletilen düğüm sayısı, sadeleştirilmiş yol, ham araç
+komutları ve birleştirilmiş komutlar iki sürümde de üretilir ve birebir karşılaştırılır.
+Ayrıca elle hazırlanmış uç durumlar (tekrarlanan pikseller, geri dönüşler, tek segment)
+denenir. Herhangi bir fark varsa çıkış kodu 1'dir.
+
+Kullanım:
+    python jit_benchmark.py --resolutions 1920x1080 3840x2160 --pairs 5
+"""
+import argparse
+import statistics
+import sys
+import time
+
+import jit_kernels
+import maze_core
+import pathfinding_benchmark
+
+EDGE_CASE_PATHS = [
+    [(0, 0), (0, 1)],
+    [(5, 5), (5, 5), (5, 6), (5, 6), (6, 7)],
+    [(0, 0), (1, 0), (2, 0), (1, 0), (0, 0)],
+    [(0, 0), (0, 1), (0, 2), (0, 1), (1, 1), (2, 2), (2, 1), (2, 0)],
+    [(3, 3), (2, 2), (1, 1), (1, 2), (1, 3), (2, 3)],
+]
+
+
+def _stages(mask_01, start, end):
+    stats = {}
+    started = time.perf_counter()
+    path = maze_core.find_path_bfs(mask_01, start, end, stats)
+    bfs_ms = (time.perf_counter() - started) * 1000.0
+    started = time.perf_counter()
+    simplified = maze_core.simplify_path(path)
+    raw = maze_core.generate_vehicle_perspective_commands(simplified)
+    consolidated = maze_core.consolidate_vehicle_commands(raw)
+    commands_ms = (time.perf_counter() - started) * 1000.0
+    outputs = {'bfs': path, 'expanded': stats['expanded'], 'simplify': simplified,
+               'vehicle': raw, 'consolidate': consolidated}
+    return outputs, bfs_ms, commands_ms
+
+
+def _run(flag, function, *args):
+    previous = jit_kernels.set_enabled(flag)
+    try:
+        return function(*args)
+    finally:
+        jit_kernels.set_enabled(previous)
+
+
+def check_edge_cases():
+    mismatches = 0
+    for path in EDGE_CASE_PATHS:
+        for function in (maze_core.simplify_path, maze_core.generate_vehicle_perspective_commands,
+                         lambda p: maze_core.consolidate_vehicle_commands(maze_core.generate_vehicle_perspective_commands(p))):
+            if _run(True, function, path) != _run(False, function, path):
+                print(f"FARK (uç durum): {path}")
+                mismatches += 1
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Numba çekirdekleri eşdeğerlik ve süre karşılaştırması")
+    parser.add_argument('--resolutions', type=pathfinding_benchmark._parse_resolution, nargs='+',
+                        default=[(1920, 1080)])
+    parser.add_argument('--pairs', type=int, default=5)
+    parser.add_argument('--scene', choices=tuple(pathfinding_benchmark.SCENES), default='maze')
+    args = parser.parse_args()
+    if not jit_kernels.NUMBA_AVAILABLE:
+        print("Numba kurulu değil; yalnızca saf Python sürümü mevcut (pip install numba).")
+        return 0
+
+    started = time.perf_counter()
+    _run(True, jit_kernels.warm_up)
+    print(f"Derleme/önbellekten yükleme: {(time.perf_counter() - started) * 1000.0:.0f} ms")
+    mismatches = check_edge_cases()
+
+    print(f"{'Çözünürlük':>11} {'Sürüm':<7} {'BFS ms (medyan)':>16} {'Komut ms (medyan)':>18} {'Aynı çıktı':>11}")
+    for width, height in args.resolutions:
+        mask = pathfinding_benchmark.SCENES[args.scene](width, height)
+        pairs = pathfinding_benchmark.random_pairs(mask, args.pairs)
+        timings = {True: ([], []), False: ([], [])}
+        same = 0
+        for start, end in pairs:
+            results = {}
+            for flag in (True, False):
+                results[flag], bfs_ms, commands_ms = _run(flag, _stages, mask, start, end)
+                timings[flag][0].append(bfs_ms)
+                timings[flag][1].append(commands_ms)
+            differing = [stage for stage in results[True] if results[True][stage] != results[False][stage]]
+            if differing:
+                print(f"FARK {start}->{end}: {', '.join(differing)}")
+                mismatches += 1
+            else:
+                same += 1
+        for flag, label in ((False, 'Python'), (True, 'Numba')):
+            bfs_timings, command_timings = timings[flag]
+            print(f"{f'{width}x{height}':>11} {label:<7} {statistics.median(bfs_timings):>16.1f} "
+                  f"{statistics.median(command_timings):>18.2f} {f'{same}/{len(pairs)}':>11}")
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
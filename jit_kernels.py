@@ -0,0 +1,178 @@
+"""İsteğe bağlı Numba JIT çekirdekleri: BFS ve komut üretimi.
+
+Numba kuruluysa maze_core.find_path_bfs (tek yönlü), generate_vehicle_perspective_commands
+ve consolidate_vehicle_commands tam sayı dizileri üzerinde derlenmiş döngülere
+yönlendirilir; kurulu değilse saf Python sürümleri olduğu gibi çalışır. Çekirdekler
+Python sürümleriyle birebir aynı sonucu üretir (aynı komşu sırası, aynı eşitlik
+kuralları); doğrulama için bkz. tests/test_jit_kernels.py, ölçüm için jit_benchmark.py.
+simplify_path NumPy ile vektörleştirildiği için ayrı bir çekirdeğe ihtiyaç duymaz.
+
+İlk çağrıdaki derleme (~1-2 s) diske önbelleklenir (cache=True); arayüz açılışta
+warm_up() ile bunu arka planda yapar. MAZE_DISABLE_JIT=1 ortam değişkeni veya
+set_enabled(False) çekirdekleri kapatır.
+"""
+import os
+
+import numpy as np
+
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Komut kodları (çekirdek içinde karakter dizisi kullanılmaz).
+COMMAND_CODES = ("ileri_a", "ileri_b", "saga_don", "sola_don")
+_CODE_FOR_ACTION = {action: code for code, action in enumerate(COMMAND_CODES)}
+
+_enabled = NUMBA_AVAILABLE and os.environ.get('MAZE_DISABLE_JIT') != '1'
+
+
+def enabled():
+    return _enabled
+
+
+def set_enabled(flag):
+    """Çekirdekleri aç/kapat (Numba yoksa her zaman kapalı); önceki durumu döndürür."""
+    global _enabled
+    previous = _enabled
+    _enabled = bool(flag) and NUMBA_AVAILABLE
+    return previous
+
+
+if NUMBA_AVAILABLE:
+    @numba.njit(cache=True)
+    def _bfs_kernel(visited, offsets, source, target):
+        """visited: duvarları 1 olan dolgulu düz dizi (yerinde değişir). (yol indeksleri, genişletilen) döndürür."""
+        parents = np.empty(visited.size, dtype=np.int32)
+        queue = np.empty(visited.size, dtype=np.int32)
+        head, tail = 0, 1
+        queue[0] = source
+        visited[source] = 1
+        while head < tail:
+            current = queue[head]
+            head += 1
+            for k in range(offsets.size):
+                neighbour = current + offsets[k]
+                if visited[neighbour]:
+                    continue
+                visited[neighbour] = 1
+                parents[neighbour] = current
+                if neighbour == target:
+                    length = 1
+                    node = target
+                    while node != source:
+                        node = parents[node]
+                        length += 1
+                    path = np.empty(length, dtype=np.int64)
+                    node = target
+                    for i in range(length - 1, -1, -1):
+                        path[i] = node
+                        if i:
+                            node = parents[node]
+                    return path, head
+                queue[tail] = neighbour
+                tail += 1
+        return np.empty(0, dtype=np.int64), head
+
+    @numba.njit(cache=True)
+    def _sign(value):
+        return (value > 0) - (value < 0)
+
+    @numba.njit(cache=True)
+    def _segment_kernel(delta_y, delta_x):
+        """(komut kodu, adım, yön_dy, yön_dx); kod -1 ise segment boş. Dikey bileşen önceliklidir."""
+        if delta_y != 0:
+            return 1, abs(delta_y), _sign(delta_y), 0
+        if delta_x != 0:
+            return 0, abs(delta_x), 0, _sign(delta_x)
+        return -1, 0, 0, 0
+
+    @numba.njit(cache=True)
+    def _vehicle_commands_kernel(ys, xs):
+        n = ys.size
+        codes = np.empty(3 * n, dtype=np.int64)
+        values = np.empty(3 * n, dtype=np.int64)
+        code, steps, current_dy, current_dx = _segment_kernel(ys[1] - ys[0], xs[1] - xs[0])
+        if code < 0:
+            return codes[:0], values[:0]
+        codes[0], values[0] = code, steps
+        count = 1
+        for i in range(1, n - 1):
+            code, steps, target_dy, target_dx = _segment_kernel(ys[i + 1] - ys[i], xs[i + 1] - xs[i])
+            if code < 0:
+                continue
+            if current_dy != target_dy or current_dx != target_dx:
+                if current_dx == target_dy and -current_dy == target_dx:
+                    codes[count], values[count] = 2, 0
+                    count += 1
+                elif -current_dx == target_dy and current_dy == target_dx:
+                    codes[count], values[count] = 3, 0
+                    count += 1
+                else:
+                    codes[count], values[count] = 2, 0
+                    codes[count + 1], values[count + 1] = 2, 0
+                    count += 2
+                current_dy, current_dx = target_dy, target_dx
+            codes[count], values[count] = code, steps
+            count += 1
+        return codes[:count], values[:count]
+
+    @numba.njit(cache=True)
+    def _consolidate_kernel(codes, values):
+        n = codes.size
+        out_codes = np.empty(n, dtype=np.int64)
+        out_values = np.empty(n, dtype=np.int64)
+        count = 0
+        i = 0
+        while i < n:
+            out_codes[count] = codes[i]
+            out_values[count] = values[i]
+            if codes[i] <= 1:
+                j = i + 1
+                while j < n and codes[j] == codes[i]:
+                    out_values[count] += values[j]
+                    j += 1
+                i = j
+            else:
+                i += 1
+            count += 1
+        return out_codes[:count], out_values[:count]
+
+
+def bfs_indices(blocked_padded_flat, offsets, source, target):
+    """Dolgulu düz indekslerde BFS: (indeks dizisi veya None, genişletilen düğüm)."""
+    path, expanded = _bfs_kernel(blocked_padded_flat, np.asarray(offsets, dtype=np.int64), source, target)
+    return (path if path.size else None), int(expanded)
+
+
+def _to_tuples(codes, values):
+    return [(COMMAND_CODES[code], value) for code, value in zip(codes.tolist(), values.tolist())]
+
+
+def generate_vehicle_perspective_commands(simplified_path_nodes):
+    points = np.asarray(simplified_path_nodes, dtype=np.int64)
+    codes, values = _vehicle_commands_kernel(np.ascontiguousarray(points[:, 0]), np.ascontiguousarray(points[:, 1]))
+    return _to_tuples(codes, values)
+
+
+def consolidate_vehicle_commands(commands_input_tuples):
+    """Yalnızca bilinen komutlar için; bilinmeyen bir eylem varsa None (çağıran Python sürümüne döner)."""
+    try:
+        codes = np.fromiter((_CODE_FOR_ACTION[action] for action, _ in commands_input_tuples), dtype=np.int64,
+                            count=len(commands_input_tuples))
+    except KeyError:
+        return None
+    values = np.fromiter((value for _, value in commands_input_tuples), dtype=np.int64, count=len(commands_input_tuples))
+    return _to_tuples(*_consolidate_kernel(codes, values))
+
+
+def warm_up():
+    """Çekirdekleri küçük girdilerle derler (veya disk önbelleğinden yükler)."""
+    if not _enabled:
+        return False
+    grid = np.ones((4, 4), dtype=np.uint8)
+    blocked = np.pad(grid != 1, 1, constant_values=True).astype(np.uint8).ravel()
+    bfs_indices(blocked, (1, -1, 6, -6, 7, 5, -5, -7), 7, 28)
+    consolidate_vehicle_commands(generate_vehicle_perspective_commands([(0, 0), (0, 1), (1, 1), (2, 1)]))
+    return True
@@ -0,0 +1,186 @@
+"""PC-Pi bağlantısı için kalp atışı ve gidiş-dönüş ölçümü (PC ve Pi ortak modülü).
+
+Her iki taraf da belirli aralıklarla PING gönderir; karşı taraf aldığı anda, komut yürütme
+ve arayüz thread'lerini beklemeden ağ thread'inde PONG ile yanıtlar. Zaman damgaları NTP
+ile aynı şekilde kullanılır:
+
+    A -> B  PING:<sıra>:<t1>            t1: A'nın gönderme anı
+    B -> A  PONG:<sıra>:<t1>:<t2>:<t3>  t2: B'nin alma, t3: B'nin yanıtlama anı; A t4'te alır
+
+    RTT       = (t4 - t1) - (t3 - t2)
+    saat farkı = ((t2 - t1) + (t3 - t4)) / 2   (B'nin saati - A'nın saati)
+
+Saat farkı en düşük RTT'li örnekten alınır (kuyrukta bekleyen paketler farkı bozar). Titreşim
+(jitter) ardışık RTT farklarının RFC 3550'deki gibi 1/16 katsayılı yürüyen ortalamasıdır.
+HEARTBEAT_TIMEOUT_S içinde yanıtlanmayan PING kayıp sayılır; bu süre boyunca hiç PONG
+gelmemişse bağlantı "yanıtsız" kabul edilir.
+
+Pi desteklediğini CAPS: içinde HEARTBEAT=1 ile bildirir; PC PING göndermeye ancak bundan
+sonra başlar, Pi de ilk PING'i aldıktan sonra kendi PING'lerini gönderir. Böylece eski PC
+veya Pi tanımadığı mesaj almaz.
+
+Yalnızca standart kütüphane kullanır; Pi'de aynı klasöre kopyalanır.
+"""
+import collections
+import threading
+import time
+
+HEARTBEAT_VERSION = 1
+CAPS_HEARTBEAT_KEY = "HEARTBEAT"
+
+HEARTBEAT_INTERVAL_S = 1.0
+HEARTBEAT_TIMEOUT_S = 5.0
+SAMPLE_WINDOW = 120  # Yüzdelikler son bu kadar örnekten hesaplanır (1 Hz'de iki dakika)
+JITTER_GAIN = 1.0 / 16.0
+
+PING_PREFIX = "PING:"
+PONG_PREFIX = "PONG:"
+
+
+def ping_message(seq, sent_at):
+    return f"{PING_PREFIX}{seq}:{sent_at:.6f}"
+
+
+def pong_message(seq, sent_at, received_at, replied_at):
+    return f"{PONG_PREFIX}{seq}:{sent_at:.6f}:{received_at:.6f}:{replied_at:.6f}"
+
+
+def _parse_fields(message, prefix, count):
+    fields = message[len(prefix):].split(':')
+    if len(fields) != count:
+        raise ValueError(f"Geçersiz kalp atışı mesajı: {message[:60]}")
+    try:
+        return [int(fields[0])] + [float(field) for field in fields[1:]]
+    except ValueError:
+        raise ValueError(f"Geçersiz kalp atışı mesajı: {message[:60]}")
+
+
+def parse_ping(message):
+    """PING: mesajı -> (sıra, t1); bozuksa ValueError."""
+    return tuple(_parse_fields(message, PING_PREFIX, 2))
+
+
+def parse_pong(message):
+    """PONG: mesajı -> (sıra, t1, t2, t3); bozuksa ValueError."""
+    return tuple(_parse_fields(message, PONG_PREFIX, 4))
+
+
+def percentile(sorted_values, q):
+    """Sıralı listede q (0-100) yüzdeliği, komşu örnekler arasında doğrusal ara değerle."""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * q / 100.0
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+class LinkMonitor:
+    """Tek bağlantının kalp atışı durumu; ağ thread'inden güncellenir, her thread'den okunabilir."""
+
+    def __init__(self, window=SAMPLE_WINDOW, timeout_s=HEARTBEAT_TIMEOUT_S, clock=time.time):
+        self._lock = threading.Lock()
+        self._clock = clock
+        self._timeout_s = timeout_s
+        self._next_seq = 0
+        self._pending = collections.OrderedDict()  # sıra -> t1
+        self._samples = collections.deque(maxlen=window)  # (rtt, saat farkı)
+        self._last_rtt = None
+        self.jitter = None
+        self.sent = 0
+        self.received = 0
+        self.lost = 0
+        self.late = 0  # Kayıp sayıldıktan sonra gelen veya bilinmeyen sıralı PONG
+        self.peer_pings = 0  # Karşı tarafın PING'leri (karşı taraf kalp atışını destekliyor mu?)
+        self.first_ping_at = None
+        self.last_pong_at = None
+
+    def _expire(self, now):
+        while self._pending:
+            seq, sent_at = next(iter(self._pending.items()))
+            if now - sent_at <= self._timeout_s:
+                break
+            del self._pending[seq]
+            self.lost += 1
+
+    def next_ping(self):
+        """Gönderilecek PING satırı; bekleyen eski PING'leri kayıp sayar."""
+        with self._lock:
+            now = self._clock()
+            self._expire(now)
+            seq = self._next_seq
+            self._next_seq += 1
+            self._pending[seq] = now
+            self.sent += 1
+            if self.first_ping_at is None:
+                self.first_ping_at = now
+            return ping_message(seq, now)
+
+    def answer(self, message):
+        """Gelen PING'e verilecek PONG satırı; bozuksa ValueError."""
+        received_at = self._clock()
+        seq, sent_at = parse_ping(message)
+        with self._lock:
+            self.peer_pings += 1
+        return pong_message(seq, sent_at, received_at, self._clock())
+
+    def record_pong(self, message):
+        """PONG'u işler, RTT'yi (s) döndürür; geç/bilinmeyen PONG için None, bozuksa ValueError."""
+        received_at = self._clock()
+        seq, sent_at, peer_received_at, peer_replied_at = parse_pong(message)
+        with self._lock:
+            if self._pending.pop(seq, None) is None:
+                self.late += 1
+                return None
+            rtt = max(0.0, (received_at - sent_at) - (peer_replied_at - peer_received_at))
+            offset = ((peer_received_at - sent_at) + (peer_replied_at - received_at)) / 2.0
+            if self._last_rtt is not None:
+                delta = abs(rtt - self._last_rtt)
+                self.jitter = delta if self.jitter is None else self.jitter + (delta - self.jitter) * JITTER_GAIN
+            self._last_rtt = rtt
+            self._samples.append((rtt, offset))
+            self.received += 1
+            self.last_pong_at = received_at
+            return rtt
+
+    def snapshot(self):
+        """Anlık özet: RTT yüzdelikleri, titreşim, saat farkı, kayıp ve sessizlik süresi (saniye)."""
+        with self._lock:
+            now = self._clock()
+            self._expire(now)
+            rtts = sorted(rtt for rtt, _ in self._samples)
+            best_offset = min(self._samples)[1] if self._samples else None
+            heard_at = self.last_pong_at if self.last_pong_at is not None else self.first_ping_at
+            silence = now - heard_at if heard_at is not None else 0.0
+            answered = self.received + self.lost
+            return {
+                'samples': len(rtts),
+                'rtt_last_s': self._last_rtt,
+                'rtt_p50_s': percentile(rtts, 50),
+                'rtt_p95_s': percentile(rtts, 95),
+                'rtt_p99_s': percentile(rtts, 99),
+                'rtt_max_s': rtts[-1] if rtts else None,
+                'jitter_s': self.jitter,
+                'clock_offset_s': best_offset,
+                'sent': self.sent,
+                'received': self.received,
+                'lost': self.lost,
+                'late': self.late,
+                'loss_ratio': self.lost / answered if answered else 0.0,
+                'silence_s': silence,
+                'stalled': silence > self._timeout_s,
+            }
+
+
+def format_summary(snapshot):
+    """Arayüz ve curses ekranı için tek satırlık özet."""
+    if not snapshot['samples']:
+        if snapshot['sent']:
+            return f"Bağlantı: yanıt bekleniyor ({snapshot['silence_s']:.0f} s)"
+        return "Bağlantı: ölçüm yok"
+    text = (f"RTT p50/p95/p99 {snapshot['rtt_p50_s'] * 1000:.1f}/{snapshot['rtt_p95_s'] * 1000:.1f}/"
+            f"{snapshot['rtt_p99_s'] * 1000:.1f} ms, titreşim {(snapshot['jitter_s'] or 0.0) * 1000:.1f} ms, "
+            f"saat {snapshot['clock_offset_s'] * 1000:+.1f} ms, kayıp %{snapshot['loss_ratio'] * 100:.0f}")
+    if snapshot['stalled']:
+        text += f" - YANITSIZ {snapshot['silence_s']:.0f} s"
+    return text
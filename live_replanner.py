@@ -0,0 +1,157 @@
+"""Canlı kamera akışında sürekli segmentasyon ve yeniden planlama.
+
+Kamera döngüsü her kareyi `submit_frame` ile verir; yalnızca en yeni kare tutulur,
+işlenemeyen eski kareler kuyruğa alınmadan düşürülür. Arka plandaki işçi hedef
+hızda (Hz) en yeni kareyi segmentasyon -> BFS -> komut üretiminden geçirir ve
+yol/komutlar değiştiğinde `on_update` geri çağrısını tetikler.
+
+Başlangıç/bitiş noktaları ve yayınlanan yol, referans görüntünün (ilk yakalanan
+kare) koordinatlarındadır; farklı çözünürlükteki kareler önce bu boyuta ölçeklenir.
+"""
+import threading
+import time
+
+import cv2
+
+import maze_core
+
+DEFAULT_TARGET_HZ = 2.0
+DEFAULT_SNAP_RADIUS = 15
+PATH_CHANGE_TOLERANCE_PX = 8
+
+
+def path_changed(old_path, new_path, tolerance_px=PATH_CHANGE_TOLERANCE_PX):
+    """İki sadeleştirilmiş yol, düğüm sayısı farklıysa veya bir düğüm tolerans dışında kaydıysa farklıdır."""
+    if old_path is None or new_path is None:
+        return old_path is not new_path
+    if len(old_path) != len(new_path):
+        return True
+    return any(abs(oy - ny) > tolerance_px or abs(ox - nx) > tolerance_px
+               for (oy, ox), (ny, nx) in zip(old_path, new_path))
+
+
+class LiveReplanner:
+    def __init__(self, model, reference_size, start_node, end_node, on_update,
+                 target_hz=DEFAULT_TARGET_HZ, snap_radius=DEFAULT_SNAP_RADIUS, on_status=None, tiling=None,
+                 skeleton_engine=None, planner=None, time_model=None, simplify_mode=None):
+        self.model = model
+        self.reference_h, self.reference_w = reference_size
+        self.start_node = start_node
+        self.end_node = end_node
+        self.on_update = on_update
+        self.on_status = on_status
+        self.target_hz = target_hz
+        self.snap_radius = snap_radius
+        self.tiling = tiling
+        self.skeleton_engine = skeleton_engine
+        self.planner = planner
+        self.time_model = time_model
+        self.simplify_mode = simplify_mode
+
+        self._frame_lock = threading.Lock()
+        self._latest_frame = None
+        self._new_frame_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        self.last_published = None
+        self.frames_submitted = 0
+        self.frames_dropped = 0
+        self.frames_processed = 0
+        self.updates_published = 0
+        self.last_cycle_ms = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._replan_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        self._stop_event.set()
+        self._new_frame_event.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def submit_frame(self, frame_bgr):
+        """En yeni kareyi bırakır; henüz işlenmemiş önceki kare varsa düşürülür."""
+        with self._frame_lock:
+            if self._latest_frame is not None:
+                self.frames_dropped += 1
+            self._latest_frame = frame_bgr
+            self.frames_submitted += 1
+        self._new_frame_event.set()
+
+    def _take_latest_frame(self):
+        with self._frame_lock:
+            frame, self._latest_frame = self._latest_frame, None
+            self._new_frame_event.clear()
+        return frame
+
+    def _replan_loop(self):
+        period_s = 1.0 / self.target_hz if self.target_hz > 0 else 0.0
+        while not self._stop_event.is_set():
+            self._new_frame_event.wait(timeout=0.5)
+            if self._stop_event.is_set():
+                break
+            frame = self._take_latest_frame()
+            if frame is None:
+                continue
+
+            cycle_started = time.perf_counter()
+            try:
+                result = self.replan_frame(frame)
+            except Exception as e:
+                print(f"Canlı yeniden planlama hatası: {e}")
+                result = None
+            self.frames_processed += 1
+            self.last_cycle_ms = (time.perf_counter() - cycle_started) * 1000.0
+
+            if result is not None and self._should_publish(result):
+                self.last_published = result
+                self.updates_published += 1
+                self.on_update(result)
+            if self.on_status:
+                self.on_status(self.status_text(result is not None))
+
+            remaining_s = period_s - (time.perf_counter() - cycle_started)
+            if remaining_s > 0:
+                self._stop_event.wait(timeout=remaining_s)
+
+    def replan_frame(self, frame_bgr):
+        """Tek bir kareyi segmentleyip çözer. Yol bulunamazsa None döner."""
+        if frame_bgr.shape[:2] != (self.reference_h, self.reference_w):
+            frame_bgr = cv2.resize(frame_bgr, (self.reference_w, self.reference_h), interpolation=cv2.INTER_AREA)
+        segmentation = maze_core.segment_maze(self.model, frame_bgr, tiling=self.tiling,
+                                              skeleton_engine=self.skeleton_engine)
+        bfs_mask = segmentation['bfs_mask']
+        start = maze_core.snap_to_mask(bfs_mask, self.start_node, self.snap_radius)
+        end = maze_core.snap_to_mask(bfs_mask, self.end_node, self.snap_radius)
+        if start is None or end is None:
+            return None
+        solution = maze_core.solve_path(bfs_mask, start, end, verbose=False, planner=self.planner,
+                                       time_model=self.time_model, simplify_mode=self.simplify_mode)
+        if solution is None:
+            return None
+        solution['frame_bgr'] = frame_bgr
+        solution['bfs_mask'] = bfs_mask
+        solution['mask_type'] = segmentation['mask_type']
+        return solution
+
+    def _should_publish(self, result):
+        if self.last_published is None:
+            return True
+        if result['commands_for_pi'] != self.last_published['commands_for_pi']:
+            return True
+        return path_changed(self.last_published['simplified_path'], result['simplified_path'])
+
+    def status_text(self, path_found=True):
+        cycle = f"{self.last_cycle_ms:.0f} ms" if self.last_cycle_ms is not None else "-"
+        state = "yol var" if path_found else "yol yok"
+        return (f"Canlı planlama ({self.target_hz:g} Hz): {state}, döngü {cycle}, "
+                f"işlenen {self.frames_processed}, düşürülen {self.frames_dropped}, güncelleme {self.updates_published}")
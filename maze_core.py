@@ -0,0 +1,894 @@
+"""Labirent çözme hattının arayüzden (Tk) bağımsız çekirdeği.
+
+Segmentasyon, iskelet çıkarma, BFS, yol sadeleştirme ve araç komutu üretimi
+burada toplanır; hem MazeSolverApp hem de batch_solver.py bu fonksiyonları kullanır.
+"""
+import itertools
+import time
+from array import array
+from collections import deque
+
+import cv2
+import numpy as np
+
+import drive_time
+import goal_field
+import grid_planners
+import jit_kernels
+import skeleton_graph
+import skeletonization
+
+MODEL_PATH = 'final_maze_segmentation_unet_model.h5'
+THRESHOLD = 0.5
+MIN_ACCEPTABLE_FORWARD_STEP = 10
+DEFAULT_TILE_OVERLAP = 32
+MULTIRES_COARSE_MAX_SIDE = 256
+MULTIRES_CORRIDOR_RADIUS = 2
+MULTIRES_MAX_CORRIDOR_RETRIES = 2
+SKIMAGE_AVAILABLE = skeletonization.SKIMAGE_AVAILABLE
+
+TURN_ACTIONS = ("saga_don", "sola_don")
+PATH_PLANNERS = ('bfs', 'bfs-bidir', 'astar', 'astar-manhattan', 'jps', 'multires', 'graph', 'drive-time', 'goal-field')
+DEFAULT_PATH_PLANNER = 'bfs'
+SIMPLIFY_MODES = ('exact', 'axis-rdp')
+DEFAULT_SIMPLIFY_MODE = 'exact'
+AXIS_RDP_TOLERANCE_PX = 8.0
+
+
+def load_segmentation_model(model_path=MODEL_PATH):
+    """Uzantıya göre Keras, TFLite veya ONNX arka ucunu yükler (bkz. inference_backends)."""
+    # Çalışma zamanları ağır bağımlılıklar; sadece model gerçekten yüklenirken içe aktarılır.
+    import inference_backends
+    return inference_backends.load_backend(model_path)
+
+
+def model_input_spec(model):
+    """Modelin (yükseklik, genişlik, kanal) girdi boyutunu döndürür."""
+    img_h, img_w, img_c = model.input_shape[1:]
+    return img_h, img_w, img_c
+
+
+def to_model_color_space(image_bgr, is_grayscale_model):
+    if is_grayscale_model and image_bgr.ndim == 3:
+        return cv2.cvtColor(image_bgr, cv2.COLOR_BGR2GRAY)
+    if not is_grayscale_model and image_bgr.ndim == 2:
+        return cv2.cvtColor(image_bgr, cv2.COLOR_GRAY2BGR)
+    return image_bgr
+
+
+def letterbox_for_model(image, target_h, target_w, is_grayscale_model):
+    """Görüntüyü en-boy oranını koruyarak model girdisine sığdırır ve dolgu bilgisini döndürür."""
+    current_h, current_w = image.shape[:2]
+    scale = 1.0
+    if current_w > 0 and current_h > 0:
+        scale = min(target_w / current_w, target_h / current_h)
+
+    new_w, new_h = int(current_w * scale), int(current_h * scale)
+    if new_w == 0 or new_h == 0:
+        raise ValueError("Görüntü ölçekleme hatası (boyut sıfır).")
+
+    resized_img = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_AREA)
+
+    top_pad = (target_h - new_h) // 2
+    bottom_pad = target_h - new_h - top_pad
+    left_pad = (target_w - new_w) // 2
+    right_pad = target_w - new_w - left_pad
+    padding_info = {
+        'top_pad': top_pad, 'left_pad': left_pad,
+        'new_w': new_w, 'new_h': new_h,
+        'bottom_pad': bottom_pad, 'right_pad': right_pad,
+        'original_model_input_shape': (target_h, target_w)
+    }
+    border_val = 0 if is_grayscale_model else [0, 0, 0]
+    padded_img = cv2.copyMakeBorder(resized_img, top_pad, bottom_pad, left_pad, right_pad,
+                                    cv2.BORDER_CONSTANT, value=border_val)
+
+    if padded_img.shape[0] != target_h or padded_img.shape[1] != target_w:
+        print(f"UYARI: Dolgulu görüntü boyutu ({padded_img.shape}) model girdisiyle ({target_h},{target_w}) eşleşmiyor. Yeniden boyutlandırılıyor.")
+        padded_img = cv2.resize(padded_img, (target_w, target_h), interpolation=cv2.INTER_NEAREST)
+
+    if is_grayscale_model and padded_img.ndim == 2:
+        padded_img = np.expand_dims(padded_img, axis=-1)
+    return padded_img, padding_info
+
+
+def prediction_to_mask(prediction, threshold=THRESHOLD):
+    """Model çıktısını (H, W) boyutunda 0/1 yol maskesine çevirir (düşük olasılık = yol)."""
+    predicted_mask_prob = prediction[0]
+    if predicted_mask_prob.shape[-1] > 1:
+        predicted_mask_prob = predicted_mask_prob[:, :, 0:1]
+    return np.squeeze(predicted_mask_prob < threshold).astype(np.uint8)
+
+
+def skeletonize_mask(mask_01, engine=None):
+    """İskeleti döndürür (motor: skeletonization.SKELETON_ENGINES); iskelet boşsa None döner."""
+    skeleton_01 = skeletonization.skeletonize(mask_01, engine)
+    if not np.any(skeleton_01):
+        return None
+    return skeleton_01
+
+
+def mask_to_original_scale(mask_model_scale, padding_info, orig_w, orig_h):
+    """Model ölçeğindeki maskeden dolguyu kırpar ve orijinal görüntü boyutuna büyütür."""
+    pi = padding_info
+    if pi['new_h'] <= 0 or pi['new_w'] <= 0:
+        if orig_w <= 0 or orig_h <= 0:
+            raise ValueError("Maske boyutlandırmada kritik hata: Orijinal veya yeni boyutlar sıfır.")
+        return cv2.resize(mask_model_scale, (orig_w, orig_h), interpolation=cv2.INTER_NEAREST)
+
+    cropped_mask = mask_model_scale[
+                   pi['top_pad']:pi['original_model_input_shape'][0] - pi['bottom_pad'],
+                   pi['left_pad']:pi['original_model_input_shape'][1] - pi['right_pad']]
+    if cropped_mask.size == 0:
+        cropped_mask = mask_model_scale
+    elif cropped_mask.shape[0] != pi['new_h'] or cropped_mask.shape[1] != pi['new_w']:
+        cropped_mask = cv2.resize(cropped_mask, (pi['new_w'], pi['new_h']), interpolation=cv2.INTER_NEAREST)
+    return cv2.resize(cropped_mask, (orig_w, orig_h), interpolation=cv2.INTER_NEAREST)
+
+
+def segment_maze_image(model, image_bgr, threshold=THRESHOLD, skeleton_engine=None):
+    """Tek bir BGR görüntü için tüm segmentasyon aşamalarını çalıştırır.
+
+    Dönen sözlük: 'raw_mask' ve 'skeleton' model ölçeğinde, 'bfs_mask' orijinal
+    ölçekte 0/1 uint8 dizilerdir; 'padding_info' ve 'mask_type' arayüzde gösterilir.
+    """
+    img_h, img_w, img_c = model_input_spec(model)
+    is_grayscale_model = (img_c == 1)
+    orig_h, orig_w = image_bgr.shape[:2]
+
+    model_input = to_model_color_space(image_bgr, is_grayscale_model)
+    padded_img, padding_info = letterbox_for_model(model_input, img_h, img_w, is_grayscale_model)
+
+    prediction = model.predict(np.expand_dims(padded_img / 255.0, axis=0))
+    raw_mask = prediction_to_mask(prediction, threshold)
+    skeleton, chosen_mask, mask_type = select_bfs_mask(raw_mask, skeleton_engine)
+
+    bfs_mask = mask_to_original_scale(chosen_mask, padding_info, orig_w, orig_h)
+    return {
+        'raw_mask': raw_mask,
+        'skeleton': skeleton,
+        'bfs_mask': bfs_mask,
+        'padding_info': padding_info,
+        'mask_type': mask_type,
+    }
+
+
+def select_bfs_mask(raw_mask, skeleton_engine=None):
+    """İskelet çıkarılabiliyorsa BFS için iskeleti, değilse ham maskeyi seçer: (iskelet, seçilen maske, açıklama)."""
+    chosen_mask = raw_mask.copy()
+    mask_type = "Orijinal Model Maskesi (BFS için)"
+    skeleton = None
+    try:
+        skeleton = skeletonize_mask(chosen_mask, skeleton_engine)
+        if skeleton is not None:
+            chosen_mask = skeleton
+            mask_type = "İskelet Maskesi (BFS için)"
+        else:
+            mask_type += " (İskelet Boş, BFS orijinali kullanıyor)"
+    except Exception as e_skele:
+        print(f"İskelet çıkarma hatası: {e_skele}")
+        mask_type += " (İskelet Hatası, BFS orijinali kullanıyor)"
+    return skeleton, chosen_mask, mask_type
+
+
+def _tile_starts(length, tile, stride):
+    if length <= tile:
+        return [0]
+    starts = list(range(0, length - tile, stride))
+    starts.append(length - tile)
+    return starts
+
+
+def _tile_blend_weights(tile_h, tile_w, overlap):
+    """Kenarlara doğru örtüşme boyunca doğrusal azalan ağırlıklar; dikiş yerleri yumuşak karışır."""
+    def ramp(n):
+        if overlap <= 0:
+            return np.ones(n, dtype=np.float32)
+        distance_to_edge = np.minimum(np.arange(n), np.arange(n)[::-1]) + 1
+        return np.minimum(1.0, distance_to_edge / (overlap + 1)).astype(np.float32)
+    return np.outer(ramp(tile_h), ramp(tile_w))
+
+
+def segment_maze_image_tiled(model, image_bgr, threshold=THRESHOLD, tile_size=None,
+                             overlap=DEFAULT_TILE_OVERLAP, batch_size=None, skeleton_engine=None):
+    """Görüntüyü küçültmeden, örtüşen döşemeler halinde segmentler.
+
+    Döşemeler orijinal çözünürlükte kesilir (tile_size verilmezse model girdi boyutu),
+    tek bir predict çağrısında toplu çalıştırılır (batch_size ile bölünebilir) ve
+    olasılıklar örtüşme bölgelerinde ağırlıklı ortalamayla birleştirilir. Dönen sözlük
+    segment_maze_image ile aynıdır; maskelerin hepsi orijinal ölçektedir ve 'tiling'
+    anahtarı verim bilgisini taşır.
+    """
+    started = time.perf_counter()
+    img_h, img_w, img_c = model_input_spec(model)
+    is_grayscale_model = (img_c == 1)
+    orig_h, orig_w = image_bgr.shape[:2]
+    tile_h, tile_w = (img_h, img_w) if tile_size is None else (tile_size, tile_size)
+    if overlap < 0 or overlap >= min(tile_h, tile_w):
+        raise ValueError(f"Döşeme örtüşmesi ({overlap}) 0 ile döşeme boyutu ({tile_h}x{tile_w}) arasında olmalı.")
+
+    model_input = to_model_color_space(image_bgr, is_grayscale_model)
+    # Döşemeden küçük görüntüler letterbox'taki gibi siyahla doldurulur.
+    padded_h, padded_w = max(orig_h, tile_h), max(orig_w, tile_w)
+    if (padded_h, padded_w) != (orig_h, orig_w):
+        border_val = 0 if is_grayscale_model else [0, 0, 0]
+        model_input = cv2.copyMakeBorder(model_input, 0, padded_h - orig_h, 0, padded_w - orig_w,
+                                         cv2.BORDER_CONSTANT, value=border_val)
+    if model_input.ndim == 2:
+        model_input = np.expand_dims(model_input, axis=-1)
+
+    positions = [(y, x) for y in _tile_starts(padded_h, tile_h, tile_h - overlap)
+                 for x in _tile_starts(padded_w, tile_w, tile_w - overlap)]
+    tiles = np.empty((len(positions), img_h, img_w, img_c), dtype=np.float32)
+    for i, (y, x) in enumerate(positions):
+        tile = model_input[y:y + tile_h, x:x + tile_w]
+        if (tile_h, tile_w) != (img_h, img_w):
+            tile = cv2.resize(tile, (img_w, img_h), interpolation=cv2.INTER_AREA)
+            if tile.ndim == 2:
+                tile = np.expand_dims(tile, axis=-1)
+        tiles[i] = tile / 255.0
+
+    predict_started = time.perf_counter()
+    batch_size = batch_size or len(positions)
+    predictions = [model.predict(tiles[i:i + batch_size]) for i in range(0, len(positions), batch_size)]
+    predictions = np.concatenate(predictions, axis=0)
+    predict_s = time.perf_counter() - predict_started
+
+    weights = _tile_blend_weights(tile_h, tile_w, overlap)
+    probability_sum = np.zeros((padded_h, padded_w), dtype=np.float32)
+    weight_sum = np.zeros((padded_h, padded_w), dtype=np.float32)
+    for (y, x), tile_prediction in zip(positions, predictions):
+        tile_probability = tile_prediction[..., 0]
+        if (tile_h, tile_w) != (img_h, img_w):
+            tile_probability = cv2.resize(tile_probability, (tile_w, tile_h), interpolation=cv2.INTER_LINEAR)
+        probability_sum[y:y + tile_h, x:x + tile_w] += tile_probability * weights
+        weight_sum[y:y + tile_h, x:x + tile_w] += weights
+    probability = (probability_sum / weight_sum)[:orig_h, :orig_w]
+
+    raw_mask = (probability < threshold).astype(np.uint8)
+    skeleton, bfs_mask, mask_type = select_bfs_mask(raw_mask, skeleton_engine)
+    total_s = time.perf_counter() - started
+    return {
+        'raw_mask': raw_mask,
+        'skeleton': skeleton,
+        'bfs_mask': bfs_mask,
+        'padding_info': {},
+        'mask_type': mask_type + " [Döşemeli]",
+        'tiling': {
+            'tile_count': len(positions),
+            'tile_size': (tile_h, tile_w),
+            'overlap': overlap,
+            'batch_size': batch_size,
+            'predict_ms': predict_s * 1000.0,
+            'total_ms': total_s * 1000.0,
+            'tiles_per_second': len(positions) / predict_s if predict_s > 0 else None,
+            'megapixels_per_second': (orig_h * orig_w / 1e6) / total_s if total_s > 0 else None,
+        },
+    }
+
+
+def segment_maze(model, image_bgr, threshold=THRESHOLD, tiling=None, skeleton_engine=None):
+    """tiling None ise tüm görüntüyü letterbox ile, sözlükse (tile_size, overlap, batch_size) döşemeli segmentler."""
+    if tiling is None:
+        return segment_maze_image(model, image_bgr, threshold, skeleton_engine)
+    return segment_maze_image_tiled(model, image_bgr, threshold, skeleton_engine=skeleton_engine, **tiling)
+
+
+def snap_to_mask(grid, point, max_radius):
+    """Nokta maske üzerinde değilse max_radius içindeki en yakın yol pikselini döndürür."""
+    rows, cols = grid.shape
+    y, x = point
+    if 0 <= y < rows and 0 <= x < cols and grid[y, x] == 1:
+        return point
+    if max_radius <= 0:
+        return None
+    y0, y1 = max(0, y - max_radius), min(rows, y + max_radius + 1)
+    x0, x1 = max(0, x - max_radius), min(cols, x + max_radius + 1)
+    ys, xs = np.nonzero(grid[y0:y1, x0:x1] == 1)
+    if ys.size == 0:
+        return None
+    dist2 = (ys + y0 - y) ** 2 + (xs + x0 - x) ** 2
+    best = int(np.argmin(dist2))
+    if dist2[best] > max_radius ** 2:
+        return None
+    return (int(ys[best] + y0), int(xs[best] + x0))
+
+
+def _bfs_arrays(grid):
+    """1 piksel dolgulu düz indeksli BFS dizileri: (duvarlar işaretli ziyaret bit haritası, komşu ofsetleri, genişlik).
+
+    Duvarlar ve dolgu baştan 'ziyaret edildi' sayılır; böylece iç döngüde sınır ve duvar kontrolü
+    tek bir bit testine iner.
+    """
+    width = grid.shape[1] + 2
+    blocked = np.pad(grid != 1, 1, constant_values=True).ravel()
+    visited = bytearray(np.packbits(blocked, bitorder='little').tobytes())
+    # Sıra eski BFS ile aynı; eşit uzunluktaki yollar arasında aynı yol seçilir.
+    offsets = (1, -1, width, -width, width + 1, width - 1, -width + 1, -width - 1)
+    return visited, offsets, width
+
+
+def _trace_parents(parents, index, stop_index):
+    chain = [index]
+    while index != stop_index:
+        index = parents[index]
+        chain.append(index)
+    return chain
+
+
+def _indices_to_points(indices, width):
+    rows, cols = np.divmod(np.asarray(indices, dtype=np.int64), width)
+    return list(zip((rows - 1).tolist(), (cols - 1).tolist()))
+
+
+def _bfs_unidirectional(visited, offsets, source, target):
+    parents = array('i', [0]) * (len(visited) * 8)
+    visited[source >> 3] |= 1 << (source & 7)
+    queue = deque([source])
+    expanded = 0
+    while queue:
+        current = queue.popleft()
+        expanded += 1
+        for offset in offsets:
+            neighbour = current + offset
+            if visited[neighbour >> 3] >> (neighbour & 7) & 1:
+                continue
+            visited[neighbour >> 3] |= 1 << (neighbour & 7)
+            parents[neighbour] = current
+            if neighbour == target:
+                return _trace_parents(parents, target, source)[::-1], expanded
+            queue.append(neighbour)
+    return None, expanded
+
+
+def _bfs_bidirectional(visited, offsets, source, target):
+    """İki uçtan seviye seviye BFS; her adımda küçük olan sınır genişletilir.
+
+    İki taraf bir düğümü ilk kez ortak ziyaret ettiğinde bulunan yol en kısadır: o ana
+    kadar hiçbir düğüm iki tarafça da ziyaret edilmemiş olduğundan buluşma düğümü diğer
+    tarafın güncel sınırındadır.
+    """
+    visited_from = (visited, bytearray(visited))
+    parents = (array('i', [0]) * (len(visited) * 8), array('i', [0]) * (len(visited) * 8))
+    frontiers = ([source], [target])
+    for side, index in ((0, source), (1, target)):
+        visited_from[side][index >> 3] |= 1 << (index & 7)
+    expanded = 0
+    while frontiers[0] and frontiers[1]:
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        own, other = visited_from[side], visited_from[1 - side]
+        own_parents = parents[side]
+        next_frontier = []
+        for current in frontiers[side]:
+            expanded += 1
+            for offset in offsets:
+                neighbour = current + offset
+                byte, bit = neighbour >> 3, neighbour & 7
+                if own[byte] >> bit & 1:
+                    continue
+                own[byte] |= 1 << bit
+                own_parents[neighbour] = current
+                if other[byte] >> bit & 1:
+                    from_source = _trace_parents(parents[0], neighbour, source)[::-1]
+                    to_target = _trace_parents(parents[1], neighbour, target)
+                    return from_source + to_target[1:], expanded
+                next_frontier.append(neighbour)
+        frontiers = (next_frontier, frontiers[1]) if side == 0 else (frontiers[0], next_frontier)
+    return None, expanded
+
+
+def find_path_bfs(grid, start_node, end_node, stats=None, bidirectional=False):
+    """8-komşulu BFS; [(y, x), ...] döndürür, yol yoksa None.
+
+    Kuyrukta yol kopyası yerine düz indeksler tutulur; ebeveynler önceden ayrılmış bir
+    int32 dizide, ziyaret bilgisi piksel başına bir bitte saklanır ve yol yalnızca sonda
+    bir kez geri izlenir. bidirectional=True iki uçtan arar. stats sözlüğü verilirse
+    kuyruktan çıkarılan düğüm sayısı 'expanded' anahtarına yazılır.
+    """
+    if stats is not None:
+        stats['expanded'] = 0
+    if grid.ndim != 2: return None
+    rows, cols = grid.shape
+
+    if not (0 <= start_node[0] < rows and 0 <= start_node[1] < cols and grid[start_node[0], start_node[1]] == 1):
+        print(f"BFS: Başlangıç noktası geçersiz: {start_node}, grid değeri: {grid[start_node[0], start_node[1]] if (0 <= start_node[0] < rows and 0 <= start_node[1] < cols) else 'sınır dışı'}")
+        return None
+    if not (0 <= end_node[0] < rows and 0 <= end_node[1] < cols and grid[end_node[0], end_node[1]] == 1):
+        print(f"BFS: Bitiş noktası geçersiz: {end_node}, grid değeri: {grid[end_node[0], end_node[1]] if (0 <= end_node[0] < rows and 0 <= end_node[1] < cols) else 'sınır dışı'}")
+        return None
+    start_node, end_node = (int(start_node[0]), int(start_node[1])), (int(end_node[0]), int(end_node[1]))
+    if start_node == end_node:
+        return [start_node]
+
+    width = cols + 2
+    source = (start_node[0] + 1) * width + start_node[1] + 1
+    target = (end_node[0] + 1) * width + end_node[1] + 1
+    if jit_kernels.enabled() and not bidirectional:
+        blocked = np.pad(grid != 1, 1, constant_values=True).astype(np.uint8).ravel()
+        offsets = (1, -1, width, -width, width + 1, width - 1, -width + 1, -width - 1)
+        indices, expanded = jit_kernels.bfs_indices(blocked, offsets, source, target)
+    else:
+        visited, offsets, width = _bfs_arrays(grid)
+        search = _bfs_bidirectional if bidirectional else _bfs_unidirectional
+        indices, expanded = search(visited, offsets, source, target)
+    if stats is not None:
+        stats['expanded'] = expanded
+    if indices is None:
+        return None
+    return _indices_to_points(indices, width)
+
+
+def _downsample_mask_max(mask_01):
+    """2x2 bloklarda en büyük değer: ince yollar kopmaz, kaba seviyede bağlantı korunur."""
+    h, w = mask_01.shape
+    padded = np.pad(mask_01, ((0, h % 2), (0, w % 2)))
+    return padded.reshape(padded.shape[0] // 2, 2, padded.shape[1] // 2, 2).max(axis=(1, 3))
+
+
+def build_mask_pyramid(mask_01, coarse_max_side=MULTIRES_COARSE_MAX_SIDE):
+    """[tam çözünürlük, 1/2, 1/4, ...]; en kaba seviyenin uzun kenarı coarse_max_side'ı geçmez."""
+    pyramid = [mask_01]
+    while max(pyramid[-1].shape) > coarse_max_side:
+        pyramid.append(_downsample_mask_max(pyramid[-1]))
+    return pyramid
+
+
+def _corridor_around_path(path, coarse_shape, fine_shape, radius):
+    """Kaba yolu radius hücre genişletip bir ince seviyeye (x2) büyütür."""
+    corridor = np.zeros(coarse_shape, dtype=np.uint8)
+    rows, cols = zip(*path)
+    corridor[list(rows), list(cols)] = 1
+    if radius > 0:
+        corridor = cv2.dilate(corridor, np.ones((2 * radius + 1, 2 * radius + 1), np.uint8))
+    corridor = np.repeat(np.repeat(corridor, 2, axis=0), 2, axis=1)
+    return corridor[:fine_shape[0], :fine_shape[1]]
+
+
+def _find_path_in_corridor(grid, corridor, start_node, end_node, stats):
+    """BFS'yi koridorun sınırlayıcı kutusuna kırpılmış (grid & koridor) maskede çalıştırır."""
+    ys, xs = np.nonzero(corridor)
+    y0, y1, x0, x1 = ys.min(), ys.max() + 1, xs.min(), xs.max() + 1
+    if not (y0 <= start_node[0] < y1 and x0 <= start_node[1] < x1 and y0 <= end_node[0] < y1 and x0 <= end_node[1] < x1):
+        return None
+    window = grid[y0:y1, x0:x1] & corridor[y0:y1, x0:x1]
+    if not (window[start_node[0] - y0, start_node[1] - x0] and window[end_node[0] - y0, end_node[1] - x0]):
+        return None
+    path = find_path_bfs(window, (start_node[0] - y0, start_node[1] - x0), (end_node[0] - y0, end_node[1] - x0), stats)
+    if path is None:
+        return None
+    return [(int(r + y0), int(c + x0)) for r, c in path]
+
+
+def find_path_multires(grid, start_node, end_node, coarse_max_side=MULTIRES_COARSE_MAX_SIDE,
+                       corridor_radius=MULTIRES_CORRIDOR_RADIUS, report=None):
+    """Kabadan inceye yol arama.
+
+    Maske piramidinin en kaba seviyesinde tam BFS yapılır; her ince seviyede arama yalnızca
+    bir üst seviyenin yolu etrafındaki dar koridorla sınırlıdır. Koridorda yol yoksa koridor
+    genişletilir, yine yoksa o seviye tam BFS ile çözülür (sonuç her zaman tam çözünürlükte
+    geçerli bir yoldur). report listesi verilirse seviye başına süre ve genişletilen düğüm
+    sayısı eklenir.
+    """
+    if report is None:
+        report = []
+    pyramid = build_mask_pyramid(grid, coarse_max_side)
+    coarsest = len(pyramid) - 1
+    factor = 2 ** coarsest
+
+    started = time.perf_counter()
+    stats = {}
+    path = find_path_bfs(pyramid[-1], (start_node[0] // factor, start_node[1] // factor),
+                         (end_node[0] // factor, end_node[1] // factor), stats)
+    report.append({'level': coarsest, 'shape': pyramid[-1].shape, 'ms': (time.perf_counter() - started) * 1000.0,
+                   'expanded': stats.get('expanded', 0), 'mode': 'tam'})
+    if path is None:
+        return None
+
+    for level in range(coarsest - 1, -1, -1):
+        factor = 2 ** level
+        level_grid = pyramid[level]
+        level_start = (start_node[0] // factor, start_node[1] // factor)
+        level_end = (end_node[0] // factor, end_node[1] // factor)
+        started = time.perf_counter()
+        expanded, refined, mode = 0, None, 'koridor'
+        radius = corridor_radius
+        for _ in range(MULTIRES_MAX_CORRIDOR_RETRIES + 1):
+            corridor = _corridor_around_path(path, pyramid[level + 1].shape, level_grid.shape, radius)
+            stats = {}
+            refined = _find_path_in_corridor(level_grid, corridor, level_start, level_end, stats)
+            expanded += stats.get('expanded', 0)
+            if refined is not None:
+                break
+            radius *= 2
+        if refined is None:
+            mode = 'tam'
+            stats = {}
+            refined = find_path_bfs(level_grid, level_start, level_end, stats)
+            expanded += stats.get('expanded', 0)
+        report.append({'level': level, 'shape': level_grid.shape, 'ms': (time.perf_counter() - started) * 1000.0,
+                       'expanded': expanded, 'mode': mode, 'corridor_radius': radius})
+        if refined is None:
+            return None
+        path = refined
+    return path
+
+
+def find_path(grid, start_node, end_node, planner=None, report=None, time_model=None):
+    """Seçilen planlayıcıyla (PATH_PLANNERS) piksel yolunu bulur; report listesine aşama ölçümleri eklenir.
+
+    time_model (drive_time.DriveTimeModel) yalnızca 'drive-time' planlayıcısı için kullanılır.
+    """
+    planner = planner or DEFAULT_PATH_PLANNER
+    if report is None:
+        report = []
+    if planner == 'multires':
+        return find_path_multires(grid, start_node, end_node, report=report)
+    if planner == 'graph':
+        return skeleton_graph.find_path_graph(grid, start_node, end_node, report=report)
+    if planner == 'goal-field':
+        return goal_field.find_path_field(grid, start_node, end_node, report=report)
+    stats = {}
+    started = time.perf_counter()
+    if planner in ('bfs', 'bfs-bidir'):
+        path = find_path_bfs(grid, start_node, end_node, stats, bidirectional=(planner == 'bfs-bidir'))
+    elif planner == 'astar':
+        path = grid_planners.find_path_astar(grid, start_node, end_node, 'octile', stats)
+    elif planner == 'astar-manhattan':
+        path = grid_planners.find_path_astar(grid, start_node, end_node, 'manhattan', stats)
+    elif planner == 'jps':
+        path = grid_planners.find_path_jps(grid, start_node, end_node, stats)
+    elif planner == 'drive-time':
+        path = drive_time.find_path_drive_time(grid, start_node, end_node, time_model, stats)
+    else:
+        raise ValueError(f"Bilinmeyen yol planlayıcı: {planner} (seçenekler: {', '.join(PATH_PLANNERS)})")
+    report.append({'level': 0, 'shape': grid.shape, 'ms': (time.perf_counter() - started) * 1000.0,
+                   'expanded': stats.get('expanded', 0), 'mode': planner})
+    return path
+
+
+def format_planner_report(report):
+    lines = []
+    for r in report:
+        line = f"Seviye {r['level']} {r['shape'][1]}x{r['shape'][0]} ({r['mode']}): {r['ms']:.1f} ms, {r['expanded']} düğüm"
+        if 'graph_cached' in r:
+            source = "önbellekten" if r['graph_cached'] else f"{r['graph_build_ms']:.0f} ms'de kuruldu"
+            line += f"; graf {r['graph_nodes']} düğüm/{r['graph_edges']} kenar, {source}"
+        if 'field_cached' in r:
+            line += "; alan önbellekten" if r['field_cached'] else f"; alan {r['field_build_ms']:.0f} ms'de kuruldu"
+        lines.append(line)
+    lines.append(f"Toplam: {sum(r['ms'] for r in report):.1f} ms, {sum(r['expanded'] for r in report)} düğüm")
+    return lines
+
+
+def _direction_change_nodes(points):
+    """(N, 2) dizide yön değiştiren noktalar; sıra ve eşitlik kuralları eski döngüyle aynıdır."""
+    signs = np.sign(np.diff(points, axis=0))
+    candidates = np.flatnonzero((signs[1:] != signs[:-1]).any(axis=1)) + 1
+    keep = np.concatenate(([0], candidates))
+    # Bir önceki tutulan noktayla aynı olan aday (tekrarlanan piksel) atlanır.
+    kept = points[keep]
+    keep = keep[np.concatenate(([True], (kept[1:] != kept[:-1]).any(axis=1)))]
+    if (points[keep[-1]] != points[-1]).any():
+        keep = np.append(keep, len(points) - 1)
+    return keep
+
+
+def _axis_segment_distances(points, a, b, corner):
+    """points'in a -> corner -> b eksen hizalı kırık çizgisine uzaklığı."""
+    distances = None
+    for p, q in ((a, corner), (corner, b)):
+        low, high = np.minimum(p, q), np.maximum(p, q)
+        gap = np.maximum(0, np.maximum(low - points, points - high))
+        leg = np.hypot(gap[:, 0], gap[:, 1])
+        distances = leg if distances is None else np.minimum(distances, leg)
+    return distances
+
+
+def _axis_aligned_rdp(points, tolerance):
+    """Eksen hizalı Douglas-Peucker: her parça bir düz ya da L biçimli Manhattan bağlantıyla
+    yaklaşıklanır; hiçbir piksel tolerance'tan uzakta kalamaz, kalırsa parça kirişe en uzak
+    noktadan bölünür. L köşesi seçilirken önceki bacağın ekseni tercih edilir (daha az dönüş).
+    """
+    vertices = [points[0]]
+    previous_vertical = None
+    stack = [(0, len(points) - 1)]
+    while stack:
+        i, j = stack.pop()
+        a, b = points[i], points[j]
+        inner = points[i + 1:j]
+        corners = [np.array((b[0], a[1])), np.array((a[0], b[1]))]  # önce dikey, önce yatay
+        if previous_vertical is False:
+            corners.reverse()
+        chosen = None
+        for corner in corners:
+            if inner.size == 0 or _axis_segment_distances(inner, a, b, corner).max() <= tolerance:
+                chosen = corner
+                break
+        if chosen is None:
+            chord = (b - a).astype(np.float64)
+            offsets = (inner - a).astype(np.float64)
+            norm = np.hypot(chord[0], chord[1])
+            if norm:
+                deviation = np.abs(offsets[:, 0] * chord[1] - offsets[:, 1] * chord[0]) / norm
+            else:
+                deviation = np.hypot(offsets[:, 0], offsets[:, 1])
+            k = i + 1 + int(np.argmax(deviation))
+            stack.append((k, j))
+            stack.append((i, k))
+            continue
+        for vertex in (chosen, b):
+            if (vertex != vertices[-1]).any():
+                previous_vertical = bool(vertex[1] == vertices[-1][1])
+                vertices.append(vertex)
+    return np.array(vertices)
+
+
+def simplify_path(path_input_pixels, mode=None, tolerance=AXIS_RDP_TOLERANCE_PX):
+    """Yolu köşe noktalarına indirger.
+
+    mode='exact' (varsayılan): her yön değişiminde bir düğüm (8-komşulu merdivenler korunur).
+    mode='axis-rdp': merdivenleri tolerance (px) içinde kalan birkaç eksen hizalı parçaya indirger.
+    """
+    if not path_input_pixels or len(path_input_pixels) < 2:
+        return path_input_pixels
+    mode = mode or DEFAULT_SIMPLIFY_MODE
+    if mode not in SIMPLIFY_MODES:
+        raise ValueError(f"Bilinmeyen sadeleştirme modu: {mode} (seçenekler: {', '.join(SIMPLIFY_MODES)})")
+    points = np.asarray(path_input_pixels, dtype=np.int64)
+    if mode == 'axis-rdp':
+        vertices = _axis_aligned_rdp(points, tolerance)
+        return list(map(tuple, vertices[_direction_change_nodes(vertices)].tolist()))
+    keep = _direction_change_nodes(points)
+    if isinstance(path_input_pixels[0], tuple):
+        return list(map(tuple, points[keep].tolist()))
+    return [path_input_pixels[i] for i in keep.tolist()]
+
+
+def calculate_turns(current_dy, current_dx, target_dy, target_dx):
+    turn_sequence = []
+    if (current_dy, current_dx) == (target_dy, target_dx):
+        return turn_sequence
+
+    temp_dy_right, temp_dx_right = current_dx, -current_dy
+    if (temp_dy_right, temp_dx_right) == (target_dy, target_dx):
+        turn_sequence.append("saga_don")
+        return turn_sequence
+
+    temp_dy_left, temp_dx_left = -current_dx, current_dy
+    if (temp_dy_left, temp_dx_left) == (target_dy, target_dx):
+        turn_sequence.append("sola_don")
+        return turn_sequence
+
+    if (-current_dy, -current_dx) == (target_dy, target_dx):
+        turn_sequence.extend(["saga_don", "saga_don"])
+        return turn_sequence
+
+    print(f"UYARI: Dönüş hesaplanamadı! Mevcut: ({current_dy},{current_dx}), Hedef: ({target_dy},{target_dx})")
+    return []
+
+
+def _segment_forward_command(delta_y, delta_x):
+    """Bir segment için (ileri komutu, adım, yön_dy, yön_dx) döndürür; dikey bileşen önceliklidir."""
+    if delta_y != 0:
+        return "ileri_b", abs(delta_y), np.sign(delta_y), 0
+    if delta_x != 0:
+        return "ileri_a", abs(delta_x), 0, np.sign(delta_x)
+    return "", 0, 0, 0
+
+
+def generate_vehicle_perspective_commands(simplified_path_nodes):
+    if not simplified_path_nodes or len(simplified_path_nodes) < 2:
+        return []
+    if jit_kernels.enabled():
+        return jit_kernels.generate_vehicle_perspective_commands(simplified_path_nodes)
+
+    vehicle_commands_tuples = []
+
+    p0_y, p0_x = simplified_path_nodes[0]
+    p1_y, p1_x = simplified_path_nodes[1]
+    initial_command_type, initial_forward_steps, current_orientation_dy, current_orientation_dx = \
+        _segment_forward_command(p1_y - p0_y, p1_x - p0_x)
+    if initial_forward_steps == 0:
+        return []
+    vehicle_commands_tuples.append((initial_command_type, initial_forward_steps))
+
+    for i in range(1, len(simplified_path_nodes) - 1):
+        seg_start_y, seg_start_x = simplified_path_nodes[i]
+        seg_end_y, seg_end_x = simplified_path_nodes[i+1]
+
+        command_type, forward_steps, target_dy, target_dx = \
+            _segment_forward_command(seg_end_y - seg_start_y, seg_end_x - seg_start_x)
+        if forward_steps == 0: continue
+
+        turns = calculate_turns(current_orientation_dy, current_orientation_dx, target_dy, target_dx)
+        if turns:
+            for turn_action_str in turns:
+                vehicle_commands_tuples.append((turn_action_str, 0))
+            current_orientation_dy, current_orientation_dx = target_dy, target_dx
+
+        vehicle_commands_tuples.append((command_type, forward_steps))
+
+    return vehicle_commands_tuples
+
+
+def consolidate_vehicle_commands(commands_input_tuples):
+    if not commands_input_tuples:
+        return []
+    if jit_kernels.enabled():
+        consolidated_list = jit_kernels.consolidate_vehicle_commands(commands_input_tuples)
+        if consolidated_list is not None:
+            return consolidated_list
+    consolidated_list = []
+    i = 0
+    while i < len(commands_input_tuples):
+        current_action, current_value = commands_input_tuples[i]
+        if current_action.startswith("ileri"):
+            total_steps = current_value
+            j = i + 1
+            while j < len(commands_input_tuples) and commands_input_tuples[j][0] == current_action:
+                total_steps += commands_input_tuples[j][1]
+                j += 1
+            consolidated_list.append((current_action, total_steps))
+            i = j
+        else:
+            consolidated_list.append((current_action, current_value))
+            i += 1
+    return consolidated_list
+
+
+def nullify_opposing_turns(commands_input):
+    if not commands_input or len(commands_input) < 2:
+        return commands_input
+
+    standardized_commands = []
+    for cmd in commands_input:
+        if isinstance(cmd, str):
+            parts = cmd.split()
+            action = parts[0]
+            value = int(parts[1]) if len(parts) > 1 and parts[0].startswith("ileri") else 0
+            if parts[0] == "Sağ" and len(parts) > 1 and parts[1] == "Dön": action = "saga_don"
+            elif parts[0] == "Sol" and len(parts) > 1 and parts[1] == "Dön": action = "sola_don"
+            standardized_commands.append((action, value))
+        else:
+            standardized_commands.append(cmd)
+
+    processed_commands_tuples = []
+    i = 0
+    n = len(standardized_commands)
+    while i < n:
+        if i + 1 < n:
+            cmd1_action, _ = standardized_commands[i]
+            cmd2_action, _ = standardized_commands[i+1]
+            if (cmd1_action == "saga_don" and cmd2_action == "sola_don") or \
+               (cmd1_action == "sola_don" and cmd2_action == "saga_don"):
+                i += 2
+                continue
+        processed_commands_tuples.append(standardized_commands[i])
+        i += 1
+    return processed_commands_tuples
+
+
+def filter_short_forwards(commands_input_tuples, min_acceptable_steps):
+    if not commands_input_tuples: return []
+    return [(action, value) for action, value in commands_input_tuples
+            if not action.startswith("ileri") or value >= min_acceptable_steps]
+
+
+def _display_text(action, value):
+    if action.startswith("ileri"):
+        direction_label = "Yatay" if action == "ileri_a" else "Dikey"
+        return f"İleri ({direction_label}) {value}"
+    if action == "saga_don":
+        return "Sağ Dön"
+    if action == "sola_don":
+        return "Sol Dön"
+    if action == "bekle":
+        return f"Bekle {value / 1000:.1f} s"
+    return None
+
+
+def commands_to_display(command_tuples):
+    display_commands = []
+    for action, value in command_tuples:
+        text = _display_text(action, value)
+        if text is not None:
+            display_commands.append(text)
+    return display_commands
+
+
+_OPPOSITE_TURN = {"saga_don": "sola_don", "sola_don": "saga_don"}
+_FORWARD_ACTIONS = frozenset(("ileri_a", "ileri_b"))
+
+
+def optimize_commands(commands_input_tuples, min_acceptable_forward_step=MIN_ACCEPTABLE_FORWARD_STEP):
+    """Ham araç komutlarını tek geçişte işler; ((eylem, değer), arayüz metni) üretir.
+
+    Eski çok aşamalı hattın (birleştir -> kısa ileri filtresi -> birleştir -> zıt dönüş
+    iptali -> birleştir -> son dönüşü at) çıktısının aynısıdır:
+      * aynı eylemli ardışık ileri komutları toplanır; toplamı eşiğin altındaysa atılır,
+      * akışta yan yana gelen zıt dönüş çifti iptal edilir (iptalin açığa çıkardığı
+        dönüş yeniden eşlenmez; eski tek geçişli iptal gibi),
+      * iptal sonrası yan yana gelen aynı ileri komutları birleşir,
+      * sondaki tek dönüş atılır.
+    Çıktı bir yığın üzerinde kurulur; yalnızca en üstteki iki öğe değişebildiğinden daha
+    derindekiler (her eklemede en fazla bir tane) hemen üretilir.
+    """
+    stack = []
+    emitted = 0
+    cancel_allowed = False  # yığının tepesindeki dönüş bir önceki akış öğesi mi
+    run_action, run_value = None, 0
+
+    for action, value in itertools.chain(commands_input_tuples, ((None, 0),)):
+        if action == run_action:
+            run_value += value
+            continue
+        if run_action is not None:
+            if run_value >= min_acceptable_forward_step:
+                if stack and stack[-1][0] == run_action:
+                    stack[-1] = (run_action, stack[-1][1] + run_value)
+                else:
+                    stack.append((run_action, run_value))
+                    if len(stack) - emitted > 2:
+                        settled = stack[emitted]
+                        emitted += 1
+                        yield settled, _display_text(*settled)
+                cancel_allowed = False
+            run_action = None
+        if action is None:
+            break
+        if action in _FORWARD_ACTIONS:
+            run_action, run_value = action, value
+        elif cancel_allowed and stack[-1][0] == _OPPOSITE_TURN.get(action):
+            stack.pop()
+            cancel_allowed = False
+        else:
+            stack.append((action, value))
+            cancel_allowed = action in _OPPOSITE_TURN
+            if len(stack) - emitted > 2:
+                settled = stack[emitted]
+                emitted += 1
+                yield settled, _display_text(*settled)
+
+    if len(stack) > emitted and stack[-1][0] in TURN_ACTIONS:
+        stack.pop()
+    for action, value in stack[emitted:]:
+        yield (action, value), _display_text(action, value)
+
+
+def generate_and_process_commands(simplified_path_nodes, min_acceptable_forward_step=MIN_ACCEPTABLE_FORWARD_STEP,
+                                  verbose=True):
+    """Sadeleştirilmiş yoldan Pi komut demetlerini ve arayüz metinlerini üretir."""
+    raw_vehicle_commands_tuples = generate_vehicle_perspective_commands(simplified_path_nodes)
+    final_commands_tuples, display_commands = [], []
+    for command, text in optimize_commands(raw_vehicle_commands_tuples, min_acceptable_forward_step):
+        final_commands_tuples.append(command)
+        if text is not None:
+            display_commands.append(text)
+    if verbose:
+        print(f"Komutlar: {len(raw_vehicle_commands_tuples)} ham -> {len(final_commands_tuples)} nihai.")
+    return final_commands_tuples, display_commands
+
+
+def solve_path(bfs_mask, start_node, end_node, verbose=True, planner=None, time_model=None, simplify_mode=None,
+               simplify_tolerance=AXIS_RDP_TOLERANCE_PX):
+    """Yol arama (planner: PATH_PLANNERS) + sadeleştirme (simplify_mode: SIMPLIFY_MODES) + komut üretimi.
+    Yol bulunamazsa None döner.
+
+    'estimated_mission_s', komutların time_model'e (varsayılan: kamera kazançları) göre beklenen süresidir.
+    """
+    planner_report = []
+    path_found_pixels = find_path(bfs_mask, start_node, end_node, planner, planner_report, time_model)
+    if not path_found_pixels:
+        return None
+    simplified_path_nodes = simplify_path(path_found_pixels, simplify_mode, simplify_tolerance)
+    if not simplified_path_nodes or len(simplified_path_nodes) < 2:
+        return None
+    commands_for_pi, commands_for_display = generate_and_process_commands(simplified_path_nodes, verbose=verbose)
+    return {
+        'path_length_pixels': len(path_found_pixels),
+        'simplified_path': simplified_path_nodes,
+        'commands_for_pi': commands_for_pi,
+        'commands_for_display': commands_for_display,
+        'planner_report': planner_report,
+        'estimated_mission_s': drive_time.estimate_mission_time(commands_for_pi, time_model),
+    }
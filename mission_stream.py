@@ -0,0 +1,188 @@
+"""Akışlı görev protokolü (PC ve Pi ortak modülü).
+
+PC planın tamamını tek COMMANDS: mesajında göndermek yerine komutları sıra numaralı
+parçalar halinde gönderir; Pi ilk parça gelir gelmez yerel kuyruktan sürmeye başlar.
+Pi CAPS: bildirdikten sonra, bağlanırken (araç dururken) jiroskobu kalibre eder; bu yüzden
+"sür" tıklamasından ilk tekerlek hareketine kadar genelde yalnızca bir gidiş süresi geçer.
+Ofset GYRO_OFFSET_MAX_AGE_S'den eskiyse Pi MISSION_START'ta ilk hareketten önce yeniden kalibre eder.
+
+Mesajlar (satır sonlu, ':' ayraçlı):
+    PC -> Pi  MISSION_START:<görev>:<KAYNAK>
+              MISSION_CMDS:<görev>:<sıra>:<başlangıç indeksi>:<COMMANDS_BIN:... | COMMANDS:[...]>
+              MISSION_END:<görev>:<toplam komut>
+    Pi -> PC  MISSION_ACK:<görev>:<sıra>:<kuyruk uzunluğu>
+              MISSION_NAK:<görev>:<sıra>:<neden>
+              MISSION_END_NAK:<görev>:<neden>
+              MISSION_PROGRESS:<görev>:<başlayan komut indeksi>
+
+MISSION_CMDS başlangıç indeksi kuyruk uzunluğuna eşitse sona ekler, küçükse kuyruğun o
+noktadan sonrasını değiştirir (henüz başlamamış komutlar için). Değiştirme tek bir
+MISSION_CMDS ile gönderilir ki ya tamamı uygulansın ya hiçbiri. Her ekleme/değiştirmeden
+sonra PC yeni toplamla MISSION_END gönderir; reddedilen bir parçanın ardından gelen
+MISSION_END de parçanın reddedilme nedeniyle (STARTED veya GAP) MISSION_END_NAK ile reddedilir
+ve kuyruk eski haliyle sürmeye devam eder. Sıra numarası son uygulanandan büyük olmayan
+(yinelenen veya geç gelen) MISSION_CMDS SEQ nedeniyle reddedilir; kuyruk değişmez. Pi desteklediğini CAPS: içinde MISSION=1 ile bildirir;
+bildirmeyen Pi'ye eski CALIBRATE + COMMANDS: akışı kullanılır.
+
+Yalnızca standart kütüphane ve command_codec kullanır; Pi'de aynı klasöre kopyalanır.
+"""
+import json
+
+import command_codec
+
+MISSION_VERSION = 1
+CAPS_MISSION_KEY = "MISSION"
+
+# İlk parça küçük tutulur ki Pi hemen sürmeye başlasın; kalanı daha büyük parçalarla gelir.
+FIRST_CHUNK_SIZE = 2
+CHUNK_SIZE = 32
+
+START_PREFIX = "MISSION_START:"
+COMMANDS_PREFIX = "MISSION_CMDS:"
+END_PREFIX = "MISSION_END:"
+ACK_PREFIX = "MISSION_ACK:"
+NAK_PREFIX = "MISSION_NAK:"
+END_NAK_PREFIX = "MISSION_END_NAK:"
+PROGRESS_PREFIX = "MISSION_PROGRESS:"
+
+NAK_STARTED = "STARTED"          # değiştirilmek istenen komut zaten başladı
+NAK_GAP = "GAP"                  # başlangıç indeksi kuyruğun ötesinde
+NAK_FORMAT = "FORMAT"            # mesaj/komut çözülemedi
+NAK_NO_MISSION = "NO_MISSION"    # bu görev yürütülmüyor
+NAK_SEQ = "SEQ"                  # sıra numarası son uygulanandan büyük değil (yinelenen/geç gelen parça)
+
+
+def chunk_commands(commands, start=0, first_size=FIRST_CHUNK_SIZE, size=CHUNK_SIZE):
+    """commands'ı (başlangıç indeksi, parça) çiftlerine böler; indeksler start'tan sayılır."""
+    position = 0
+    chunk_size = first_size
+    while position < len(commands):
+        yield start + position, commands[position:position + chunk_size]
+        position += chunk_size
+        chunk_size = size
+
+
+def start_message(mission_id, source):
+    return f"{START_PREFIX}{mission_id}:{source.upper()}"
+
+
+def commands_message(mission_id, seq, start, commands, codec_version=None):
+    return f"{COMMANDS_PREFIX}{mission_id}:{seq}:{start}:{command_codec.encode_message(commands, codec_version)}"
+
+
+def end_message(mission_id, total):
+    return f"{END_PREFIX}{mission_id}:{total}"
+
+
+def ack_message(mission_id, seq, queue_length):
+    return f"{ACK_PREFIX}{mission_id}:{seq}:{queue_length}"
+
+
+def nak_message(mission_id, seq, reason):
+    return f"{NAK_PREFIX}{mission_id}:{seq}:{reason}"
+
+
+def end_nak_message(mission_id, reason):
+    return f"{END_NAK_PREFIX}{mission_id}:{reason}"
+
+
+def progress_message(mission_id, index):
+    return f"{PROGRESS_PREFIX}{mission_id}:{index}"
+
+
+def split_fields(message, prefix, count):
+    """prefix'ten sonraki ':' ayraçlı alanları döndürür; son alan kalan metnin tamamıdır."""
+    fields = message[len(prefix):].split(':', count - 1)
+    if len(fields) != count:
+        raise ValueError(f"Eksik alanlı görev mesajı: {message[:60]}")
+    return fields
+
+
+def parse_int_fields(message, prefix, count):
+    try:
+        return [int(field) for field in split_fields(message, prefix, count)]
+    except ValueError:
+        raise ValueError(f"Geçersiz görev mesajı: {message[:60]}")
+
+
+def decode_payload(payload):
+    """COMMANDS_BIN:... veya COMMANDS:[...] yükünü [(eylem, değer), ...] listesine çözer."""
+    if payload.startswith(command_codec.BINARY_PREFIX):
+        return command_codec.decode_binary_payload(payload[len(command_codec.BINARY_PREFIX):])
+    if not payload.startswith(command_codec.JSON_PREFIX):
+        raise ValueError("Bilinmeyen komut yükü biçimi.")
+    try:
+        parsed = json.loads(payload[len(command_codec.JSON_PREFIX):])
+    except json.JSONDecodeError:
+        raise ValueError("Komutlar JSON formatında değil.")
+    if not isinstance(parsed, list):
+        raise ValueError("Komutlar liste formatında değil.")
+    commands = []
+    for item in parsed:
+        if not (isinstance(item, list) and len(item) == 2 and item[0] in command_codec.OPCODES and
+                isinstance(item[1], int) and item[1] >= 0):
+            raise ValueError(f"Geçersiz komut: {item}")
+        commands.append((item[0], item[1]))
+    return commands
+
+
+def parse_commands_message(message):
+    """MISSION_CMDS: mesajı -> (görev, sıra, başlangıç, komutlar); bozuksa ValueError."""
+    mission_id, seq, start, payload = split_fields(message, COMMANDS_PREFIX, 4)
+    try:
+        mission_id, seq, start = int(mission_id), int(seq), int(start)
+    except ValueError:
+        raise ValueError(f"Geçersiz görev mesajı: {message[:60]}")
+    return mission_id, seq, start, decode_payload(payload)
+
+
+class MissionQueue:
+    """Pi tarafındaki görev kuyruğu: ekleme/kuyruk sonu değiştirme kuralları ve yürütme imleci."""
+
+    def __init__(self, mission_id):
+        self.mission_id = mission_id
+        self.commands = []
+        self.next_index = 0
+        self.total = None
+        self.last_seq = -1
+        self._rejection = None  # Son MISSION_END'den beri reddedilen güncellemenin NAK nedeni
+
+    def apply(self, seq, start, commands):
+        """start == uzunluk ise ekler, küçükse start'tan sonrasını değiştirir. Reddedilirse NAK nedeni, yoksa None.
+
+        Yinelenen veya geç gelen parça (seq <= last_seq) NAK_SEQ ile reddedilir; yeni parça zaten
+        uygulandığı için ardından gelen MISSION_END'i etkilemez.
+        """
+        if seq <= self.last_seq:
+            return NAK_SEQ
+        if start > len(self.commands) or start < self.next_index:
+            self._rejection = NAK_GAP if start > len(self.commands) else NAK_STARTED
+            return self._rejection
+        del self.commands[start:]
+        self.commands.extend(commands)
+        self.last_seq = seq
+        # Yeni toplam ayrı bir MISSION_END ile gelir; o zamana kadar görev bitmiş sayılmaz.
+        self.total = None
+        return None
+
+    def end(self, total):
+        """Arada bir güncelleme reddedildiyse onun nedeniyle NAK; toplam kuyruğa uymuyorsa NAK_GAP."""
+        if self._rejection is not None:
+            reason, self._rejection = self._rejection, None
+            return reason
+        if total < self.next_index or total > len(self.commands):
+            return NAK_GAP
+        del self.commands[total:]
+        self.total = total
+        return None
+
+    def take_next(self):
+        """Sıradaki (indeks, (eylem, değer)); kuyruk boşsa None."""
+        if self.next_index >= len(self.commands):
+            return None
+        index = self.next_index
+        self.next_index += 1
+        return index, self.commands[index]
+
+    def is_finished(self):
+        return self.total is not None and self.next_index >= self.total
@@ -0,0 +1,230 @@
+"""Yol arama karşılaştırması (süre ve genişletilen düğüm sayısı).
+
+Gerçek hattaki gibi bir maske üretilir: model ölçeğinde (128x128) sentetik labirentin
+iskeleti en yakın komşu ile kamera çözünürlüğüne büyütülür. Aynı başlangıç/bitiş
+çiftleri için maze_core.PATH_PLANNERS'taki tüm planlayıcılar ölçülür. İskelet grafı
+önceden kurulur (arayüzdeki gibi maske başına bir kez); kurulum süresi ayrıca yazılır.
+--scene arena, labirent yerine dikdörtgen engelli açık bir alan üretir (A*/JPS'nin
+öne çıktığı uzun düz koridorlar).
+
+--compare-bfs ile BFS çekirdekleri (eski yol kopyalayan BFS, düz dizili BFS ve çift yönlü
+BFS) süre ve tepe bellek (tracemalloc) açısından karşılaştırılır.
+
+--mission ile planlayıcılar üretilen Pi komutlarının tahmini görev süresi, dönüş sayısı ve
+komutlar birebir uygulandığında hedefe kalan mesafe (ölü hesap) ile karşılaştırılır.
+
+Kullanım:
+    python pathfinding_benchmark.py --resolutions 1920x1080 3840x2160 --pairs 5
+    python pathfinding_benchmark.py --scene arena --resolutions 1920x1080 --pairs 5
+    python pathfinding_benchmark.py --compare-bfs --resolutions 1920x1080 3840x2160 --pairs 3
+    python pathfinding_benchmark.py --mission --planners bfs astar drive-time --scene arena
+    python pathfinding_benchmark.py --mission --planners bfs jps --simplify axis-rdp
+"""
+import argparse
+import statistics
+import time
+import tracemalloc
+from collections import deque
+
+import cv2
+import numpy as np
+
+import drive_time
+import maze_core
+import skeleton_graph
+import skeletonization
+
+MODEL_SCALE = 128
+
+
+def synthetic_bfs_mask(width, height, cells=16, seed=0):
+    """Model ölçeğindeki iskeletin orijinal ölçeğe büyütülmüş hali (mask_for_bfs_and_clicking_ORIG_SCALE gibi)."""
+    corridors = skeletonization._synthetic_maze_mask(MODEL_SCALE, cells=cells, seed=seed)
+    skeleton = skeletonization.skeletonize(corridors)
+    return cv2.resize(skeleton, (width, height), interpolation=cv2.INTER_NEAREST)
+
+
+def synthetic_arena_mask(width, height, obstacles=12, seed=0):
+    """Açık alan: kenarları duvar, içinde rastgele dikdörtgen engeller."""
+    rng = np.random.default_rng(seed)
+    mask = np.ones((height, width), dtype=np.uint8)
+    mask[[0, -1], :] = 0
+    mask[:, [0, -1]] = 0
+    for _ in range(obstacles):
+        h, w = int(rng.integers(height // 10, height // 3)), int(rng.integers(width // 30, width // 15))
+        if rng.random() < 0.5:
+            h, w = w, h
+        y, x = int(rng.integers(0, height - h)), int(rng.integers(0, width - w))
+        mask[y:y + h, x:x + w] = 0
+    return mask
+
+
+SCENES = {
+    'maze': synthetic_bfs_mask,
+    'arena': synthetic_arena_mask,
+}
+
+
+def random_pairs(mask_01, count, seed=0):
+    rng = np.random.default_rng(seed)
+    ys, xs = np.nonzero(mask_01)
+    picks = rng.choice(ys.size, size=(count, 2), replace=False)
+    return [((int(ys[a]), int(xs[a])), (int(ys[b]), int(xs[b]))) for a, b in picks]
+
+
+def _time_planner(planner, mask_01, pairs, repeats):
+    timings, expansions, lengths = [], [], []
+    for start, end in pairs:
+        for _ in range(repeats):
+            report = []
+            started = time.perf_counter()
+            path = planner(mask_01, start, end, report)
+            timings.append((time.perf_counter() - started) * 1000.0)
+        expansions.append(sum(level['expanded'] for level in report))
+        lengths.append(len(path) if path else 0)
+    return timings, expansions, lengths
+
+
+def benchmark(resolutions, pair_count=5, repeats=1, scene='maze'):
+    print(f"{'Çözünürlük':>11} {'Yöntem':<15} {'ms (medyan)':>12} {'Düğüm (medyan)':>15} {'Yol uzunluğu':>13}")
+    for width, height in resolutions:
+        mask = SCENES[scene](width, height)
+        pairs = random_pairs(mask, pair_count)
+        graph, _ = skeleton_graph.graph_for_mask(mask)
+        print(f"{'':>11}   İskelet grafı: {len(graph.nodes)} düğüm, {len(graph.edges)} kenar, "
+              f"kurulum {graph.build_ms:.0f} ms")
+        baseline_lengths = None
+        for name in maze_core.PATH_PLANNERS:
+            planner = lambda grid, start, end, report, name=name: maze_core.find_path(grid, start, end, name, report)
+            timings, expansions, lengths = _time_planner(planner, mask, pairs, repeats)
+            if baseline_lengths is None:
+                baseline_lengths = lengths
+            ratio = statistics.mean(l / b for l, b in zip(lengths, baseline_lengths) if b)
+            print(f"{f'{width}x{height}':>11} {name:<15} {statistics.median(timings):>12.1f} "
+                  f"{int(statistics.median(expansions)):>15} {f'x{ratio:.3f}':>13}")
+        report = []
+        maze_core.find_path_multires(mask, pairs[0][0], pairs[0][1], report=report)
+        for line in maze_core.format_planner_report(report):
+            print(f"{'':>11}   {line}")
+
+
+def legacy_find_path_bfs(grid, start_node, end_node):
+    """Eski BFS (her kuyruk girdisinde yolun tam kopyası, demet kümesiyle ziyaret); yalnızca karşılaştırma için."""
+    rows, cols = grid.shape
+    queue = deque([(start_node, [start_node])])
+    visited_nodes = {start_node}
+    possible_moves = [(0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1)]
+    while queue:
+        (current_node, current_path) = queue.popleft()
+        if current_node == end_node:
+            return current_path
+        for dr, dc in possible_moves:
+            next_r, next_c = current_node[0] + dr, current_node[1] + dc
+            neighbor_node = (next_r, next_c)
+            if 0 <= next_r < rows and 0 <= next_c < cols and \
+               grid[next_r, next_c] == 1 and neighbor_node not in visited_nodes:
+                visited_nodes.add(neighbor_node)
+                new_path = list(current_path)
+                new_path.append(neighbor_node)
+                queue.append((neighbor_node, new_path))
+    return None
+
+
+BFS_ENGINES = {
+    'eski': legacy_find_path_bfs,
+    'düz dizi': lambda grid, start, end: maze_core.find_path_bfs(grid, start, end),
+    'çift yönlü': lambda grid, start, end: maze_core.find_path_bfs(grid, start, end, bidirectional=True),
+}
+
+
+def compare_bfs_engines(resolutions, pair_count=3):
+    """Her çift için süre ve tepe bellek; tracemalloc ölçümü süreyi etkilemesin diye ayrı çalıştırılır."""
+    print(f"{'Çözünürlük':>11} {'BFS':<11} {'ms (medyan)':>12} {'Tepe MB (medyan)':>17} {'Aynı yol':>9} {'Aynı uzunluk':>13}")
+    for width, height in resolutions:
+        mask = synthetic_bfs_mask(width, height)
+        pairs = random_pairs(mask, pair_count)
+        reference_paths = None
+        for name, engine in BFS_ENGINES.items():
+            timings, peaks, paths = [], [], []
+            for start, end in pairs:
+                started = time.perf_counter()
+                paths.append(engine(mask, start, end))
+                timings.append((time.perf_counter() - started) * 1000.0)
+                tracemalloc.start()
+                engine(mask, start, end)
+                peaks.append(tracemalloc.get_traced_memory()[1] / (1024 * 1024))
+                tracemalloc.stop()
+            if reference_paths is None:
+                reference_paths = paths
+            same = sum(1 for a, b in zip(paths, reference_paths) if a == b)
+            same_length = sum(1 for a, b in zip(paths, reference_paths) if len(a or ()) == len(b or ()))
+            print(f"{f'{width}x{height}':>11} {name:<11} {statistics.median(timings):>12.1f} "
+                  f"{statistics.median(peaks):>17.1f} {f'{same}/{len(pairs)}':>9} {f'{same_length}/{len(pairs)}':>13}")
+
+
+def _initial_heading(simplified_path):
+    (y0, x0), (y1, x1) = simplified_path[0], simplified_path[1]
+    _, _, dy, dx = maze_core._segment_forward_command(y1 - y0, x1 - x0)
+    return drive_time.HEADINGS.index((int(dy), int(dx)))
+
+
+def compare_mission_time(resolutions, pair_count=5, scene='maze', planners=maze_core.PATH_PLANNERS,
+                         image_source='camera', simplify_mode=None):
+    """Çift başına tahmini görev süresi, dönüş sayısı ve ölü hesapla hedef hatası (medyanlar)."""
+    time_model = drive_time.time_model_for_source(image_source)
+    print(f"{'Çözünürlük':>11} {'Yöntem':<15} {'Görev s (medyan)':>17} {'Dönüş (medyan)':>15} "
+          f"{'Hedef hatası px (medyan)':>25} {'ms (medyan)':>12}")
+    for width, height in resolutions:
+        mask = SCENES[scene](width, height)
+        pairs = random_pairs(mask, pair_count)
+        for name in planners:
+            durations, turns, errors, timings = [], [], [], []
+            for start, end in pairs:
+                started = time.perf_counter()
+                solution = maze_core.solve_path(mask, start, end, verbose=False, planner=name, time_model=time_model,
+                                                simplify_mode=simplify_mode)
+                timings.append((time.perf_counter() - started) * 1000.0)
+                if solution is None or len(solution['simplified_path']) < 2:
+                    continue
+                commands = solution['commands_for_pi']
+                durations.append(solution['estimated_mission_s'])
+                turns.append(sum(1 for action, _ in commands if action in maze_core.TURN_ACTIONS))
+                final_y, final_x = drive_time.dead_reckon(commands, start, _initial_heading(solution['simplified_path']))
+                errors.append(float(np.hypot(final_y - end[0], final_x - end[1])))
+            if not durations:
+                print(f"{f'{width}x{height}':>11} {name:<15} {'yol yok':>17}")
+                continue
+            print(f"{f'{width}x{height}':>11} {name:<15} {statistics.median(durations):>17.1f} "
+                  f"{statistics.median(turns):>15.1f} {statistics.median(errors):>25.1f} "
+                  f"{statistics.median(timings):>12.1f}")
+
+
+def _parse_resolution(text):
+    width, height = text.lower().split('x')
+    return int(width), int(height)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Yol arama karşılaştırması")
+    parser.add_argument('--resolutions', type=_parse_resolution, nargs='+', default=[(1920, 1080)])
+    parser.add_argument('--pairs', type=int, default=5, help="Rastgele başlangıç/bitiş çifti sayısı")
+    parser.add_argument('--repeats', type=int, default=1)
+    parser.add_argument('--scene', choices=tuple(SCENES), default='maze')
+    parser.add_argument('--compare-bfs', action='store_true',
+                        help="Eski ve yeni BFS çekirdeklerini süre ve tepe bellekle karşılaştır")
+    parser.add_argument('--mission', action='store_true',
+                        help="Planlayıcıları tahmini görev süresi ve hedef hatasıyla karşılaştır")
+    parser.add_argument('--planners', nargs='+', choices=maze_core.PATH_PLANNERS, default=list(maze_core.PATH_PLANNERS))
+    parser.add_argument('--image-source', choices=tuple(drive_time.ADIM_KAZANCI), default='camera')
+    parser.add_argument('--simplify', choices=maze_core.SIMPLIFY_MODES, default=maze_core.DEFAULT_SIMPLIFY_MODE)
+    args = parser.parse_args()
+    if args.compare_bfs:
+        compare_bfs_engines(args.resolutions, args.pairs)
+    elif args.mission:
+        compare_mission_time(args.resolutions, args.pairs, args.scene, args.planners, args.image_source, args.simplify)
+    else:
+        benchmark(args.resolutions, args.pairs, args.repeats, args.scene)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,9 +4,30 @@ import time
 import smbus
 import math
 import socket
+import codecs
 import json # Komutları JSON formatında almak için
+import queue
+import threading
 import traceback
 
+try:
+    import command_codec # İkili COMMANDS_BIN kodlaması (PC ile ortak modül, aynı klasöre kopyalanır)
+    COMMAND_CODEC_AVAILABLE = True
+except ImportError:
+    COMMAND_CODEC_AVAILABLE = False
+
+try:
+    import mission_stream # Akışlı görev protokolü (PC ile ortak modül, aynı klasöre kopyalanır)
+    MISSION_STREAM_AVAILABLE = COMMAND_CODEC_AVAILABLE
+except ImportError:
+    MISSION_STREAM_AVAILABLE = False
+
+try:
+    import link_health # Kalp atışı ve RTT ölçümü (PC ile ortak modül, aynı klasöre kopyalanır)
+    LINK_HEALTH_AVAILABLE = True
+except ImportError:
+    LINK_HEALTH_AVAILABLE = False
+
 # ============ MPU6050 Ayarları ============ #
 MPU6050_ADDR = 0x68
 PWR_MGMT_1 = 0x6B
@@ -50,12 +71,21 @@ current_adim_kazanci_b = ADIM_KAZANCI_CAMERA_B
 
 FORWARD_DURATION_PER_STEP = 0.1 # Bu, ADIM_KAZANCI ile çarpılan adıma karşılık gelen süre
 DELAY_BETWEEN_COMMANDS = 0.2
+MISSION_POLL_TIMEOUT = 0.02 # Görev kuyruğu boşken bir sonraki parça için bekleme süresi
+# Jiroskop sıfır kayması sıcaklıkla değişir; bundan eski ofsetle akışlı görev başlamadan önce yeniden kalibre edilir.
+GYRO_OFFSET_MAX_AGE_S = 300.0
 LED_PIN = 26
 
 SERVER_HOST = '192.168.137.1' # PC'nizin IP adresini buraya girin (veya 0.0.0.0)
 SERVER_PORT = 65432
 client_socket = None
 connected_to_server = False
+message_receiver = None # Soketi arka planda okuyan MessageReceiver (bağlantı başına bir tane)
+stop_requested = threading.Event() # STOP gelince alıcı thread'i kurar; hareket beklemeleri bunu bekler
+RECEIVE_POLL_TIMEOUT = 0.5 # Alıcı thread'in kapatılma isteğini fark etme süresi
+send_lock = threading.Lock() # Ana döngü ile kalp atışı/PONG gönderen thread'ler aynı sokete yazar
+LINK_DISPLAY_INTERVAL = 0.2 # Bağlantı özet satırının en sık yenilenme aralığı
+last_link_display_time = 0.0
 
 pwm_m1, pwm_m2, pwm_m3, pwm_m4 = None, None, None, None
 pwm_led = None
@@ -65,6 +95,7 @@ led_pwm_initialized = False
 direction_pins = [M1_IN1, M1_IN2, M2_IN3, M2_IN4, M3_IN1, M3_IN2, M4_IN3, M4_IN4]
 pwm_hardware_pins = [PWM_M1_PIN, PWM_M2_PIN, PWM_M3_PIN, PWM_M4_PIN]
 offset_x = 0.0 # turn_pid içinde kullanılacak global kalibrasyon ofseti
+offset_x_time = None # offset_x'in ölçüldüğü an (time.monotonic); hiç ölçülmediyse None
 current_image_source_on_pi = "CAMERA" # PC'den gelen görüntü kaynağını saklamak için (varsayılan)
 
 def initialize_mpu(stdscr):
@@ -99,8 +130,8 @@ def get_gyro_x():
     gx_raw = read_raw_data(GYRO_XOUT_H)
     return gx_raw / 131.0
 
-def calibrate_gyro_x(stdscr, duration=2.0):
-    global offset_x
+def calibrate_gyro_x(stdscr, duration=2.0, result_display_s=2.0):
+    global offset_x, offset_x_time
     if not mpu_initialized:
         stdscr.clear()
         stdscr.addstr(0,0, "MPU6050 başlatılmadığı için kalibrasyon yapılamıyor.")
@@ -122,9 +153,10 @@ def calibrate_gyro_x(stdscr, duration=2.0):
         time.sleep(0.01)
 
     offset_x = total_x_val / samples
+    offset_x_time = time.monotonic()
     stdscr.addstr(2, 0, f"Kalibrasyon tamamlandı. Ofset X: {offset_x:.2f} dps")
     stdscr.refresh()
-    time.sleep(2)
+    time.sleep(result_display_s)
     return offset_x
 
 def setup_gpio_pins():
@@ -279,6 +311,10 @@ def turn_pid(stdscr, target_relative_angle, gyro_offset_param):
     min_consecutive_for_stop = 5
 
     while (time.time() - start_time) < TURN_TIMEOUT:
+        if stop_requested.is_set():
+            stdscr.addstr(9, 0, "STOP alındı, dönüş kesiliyor...".ljust(curses.COLS-1 if curses.COLS > 0 else 60))
+            stdscr.refresh()
+            break
         current_time = time.time()
         dt = current_time - prev_time
         prev_time = current_time
@@ -325,19 +361,100 @@ def turn_pid(stdscr, target_relative_angle, gyro_offset_param):
     final_message = f"Dönüş tamamlandı. Son Açı: {angle_turned_this_turn:.2f}° (Hata: {error:.2f}°)"
     stdscr.addstr(9, 0, final_message.ljust(curses.COLS-1 if curses.COLS > 0 else 60))
     stdscr.refresh()
-    time.sleep(1.5)
+    stop_requested.wait(1.5)
     return angle_turned_this_turn
 
+class MessageReceiver:
+    """Soketi arka planda okur ve satırları gelen kutusuna koyar; komut yürütme hiçbir zaman sokette beklemez.
+
+    STOP satırı kutuya konmadan önce stop_requested'ı kurar, böylece süren ileri hareket
+    beklemesi veya turn_pid döngüsü milisaniyeler içinde kesilir. Bağlantı kapanınca kutuya
+    None konur. PING/PONG kutuya konmaz, bu thread'de yanıtlanır; PC'nin ilk PING'inden
+    sonra Pi de kendi kalp atışlarını gönderir.
+    """
+    def __init__(self, sock):
+        self.sock = sock
+        self.inbox = queue.Queue()
+        self.closed_reason = None
+        self._closed = threading.Event()
+        self._running = True
+        self.link = link_health.LinkMonitor() if LINK_HEALTH_AVAILABLE else None
+        self.heartbeat_thread = None
+        self.thread = threading.Thread(target=self._receive_loop, daemon=True)
+        self.thread.start()
+
+    def _handle_heartbeat(self, line):
+        # Yanıt motor hareketini beklemez; ölçülen RTT ana döngünün değil ağın gecikmesidir.
+        try:
+            if line.startswith(link_health.PING_PREFIX):
+                send_message(self.sock, self.link.answer(line), None)
+                if self.heartbeat_thread is None:
+                    self.heartbeat_thread = threading.Thread(target=self._heartbeat_loop, daemon=True)
+                    self.heartbeat_thread.start()
+            else:
+                self.link.record_pong(line)
+        except ValueError:
+            pass
+
+    def _heartbeat_loop(self):
+        while self._running and not self._closed.is_set():
+            send_message(self.sock, self.link.next_ping(), None)
+            if self._closed.wait(link_health.HEARTBEAT_INTERVAL_S):
+                break
+
+    def _receive_loop(self):
+        buffer = ""
+        # İki recv() arasında bölünen çok baytlı UTF-8 karakterleri bir sonraki parçayı bekler.
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        while self._running:
+            try:
+                data = self.sock.recv(4096)
+                if not data:
+                    self.closed_reason = "Sunucu bağlantıyı kapattı."
+                    break
+                buffer += decoder.decode(data)
+            except socket.timeout:
+                continue
+            except ConnectionResetError:
+                self.closed_reason = "Bağlantı sıfırlandı."
+                break
+            except Exception as e:
+                # Geçersiz UTF-8 dahil: thread sessizce ölmesin, kapanış bildirilsin.
+                self.closed_reason = f"Alma hatası: {e}"
+                break
+            while "\n" in buffer:
+                line, buffer = buffer.split("\n", 1)
+                line = line.strip()
+                if line == "STOP":
+                    stop_requested.set()
+                elif self.link is not None and line.startswith((link_health.PING_PREFIX, link_health.PONG_PREFIX)):
+                    self._handle_heartbeat(line)
+                    continue
+                self.inbox.put(line)
+        self._closed.set()
+        self.inbox.put(None)
+
+    def is_closed(self):
+        return self._closed.is_set()
+
+    def close(self):
+        self._running = False
+
 def connect_to_server(stdscr, host, port):
-    global client_socket, connected_to_server
+    global client_socket, connected_to_server, message_receiver
     s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     s.settimeout(5)
     try:
         stdscr.addstr(0, 0, f"{host}:{port} adresine bağlanılıyor...")
         stdscr.refresh()
         s.connect((host, port))
+        s.settimeout(RECEIVE_POLL_TIMEOUT)
+        # Küçük satırlar (PONG, MISSION_PROGRESS) Nagle + gecikmeli ACK yüzünden ~40 ms bekletilmesin.
+        s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
         client_socket = s
         connected_to_server = True
+        stop_requested.clear()
+        message_receiver = MessageReceiver(s)
         stdscr.addstr(0, 0, f"{host}:{port} adresine başarıyla bağlandı! LED %50 PWM.")
         if led_pwm_initialized and pwm_led:
             pwm_led.ChangeDutyCycle(50)
@@ -357,7 +474,8 @@ def connect_to_server(stdscr, host, port):
 def send_message(sock, message, stdscr):
     try:
         if sock:
-            sock.sendall((message + "\n").encode('utf-8'))
+            with send_lock:
+                sock.sendall((message + "\n").encode('utf-8'))
             return True
     except Exception as e:
         if stdscr:
@@ -369,37 +487,42 @@ def send_message(sock, message, stdscr):
         return False
     return False
 
-def receive_message(sock, stdscr):
+def draw_link_status(stdscr, force=False):
+    """Kalp atışı özetini (RTT yüzdelikleri, titreşim, saat farkı) alttan dördüncü satıra yazar."""
+    global last_link_display_time
+    if not stdscr or message_receiver is None or message_receiver.link is None:
+        return
+    now = time.time()
+    if not force and now - last_link_display_time < LINK_DISPLAY_INTERVAL:
+        return
+    last_link_display_time = now
+    text = link_health.format_summary(message_receiver.link.snapshot())
+    width = curses.COLS - 1 if curses.COLS > 0 else 60
+    stdscr.addstr(curses.LINES - 4, 0, text[:width].ljust(width))
+    stdscr.refresh()
+
+def receive_message(sock, stdscr, timeout=1.0):
+    """Gelen kutusundan bir satır; timeout içinde yoksa "TIMEOUT", bağlantı kapandıysa None. timeout=0 beklemez."""
     global connected_to_server
+    if not sock or message_receiver is None:
+        return None
+    draw_link_status(stdscr)
     try:
-        if sock:
-            sock.settimeout(1.0)
-            data = sock.recv(4096)
-            if not data:
-                connected_to_server = False
-                if pwm_led: pwm_led.ChangeDutyCycle(0)
-                if stdscr:
-                    stdscr.addstr(curses.LINES - 2, 0, "Sunucu bağlantıyı kapattı.".ljust(curses.COLS-1 if curses.COLS > 0 else 60))
-                    stdscr.refresh()
-                return None
-            return data.decode('utf-8').strip()
-    except socket.timeout:
+        if timeout > 0:
+            message = message_receiver.inbox.get(timeout=timeout)
+        else:
+            message = message_receiver.inbox.get_nowait()
+    except queue.Empty:
         return "TIMEOUT"
-    except ConnectionResetError:
+    if message is None:
+        message_receiver.inbox.put(None) # Sonraki çağrılar da kopukluğu görsün
         connected_to_server = False
         if pwm_led: pwm_led.ChangeDutyCycle(0)
         if stdscr:
-            stdscr.addstr(curses.LINES - 2, 0, "Bağlantı sıfırlandı.".ljust(curses.COLS-1 if curses.COLS > 0 else 60))
+            stdscr.addstr(curses.LINES - 2, 0, f"{message_receiver.closed_reason}".ljust(curses.COLS-1 if curses.COLS > 0 else 60))
             stdscr.refresh()
         return None
-    except Exception as e:
-        connected_to_server = False
-        if pwm_led: pwm_led.ChangeDutyCycle(0)
-        if stdscr:
-            stdscr.addstr(curses.LINES - 2, 0, f"Alma hatası: {e}".ljust(curses.COLS-1 if curses.COLS > 0 else 60))
-            stdscr.refresh()
-        return None
-    return None
+    return message
 
 def perform_stop_and_cleanup(stdscr_ref, main_socket, from_exception=False):
     global connected_to_server, client_socket, pwm_led, mpu_initialized, pwm_initialized, led_pwm_initialized
@@ -410,6 +533,8 @@ def perform_stop_and_cleanup(stdscr_ref, main_socket, from_exception=False):
         stdscr_ref.refresh()
 
     motor_durdur()
+    if message_receiver:
+        message_receiver.close()
 
     if pwm_led:
         pwm_led.ChangeDutyCycle(0)
@@ -462,8 +587,8 @@ def led_celebrate_pattern(stdscr, sock_ref, duration_sec=10, interval=0.2):
 
     while time.time() - start_time < duration_sec:
         if sock_ref:
-            message = receive_message(sock_ref, stdscr)
-            if message == "STOP":
+            message = receive_message(sock_ref, stdscr, timeout=0)
+            if message == "STOP" or stop_requested.is_set():
                 if stdscr: stdscr.addstr(11, 0, "Kutlama sırasında STOP alındı!".ljust(curses.COLS-1 if curses.COLS >0 else 60)); stdscr.refresh()
                 stop_received_during_celebration = True
                 break
@@ -474,7 +599,7 @@ def led_celebrate_pattern(stdscr, sock_ref, duration_sec=10, interval=0.2):
 
         pwm_led.ChangeDutyCycle(100 if on else 0)
         on = not on
-        time.sleep(interval)
+        stop_requested.wait(interval)
 
     pwm_led.ChangeDutyCycle(0)
     if stdscr and not stop_received_during_celebration:
@@ -502,7 +627,7 @@ def parse_commands(command_str, stdscr):
             
             # ileri_a ve ileri_b komutlarını da kabul et
             if not isinstance(action, str) or not isinstance(value, int) or \
-               not (action in ["ileri_a", "ileri_b", "sola_don", "saga_don"]): # "ileri" kaldırıldı, yerine a/b geldi
+               not (action in ["ileri_a", "ileri_b", "sola_don", "saga_don", "bekle"]): # "ileri" kaldırıldı, yerine a/b geldi
                 stdscr.addstr(12, 0, f"Hata: Geçersiz komut tipi/eylemi: {action}, {value}".ljust(curses.COLS-1 if curses.COLS >0 else 60))
                 stdscr.refresh()
                 return None
@@ -517,6 +642,171 @@ def parse_commands(command_str, stdscr):
         stdscr.refresh()
         return None
 
+def parse_binary_commands(payload, stdscr):
+    if not COMMAND_CODEC_AVAILABLE:
+        stdscr.addstr(12, 0, "Hata: command_codec bulunamadı, ikili komutlar çözülemiyor.".ljust(curses.COLS-1 if curses.COLS >0 else 60))
+        stdscr.refresh()
+        return None
+    try:
+        return command_codec.decode_binary_payload(payload)
+    except ValueError as e:
+        stdscr.addstr(12, 0, f"Hata: {e}".ljust(curses.COLS-1 if curses.COLS >0 else 60))
+        stdscr.refresh()
+        return None
+
+def apply_image_source(source):
+    global current_image_source_on_pi, current_adim_kazanci_a, current_adim_kazanci_b
+    current_image_source_on_pi = source.upper() if source else "UNKNOWN"
+    if current_image_source_on_pi == "GALLERY":
+        current_adim_kazanci_a = ADIM_KAZANCI_GALLERY_A
+        current_adim_kazanci_b = ADIM_KAZANCI_GALLERY_B
+    else: # Varsayılan olarak, "CAMERA" veya bilinmeyen kaynak için
+        current_adim_kazanci_a = ADIM_KAZANCI_CAMERA_A
+        current_adim_kazanci_b = ADIM_KAZANCI_CAMERA_B
+
+def execute_command(stdscr, action, value, gyro_offset_for_turns):
+    """Tek bir komutu sürer; dönüşlerde ölçülen açıyı, diğerlerinde 0 döndürür."""
+    current_action_message = f"İşleniyor: {action}"
+    effective_steps = 0
+    selected_kazanc = 0
+    angle_this_turn = 0.0
+
+    if action == "ileri_a":
+        selected_kazanc = current_adim_kazanci_a
+        effective_steps = value * selected_kazanc
+        current_action_message += f" (Yatay {value}x{selected_kazanc:.3f}={effective_steps:.0f} adım)"
+    elif action == "ileri_b":
+        selected_kazanc = current_adim_kazanci_b
+        effective_steps = value * selected_kazanc
+        current_action_message += f" (Dikey {value}x{selected_kazanc:.3f}={effective_steps:.0f} adım)"
+    elif "don" in action:
+        current_action_message += " (90 derece)"
+    elif action == "bekle":
+        current_action_message += f" ({value / 1000.0:.1f}s, filo çizelgesi)"
+
+    stdscr.move(3,0); stdscr.clrtoeol()
+    stdscr.addstr(3, 0, current_action_message.ljust(curses.COLS-1 if curses.COLS >0 else 60))
+    stdscr.refresh()
+
+    if action == "ileri_a" or action == "ileri_b":
+        duration = FORWARD_DURATION_PER_STEP * effective_steps
+        status_msg = f"İleri hareket ({duration:.1f}s, Hız: {FORWARD_SPEED}%)..."
+        stdscr.move(4,0); stdscr.clrtoeol()
+        stdscr.addstr(4, 0, status_msg.ljust(curses.COLS-1 if curses.COLS >0 else 60)); stdscr.refresh()
+        set_motor_action(action, FORWARD_SPEED) # action 'ileri_a' veya 'ileri_b' olabilir, set_motor_action bunu 'forward' gibi ele alır
+        interrupted = stop_requested.wait(duration) # STOP gelirse süre dolmadan uyanır
+        motor_durdur()
+        stdscr.move(4,0); stdscr.clrtoeol()
+        if interrupted:
+            stdscr.addstr(4, 0, "STOP alındı, ileri hareket kesildi.".ljust(curses.COLS-1 if curses.COLS >0 else 60))
+        else:
+            stdscr.addstr(4, 0, f"İleri hareket tamamlandı ({duration:.1f}s).".ljust(curses.COLS-1 if curses.COLS >0 else 60))
+        stdscr.refresh()
+
+    elif action == "sola_don":
+        if mpu_initialized:
+            angle_this_turn = turn_pid(stdscr, 90.0, gyro_offset_for_turns)
+        else:
+            stdscr.addstr(4, 0, "MPU yok, sola dönüş atlandı.".ljust(curses.COLS-1 if curses.COLS >0 else 60)); stdscr.refresh(); time.sleep(1)
+        motor_durdur()
+
+    elif action == "saga_don":
+        if mpu_initialized:
+            angle_this_turn = turn_pid(stdscr, -90.0, gyro_offset_for_turns)
+        else:
+            stdscr.addstr(4, 0, "MPU yok, sağa dönüş atlandı.".ljust(curses.COLS-1 if curses.COLS >0 else 60)); stdscr.refresh(); time.sleep(1)
+        motor_durdur()
+
+    elif action == "bekle":
+        # Filo çizelgesinde başka bir aracın yolu açması beklenir; STOP gelirse erken biter.
+        stdscr.move(4,0); stdscr.clrtoeol()
+        stdscr.addstr(4, 0, f"Bekleniyor ({value / 1000.0:.1f}s)...".ljust(curses.COLS-1 if curses.COLS >0 else 60)); stdscr.refresh()
+        stop_requested.wait(value / 1000.0)
+    else:
+        stdscr.move(4,0); stdscr.clrtoeol()
+        stdscr.addstr(4, 0, f"Bilinmeyen komut: {action}".ljust(curses.COLS-1 if curses.COLS >0 else 60))
+        stdscr.refresh()
+    return angle_this_turn
+
+def complete_sequence(stdscr):
+    """SEQUENCE_DONE gönderir ve kutlar; kutlama sırasında STOP alınırsa True döndürür."""
+    stdscr.move(11,0); stdscr.clrtoeol()
+    stdscr.addstr(11, 0, "Tüm komutlar tamamlandı.".ljust(curses.COLS-1 if curses.COLS >0 else 60))
+    send_message(client_socket, "SEQUENCE_DONE", stdscr)
+    stdscr.refresh()
+    return led_celebrate_pattern(stdscr, client_socket)
+
+def handle_mission_message(stdscr, mission_queue, message):
+    """Görev sırasında gelen MISSION_CMDS/MISSION_END mesajını kuyruğa uygular ve ACK/NAK gönderir."""
+    if message.startswith(mission_stream.COMMANDS_PREFIX):
+        try:
+            mission_id, seq, start, commands = mission_stream.parse_commands_message(message)
+        except ValueError as e:
+            stdscr.addstr(12, 0, f"Hata: {e}".ljust(curses.COLS-1 if curses.COLS >0 else 60)); stdscr.refresh()
+            send_message(client_socket, mission_stream.nak_message(mission_queue.mission_id, -1, mission_stream.NAK_FORMAT), stdscr)
+            return
+        if mission_id != mission_queue.mission_id:
+            send_message(client_socket, mission_stream.nak_message(mission_id, seq, mission_stream.NAK_NO_MISSION), stdscr)
+            return
+        reason = mission_queue.apply(seq, start, commands)
+        if reason:
+            send_message(client_socket, mission_stream.nak_message(mission_id, seq, reason), stdscr)
+        else:
+            send_message(client_socket, mission_stream.ack_message(mission_id, seq, len(mission_queue.commands)), stdscr)
+    elif message.startswith(mission_stream.END_PREFIX):
+        try:
+            mission_id, total = mission_stream.parse_int_fields(message, mission_stream.END_PREFIX, 2)
+        except ValueError as e:
+            stdscr.addstr(12, 0, f"Hata: {e}".ljust(curses.COLS-1 if curses.COLS >0 else 60)); stdscr.refresh()
+            return
+        reason = mission_queue.end(total) if mission_id == mission_queue.mission_id else mission_stream.NAK_NO_MISSION
+        if reason:
+            send_message(client_socket, mission_stream.end_nak_message(mission_id, reason), stdscr)
+    elif message:
+        stdscr.addstr(12, 0, f"Görev sırasında yok sayıldı: {message[:40]}".ljust(curses.COLS-1 if curses.COLS >0 else 60))
+        stdscr.refresh()
+
+def run_mission(stdscr, mission_id):
+    """Parçalar geldikçe kuyruğa alır, kuyruktan sürer. "DONE", "STOP" veya "DISCONNECTED" döndürür."""
+    mission_queue = mission_stream.MissionQueue(mission_id)
+    gyro_offset_for_turns = offset_x
+    current_total_angle_estimate = 0.0
+    stdscr.clear()
+    stdscr.addstr(0, 0, f"Görev {mission_id}: akışlı komutlar yürütülüyor...")
+    stdscr.refresh()
+
+    while True:
+        # Kuyrukta sürülecek komut varsa beklenmez; yoksa sıradaki parça için kısa süre beklenir.
+        wait = 0 if mission_queue.next_index < len(mission_queue.commands) else MISSION_POLL_TIMEOUT
+        while True:
+            message = receive_message(client_socket, stdscr, timeout=wait)
+            if message is None:
+                return "DISCONNECTED"
+            if message == "TIMEOUT":
+                break
+            if message == "STOP":
+                return "STOP"
+            handle_mission_message(stdscr, mission_queue, message)
+            wait = 0
+
+        if mission_queue.is_finished():
+            return "DONE"
+        next_item = mission_queue.take_next()
+        if next_item is None:
+            continue
+        index, (action, value) = next_item
+        if index > 0 and stop_requested.wait(DELAY_BETWEEN_COMMANDS):
+            return "STOP"
+        send_message(client_socket, mission_stream.progress_message(mission_id, index), stdscr)
+        total_text = str(mission_queue.total) if mission_queue.total is not None else f"{len(mission_queue.commands)}+"
+        stdscr.move(1,0); stdscr.clrtoeol()
+        stdscr.addstr(1, 0, f"Komut: {index + 1}/{total_text}".ljust(curses.COLS-1 if curses.COLS >0 else 60))
+        stdscr.move(2,0); stdscr.clrtoeol()
+        stdscr.addstr(2, 0, f"Toplam Tahmini Yön: {current_total_angle_estimate:.2f}° (Ofset: {gyro_offset_for_turns:.2f})".ljust(curses.COLS-1 if curses.COLS >0 else 60))
+        current_total_angle_estimate += execute_command(stdscr, action, value, gyro_offset_for_turns)
+        if stop_requested.is_set():
+            return "STOP"
+
 def main_loop(stdscr):
     global client_socket, connected_to_server, mpu_initialized, pwm_initialized, led_pwm_initialized
     global offset_x, current_image_source_on_pi
@@ -544,9 +834,26 @@ def main_loop(stdscr):
                 stdscr.refresh()
                 time.sleep(5)
                 continue
+            send_message(client_socket, f"VEHICLE:{socket.gethostname()}", stdscr) # PC araç listesinde bu adla görünür
+            caps = {}
+            if MISSION_STREAM_AVAILABLE:
+                # MPU yoksa MISSION bildirilmez ve PC eski CALIBRATE akışını kullanır.
+                if not mpu_initialized:
+                    initialize_mpu(stdscr)
+                if mpu_initialized:
+                    caps[mission_stream.CAPS_MISSION_KEY] = (mission_stream.MISSION_VERSION,)
+            if LINK_HEALTH_AVAILABLE:
+                caps[link_health.CAPS_HEARTBEAT_KEY] = (link_health.HEARTBEAT_VERSION,)
+            if COMMAND_CODEC_AVAILABLE: # PC ikili kodlamayı ve akışlı görevi ancak bu bildirimden sonra kullanır
+                send_message(client_socket, command_codec.caps_message(caps), stdscr)
+            if MISSION_STREAM_AVAILABLE and mpu_initialized:
+                # CAPS gönderildikten sonra, araç bağlanırken dururken kalibre edilir; PC bu sürede beklemez.
+                # Bu sırada gelen mesajlar alıcı thread'in kutusunda bekler.
+                calibrate_gyro_x(stdscr)
 
         stdscr.clear()
-        stdscr.addstr(0, 0, "Sunucuya bağlı. Komut bekleniyor (CALIBRATE:[KAYNAK], COMMANDS:{...}, STOP)".ljust(curses.COLS-1 if curses.COLS >0 else 80))
+        stdscr.addstr(0, 0, "Sunucuya bağlı. Komut bekleniyor (CALIBRATE:[KAYNAK], COMMANDS[_BIN]:..., MISSION_START:..., STOP)".ljust(curses.COLS-1 if curses.COLS >0 else 80))
+        draw_link_status(stdscr, force=True) # Ekran her turda temizlendiği için satır yeniden çizilir
         stdscr.refresh()
 
         message = receive_message(client_socket, stdscr)
@@ -570,18 +877,10 @@ def main_loop(stdscr):
         if message.startswith("CALIBRATE:"):
             parts = message.split(":")
             if len(parts) == 2:
-                current_image_source_on_pi = parts[1].upper()
-                if current_image_source_on_pi == "GALLERY":
-                    current_adim_kazanci_a = ADIM_KAZANCI_GALLERY_A
-                    current_adim_kazanci_b = ADIM_KAZANCI_GALLERY_B
-                else: # Varsayılan olarak veya "CAMERA" için
-                    current_adim_kazanci_a = ADIM_KAZANCI_CAMERA_A
-                    current_adim_kazanci_b = ADIM_KAZANCI_CAMERA_B
+                apply_image_source(parts[1])
                 stdscr.addstr(2,0, f"Kaynak: {current_image_source_on_pi}, Kznç A: {current_adim_kazanci_a:.3f}, Kznç B: {current_adim_kazanci_b:.3f}".ljust(curses.COLS-1 if curses.COLS >0 else 80))
             else:
-                current_image_source_on_pi = "UNKNOWN"
-                current_adim_kazanci_a = ADIM_KAZANCI_CAMERA_A # Bilinmiyorsa varsayılan
-                current_adim_kazanci_b = ADIM_KAZANCI_CAMERA_B
+                apply_image_source(None) # Bilinmiyorsa varsayılan kazançlar
                 stdscr.addstr(2,0, f"Kalibrasyon: Kaynak yok. Varsayılan kazançlar A:{current_adim_kazanci_a:.3f} B:{current_adim_kazanci_b:.3f}".ljust(curses.COLS-1 if curses.COLS >0 else 80))
             stdscr.refresh()
             
@@ -596,9 +895,12 @@ def main_loop(stdscr):
                 send_message(client_socket, "CALIBRATION_FAIL:MPU_INIT_ERROR", stdscr)
                 if pwm_led: pwm_led.ChangeDutyCycle(0)
 
-        elif message.startswith("COMMANDS:"):
-            command_data_str = message[len("COMMANDS:"):]
-            COMMAND_SEQUENCE = parse_commands(command_data_str, stdscr)
+        elif message.startswith("COMMANDS:") or message.startswith("COMMANDS_BIN:"):
+            if message.startswith("COMMANDS_BIN:"):
+                COMMAND_SEQUENCE = parse_binary_commands(message[len("COMMANDS_BIN:"):], stdscr)
+            else:
+                command_data_str = message[len("COMMANDS:"):]
+                COMMAND_SEQUENCE = parse_commands(command_data_str, stdscr)
 
             if COMMAND_SEQUENCE:
                 send_message(client_socket, "COMMANDS_RECEIVED_VALID", stdscr)
@@ -616,84 +918,32 @@ def main_loop(stdscr):
                 gyro_offset_for_turns = offset_x
 
                 for cmd_idx, (action, value) in enumerate(COMMAND_SEQUENCE):
+                    if cmd_idx > 0:
+                        stdscr.move(10,0); stdscr.clrtoeol()
+                        stdscr.addstr(10, 0, f"{DELAY_BETWEEN_COMMANDS} saniye bekleniyor...".ljust(curses.COLS-1 if curses.COLS >0 else 60))
+                        stdscr.refresh()
+                        stop_requested.wait(DELAY_BETWEEN_COMMANDS)
+                        stdscr.move(10,0); stdscr.clrtoeol()
+                    # STOP ve kopma alıcı thread'den gelir; burada sokette beklenmez.
+                    if stop_requested.is_set() or message_receiver.is_closed():
+                        break
                     stdscr.move(1,0); stdscr.clrtoeol()
                     stdscr.addstr(1, 0, f"Komut Dizisi: {cmd_idx + 1}/{len(COMMAND_SEQUENCE)}".ljust(curses.COLS-1 if curses.COLS >0 else 60))
                     stdscr.move(2,0); stdscr.clrtoeol()
                     stdscr.addstr(2, 0, f"Toplam Tahmini Yön: {current_total_angle_estimate:.2f}° (Ofset: {gyro_offset_for_turns:.2f})".ljust(curses.COLS-1 if curses.COLS >0 else 60))
-                    
-                    current_action_message = f"İşleniyor: {action}"
-                    effective_steps = 0
-                    selected_kazanc = 0
-
-                    if action == "ileri_a":
-                        selected_kazanc = current_adim_kazanci_a
-                        effective_steps = value * selected_kazanc
-                        current_action_message += f" (Yatay {value}x{selected_kazanc:.3f}={effective_steps:.0f} adım)"
-                    elif action == "ileri_b":
-                        selected_kazanc = current_adim_kazanci_b
-                        effective_steps = value * selected_kazanc
-                        current_action_message += f" (Dikey {value}x{selected_kazanc:.3f}={effective_steps:.0f} adım)"
-                    elif "don" in action:
-                        current_action_message += " (90 derece)"
-                    
-                    stdscr.move(3,0); stdscr.clrtoeol()
-                    stdscr.addstr(3, 0, current_action_message.ljust(curses.COLS-1 if curses.COLS >0 else 60))
-                    stdscr.refresh()
+                    current_total_angle_estimate += execute_command(stdscr, action, value, gyro_offset_for_turns)
 
-                    if action == "ileri_a" or action == "ileri_b":
-                        duration = FORWARD_DURATION_PER_STEP * effective_steps
-                        status_msg = f"İleri hareket ({duration:.1f}s, Hız: {FORWARD_SPEED}%)..."
-                        stdscr.move(4,0); stdscr.clrtoeol()
-                        stdscr.addstr(4, 0, status_msg.ljust(curses.COLS-1 if curses.COLS >0 else 60)); stdscr.refresh()
-                        set_motor_action(action, FORWARD_SPEED) # action 'ileri_a' veya 'ileri_b' olabilir, set_motor_action bunu 'forward' gibi ele alır
-                        time.sleep(duration)
-                        motor_durdur()
-                        stdscr.move(4,0); stdscr.clrtoeol()
-                        stdscr.addstr(4, 0, f"İleri hareket tamamlandı ({duration:.1f}s).".ljust(curses.COLS-1 if curses.COLS >0 else 60))
-                        stdscr.refresh()
-
-                    elif action == "sola_don":
-                        if mpu_initialized:
-                            angle_this_turn = turn_pid(stdscr, 90.0, gyro_offset_for_turns)
-                            current_total_angle_estimate += angle_this_turn
-                        else:
-                            stdscr.addstr(4, 0, "MPU yok, sola dönüş atlandı.".ljust(curses.COLS-1 if curses.COLS >0 else 60)); stdscr.refresh(); time.sleep(1)
-                        motor_durdur()
-
-                    elif action == "saga_don":
-                        if mpu_initialized:
-                            angle_this_turn = turn_pid(stdscr, -90.0, gyro_offset_for_turns)
-                            current_total_angle_estimate += angle_this_turn
-                        else:
-                            stdscr.addstr(4, 0, "MPU yok, sağa dönüş atlandı.".ljust(curses.COLS-1 if curses.COLS >0 else 60)); stdscr.refresh(); time.sleep(1)
-                        motor_durdur()
-                    else:
-                        stdscr.move(4,0); stdscr.clrtoeol()
-                        stdscr.addstr(4, 0, f"Bilinmeyen komut: {action}".ljust(curses.COLS-1 if curses.COLS >0 else 60))
-                        stdscr.refresh()
+                if stop_requested.is_set():
+                    perform_stop_and_cleanup(stdscr, client_socket)
+                    return
+                if message_receiver.is_closed():
+                    connected_to_server = False
+                    if pwm_led: pwm_led.ChangeDutyCycle(0)
+                    if client_socket: client_socket.close(); client_socket = None
+                    continue
 
-                    stop_check_during_delay = receive_message(client_socket, stdscr)
-                    if stop_check_during_delay == "STOP":
-                        perform_stop_and_cleanup(stdscr, client_socket)
-                        return
-                    elif stop_check_during_delay is None and not connected_to_server:
-                        if client_socket: client_socket.close(); client_socket = None
-                        break 
-
-                    if cmd_idx < len(COMMAND_SEQUENCE) - 1:
-                        stdscr.move(10,0); stdscr.clrtoeol()
-                        stdscr.addstr(10, 0, f"{DELAY_BETWEEN_COMMANDS} saniye bekleniyor...".ljust(curses.COLS-1 if curses.COLS >0 else 60))
-                        stdscr.refresh()
-                        time.sleep(DELAY_BETWEEN_COMMANDS)
-                        stdscr.move(10,0); stdscr.clrtoeol()
-                
                 if connected_to_server: # Eğer komut döngüsü bağlantı kopmasıyla kesilmediyse
-                    stdscr.move(11,0); stdscr.clrtoeol()
-                    stdscr.addstr(11, 0, "Tüm komutlar tamamlandı.".ljust(curses.COLS-1 if curses.COLS >0 else 60))
-                    send_message(client_socket, "SEQUENCE_DONE", stdscr)
-                    stdscr.refresh()
-                    
-                    stop_after_celeb = led_celebrate_pattern(stdscr, client_socket)
+                    stop_after_celeb = complete_sequence(stdscr)
                     if stop_after_celeb:
                         perform_stop_and_cleanup(stdscr, client_socket)
                         return
@@ -706,6 +956,47 @@ def main_loop(stdscr):
                 stdscr.refresh()
                 time.sleep(2)
 
+        elif MISSION_STREAM_AVAILABLE and message.startswith(mission_stream.START_PREFIX):
+            try:
+                mission_id, source = mission_stream.split_fields(message, mission_stream.START_PREFIX, 2)
+                mission_id = int(mission_id)
+            except ValueError as e:
+                stdscr.addstr(12, 0, f"Hata: {e}".ljust(curses.COLS-1 if curses.COLS >0 else 60)); stdscr.refresh()
+                continue
+            apply_image_source(source)
+            if not mpu_initialized:
+                stdscr.addstr(1,0,"UYARI: MPU başlatılmadı, dönüşler atlanacak!")
+                stdscr.refresh()
+            elif offset_x_time is None or time.monotonic() - offset_x_time > GYRO_OFFSET_MAX_AGE_S:
+                # Ofset eskidiyse (araç görev başında duruyor) ilk hareketten önce yeniden ölçülür.
+                calibrate_gyro_x(stdscr, result_display_s=0.0)
+            outcome = run_mission(stdscr, mission_id)
+            if outcome == "STOP":
+                perform_stop_and_cleanup(stdscr, client_socket)
+                return
+            if outcome == "DISCONNECTED":
+                if client_socket: client_socket.close(); client_socket = None
+                continue
+            stop_after_celeb = complete_sequence(stdscr)
+            if stop_after_celeb:
+                perform_stop_and_cleanup(stdscr, client_socket)
+                return
+            elif not connected_to_server:
+                if client_socket: client_socket.close(); client_socket = None
+                continue
+
+        elif MISSION_STREAM_AVAILABLE and (message.startswith(mission_stream.COMMANDS_PREFIX) or
+                                           message.startswith(mission_stream.END_PREFIX)):
+            # Biten veya hiç başlamamış bir göreve gelen ekleme/değiştirme.
+            fields = message.split(":")
+            if message.startswith(mission_stream.END_PREFIX):
+                send_message(client_socket, mission_stream.end_nak_message(fields[1] if len(fields) > 1 else -1,
+                                                                           mission_stream.NAK_NO_MISSION), stdscr)
+            else:
+                send_message(client_socket, mission_stream.nak_message(fields[1] if len(fields) > 1 else -1,
+                                                                        fields[2] if len(fields) > 2 else -1,
+                                                                        mission_stream.NAK_NO_MISSION), stdscr)
+
         elif message == "STOP":
             stdscr.addstr(curses.LINES-3, 0, "STOP komutu alındı. Durduruluyor...".ljust(curses.COLS-1 if curses.COLS >0 else 60))
             stdscr.refresh()
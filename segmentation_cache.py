@@ -0,0 +1,225 @@
+"""İçerik adresli segmentasyon sonuç önbelleği.
+
+Anahtar; görüntü piksellerinin, model dosyasının içeriğinin ve segmentasyon
+ayarlarının (eşik, döşeme) özetidir. Aynı görüntü aynı modelle tekrar açıldığında
+U-Net, iskelet çıkarma ve maske büyütme yeniden çalıştırılmaz.
+
+Maskeler 0/1 olduğundan bit düzeyinde paketlenerek (np.packbits) saklanır. Bellekte
+bayt bütçeli bir LRU tutulur; her kayıt ayrıca disk klasörüne .npz olarak yazılır
+ve uygulama yeniden başlatıldığında oradan okunur. Disk de bir bütçeyle sınırlıdır;
+aşılınca en uzun süredir kullanılmayan dosyalar silinir.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+import maze_core
+import skeletonization
+
+DEFAULT_CACHE_DIR = '.segmentation_cache'
+DEFAULT_MEMORY_BUDGET_MB = 256
+DEFAULT_DISK_BUDGET_MB = 1024
+MASK_KEYS = ('raw_mask', 'skeleton', 'bfs_mask')
+
+_model_version_lock = threading.Lock()
+_model_versions = {}
+
+
+def model_version(model_path):
+    """Model dosyasının içerik özeti; dosya değişmedikçe (boyut/mtime) yeniden hesaplanmaz."""
+    stat = os.stat(model_path)
+    signature = (os.path.abspath(model_path), stat.st_size, stat.st_mtime_ns)
+    with _model_version_lock:
+        if signature not in _model_versions:
+            digest = hashlib.blake2b(digest_size=16)
+            with open(model_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+            _model_versions[signature] = digest.hexdigest()
+        return _model_versions[signature]
+
+
+def cache_key(image_bgr, version, threshold=maze_core.THRESHOLD, tiling=None, skeleton_engine=None):
+    digest = hashlib.blake2b(digest_size=20)
+    image = np.ascontiguousarray(image_bgr)
+    # batch_size sonucu değiştirmez; anahtara girmez.
+    tiling_items = sorted((k, v) for k, v in (tiling or {}).items() if k != 'batch_size')
+    engine = skeletonization.resolve_engine(skeleton_engine)
+    digest.update(f"{image.shape}|{image.dtype}|{version}|{threshold}|{tiling_items}|{engine}".encode())
+    digest.update(image.data)
+    return digest.hexdigest()
+
+
+def _pack_segmentation(segmentation):
+    arrays = {}
+    for key in MASK_KEYS:
+        mask = segmentation.get(key)
+        if mask is not None:
+            arrays[key + '_bits'] = np.packbits(mask.astype(bool))
+            arrays[key + '_shape'] = np.array(mask.shape, dtype=np.int64)
+    meta = {'padding_info': segmentation['padding_info'], 'mask_type': segmentation['mask_type']}
+    arrays['meta'] = np.frombuffer(json.dumps(meta).encode('utf-8'), dtype=np.uint8)
+    return arrays
+
+
+def _unpack_segmentation(arrays):
+    segmentation = {}
+    for key in MASK_KEYS:
+        if key + '_bits' in arrays:
+            shape = tuple(int(d) for d in arrays[key + '_shape'])
+            count = int(np.prod(shape))
+            segmentation[key] = np.unpackbits(arrays[key + '_bits'], count=count).reshape(shape)
+        else:
+            segmentation[key] = None
+    meta = json.loads(bytes(arrays['meta']).decode('utf-8'))
+    if 'original_model_input_shape' in meta['padding_info']:
+        meta['padding_info']['original_model_input_shape'] = tuple(meta['padding_info']['original_model_input_shape'])
+    segmentation.update(meta)
+    return segmentation
+
+
+def _packed_size(arrays):
+    return sum(a.nbytes for a in arrays.values())
+
+
+class SegmentationCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB,
+                 disk_budget_mb=DEFAULT_DISK_BUDGET_MB):
+        self.cache_dir = cache_dir
+        self.memory_budget_bytes = int(memory_budget_mb * 1024 * 1024)
+        self.disk_budget_bytes = int(disk_budget_mb * 1024 * 1024) if disk_budget_mb is not None else None
+        self._entries = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, key + '.npz')
+
+    def get(self, key):
+        """Kayıt varsa segmentasyon sözlüğünü (maskeler açılmış halde) döndürür, yoksa None."""
+        with self._lock:
+            arrays = self._entries.get(key)
+            if arrays is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return _unpack_segmentation(arrays)
+
+        arrays = self._read_from_disk(key)
+        with self._lock:
+            if arrays is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, arrays)
+        return _unpack_segmentation(arrays)
+
+    def put(self, key, segmentation):
+        arrays = _pack_segmentation(segmentation)
+        with self._lock:
+            self._remember(key, arrays)
+        self._write_to_disk(key, arrays)
+
+    def _remember(self, key, arrays):
+        size = _packed_size(arrays)
+        if size > self.memory_budget_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= _packed_size(previous)
+        self._entries[key] = arrays
+        self._memory_bytes += size
+        while self._memory_bytes > self.memory_budget_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._memory_bytes -= _packed_size(evicted)
+
+    def _read_from_disk(self, key):
+        if not self.cache_dir:
+            return None
+        path = self._disk_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                arrays = {name: data[name] for name in data.files}
+            os.utime(path)  # disk LRU'su için son kullanım zamanı
+            return arrays
+        except Exception as e:
+            print(f"UYARI: Bozuk önbellek kaydı siliniyor ({os.path.basename(path)}): {e}")
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+
+    def _write_to_disk(self, key, arrays):
+        if not self.cache_dir:
+            return
+        path = self._disk_path(key)
+        # Aynı klasörü paylaşan süreçler yarım yazılmış dosya görmesin diye önce geçici dosyaya yazılır.
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, 'wb') as f:
+                np.savez(f, **arrays)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"UYARI: Önbellek kaydı diske yazılamadı: {e}")
+            return
+        self._enforce_disk_budget()
+
+    def _enforce_disk_budget(self):
+        if self.disk_budget_bytes is None:
+            return
+        entries = []
+        total = 0
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.npz'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        for _, size, path in sorted(entries):
+            if total <= self.disk_budget_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._memory_bytes = 0
+        if self.cache_dir and os.path.isdir(self.cache_dir):
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith('.npz'):
+                    os.remove(entry.path)
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'disk_hits': self.disk_hits, 'misses': self.misses,
+                    'entries': len(self._entries), 'memory_bytes': self._memory_bytes}
+
+
+def segment_with_cache(cache, model, image_bgr, threshold=maze_core.THRESHOLD, tiling=None, skeleton_engine=None):
+    """maze_core.segment_maze ile aynı sonucu döndürür; cache None ise veya model dosyası bilinmiyorsa önbelleksiz çalışır."""
+    model_path = getattr(model, 'model_path', None)
+    if cache is None or not model_path:
+        return maze_core.segment_maze(model, image_bgr, threshold, tiling=tiling, skeleton_engine=skeleton_engine)
+    key = cache_key(image_bgr, model_version(model_path), threshold, tiling, skeleton_engine)
+    segmentation = cache.get(key)
+    if segmentation is not None:
+        segmentation['cache_hit'] = True
+        return segmentation
+    segmentation = maze_core.segment_maze(model, image_bgr, threshold, tiling=tiling, skeleton_engine=skeleton_engine)
+    cache.put(key, segmentation)
+    segmentation['cache_hit'] = False
+    return segmentation
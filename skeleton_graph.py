@@ -0,0 +1,306 @@
+"""İskeletten kavşak/koridor grafı çıkarma ve graf üzerinde en kısa yol.
+
+İskelet (bir piksel kalınlığında) maskede komşu sayısı 2 olmayan pikseller düğümdür
+(uç noktalar ve kavşaklar; bitişik kavşak pikselleri tek düğümde toplanır). Düğümler
+arasındaki 2-komşulu piksel zincirleri, piksel çoklu çizgisi (polyline) saklanan
+kenarlardır. Graf maske başına bir kez kurulur ve önbellekte tutulur; sonraki her
+başlangıç/bitiş sorgusu piksel BFS'i yerine birkaç yüz düğümlük Dijkstra'dır.
+
+Başlangıç/bitiş tıklamaları en yakın iskelet pikseline (uzaklık dönüşümü etiketleriyle
+O(1)) ve oradan bir kenara/düğüme oturtulur.
+"""
+import hashlib
+import heapq
+import threading
+import time
+from collections import OrderedDict, deque
+
+import cv2
+import numpy as np
+
+import skeletonization
+
+GRAPH_CACHE_SIZE = 4
+
+_graph_cache = OrderedDict()
+_graph_cache_lock = threading.Lock()
+
+
+def _line_pixels(a, b):
+    """a'dan b'ye 8-komşulu düz çizgi pikselleri (a hariç, b dahil)."""
+    steps = max(abs(b[0] - a[0]), abs(b[1] - a[1]))
+    if steps == 0:
+        return []
+    rows = np.rint(np.linspace(a[0], b[0], steps + 1)).astype(int)
+    cols = np.rint(np.linspace(a[1], b[1], steps + 1)).astype(int)
+    return [(int(r), int(c)) for r, c in zip(rows[1:], cols[1:])]
+
+
+class SkeletonGraph:
+    def __init__(self, skeleton_01):
+        started = time.perf_counter()
+        self.shape = skeleton_01.shape
+        rows, cols = self.shape
+        self._width = cols + 2
+        padded = np.pad((skeleton_01 == 1).astype(np.uint8), 1)
+        self._offsets = [-self._width - 1, -self._width, -self._width + 1, -1, 1,
+                         self._width - 1, self._width, self._width + 1]
+        degree = cv2.filter2D(padded, -1, np.array([[1, 1, 1], [1, 0, 1], [1, 1, 1]], np.uint8),
+                              borderType=cv2.BORDER_CONSTANT) * padded
+        flat = padded.ravel()
+
+        # Düğüm pikselleri: uçlar, kavşaklar, tek pikseller; bitişik olanlar tek düğüm.
+        node_pixels = ((padded == 1) & (degree != 2)).astype(np.uint8)
+        cluster_count, cluster_labels = cv2.connectedComponents(node_pixels, connectivity=8)
+        self._node_of = cluster_labels.ravel().astype(np.int32) - 1
+        self.nodes = [[] for _ in range(cluster_count - 1)]
+        for index in np.flatnonzero(self._node_of >= 0):
+            self.nodes[self._node_of[index]].append(int(index))
+
+        self._edge_of = np.full(flat.size, -1, dtype=np.int32)
+        self._position_of = np.full(flat.size, -1, dtype=np.int32)
+        self.edges = []
+        self.adjacency = [[] for _ in self.nodes]
+        for node in range(len(self.nodes)):
+            self._trace_edges_from(node, flat)
+
+        # Düğümü olmayan kapalı döngüler: herhangi bir pikseli düğüm yapılır.
+        remaining = np.flatnonzero((flat == 1) & (self._node_of < 0) & (self._edge_of < 0))
+        for index in remaining:
+            if self._edge_of[index] >= 0:
+                continue
+            node = len(self.nodes)
+            self.nodes.append([int(index)])
+            self.adjacency.append([])
+            self._node_of[index] = node
+            self._trace_edges_from(node, flat)
+
+        # Her pikselin en yakın iskelet pikseli (O(1) oturtma için).
+        distance, labels = cv2.distanceTransformWithLabels(1 - padded, cv2.DIST_L2, 5,
+                                                           labelType=cv2.DIST_LABEL_PIXEL)
+        skeleton_indices = np.zeros(int(labels.max()) + 1, dtype=np.int64)
+        zero_ys, zero_xs = np.nonzero(padded == 1)
+        skeleton_indices[labels[zero_ys, zero_xs]] = zero_ys * self._width + zero_xs
+        self._nearest = skeleton_indices[labels.ravel()]
+        self._nearest_distance = distance.ravel()
+        self.build_ms = (time.perf_counter() - started) * 1000.0
+
+    def _trace_edges_from(self, node, flat):
+        for start_pixel in self.nodes[node]:
+            for offset in self._offsets:
+                first = start_pixel + offset
+                if flat[first] != 1 or self._edge_of[first] >= 0 or self._node_of[first] == node:
+                    continue
+                if self._node_of[first] >= 0:
+                    # İki düğüm doğrudan bitişik: iç pikseli olmayan kenar (yalnızca bir kez ekle).
+                    if self._node_of[first] > node:
+                        self._add_edge(node, self._node_of[first], [start_pixel, first])
+                    continue
+                polyline = [start_pixel, first]
+                previous, current = start_pixel, first
+                while self._node_of[current] < 0:
+                    self._edge_of[current] = len(self.edges)
+                    self._position_of[current] = len(polyline) - 1
+                    following = None
+                    for step in self._offsets:
+                        candidate = current + step
+                        if candidate != previous and flat[candidate] == 1 and \
+                                (self._node_of[candidate] >= 0 or self._edge_of[candidate] < 0):
+                            following = candidate
+                            if self._node_of[candidate] >= 0:
+                                break
+                    if following is None:
+                        break
+                    previous, current = current, following
+                    polyline.append(current)
+                end_node = self._node_of[current]
+                if end_node < 0:
+                    end_node = node
+                self._add_edge(node, int(end_node), polyline)
+
+    def _add_edge(self, u, v, polyline):
+        edge = len(self.edges)
+        cost = len(polyline) - 1
+        self.edges.append((u, v, np.array(polyline, dtype=np.int64)))
+        for position, index in enumerate(polyline):
+            if self._node_of[index] < 0:
+                self._edge_of[index] = edge
+                self._position_of[index] = position
+        self.adjacency[u].append((v, edge, cost))
+        if v != u:
+            self.adjacency[v].append((u, edge, cost))
+
+    def _to_index(self, point):
+        return (point[0] + 1) * self._width + point[1] + 1
+
+    def snap(self, point, max_radius=None):
+        """Noktaya en yakın iskelet pikselinin indisini döndürür; max_radius dışındaysa None."""
+        if not (0 <= point[0] < self.shape[0] and 0 <= point[1] < self.shape[1]):
+            return None
+        index = self._to_index(point)
+        if max_radius is not None and self._nearest_distance[index] > max_radius:
+            return None
+        return int(self._nearest[index])
+
+    def _attachments(self, pixel):
+        """Bir iskelet pikselinden düğümlere: [(düğüm, maliyet, piksel parçası)], parça düğüm pikselinde biter."""
+        node = self._node_of[pixel]
+        if node >= 0:
+            return [(int(node), 0, np.array([pixel], dtype=np.int64))]
+        edge = self._edge_of[pixel]
+        u, v, polyline = self.edges[edge]
+        position = int(self._position_of[pixel])
+        return [(u, position, polyline[position::-1]), (v, len(polyline) - 1 - position, polyline[position:])]
+
+    def _bridge(self, a, b):
+        """Aynı kavşak düğümündeki iki piksel arasında düğüm pikselleri üzerinden kısa yol (a hariç)."""
+        cluster = set(self.nodes[self._node_of[a]])
+        parents = {a: None}
+        queue = deque([a])
+        while queue:
+            current = queue.popleft()
+            if current == b:
+                break
+            for offset in self._offsets:
+                candidate = current + offset
+                if candidate in cluster and candidate not in parents:
+                    parents[candidate] = current
+                    queue.append(candidate)
+        chain = []
+        current = b
+        while current is not None and current != a:
+            chain.append(current)
+            current = parents.get(current)
+        return chain[::-1]
+
+    def _stitch(self, pieces):
+        """Parçaları birleştirir; ortak uçlar bir kez yazılır, aynı kavşaktaki farklı uçlar köprülenir."""
+        joined = [pieces[0]]
+        last = int(pieces[0][-1])
+        for piece in pieces[1:]:
+            if len(piece) == 0:
+                continue
+            first = int(piece[0])
+            if first == last:
+                piece = piece[1:]
+            elif self._node_of[last] >= 0 and self._node_of[last] == self._node_of[first]:
+                joined.append(np.array(self._bridge(last, first)[:-1], dtype=np.int64))
+            joined.append(piece)
+            if len(piece):
+                last = int(piece[-1])
+        return np.concatenate(joined)
+
+    def shortest_path(self, start_node, end_node, snap_radius=None, stats=None):
+        """Piksel yolunu [(y, x), ...] olarak döndürür; tıklanan noktalar yolun ilk/son pikselidir."""
+        if stats is not None:
+            stats['expanded'] = 0
+        source_pixel = self.snap(start_node, snap_radius)
+        target_pixel = self.snap(end_node, snap_radius)
+        if source_pixel is None or target_pixel is None:
+            return None
+
+        best_cost, best_pieces = None, None
+        source_edge, target_edge = self._edge_of[source_pixel], self._edge_of[target_pixel]
+        if source_edge >= 0 and source_edge == target_edge:
+            polyline = self.edges[source_edge][2]
+            i, j = int(self._position_of[source_pixel]), int(self._position_of[target_pixel])
+            best_cost = abs(i - j)
+            best_pieces = [polyline[i:j + 1] if i <= j else polyline[j:i + 1][::-1]]
+
+        targets = {}
+        for node, cost, piece in self._attachments(target_pixel):
+            if node not in targets or cost < targets[node][0]:
+                targets[node] = (cost, piece[::-1])
+
+        distances, parents, heap = {}, {}, []
+        for node, cost, piece in self._attachments(source_pixel):
+            if node not in distances or cost < distances[node]:
+                distances[node] = cost
+                parents[node] = (None, piece)
+                heapq.heappush(heap, (cost, node))
+        reached = None
+        while heap:
+            cost, node = heapq.heappop(heap)
+            if cost > distances[node]:
+                continue
+            if best_cost is not None and cost >= best_cost:
+                break
+            if stats is not None:
+                stats['expanded'] += 1
+            if node in targets and (best_cost is None or cost + targets[node][0] < best_cost):
+                best_cost = cost + targets[node][0]
+                reached = node
+            for neighbour, edge, edge_cost in self.adjacency[node]:
+                new_cost = cost + edge_cost
+                if new_cost < distances.get(neighbour, new_cost + 1):
+                    distances[neighbour] = new_cost
+                    parents[neighbour] = (node, edge)
+                    heapq.heappush(heap, (new_cost, neighbour))
+
+        if reached is not None:
+            pieces = [targets[reached][1]]
+            node = reached
+            while True:
+                previous, via = parents[node]
+                if previous is None:
+                    pieces.append(via)
+                    break
+                u, _, polyline = self.edges[via]
+                pieces.append(polyline if u == previous else polyline[::-1])
+                node = previous
+            best_pieces = pieces[::-1]
+        if best_pieces is None:
+            return None
+
+        rows, cols = np.divmod(self._stitch(best_pieces), self._width)
+        path = list(zip((rows - 1).tolist(), (cols - 1).tolist()))
+        # Yaklaşma çizgisi iskelet yolunun ilk pikselinde biter; o piksel bir kez yazılır.
+        head = [tuple(start_node)] + _line_pixels(tuple(start_node), path[0])
+        tail = _line_pixels(path[-1], tuple(end_node))
+        return head + path[1:] + tail
+
+    def stats(self):
+        return {'nodes': len(self.nodes), 'edges': len(self.edges), 'build_ms': self.build_ms}
+
+
+def mask_digest(mask_01, engine=None):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{mask_01.shape}|{engine}".encode())
+    digest.update(np.packbits(mask_01 == 1).data)
+    return digest.hexdigest()
+
+
+def build_graph(mask_01, skeleton_engine=None):
+    """Maske bir piksel kalın değilse (ör. büyütülmüş iskelet) önce inceltilir."""
+    return SkeletonGraph(skeletonization.skeletonize(mask_01, skeleton_engine))
+
+
+def graph_for_mask(mask_01, skeleton_engine=None):
+    """Maskenin grafını önbellekten döndürür, yoksa kurar: (graf, önbellekten_mi)."""
+    key = mask_digest(mask_01, skeletonization.resolve_engine(skeleton_engine))
+    with _graph_cache_lock:
+        graph = _graph_cache.get(key)
+        if graph is not None:
+            _graph_cache.move_to_end(key)
+            return graph, True
+    graph = build_graph(mask_01, skeleton_engine)
+    with _graph_cache_lock:
+        _graph_cache[key] = graph
+        while len(_graph_cache) > GRAPH_CACHE_SIZE:
+            _graph_cache.popitem(last=False)
+    return graph, False
+
+
+def find_path_graph(grid, start_node, end_node, report=None, skeleton_engine=None):
+    """maze_core.find_path_bfs ile aynı arayüz; graf önbellekte yoksa önce kurulur."""
+    if report is None:
+        report = []
+    graph, cached = graph_for_mask(grid, skeleton_engine)
+    stats = {}
+    started = time.perf_counter()
+    path = graph.shortest_path(start_node, end_node, stats=stats)
+    report.append({'level': 0, 'shape': grid.shape, 'ms': (time.perf_counter() - started) * 1000.0,
+                   'expanded': stats.get('expanded', 0), 'mode': 'graf',
+                   'graph_cached': cached, 'graph_build_ms': graph.build_ms,
+                   'graph_nodes': len(graph.nodes), 'graph_edges': len(graph.edges)})
+    return path
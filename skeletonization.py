@@ -0,0 +1,221 @@
+"""İskelet çıkarma (inceltme) motorları.
+
+Tüm motorlar aynı sözleşmeye uyar: 0/1 uint8 maske alır, maskenin alt kümesi olan,
+8-komşulukta bağlı, bir piksel kalınlığında 0/1 uint8 iskelet döndürür (BFS bunu bekler).
+
+  * skimage:     skimage.morphology.skeletonize (scikit-image kuruluysa)
+  * zhang-suen:  OpenCV ximgproc inceltmesi (opencv-contrib), yoksa vektörize NumPy Zhang-Suen
+  * medial-axis: uzaklık dönüşümünün sırt (ridge) pikselleri + tek piksele indiren kısa Zhang-Suen
+  * auto:        skimage varsa o, yoksa zhang-suen
+
+scikit-image artık zorunlu değildir.
+
+Karşılaştırma:
+    python skeletonization.py --sizes 256 512 1024 2048
+"""
+import argparse
+import statistics
+import time
+
+import cv2
+import numpy as np
+
+try:
+    from skimage.morphology import skeletonize as _skimage_skeletonize
+    SKIMAGE_AVAILABLE = True
+except ImportError:
+    SKIMAGE_AVAILABLE = False
+
+XIMGPROC_AVAILABLE = hasattr(cv2, 'ximgproc')
+SKELETON_ENGINES = ('auto', 'skimage', 'zhang-suen', 'medial-axis')
+DEFAULT_SKELETON_ENGINE = 'auto'
+
+
+def _zhang_suen_lookup_tables():
+    """8-komşu kodu (bit 0..7 = P2..P9, saat yönünde) için iki alt adımın 'silinebilir' tabloları."""
+    first, second = np.zeros(256, dtype=bool), np.zeros(256, dtype=bool)
+    for code in range(256):
+        p2, p3, p4, p5, p6, p7, p8, p9 = ((code >> bit) & 1 for bit in range(8))
+        ring = (p2, p3, p4, p5, p6, p7, p8, p9, p2)
+        neighbours = sum(ring[:8])
+        transitions = sum(1 for i in range(8) if ring[i] == 0 and ring[i + 1] == 1)
+        if not (2 <= neighbours <= 6 and transitions == 1):
+            continue
+        first[code] = (p2 * p4 * p6 == 0) and (p4 * p6 * p8 == 0)
+        second[code] = (p2 * p4 * p8 == 0) and (p2 * p6 * p8 == 0)
+    return first, second
+
+
+_ZS_REMOVABLE = _zhang_suen_lookup_tables()
+
+
+def _zhang_suen_numpy(mask_01):
+    """Vektörize Zhang-Suen inceltmesi.
+
+    Her alt adımda yalnızca sınırdaki aday pikseller değerlendirilir (komşu kodu + tablo);
+    bir sonraki adayların kümesi silinen piksellerin komşularıdır. Böylece her tur tüm
+    görüntüyü değil, yalnızca ilerleyen sınırı dolaşır.
+    """
+    image = np.pad((mask_01 == 1).astype(np.uint8), 1)
+    width = image.shape[1]
+    flat = image.ravel()
+    offsets = np.array([-width, -width + 1, 1, width + 1, width, width - 1, -1, -width - 1], dtype=np.intp)
+
+    # Tekrarlanan adayları sıralamadan elemek için: her indise son yazan konumu damgalanır.
+    stamp = np.empty(flat.size, dtype=np.int64)
+
+    interior = cv2.erode(image, np.ones((3, 3), np.uint8), borderType=cv2.BORDER_CONSTANT, borderValue=0)
+    candidates = np.flatnonzero((image == 1) & (interior == 0))
+    subiteration, idle_subiterations = 0, 0
+    while idle_subiterations < 2 and candidates.size:
+        codes = flat[candidates + offsets[0]].copy()
+        for bit in range(1, 8):
+            codes |= flat[candidates + offsets[bit]] << bit
+        removed = candidates[_ZS_REMOVABLE[subiteration][codes]]
+        if removed.size:
+            flat[removed] = 0
+            idle_subiterations = 0
+            candidates = np.concatenate([candidates, (removed[:, None] + offsets[None, :]).ravel()])
+            candidates = candidates[flat[candidates] == 1]
+            positions = np.arange(candidates.size)
+            stamp[candidates] = positions
+            candidates = candidates[stamp[candidates] == positions]
+        else:
+            idle_subiterations += 1
+        subiteration ^= 1
+    return image[1:-1, 1:-1].copy()
+
+
+def zhang_suen(mask_01):
+    if XIMGPROC_AVAILABLE:
+        thinned = cv2.ximgproc.thinning((mask_01 == 1).astype(np.uint8) * 255, thinningType=cv2.ximgproc.THINNING_ZHANGSUEN)
+        return (thinned > 0).astype(np.uint8)
+    return _zhang_suen_numpy(mask_01)
+
+
+def medial_axis(mask_01):
+    """Uzaklık dönüşümünün sırtı; koridor genişliğinden bağımsız olarak birkaç inceltme turunda biter."""
+    mask_u8 = (mask_01 == 1).astype(np.uint8)
+    distance = cv2.distanceTransform(mask_u8, cv2.DIST_L2, 5)
+    padded = np.pad(distance, 1)
+    center = padded[1:-1, 1:-1]
+    ridge = np.zeros(mask_u8.shape, dtype=bool)
+    # Dört eksenden (yatay, dikey, iki çapraz) en az birinde iki komşusundan da küçük olmayan pikseller.
+    for (dy1, dx1), (dy2, dx2) in (((0, -1), (0, 1)), ((-1, 0), (1, 0)), ((-1, -1), (1, 1)), ((-1, 1), (1, -1))):
+        neighbour_a = padded[1 + dy1:padded.shape[0] - 1 + dy1, 1 + dx1:padded.shape[1] - 1 + dx1]
+        neighbour_b = padded[1 + dy2:padded.shape[0] - 1 + dy2, 1 + dx2:padded.shape[1] - 1 + dx2]
+        # Koridor boyunca komşular eşit olur; en az birinden kesin büyük olma şartı onları eler.
+        ridge |= (center >= neighbour_a) & (center >= neighbour_b) & ((center > neighbour_a) | (center > neighbour_b))
+    ridge &= mask_u8 == 1
+    # Sırt birkaç piksel kalın olabilir; tek piksele indirmek için kısa bir Zhang-Suen yeterli.
+    return zhang_suen(ridge.astype(np.uint8))
+
+
+def skimage_skeleton(mask_01):
+    if not SKIMAGE_AVAILABLE:
+        raise ValueError("'skimage' iskelet motoru için scikit-image kurulu olmalı.")
+    return _skimage_skeletonize(mask_01 == 1).astype(np.uint8)
+
+
+def resolve_engine(engine=None):
+    engine = engine or DEFAULT_SKELETON_ENGINE
+    if engine not in SKELETON_ENGINES:
+        raise ValueError(f"Bilinmeyen iskelet motoru: {engine} (seçenekler: {', '.join(SKELETON_ENGINES)})")
+    if engine == 'auto':
+        return 'skimage' if SKIMAGE_AVAILABLE else 'zhang-suen'
+    return engine
+
+
+_ENGINE_FUNCTIONS = {
+    'skimage': skimage_skeleton,
+    'zhang-suen': zhang_suen,
+    'medial-axis': medial_axis,
+}
+
+
+def skeletonize(mask_01, engine=None):
+    """Seçilen motorla 0/1 uint8 iskelet döndürür."""
+    return _ENGINE_FUNCTIONS[resolve_engine(engine)](mask_01)
+
+
+def _synthetic_maze_mask(size, cells=16, seed=0):
+    """Benchmark için rastgele (DFS ile oyulmuş) labirent koridor maskesi."""
+    rng = np.random.default_rng(seed)
+    cell = size // cells
+    wall = max(1, cell // 6)
+    mask = np.zeros((cells * cell, cells * cell), dtype=np.uint8)
+    visited = np.zeros((cells, cells), dtype=bool)
+    stack = [(0, 0)]
+    visited[0, 0] = True
+    mask[wall:cell - wall, wall:cell - wall] = 1
+    while stack:
+        r, c = stack[-1]
+        options = [(r + dr, c + dc) for dr, dc in ((0, 1), (1, 0), (0, -1), (-1, 0))
+                   if 0 <= r + dr < cells and 0 <= c + dc < cells and not visited[r + dr, c + dc]]
+        if not options:
+            stack.pop()
+            continue
+        nr, nc = options[rng.integers(len(options))]
+        visited[nr, nc] = True
+        y0, y1 = min(r, nr) * cell + wall, (max(r, nr) + 1) * cell - wall
+        x0, x1 = min(c, nc) * cell + wall, (max(c, nc) + 1) * cell - wall
+        mask[y0:y1, x0:x1] = 1
+        stack.append((nr, nc))
+    return mask
+
+
+def _bfs_path_length(skeleton, start, end):
+    import maze_core
+    start = maze_core.snap_to_mask(skeleton, start, skeleton.shape[0] // 8)
+    end = maze_core.snap_to_mask(skeleton, end, skeleton.shape[0] // 8)
+    if start is None or end is None:
+        return None
+    path = maze_core.find_path_bfs(skeleton, start, end)
+    return len(path) if path else None
+
+
+def _contract_violations(skeleton, mask):
+    problems = []
+    if skeleton.dtype != np.uint8 or not np.isin(skeleton, (0, 1)).all():
+        problems.append("0/1 uint8 değil")
+    if np.any((skeleton == 1) & (mask != 1)):
+        problems.append("maske dışına taşıyor")
+    mask_components = cv2.connectedComponents(mask, connectivity=8)[0]
+    skeleton_components = cv2.connectedComponents(skeleton, connectivity=8)[0]
+    if skeleton_components > mask_components:
+        problems.append(f"bağlantı kopuk ({skeleton_components - 1} bileşen, maske {mask_components - 1})")
+    return problems
+
+
+def benchmark(sizes=(256, 512, 1024, 2048), repeats=3):
+    """Motorları farklı maske boyutlarında süre, iskelet pikseli ve BFS yol uzunluğuyla karşılaştırır."""
+    engines = [name for name in ('skimage', 'zhang-suen', 'medial-axis') if name != 'skimage' or SKIMAGE_AVAILABLE]
+    print(f"ximgproc: {'var' if XIMGPROC_AVAILABLE else 'yok (NumPy Zhang-Suen)'}, "
+          f"scikit-image: {'var' if SKIMAGE_AVAILABLE else 'yok'}")
+    print(f"{'Boyut':>6} {'Motor':<12} {'ms':>9} {'Piksel':>8} {'Yol':>7} {'Sözleşme'}")
+    for size in sizes:
+        mask = _synthetic_maze_mask(size)
+        cell = mask.shape[0] // 16
+        start, end = (cell // 2, cell // 2), (mask.shape[0] - cell // 2, mask.shape[1] - cell // 2)
+        for engine in engines:
+            timings = []
+            for _ in range(repeats):
+                started = time.perf_counter()
+                skeleton = skeletonize(mask, engine)
+                timings.append((time.perf_counter() - started) * 1000.0)
+            path_length = _bfs_path_length(skeleton, start, end)
+            problems = _contract_violations(skeleton, mask)
+            print(f"{mask.shape[0]:>6} {engine:<12} {statistics.median(timings):>9.1f} {int(skeleton.sum()):>8} "
+                  f"{path_length if path_length else '-':>7} {'; '.join(problems) or 'uygun'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="İskelet motorları karşılaştırması")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[256, 512, 1024, 2048])
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+    benchmark(args.sizes, args.repeats)
+
+
+if __name__ == '__main__':
+    main()
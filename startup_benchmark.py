@@ -0,0 +1,75 @@
+"""Arayüz açılış süresi karşılaştırması.
+
+Her ölçüm temiz bir alt süreçte yapılır (TensorFlow içe aktarma önbelleği paylaşılmasın diye):
+  * eager: eski akış - TensorFlow içe aktarılır ve model yüklenir, pencere ancak sonra açılır.
+  * lazy:  mevcut akış - pencere hemen açılır, model arka planda yüklenir.
+
+Raporlanan süreler süreç başlangıcından itibarendir: pencerenin çizildiği an ve
+modelin kullanıma hazır olduğu an.
+
+Kullanım (ekran gerektirir):
+    python startup_benchmark.py --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PROCESS_START = time.perf_counter()
+RESULT_PREFIX = "STARTUP_BENCHMARK "
+
+
+def _measure_in_child(mode):
+    import tkinter as tk
+    if mode == 'eager':
+        import tensorflow  # noqa: F401 - eski akıştaki modül düzeyindeki içe aktarımı taklit eder
+        import maze_core
+        maze_core.load_segmentation_model(maze_core.MODEL_PATH)
+    import computerside
+
+    root = tk.Tk()
+    app = computerside.MazeSolverApp(root)
+    root.update()
+    window_visible_s = time.perf_counter() - PROCESS_START
+    if mode == 'eager':
+        # Eski akışta model pencere açılmadan zaten hazırdı.
+        model_ready_s = window_visible_s
+    else:
+        while not app.model_ready_event.is_set():
+            root.update()
+            time.sleep(0.005)
+        model_ready_s = time.perf_counter() - PROCESS_START
+    root.destroy()
+    print(RESULT_PREFIX + json.dumps({'window_visible_s': window_visible_s, 'model_ready_s': model_ready_s}))
+
+
+def _run_child(mode):
+    output = subprocess.check_output([sys.executable, os.path.abspath(__file__), '--child', mode],
+                                     cwd=os.path.dirname(os.path.abspath(__file__)), text=True)
+    result_line = next(line for line in output.splitlines() if line.startswith(RESULT_PREFIX))
+    return json.loads(result_line[len(RESULT_PREFIX):])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Arayüz açılış süresi ölçümü (eager vs lazy)")
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--child', choices=('eager', 'lazy'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _measure_in_child(args.child)
+        return
+
+    print(f"{'Akış':<8} {'Pencere (s)':>12} {'Model hazır (s)':>16}")
+    for mode in ('eager', 'lazy'):
+        results = [_run_child(mode) for _ in range(args.runs)]
+        window_median = statistics.median(r['window_visible_s'] for r in results)
+        ready_median = statistics.median(r['model_ready_s'] for r in results)
+        print(f"{mode:<8} {window_median:>12.2f} {ready_median:>16.2f}")
+
+
+if __name__ == '__main__':
+    main()
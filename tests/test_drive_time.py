@@ -0,0 +1,49 @@
+"""Sürüş süresi planlayıcısının tahmini görev süresinin düz BFS'ninkini hiçbir zaman aşmadığı.
+
+Kalın koridorlu labirentte (şeritler sığar) ve iskelet labirentte (çapraz adımlar, şerit
+sığmaz) tohumlu başlangıç/bitiş çiftleri iki planlayıcıyla maze_core.solve_path üzerinden
+çözülür; açık arenada şeritli yeniden kurulum ayrıca denetlenir.
+"""
+import cv2
+import pytest
+
+import drive_time
+import maze_core
+import pathfinding_benchmark
+import skeletonization
+
+WIDTH, HEIGHT = 640, 360
+
+
+def _thick_maze():
+    mask = skeletonization._synthetic_maze_mask(pathfinding_benchmark.MODEL_SCALE, cells=16, seed=0)
+    return cv2.resize(mask, (WIDTH, HEIGHT), interpolation=cv2.INTER_NEAREST)
+
+
+def _skeleton_maze():
+    return pathfinding_benchmark.synthetic_bfs_mask(WIDTH, HEIGHT)
+
+
+@pytest.mark.parametrize('make_mask', [_thick_maze, _skeleton_maze])
+def test_drive_time_estimate_not_above_bfs(make_mask):
+    mask = make_mask()
+    for start, end in pathfinding_benchmark.random_pairs(mask, 6):
+        bfs = maze_core.solve_path(mask, start, end, verbose=False, planner='bfs')
+        fastest = maze_core.solve_path(mask, start, end, verbose=False, planner='drive-time')
+        assert fastest['estimated_mission_s'] <= bfs['estimated_mission_s'] + 1e-9
+
+
+def test_lane_rebuild_is_axis_aligned():
+    # Açık arenada aramanın koşuları şeritlere oturur; şeritli yol yalnızca eksenler boyunca ilerler.
+    mask = pathfinding_benchmark.synthetic_arena_mask(WIDTH, HEIGHT)
+    rebuilds = []
+    for start, end in pathfinding_benchmark.random_pairs(mask, 6):
+        stats = {}
+        path = drive_time.find_path_drive_time(mask, start, end, stats=stats)
+        assert path[0] == tuple(start) and path[-1] == tuple(end)
+        assert all(mask[y, x] == 1 for y, x in path)
+        assert stats['estimated_s'] <= stats['bfs_estimated_s']
+        rebuilds.append(stats['rebuild'])
+        if stats['rebuild'] == 'lanes':
+            assert all(abs(y - y2) + abs(x - x2) == 1 for (y, x), (y2, x2) in zip(path, path[1:]))
+    assert 'lanes' in rebuilds
@@ -0,0 +1,97 @@
+"""Numba çekirdeklerinin saf Python sürümleriyle (MAZE_DISABLE_JIT=1) birebir aynı çıktıyı verdiği.
+
+Tohumlu rastgele maskelerde BFS yolu ve genişletilen düğüm sayısı, sadeleştirilmiş yollardan
+ve rastgele yürüyüşlerden üretilen araç komutları ve birleştirilmiş komutlar iki sürümde
+karşılaştırılır. Ortam değişkeni modül yüklenirken okunduğu için jit_kernels her sürüm
+için yeniden yüklenir.
+"""
+import importlib
+import os
+import random
+
+import numpy as np
+import pytest
+
+import command_benchmark
+import jit_benchmark
+import jit_kernels
+import maze_core
+
+pytestmark = pytest.mark.skipif(not jit_kernels.NUMBA_AVAILABLE, reason="Numba kurulu değil")
+
+SEEDS = range(40)
+
+
+@pytest.fixture
+def run_both():
+    """run(fonksiyon, girdiler) -> (JIT açıkken çıktılar, MAZE_DISABLE_JIT=1 iken çıktılar)."""
+    previous = os.environ.get('MAZE_DISABLE_JIT')
+
+    def run(function, cases):
+        results = {}
+        for disabled in (False, True):
+            if disabled:
+                os.environ['MAZE_DISABLE_JIT'] = '1'
+            else:
+                os.environ.pop('MAZE_DISABLE_JIT', None)
+            importlib.reload(jit_kernels)
+            assert jit_kernels.enabled() is not disabled
+            results[disabled] = [function(*case) for case in cases]
+        return results[False], results[True]
+
+    yield run
+    if previous is None:
+        os.environ.pop('MAZE_DISABLE_JIT', None)
+    else:
+        os.environ['MAZE_DISABLE_JIT'] = previous
+    importlib.reload(jit_kernels)
+
+
+def random_mask_case(seed):
+    """Rastgele yoğunlukta gürültü maskesi ve maske üzerinde iki nokta (aralarında yol olmayabilir)."""
+    rng = np.random.default_rng(seed)
+    rows, cols = (int(size) for size in rng.integers(8, 90, size=2))
+    mask = (rng.random((rows, cols)) < rng.uniform(0.45, 0.8)).astype(np.uint8)
+    ys, xs = np.nonzero(mask)
+    first, second = rng.choice(len(ys), size=2)
+    return mask, (int(ys[first]), int(xs[first])), (int(ys[second]), int(xs[second]))
+
+
+def _bfs(mask, start, end):
+    stats = {}
+    return maze_core.find_path_bfs(mask, start, end, stats), stats['expanded']
+
+
+def _node_lists():
+    nodes = list(jit_benchmark.EDGE_CASE_PATHS)
+    for seed in SEEDS:
+        path, _ = _bfs(*random_mask_case(seed))
+        if path and len(path) >= 2:
+            nodes.append(maze_core.simplify_path(path))
+        nodes.append(maze_core.simplify_path(command_benchmark.random_walk_path(random.Random(seed), 200)))
+    return [(path,) for path in nodes]
+
+
+def test_find_path_bfs_matches(run_both):
+    cases = [random_mask_case(seed) for seed in SEEDS]
+    jit, python = run_both(_bfs, cases)
+    assert jit == python
+    assert any(path is None for path, _ in python) and any(path for path, _ in python)
+
+
+def test_vehicle_commands_match(run_both):
+    jit, python = run_both(maze_core.generate_vehicle_perspective_commands, _node_lists())
+    assert jit == python
+
+
+def test_consolidate_matches(run_both):
+    rng = random.Random(0)
+    cases = [(command_benchmark.random_raw_commands(rng, rng.randint(0, 60)),) for _ in SEEDS]
+    cases += [(maze_core.generate_vehicle_perspective_commands(*nodes),) for nodes in _node_lists()]
+    jit, python = run_both(maze_core.consolidate_vehicle_commands, cases)
+    assert jit == python
+
+
+def test_generate_and_process_commands_matches(run_both):
+    jit, python = run_both(lambda nodes: maze_core.generate_and_process_commands(nodes, verbose=False), _node_lists())
+    assert jit == python
@@ -0,0 +1,123 @@
+"""maze_core.optimize_commands'ın eski çok aşamalı hatla birebir aynı çıktıyı verdiği.
+
+Referans, tek geçişli sürümden önceki hattın kopyasıdır: birleştir -> kısa ileri filtresi ->
+birleştir -> zıt dönüş iptali -> birleştir -> son dönüşü at. maze_core'daki aşama
+fonksiyonları değişse bile karşılaştırma bu kopyaya karşı yapılır.
+"""
+import random
+
+import pytest
+
+import command_benchmark
+import maze_core
+
+SEEDS = range(300)
+
+
+def reference_consolidate(commands):
+    consolidated = []
+    i = 0
+    while i < len(commands):
+        action, value = commands[i]
+        if action.startswith("ileri"):
+            total = value
+            j = i + 1
+            while j < len(commands) and commands[j][0] == action:
+                total += commands[j][1]
+                j += 1
+            consolidated.append((action, total))
+            i = j
+        else:
+            consolidated.append((action, value))
+            i += 1
+    return consolidated
+
+
+def reference_filter_short_forwards(commands, min_acceptable_steps):
+    return [(action, value) for action, value in commands
+            if not action.startswith("ileri") or value >= min_acceptable_steps]
+
+
+def reference_nullify_opposing_turns(commands):
+    if len(commands) < 2:
+        return commands
+    result = []
+    i = 0
+    while i < len(commands):
+        if i + 1 < len(commands) and {commands[i][0], commands[i + 1][0]} == {"saga_don", "sola_don"}:
+            i += 2
+            continue
+        result.append(commands[i])
+        i += 1
+    return result
+
+
+def reference_display(commands):
+    texts = []
+    for action, value in commands:
+        if action.startswith("ileri"):
+            texts.append(f"İleri ({'Yatay' if action == 'ileri_a' else 'Dikey'}) {value}")
+        elif action == "saga_don":
+            texts.append("Sağ Dön")
+        elif action == "sola_don":
+            texts.append("Sol Dön")
+    return texts
+
+
+def reference_process(raw_commands, min_acceptable_forward_step):
+    commands = reference_consolidate(raw_commands)
+    commands = reference_filter_short_forwards(commands, min_acceptable_forward_step)
+    commands = reference_consolidate(commands)
+    commands = reference_nullify_opposing_turns(commands)
+    commands = reference_consolidate(commands)
+    if commands and commands[-1][0] in ("saga_don", "sola_don"):
+        commands.pop()
+    return commands, reference_display(commands)
+
+
+def optimized_process(raw_commands, min_acceptable_forward_step):
+    commands, texts = [], []
+    for command, text in maze_core.optimize_commands(raw_commands, min_acceptable_forward_step):
+        commands.append(command)
+        if text is not None:
+            texts.append(text)
+    return commands, texts
+
+
+def random_turn_heavy_commands(rng, length):
+    """Zıt dönüş zincirleri ve eşiğin hemen altı/üstündeki ileri adımları sık üretir."""
+    commands = []
+    for _ in range(length):
+        if rng.random() < 0.5:
+            commands.append((rng.choice(("saga_don", "sola_don")), 0))
+        else:
+            step = maze_core.MIN_ACCEPTABLE_FORWARD_STEP + rng.randint(-3, 2)
+            commands.append((rng.choice(("ileri_a", "ileri_b")), max(0, step)))
+    return commands
+
+
+@pytest.mark.parametrize("minimum", (0, 1, 5, maze_core.MIN_ACCEPTABLE_FORWARD_STEP, 20))
+def test_random_raw_commands(minimum):
+    for seed in SEEDS:
+        rng = random.Random(seed)
+        for raw in (command_benchmark.random_raw_commands(rng, rng.randint(0, 40)),
+                    random_turn_heavy_commands(rng, rng.randint(0, 40))):
+            assert optimized_process(raw, minimum) == reference_process(raw, minimum), raw
+
+
+def test_commands_from_random_walks():
+    for seed in SEEDS:
+        rng = random.Random(seed)
+        nodes = maze_core.simplify_path(command_benchmark.random_walk_path(rng, rng.randint(1, 400)))
+        raw = maze_core.generate_vehicle_perspective_commands(nodes)
+        minimum = rng.choice((0, 5, maze_core.MIN_ACCEPTABLE_FORWARD_STEP, 20))
+        assert optimized_process(raw, minimum) == reference_process(raw, minimum), nodes
+
+
+def test_edge_cases():
+    for raw in ([], [("saga_don", 0)], [("saga_don", 0), ("sola_don", 0)],
+                [("sola_don", 0), ("saga_don", 0), ("sola_don", 0)],
+                [("ileri_a", 3), ("saga_don", 0), ("ileri_a", 4), ("sola_don", 0), ("ileri_a", 9)],
+                [("ileri_b", 12), ("saga_don", 0), ("ileri_a", 2), ("sola_don", 0), ("ileri_b", 12)]):
+        assert optimized_process(raw, maze_core.MIN_ACCEPTABLE_FORWARD_STEP) == \
+            reference_process(raw, maze_core.MIN_ACCEPTABLE_FORWARD_STEP), raw
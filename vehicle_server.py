@@ -0,0 +1,175 @@
+"""Asyncio tabanlı çok araçlı soket sunucusu.
+
+Her bağlanan Pi için bağımsız bir VehicleSession tutulur (plan, kalibrasyon ofseti, kodlama
+sürümü, görev durumu). Olay döngüsü arka plan thread'inde çalışır; bağlantı, mesaj ve kopma
+geri çağrıları bu thread'den yapılır, arayüz bunları root.after ile kendi thread'ine aktarır.
+send() herhangi bir thread'den çağrılabilir.
+
+Mesajlar satır sonlu metindir (raspberrypiside.py ile aynı çerçeve). Kalp atışı PING/PONG
+mesajları (link_health.py) bu thread'de yanıtlanır ve on_message'a iletilmez; böylece ölçülen
+RTT arayüz thread'inin yoğunluğunu değil ağı gösterir.
+"""
+import asyncio
+import itertools
+import threading
+import time
+
+import command_codec
+import link_health
+
+
+class VehicleSession:
+    """Bağlı bir aracın bağlantı ve sürüş durumu."""
+
+    def __init__(self, session_id, address, writer):
+        self.session_id = session_id
+        self.address = address
+        self.name = None  # Pi'nin VEHICLE: ile bildirdiği ad
+        self.connected_at = time.time()
+        self.status = "Bağlandı"
+        self._writer = writer
+
+        self.plan = []  # Bu araca son gönderilen komutlar
+        self.image_source = None
+        self.follows_live_plan = False  # Canlı planlama değişiklikleri bu aracın kuyruğuna uygulanır
+        self.calibration_offset = None
+        self.is_calibrating = False
+        self.is_driving = False
+
+        # Pi'nin CAPS: ile bildirdiği ortak ikili kodlama sürümü; None ise JSON COMMANDS: kullanılır.
+        self.codec_version = None
+        self.last_commands_sent_binary = False
+        # Akışlı görev: gönderilen komutlar ve Pi'nin başladığı son indeks.
+        self.supports_mission = False
+        self.mission_id = 0
+        self.mission_seq = 0
+        self.mission_sent_commands = []
+        self.mission_progress_index = -1
+        self.mission_started_at = None
+        self.mission_pending_amend = None
+        # Kalp atışı ölçümleri; Pi CAPS: içinde HEARTBEAT bildirince PING gönderilmeye başlanır.
+        self.link = link_health.LinkMonitor()
+        self.link_stalled = False
+
+    @property
+    def label(self):
+        host, port = self.address[0], self.address[1]
+        return f"{self.name} ({host}:{port})" if self.name else f"{host}:{port}"
+
+
+class VehicleServer:
+    def __init__(self, host, port, on_connect, on_message, on_disconnect, on_status):
+        self.host = host
+        self.port = port
+        self.on_connect = on_connect
+        self.on_message = on_message
+        self.on_disconnect = on_disconnect
+        self.on_status = on_status  # (mesaj, çalışıyor_mu)
+        self.sessions = {}
+        self._ids = itertools.count(1)
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self.start_failed = False
+
+    def start(self):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._server = self._loop.run_until_complete(
+                asyncio.start_server(self._handle_client, self.host, self.port))
+        except OSError as e:
+            self._loop.close()
+            self.start_failed = True
+            self.on_status(f"Sunucu başlatma hatası: {e}", False)
+            return
+        self.on_status(f"Sunucu: {self.host}:{self.port} dinleniyor...", True)
+        try:
+            self._loop.run_forever()
+        finally:
+            self._server.close()
+            for session in list(self.sessions.values()):
+                session._writer.close()
+            # Bağlantı görevleri kopmayı işleyip on_disconnect çağırsın.
+            pending = [task for task in asyncio.all_tasks(self._loop) if not task.done()]
+            if pending:
+                self._loop.run_until_complete(asyncio.wait(pending, timeout=1.0))
+            self._loop.close()
+            self.on_status("Sunucu: Durduruldu", False)
+
+    async def _handle_client(self, reader, writer):
+        session = VehicleSession(next(self._ids), writer.get_extra_info('peername')[:2], writer)
+        self.sessions[session.session_id] = session
+        self.on_connect(session)
+        heartbeat = None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                message = line.decode('utf-8', errors='replace').strip()
+                if message.startswith((link_health.PING_PREFIX, link_health.PONG_PREFIX)):
+                    self._handle_heartbeat(session, message)
+                    continue
+                if heartbeat is None and message.startswith(command_codec.CAPS_PREFIX) and \
+                        link_health.CAPS_HEARTBEAT_KEY in command_codec.parse_caps_fields(message):
+                    heartbeat = asyncio.ensure_future(self._send_heartbeats(session))
+                if message:
+                    self.on_message(session, message)
+        except (ConnectionError, OSError, ValueError) as e:
+            print(f"Araç {session.label} ile bağlantı hatası: {e}")
+        finally:
+            if heartbeat is not None:
+                heartbeat.cancel()
+            self.sessions.pop(session.session_id, None)
+            writer.close()
+            self.on_disconnect(session)
+
+    def _handle_heartbeat(self, session, message):
+        try:
+            if message.startswith(link_health.PING_PREFIX):
+                self._write(session, (session.link.answer(message) + "\n").encode('utf-8'))
+            else:
+                session.link.record_pong(message)
+        except ValueError as e:
+            print(f"Araç {session.label}: {e}")
+
+    async def _send_heartbeats(self, session):
+        while True:
+            self._write(session, (session.link.next_ping() + "\n").encode('utf-8'))
+            await asyncio.sleep(link_health.HEARTBEAT_INTERVAL_S)
+
+    def send(self, session, message):
+        """Mesajı oturumun yazma sırasına koyar (thread güvenli); oturum kapalıysa False."""
+        if self._loop is None or self._loop.is_closed() or session.session_id not in self.sessions:
+            return False
+        try:
+            self._loop.call_soon_threadsafe(self._write, session, (message + "\n").encode('utf-8'))
+        except RuntimeError:  # Döngü kapanıyor
+            return False
+        return True
+
+    @staticmethod
+    def _write(session, data):
+        if not session._writer.is_closing():
+            session._writer.write(data)
+
+    def stop(self, farewell=None, timeout=2.0):
+        """Sunucuyu ve tüm bağlantıları kapatır; farewell verilirse önce her araca gönderilir."""
+        if not self.is_running():
+            return
+        if farewell:
+            for session in list(self.sessions.values()):
+                self.send(session, farewell)
+        try:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        except RuntimeError:
+            pass
+        self._thread.join(timeout)